@@ -0,0 +1,396 @@
+"""
+Python API for driving jobber from other programs.
+
+Unlike `jobber.cli.main`, these functions raise exceptions instead of exiting and return
+as soon as the work is started: `submit` returns a JobHandle to poll or wait on. Every
+operation has an `_async` variant for asyncio schedulers. Their waits sleep on the event
+loop, cloud API calls run one at a time in the default executor, and data syncs run as
+asyncio subprocesses, so hundreds of operations can be in flight in one process.
+"""
+
+import asyncio
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+from jobber import config as cfg
+from jobber import job_registry, push_targets, retry
+from jobber.docker_utils import DockerImage
+
+
+@dataclass
+class JobSpec:
+    """
+    Everything needed to submit one training job. Field names match the `submit` config
+    keys; AWS uses role_arn/instance_*, GCP uses project/machine_type/accelerator_*/replica_count.
+    """
+
+    image_uri: str
+    bucket: str
+    prefix: str = "jobber-run"
+    provider: str = "aws"
+    region: Optional[str] = None
+    entry_point: Optional[str] = None
+    source_dir: Optional[str] = "code-bundle"
+    hyperparameters: Dict[str, Any] = field(default_factory=dict)
+    job_name: Optional[str] = None
+    ensure_data: bool = True
+    # SageMaker
+    role_arn: Optional[str] = None
+    instance_type: str = "ml.m5.xlarge"
+    instance_count: int = 1
+    use_spot: bool = False
+    max_wait_seconds: Optional[int] = None
+    # Vertex AI
+    project: Optional[str] = None
+    machine_type: str = "n1-standard-4"
+    accelerator_type: Optional[str] = None
+    accelerator_count: Optional[int] = None
+    replica_count: int = 1
+    service_account: Optional[str] = None
+    network: Optional[str] = None
+    subnet: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, conf: Mapping[str, Any], **overrides: Any) -> "JobSpec":
+        """
+        Build a spec from a loaded config (`config.load_config`): the `submit` section plus
+        the top-level provider. Keys that only mean something to the CLI are ignored.
+        """
+        section = dict(conf.get("submit") or {})
+        section.setdefault("provider", conf.get("provider"))
+        section["bucket"] = section.get("gcs_bucket") or section.get("bucket")
+        section["prefix"] = section.get("gcs_prefix") or section.get("prefix")
+        if "params" in section:
+            section["hyperparameters"] = section.pop("params")
+        known = {f.name for f in fields(cls)}
+        values = {k: v for k, v in {**section, **overrides}.items() if k in known and v is not None}
+        return cls(**values)
+
+    def validate(self) -> None:
+        self.provider = cfg.resolve_provider({"provider": self.provider})
+        missing = ["image_uri", "bucket", "prefix"]
+        missing += ["role_arn"] if self.provider == "aws" else ["project", "region"]
+        missing = [name for name in missing if not getattr(self, name)]
+        if missing:
+            raise ValueError(f"{self.provider} job spec is missing {', '.join(missing)}")
+
+
+class JobFailed(RuntimeError):
+    def __init__(self, handle: "JobHandle", status: str):
+        super().__init__(f"{handle.name} ended with status {status}")
+        self.handle = handle
+        self.status = status
+
+
+@dataclass
+class JobHandle:
+    """
+    A submitted job. `status()` is one provider API call; `wait()` polls until the job is
+    terminal and raises JobFailed unless it succeeded.
+    """
+
+    provider: str
+    name: str
+    region: Optional[str] = None
+    project: Optional[str] = None
+    submitted_at: Optional[float] = None
+    last_status: Optional[str] = None
+
+    @property
+    def state(self) -> Optional[str]:
+        """
+        The last seen status normalized to pending/running/succeeded/failed/stopped.
+        """
+        return job_registry.normalize_state(self.provider, self.last_status) if self.last_status else None
+
+    @property
+    def done(self) -> bool:
+        return self.state in job_registry.TERMINAL_STATES
+
+    def status(self) -> str:
+        return _observe(self, _fetch_statuses([self]).get(self.name))
+
+    def wait(self, poll: float = 30, timeout: Optional[float] = None) -> str:
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            status = self.status()
+            if self.done:
+                return _check(self, status)
+            _wait_or_timeout(self, poll, deadline)
+            time.sleep(poll)
+
+    def stop(self) -> None:
+        job_registry.stop_job(self.provider, self.name, self.region)
+
+    async def status_async(self) -> str:
+        return await asyncio.to_thread(self.status)
+
+    async def wait_async(self, poll: float = 30, timeout: Optional[float] = None) -> str:
+        return (await wait_all_async([self], poll=poll, timeout=timeout))[0]
+
+    async def stop_async(self) -> None:
+        await asyncio.to_thread(self.stop)
+
+
+def _observe(handle: JobHandle, status: Optional[str]) -> str:
+    if status is None:
+        raise LookupError(f"{handle.provider} job {handle.name} not found")
+    if status != handle.last_status:
+        handle.last_status = status
+        try:
+            job_registry.update_status(handle.name, handle.provider, status)
+        except Exception:
+            pass  # the registry is a convenience; never fail a wait over it
+    return status
+
+
+def _check(handle: JobHandle, status: str) -> str:
+    if handle.state != "succeeded":
+        raise JobFailed(handle, status)
+    return status
+
+
+def _wait_or_timeout(handle: JobHandle, poll: float, deadline: Optional[float]) -> None:
+    if deadline is not None and time.time() + poll > deadline:
+        raise TimeoutError(f"{handle.name} still {handle.last_status} after waiting")
+
+
+def _fetch_statuses(handles: Sequence[JobHandle]) -> Dict[str, str]:
+    """
+    Current status of each job, batched the way `jobs refresh` does it: several SageMaker
+    jobs share one paginated list per region (from the oldest submit time); a single job,
+    or one whose submit time is unknown, is described on its own. Vertex AI jobs are one
+    get each.
+    """
+
+    def record(h: JobHandle) -> job_registry.JobRecord:
+        return job_registry.JobRecord(provider=h.provider, job_name=h.name, region=h.region, project=h.project, submitted_at=h.submitted_at or 0)
+
+    aws = [h for h in handles if h.provider == "aws"]
+    gcp = [record(h) for h in handles if h.provider == "gcp"]
+    listed = [record(h) for h in aws if h.submitted_at is not None] if len(aws) > 1 else []
+    out = job_registry.statuses(listed + gcp)
+    for h in aws:
+        if h.name not in out:
+            desc = retry.session(h.region).client("sagemaker").describe_training_job(TrainingJobName=h.name)
+            out[h.name] = desc["TrainingJobStatus"]
+    return out
+
+
+def wait_all(handles: Sequence[JobHandle], poll: float = 30, timeout: Optional[float] = None) -> List[str]:
+    """
+    Wait for every job with one batched status query per poll. Returns the final statuses
+    in order; raises JobFailed for the first job that did not succeed (after all finish).
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        pending = _poll(handles)
+        if not pending:
+            return [_check(h, h.last_status) for h in handles]
+        _wait_or_timeout(pending[0], poll, deadline)
+        time.sleep(poll)
+
+
+async def wait_all_async(handles: Sequence[JobHandle], poll: float = 30, timeout: Optional[float] = None) -> List[str]:
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        pending = await asyncio.to_thread(_poll, handles)
+        if not pending:
+            return [_check(h, h.last_status) for h in handles]
+        _wait_or_timeout(pending[0], poll, deadline)
+        await asyncio.sleep(poll)
+
+
+def _poll(handles: Sequence[JobHandle]) -> List[JobHandle]:
+    """
+    Refresh the handles that are not yet terminal; returns those still pending.
+    """
+    pending = [h for h in handles if not h.done]
+    statuses = _fetch_statuses(pending) if pending else {}
+    for handle in pending:
+        _observe(handle, statuses.get(handle.name))
+    return [h for h in pending if not h.done]
+
+
+def job(name: str, provider: Optional[str] = None, region: Optional[str] = None, project: Optional[str] = None) -> JobHandle:
+    """
+    A handle for an existing job, filled in from the job registry when it is recorded there.
+    """
+    record = job_registry.get(name)
+    if record:
+        return JobHandle(record.provider, record.job_name, region or record.region, project or record.project, record.submitted_at, record.status)
+    provider = provider or ("gcp" if name.startswith("projects/") else "aws")
+    if provider == "gcp" and not project:
+        project = name.split("/")[1] if name.startswith("projects/") else None
+    return JobHandle(provider, name, region, project)
+
+
+def _record(spec: JobSpec) -> job_registry.JobRecord:
+    from jobber import hyperparams
+
+    if spec.provider == "gcp":
+        compute = dict(instance_type=spec.machine_type, instance_count=spec.replica_count, accelerator_type=spec.accelerator_type, accelerator_count=spec.accelerator_count)
+        scheme = "gs"
+    else:
+        compute = dict(instance_type=spec.instance_type, instance_count=spec.instance_count)
+        scheme = "s3"
+    record = job_registry.JobRecord(
+        provider=spec.provider,
+        job_name="",
+        region=spec.region,
+        project=spec.project if spec.provider == "gcp" else None,
+        image_uri=spec.image_uri,
+        image_digest=job_registry.image_digest(spec.provider, spec.image_uri, spec.region),
+        hyperparameters={k: hyperparams.encode_value(v) for k, v in spec.hyperparameters.items()},
+        config_hash=job_registry.config_hash(asdict(spec)),
+        data_uri=f"{scheme}://{spec.bucket}/{spec.prefix}/data",
+        output_uri=f"{scheme}://{spec.bucket}/{spec.prefix}/outputs",
+        **compute,
+    )
+    try:
+        code_hash = job_registry.source_hash(spec.source_dir)
+    except OSError:
+        return record
+    record.fingerprint = job_registry.fingerprint(record, code_hash, entry_point=spec.entry_point)
+    record.workload = job_registry.workload_fingerprint(record, code_hash, entry_point=spec.entry_point)
+    return record
+
+
+def submit(spec: JobSpec, record: bool = True) -> JobHandle:
+    """
+    Create the job and return its handle without waiting for it. With `record`, the job is
+    added to the local registry like a CLI submit (`jobber jobs`, `jobber attach`).
+    """
+    spec.validate()
+    submitted_at = time.time()
+    entry = _record(spec) if record else None
+
+    def on_created(name: str) -> None:
+        if entry is not None:
+            entry.job_name = name
+            try:
+                job_registry.record(entry)
+            except Exception:
+                pass
+
+    source_dir = str(Path(spec.source_dir).resolve()) if spec.source_dir else None
+    if spec.provider == "gcp":
+        from jobber import vertex_submit
+
+        name = vertex_submit.submit_job(
+            project=spec.project,
+            region=spec.region,
+            image_uri=spec.image_uri,
+            bucket=spec.bucket,
+            prefix=spec.prefix,
+            entry_point=spec.entry_point,
+            source_dir=source_dir,
+            args=spec.hyperparameters,
+            machine_type=spec.machine_type,
+            accelerator_type=spec.accelerator_type,
+            accelerator_count=spec.accelerator_count,
+            replica_count=spec.replica_count,
+            job_name=spec.job_name,
+            service_account=spec.service_account,
+            network=spec.network,
+            subnet=spec.subnet,
+            ensure_data=spec.ensure_data,
+            on_created=on_created,
+        )
+    else:
+        from jobber import sm_submit
+
+        name = sm_submit.submit_job(
+            image_uri=spec.image_uri,
+            role_arn=spec.role_arn,
+            bucket=spec.bucket,
+            prefix=spec.prefix,
+            region=spec.region,
+            entry_point=spec.entry_point,
+            source_dir=source_dir,
+            hyperparameters=spec.hyperparameters,
+            instance_type=spec.instance_type,
+            instance_count=spec.instance_count,
+            job_name=spec.job_name,
+            ensure_data=spec.ensure_data,
+            use_spot=spec.use_spot,
+            max_wait_seconds=spec.max_wait_seconds,
+            on_created=on_created,
+            wait=False,
+        )
+    return JobHandle(spec.provider, name, spec.region, spec.project if spec.provider == "gcp" else None, entry.submitted_at if entry else submitted_at)
+
+
+async def submit_async(spec: JobSpec, record: bool = True) -> JobHandle:
+    return await asyncio.to_thread(submit, spec, record)
+
+
+def _sync_plan(src: Union[str, Path], dest: str, region: Optional[str], provider: Optional[str]):
+    """
+    Validate a sync and return (ensure_bucket callable, transfer command).
+    """
+    provider = cfg.resolve_provider({"provider": provider})
+    if dest.startswith("gs://") or provider == "gcp":
+        from jobber import gcp_storage
+
+        if not dest.startswith("gs://"):
+            raise ValueError("GCP sync requires gs:// destination")
+        parts = dest.split("/", 3)
+        if len(parts) < 3 or not parts[2]:
+            raise ValueError("Invalid GCS URI; expected gs://bucket/prefix")
+        return (lambda: gcp_storage.ensure_bucket(parts[2], region=region)), gcp_storage.sync_command(Path(src), dest)
+    if not dest.startswith("s3://"):
+        raise ValueError("Destination must start with s3:// for AWS sync")
+    from jobber import s3_utils
+
+    bucket = dest.split("/")[2]
+    return (lambda: s3_utils.ensure_bucket(bucket, region=region)), s3_utils.sync_command(Path(src), dest, region)
+
+
+def sync(src: Union[str, Path], dest: str, region: Optional[str] = None, provider: Optional[str] = None) -> str:
+    """
+    Sync a local folder to s3:// or gs://, creating the bucket if needed. Returns `dest`;
+    raises subprocess.CalledProcessError if the transfer fails.
+    """
+    ensure_bucket, cmd = _sync_plan(src, dest, region, provider)
+    ensure_bucket()
+    print(f"+ {' '.join(cmd)}")
+    subprocess.run(cmd, check=True)
+    return dest
+
+
+async def sync_async(src: Union[str, Path], dest: str, region: Optional[str] = None, provider: Optional[str] = None) -> str:
+    ensure_bucket, cmd = _sync_plan(src, dest, region, provider)
+    await asyncio.to_thread(ensure_bucket)
+    print(f"+ {' '.join(cmd)}")
+    proc = await asyncio.create_subprocess_exec(*cmd)
+    if await proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    return dest
+
+
+def push(
+    image: str,
+    targets: Iterable[Union[push_targets.PushTarget, Mapping[str, Any]]],
+    tag: str = "latest",
+    copy_from: Optional[str] = None,
+) -> List[push_targets.PushResult]:
+    """
+    Push a local image (or copy `copy_from`) to each target, concurrently. Targets are
+    PushTargets or `push.targets`-style mappings. Per-target failures are reported in the
+    results, not raised.
+    """
+    targets = [t if isinstance(t, push_targets.PushTarget) else push_targets.parse_targets([dict(t)])[0] for t in targets]
+    return push_targets.push_to_targets(DockerImage(name=image, tag=tag), targets, copy_from=copy_from)
+
+
+async def push_async(
+    image: str,
+    targets: Iterable[Union[push_targets.PushTarget, Mapping[str, Any]]],
+    tag: str = "latest",
+    copy_from: Optional[str] = None,
+) -> List[push_targets.PushResult]:
+    return await asyncio.to_thread(push, image, list(targets), tag, copy_from)
@@ -0,0 +1,343 @@
+"""
+Build-context helpers for jobber: .dockerignore matching and deterministic context archives.
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import re
+import tarfile
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+
+@dataclass
+class IgnoreRule:
+    pattern: str
+    regex: re.Pattern
+    negate: bool = False
+
+
+@dataclass
+class ContextReport:
+    total_bytes: int
+    files: int
+    largest_files: List[Tuple[str, int]]
+    largest_dirs: List[Tuple[str, int]]
+    suggestions: List[str]
+
+    @property
+    def total_mb(self) -> float:
+        return self.total_bytes / (1024 * 1024)
+
+
+@dataclass
+class ContextArchive:
+    path: Path
+    sha256: str
+    size: int
+    files: int
+
+
+def _pattern_to_regex(pattern: str) -> re.Pattern:
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "*":
+            if pattern[i : i + 2] == "**":
+                # `**/` matches zero or more directories; a trailing `**` matches everything.
+                if pattern[i : i + 3] == "**/":
+                    out.append("(?:.*/)?")
+                    i += 3
+                else:
+                    out.append(".*")
+                    i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                cls = pattern[i + 1 : end].replace("\\", "\\\\")
+                if cls.startswith("!"):
+                    cls = "^" + cls[1:]
+                out.append(f"[{cls}]")
+                i = end
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+def parse_ignore(text: str) -> List[IgnoreRule]:
+    """
+    Parse .dockerignore content into ordered rules (later rules win, `!` re-includes).
+    """
+    rules = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:].strip()
+        pattern = os.path.normpath(line).replace(os.sep, "/").lstrip("/")
+        if pattern in {"", "."}:
+            continue
+        rules.append(IgnoreRule(pattern=pattern, regex=_pattern_to_regex(pattern), negate=negate))
+    return rules
+
+
+def load_ignore_rules(context: str | Path) -> List[IgnoreRule]:
+    path = Path(context) / ".dockerignore"
+    if not path.exists():
+        return []
+    return parse_ignore(path.read_text())
+
+
+def is_ignored(relpath: str, rules: List[IgnoreRule]) -> bool:
+    """
+    Docker semantics: a rule matches a path or any of its parent directories; the last
+    matching rule decides.
+    """
+    parts = relpath.split("/")
+    candidates = ["/".join(parts[: i + 1]) for i in range(len(parts))]
+    ignored = False
+    for rule in rules:
+        if any(rule.regex.match(c) for c in candidates):
+            ignored = not rule.negate
+    return ignored
+
+
+def iter_context_files(context: str | Path, rules: Optional[List[IgnoreRule]] = None) -> Iterator[Tuple[str, Path]]:
+    """
+    Yield (relative posix path, absolute path) for every file docker would send, sorted.
+    """
+    root = Path(context)
+    if rules is None:
+        rules = load_ignore_rules(root)
+    # Directories can only be pruned when no `!` rule might re-include something below them.
+    can_prune = not any(r.negate for r in rules)
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        rel_dir = "" if rel_dir == "." else rel_dir + "/"
+        if can_prune:
+            dirnames[:] = [d for d in dirnames if not is_ignored(rel_dir + d, rules)]
+        dirnames.sort()
+        for name in sorted(filenames):
+            rel = rel_dir + name
+            if not is_ignored(rel, rules):
+                yield rel, Path(dirpath) / name
+
+
+BULKY_DIRS = {
+    "data",
+    "datasets",
+    "checkpoints",
+    "ckpt",
+    "outputs",
+    "output",
+    "models",
+    "model",
+    "runs",
+    "wandb",
+    "mlruns",
+    "lightning_logs",
+    "logs",
+    "node_modules",
+    "venv",
+    ".venv",
+    ".git",
+}
+BULKY_SUFFIXES = {
+    ".ckpt",
+    ".pt",
+    ".pth",
+    ".safetensors",
+    ".bin",
+    ".h5",
+    ".onnx",
+    ".npy",
+    ".npz",
+    ".parquet",
+    ".tar",
+    ".tgz",
+    ".gz",
+    ".zip",
+}
+SUGGEST_MIN_BYTES = 10 * 1024 * 1024
+
+
+def analyze_context(context: str | Path, top: int = 5) -> ContextReport:
+    """
+    Size up what `docker build` would send under the effective .dockerignore rules and
+    suggest ignore patterns for bulky data/checkpoint paths.
+    """
+    total = 0
+    count = 0
+    files: List[Tuple[str, int]] = []
+    dirs: dict[str, int] = {}
+    suffix_bytes: dict[str, int] = {}
+    for rel, path in iter_context_files(context):
+        try:
+            size = path.stat().st_size
+        except OSError:
+            continue
+        total += size
+        count += 1
+        files.append((rel, size))
+        if "/" in rel:
+            head = rel.split("/", 1)[0]
+            dirs[head] = dirs.get(head, 0) + size
+        suffix = Path(rel).suffix.lower()
+        if suffix in BULKY_SUFFIXES:
+            suffix_bytes[suffix] = suffix_bytes.get(suffix, 0) + size
+
+    largest_files = sorted(files, key=lambda f: f[1], reverse=True)[:top]
+    largest_dirs = sorted(dirs.items(), key=lambda d: d[1], reverse=True)[:top]
+
+    suggestions = []
+    for name, size in sorted(dirs.items(), key=lambda d: d[1], reverse=True):
+        if size >= SUGGEST_MIN_BYTES and name.lower() in BULKY_DIRS:
+            suggestions.append(f"{name}/")
+    for suffix, size in sorted(suffix_bytes.items(), key=lambda s: s[1], reverse=True):
+        if size >= SUGGEST_MIN_BYTES:
+            suggestions.append(f"**/*{suffix}")
+    return ContextReport(
+        total_bytes=total,
+        files=count,
+        largest_files=largest_files,
+        largest_dirs=largest_dirs,
+        suggestions=suggestions,
+    )
+
+
+def format_report(report: ContextReport) -> str:
+    lines = [f"Build context: {report.files} files, {_human(report.total_bytes)}"]
+    if report.largest_dirs:
+        lines.append("  largest directories:")
+        lines += [f"    {_human(size):>10}  {name}/" for name, size in report.largest_dirs]
+    if report.largest_files:
+        lines.append("  largest files:")
+        lines += [f"    {_human(size):>10}  {name}" for name, size in report.largest_files]
+    if report.suggestions:
+        lines.append("  consider adding to .dockerignore:")
+        lines += [f"    {pattern}" for pattern in report.suggestions]
+    return "\n".join(lines)
+
+
+def _human(n: int) -> str:
+    if n < 1024:
+        return f"{n} B"
+    size = n / 1024
+    for unit in ("KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+ARCHIVE_FORMATS = ("tar.gz", "zip")
+EXTERNAL_DOCKERFILE = ".jobber/Dockerfile"
+# Fixed zip timestamp (the earliest a zip entry can carry).
+_ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def archive_context(context: str | Path, dockerfile: Optional[str] = None, fmt: str = "tar.gz") -> ContextArchive:
+    """
+    Write the filtered build context to a reproducible .tar.gz (Cloud Build) or .zip
+    (CodeBuild, which only unpacks zip sources) and return its sha256.
+
+    File order, mtimes and ownership are normalized so the same tree always hashes the
+    same, which lets remote builds skip re-uploading an unchanged context. A Dockerfile
+    excluded by .dockerignore is added at its own path; one outside the context goes
+    to `.jobber/Dockerfile` (see dockerfile_in_archive) so it never shadows the
+    context's own Dockerfile.
+    """
+    if fmt not in ARCHIVE_FORMATS:
+        raise ValueError(f"unknown archive format {fmt!r}; expected {', '.join(ARCHIVE_FORMATS)}")
+    root = Path(context)
+    files = list(iter_context_files(root))
+    if dockerfile:
+        rel = dockerfile_in_archive(root, dockerfile)
+        files = [(name, path) for name, path in files if name != rel]
+        files.append((rel, Path(dockerfile)))
+    entries = sorted(files)
+
+    fd, tmp = tempfile.mkstemp(prefix="jobber-context-", suffix=f".{fmt}")
+    os.close(fd)
+    if fmt == "zip":
+        _write_zip(Path(tmp), entries)
+        digest = hashlib.sha256(Path(tmp).read_bytes())
+    else:
+        digest = hashlib.sha256()
+        _write_tar_gz(Path(tmp), entries, digest)
+    return ContextArchive(path=Path(tmp), sha256=digest.hexdigest(), size=Path(tmp).stat().st_size, files=len(entries))
+
+
+def dockerfile_in_archive(context: str | Path, dockerfile: Optional[str]) -> str:
+    """
+    The Dockerfile's path inside the context archive (what remote builds pass to `-f`).
+    """
+    if not dockerfile:
+        return "Dockerfile"
+    try:
+        return Path(dockerfile).resolve().relative_to(Path(context).resolve()).as_posix()
+    except ValueError:
+        return EXTERNAL_DOCKERFILE
+
+
+def _mode(path: Path) -> int:
+    return 0o755 if os.access(path, os.X_OK) else 0o644
+
+
+def _write_tar_gz(out: Path, entries: List[Tuple[str, Path]], digest) -> None:
+    with open(out, "wb") as raw:
+        writer = _HashingWriter(raw, digest)
+        with gzip.GzipFile(fileobj=writer, mode="wb", mtime=0) as gz:
+            with tarfile.open(fileobj=gz, mode="w", format=tarfile.PAX_FORMAT) as tar:
+                for rel, path in entries:
+                    info = tarfile.TarInfo(rel)
+                    info.size = path.stat().st_size
+                    info.mode = _mode(path)
+                    info.mtime = 0
+                    info.uid = info.gid = 0
+                    info.uname = info.gname = ""
+                    with open(path, "rb") as fh:
+                        tar.addfile(info, fh)
+
+
+def _write_zip(out: Path, entries: List[Tuple[str, Path]]) -> None:
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for rel, path in entries:
+            info = zipfile.ZipInfo(rel, date_time=_ZIP_EPOCH)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3  # unix, so external_attr carries the mode
+            info.external_attr = (0o100000 | _mode(path)) << 16
+            with open(path, "rb") as src, zf.open(info, "w") as dst:
+                while chunk := src.read(1 << 20):
+                    dst.write(chunk)
+
+
+class _HashingWriter(io.RawIOBase):
+    def __init__(self, raw, digest):
+        self._raw = raw
+        self._digest = digest
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._digest.update(b)
+        return self._raw.write(b)
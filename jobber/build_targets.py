@@ -0,0 +1,210 @@
+"""
+Concurrent builds of several images (template variants, platforms) from one build context.
+
+All targets are built with `docker buildx build` on the current builder, so they share one
+BuildKit cache: layers common to the variants are built once, and the context is synced
+to BuildKit incrementally instead of being sent again in full for every target.
+"""
+
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from jobber import docker_templates
+
+
+TARGET_KEYS = {"name", "template", "dockerfile", "image", "tags", "platforms", "template_params", "build_args", "push"}
+DEFAULT_PARALLEL = 2
+_print_lock = threading.Lock()
+
+
+@dataclass
+class BuildTarget:
+    name: str
+    image: str
+    tags: List[str] = field(default_factory=lambda: ["latest"])
+    template: Optional[str] = None
+    dockerfile: Optional[str] = None
+    platforms: List[str] = field(default_factory=list)
+    template_params: Dict[str, Any] = field(default_factory=dict)
+    build_args: Dict[str, Any] = field(default_factory=dict)
+    push: bool = False
+
+    @property
+    def refs(self) -> List[str]:
+        return [f"{self.image}:{tag}" for tag in self.tags]
+
+
+@dataclass
+class BuildResult:
+    target: BuildTarget
+    ok: bool
+    seconds: float
+    error: Optional[str] = None
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return [str(v) for v in value]
+
+
+def parse_targets(raw: List[Dict[str, Any]], defaults: Optional[Dict[str, Any]] = None) -> List[BuildTarget]:
+    """
+    Build BuildTargets from the `build.targets` config list, filling image/tag/dockerfile
+    from `defaults` (the top-level build args). A target names a template or a Dockerfile;
+    its name defaults to the template name.
+    """
+    defaults = defaults or {}
+    targets: List[BuildTarget] = []
+    for i, entry in enumerate(raw):
+        if not isinstance(entry, dict):
+            raise ValueError(f"build target #{i} must be a mapping, got {type(entry).__name__}")
+        unknown = set(entry) - TARGET_KEYS
+        if unknown:
+            raise ValueError(f"build target #{i} has unknown keys: {', '.join(sorted(unknown))}")
+        if entry.get("template") and entry.get("dockerfile"):
+            raise ValueError(f"build target #{i} sets both template and dockerfile")
+        template = entry.get("template")
+        if template:
+            docker_templates.get_template(template)  # unknown names fail before anything builds
+        dockerfile = None if template else entry.get("dockerfile") or defaults.get("dockerfile")
+        name = entry.get("name") or template or (Path(dockerfile).name if dockerfile else f"target{i}")
+        image = entry.get("image") or defaults.get("image")
+        if not image:
+            raise ValueError(f"build target {name!r} needs an image name (set `image` on the target or in build:)")
+        tags = _as_list(entry.get("tags")) or _as_list(defaults.get("tag")) or ["latest"]
+        platforms = _as_list(entry.get("platforms"))
+        push = bool(entry.get("push", False))
+        if len(platforms) > 1 and not push:
+            # `--load` fails for multi-platform images unless docker uses the containerd
+            # image store; catch it here rather than after the other targets have built.
+            raise ValueError(f"build target {name!r} builds {len(platforms)} platforms and must set push: true (docker can only load a single-platform image)")
+        targets.append(
+            BuildTarget(
+                name=str(name),
+                image=image,
+                tags=tags,
+                template=template,
+                dockerfile=dockerfile,
+                platforms=platforms,
+                template_params=dict(entry.get("template_params") or {}),
+                build_args=dict(entry.get("build_args") or {}),
+                push=push,
+            )
+        )
+    names = [t.name for t in targets]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate build target names: {', '.join(duplicates)}; set `name` on each")
+    return targets
+
+
+def select(targets: List[BuildTarget], names: Optional[List[str]]) -> List[BuildTarget]:
+    if not names:
+        return targets
+    unknown = sorted(set(names) - {t.name for t in targets})
+    if unknown:
+        raise ValueError(f"unknown build targets: {', '.join(unknown)} (have {', '.join(t.name for t in targets)})")
+    return [t for t in targets if t.name in names]
+
+
+def render_dockerfiles(
+    targets: List[BuildTarget], context: str, out_dir: Path, params: Optional[Dict[str, Any]] = None, extra: Optional[Dict[str, List[str]]] = None
+) -> Dict[str, str]:
+    """
+    Dockerfile path per target name. Templates are rendered to `out_dir/<name>.Dockerfile`
+    (outside the context, so variants never overwrite each other); `params`/`extra` are
+    the command-line template settings, which the target's own template_params override.
+    """
+    out: Dict[str, str] = {}
+    for target in targets:
+        if target.template:
+            tmpl = docker_templates.get_template(target.template)
+            path = out_dir / f"{target.name}.Dockerfile"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(tmpl.render({**(params or {}), **target.template_params}, extra))
+            out[target.name] = str(path)
+        else:
+            out[target.name] = target.dockerfile or str(Path(context) / "Dockerfile")
+    return out
+
+
+def build_command(target: BuildTarget, context: str, dockerfile: str) -> List[str]:
+    cmd = ["docker", "buildx", "build", "--progress", "plain", "-f", dockerfile]
+    for ref in target.refs:
+        cmd += ["-t", ref]
+    if target.platforms:
+        cmd += ["--platform", ",".join(target.platforms)]
+    for key, value in sorted(target.build_args.items()):
+        cmd += ["--build-arg", f"{key}={value}"]
+    # parse_targets only allows several platforms together with push.
+    cmd.append("--push" if target.push else "--load")
+    cmd.append(context)
+    return cmd
+
+
+def _run_prefixed(name: str, cmd: List[str]) -> None:
+    """
+    Run a build, prefixing each output line with the target name so concurrent builds
+    stay readable. Raises CalledProcessError with the last lines of output.
+    """
+    with _print_lock:
+        print(f"[{name}] + {' '.join(cmd)}", flush=True)
+    tail: deque = deque(maxlen=20)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace")
+    assert proc.stdout is not None
+    for line in proc.stdout:
+        tail.append(line.rstrip())
+        with _print_lock:
+            print(f"[{name}] {line.rstrip()}", flush=True)
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output="\n".join(tail))
+
+
+def build_targets(targets: List[BuildTarget], context: str, dockerfiles: Dict[str, str], parallel: Optional[int] = None) -> List[BuildResult]:
+    """
+    Build every target, at most `parallel` at a time. Failures are captured per target.
+    """
+    if not targets:
+        return []
+
+    def _build(target: BuildTarget) -> BuildResult:
+        started = time.time()
+        try:
+            _run_prefixed(target.name, build_command(target, context, dockerfiles[target.name]))
+        except (OSError, subprocess.CalledProcessError) as e:
+            return BuildResult(target=target, ok=False, seconds=time.time() - started, error=_error_line(e))
+        return BuildResult(target=target, ok=True, seconds=time.time() - started)
+
+    workers = max(1, min(parallel or DEFAULT_PARALLEL, len(targets)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_build, targets))
+
+
+def _error_line(e: Exception) -> str:
+    if isinstance(e, subprocess.CalledProcessError):
+        lines = [l for l in (e.output or "").splitlines() if "ERROR" in l or "error" in l]
+        return lines[-1].strip() if lines else f"exit status {e.returncode}"
+    return f"{type(e).__name__}: {e}"
+
+
+def format_report(results: List[BuildResult]) -> str:
+    lines = ["Build summary:"]
+    for res in results:
+        status = "ok" if res.ok else "FAILED"
+        platforms = ",".join(res.target.platforms) or "native"
+        line = f"  {status:<6} {res.target.name:<16} {', '.join(res.target.refs)} [{platforms}] ({res.seconds:.1f}s{', pushed' if res.ok and res.target.push else ''})"
+        if res.error:
+            line += f": {res.error}"
+        lines.append(line)
+    ok = sum(1 for r in results if r.ok)
+    lines.append(f"{ok}/{len(results)} targets built")
+    return "\n".join(lines)
@@ -3,59 +3,197 @@ jobber CLI: build/push/submit helpers.
 """
 
 import argparse
+import re
+import subprocess
 import sys
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Optional
 
 from jobber.docker_utils import DockerImage, build_image, push_image, tag_image
+from jobber import build_context
 from jobber import docker_templates
+from jobber import exists_cache
 from jobber import config as cfg
 from jobber import gcp_storage
+from jobber import push_targets
+from jobber import retry
 from jobber.gcp_artifact import ArtifactRef, configure_docker as gcp_auth, ensure_repo as gcp_ensure_repo, push_image as gcp_push
 import yaml
 
+DEFAULT_CONTEXT_WARN_MB = 500
+# Commands that also take defaults from another config section (later sections win).
+CONFIG_FALLBACKS = {"run-local": ["submit"]}
+
 
 def cmd_build(args: argparse.Namespace) -> None:
     context = args.context or "."
     tag = args.tag or "latest"
     dockerfile = args.dockerfile
     _ensure_default_dockerignore(context)
-    if not args.image:
+    remote = getattr(args, "remote", False)
+    if getattr(args, "targets", None):
+        if remote:
+            print("build.targets cannot be built with --remote; drop --remote or remove targets from the build config", file=sys.stderr)
+            sys.exit(1)
+        _build_targets(args, context)
+        return
+    if not args.image and not remote:
         print("Image name is required (e.g., --image my-training)", file=sys.stderr)
         sys.exit(1)
     if getattr(args, "template", None):
         tmpl = docker_templates.get_template(args.template)
         df_path = Path(context) / "Dockerfile"
         df_path.parent.mkdir(parents=True, exist_ok=True)
-        df_path.write_text(tmpl.content)
+        params, extra = _template_params(args)
+        try:
+            df_path.write_text(tmpl.render(params, extra))
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            sys.exit(1)
         dockerfile = str(df_path)
         print(f"Wrote Dockerfile from template: {tmpl.name} -> {df_path}")
+    _check_context(args, context)
+    _lint_dockerfile(dockerfile or str(Path(context) / "Dockerfile"))
+    if remote:
+        _remote_build(args, context, dockerfile)
+        return
     image = DockerImage(name=args.image, tag=tag)
     build_image(image, context=context, dockerfile=dockerfile)
     print(f"Built {image.ref}")
 
 
+def _build_targets(args: argparse.Namespace, context: str) -> None:
+    import tempfile
+
+    from jobber import build_targets
+
+    defaults = {"image": args.image, "tag": args.tag, "dockerfile": args.dockerfile}
+    try:
+        targets = build_targets.parse_targets(args.targets, defaults)
+        targets = build_targets.select(targets, getattr(args, "only", None))
+    except ValueError as e:
+        print(f"Invalid build targets: {e}", file=sys.stderr)
+        sys.exit(1)
+    _check_context(args, context)
+    params, extra = _template_params(args)
+    with tempfile.TemporaryDirectory(prefix="jobber-build-") as tmp:
+        try:
+            dockerfiles = build_targets.render_dockerfiles(targets, context, Path(tmp), params, extra)
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            sys.exit(1)
+        for target in targets:
+            _lint_dockerfile(dockerfiles[target.name])
+        print(f"Building {len(targets)} targets from {context}: {', '.join(t.name for t in targets)}")
+        results = build_targets.build_targets(targets, context, dockerfiles, parallel=getattr(args, "parallel", None))
+    print(build_targets.format_report(results))
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
+def _template_params(args: argparse.Namespace) -> tuple[dict, dict]:
+    params = {
+        "base_image": getattr(args, "base_image", None),
+        "python_version": getattr(args, "python_version", None),
+    }
+    raw = getattr(args, "template_params", None) or {}
+    if isinstance(raw, list):
+        for item in raw:
+            if "=" not in item:
+                print(f"Invalid --template-param {item!r}; expected KEY=VALUE", file=sys.stderr)
+                sys.exit(1)
+            k, v = item.split("=", 1)
+            params[k.replace("-", "_")] = v
+    else:
+        params.update(raw)
+    extra = {
+        "pip_packages": getattr(args, "pip_packages", None) or [],
+        "apt_packages": getattr(args, "apt_packages", None) or [],
+    }
+    return params, extra
+
+
+def _lint_dockerfile(path: str) -> None:
+    from jobber import dockerfile_lint
+
+    p = Path(path)
+    if not p.exists():
+        return
+    findings = dockerfile_lint.lint(p.read_text())
+    if findings:
+        print(dockerfile_lint.format_findings(findings, str(p)), file=sys.stderr)
+
+
+def _check_context(args: argparse.Namespace, context: str) -> None:
+    if getattr(args, "skip_context_check", False):
+        return
+    report = build_context.analyze_context(context)
+    warn_mb = getattr(args, "context_warn_mb", None)
+    if warn_mb is None:
+        warn_mb = DEFAULT_CONTEXT_WARN_MB
+    if report.total_mb <= warn_mb:
+        print(f"Build context: {report.files} files, {report.total_mb:.1f} MB")
+        return
+    print(build_context.format_report(report), file=sys.stderr)
+    print(f"Build context is {report.total_mb:.1f} MB (threshold {warn_mb} MB).", file=sys.stderr)
+    if getattr(args, "fail_on_large_context", False):
+        sys.exit(1)
+
+
+def _remote_build(args: argparse.Namespace, context: str, dockerfile: str | None) -> None:
+    from jobber import remote_build
+
+    if not args.image_uri or not args.staging_uri:
+        print("Remote build requires --image-uri (destination) and --staging-uri (s3://... or gs://...)", file=sys.stderr)
+        sys.exit(1)
+    try:
+        uri = remote_build.remote_build(
+            context=context,
+            dockerfile=dockerfile,
+            image_uri=args.image_uri,
+            staging_uri=args.staging_uri,
+            region=args.region,
+            project=args.project,
+            codebuild_project=args.codebuild_project,
+        )
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+    print(f"Built and pushed {uri}")
+
+
 def cmd_push(args: argparse.Namespace) -> None:
     provider = cfg.resolve_provider({"provider": args.provider})
     if not args.image:
         print("Image name is required (e.g., --image my-training)", file=sys.stderr)
         sys.exit(1)
 
+    if getattr(args, "targets", None) or getattr(args, "copy_from", None):
+        _push_to_targets(args, provider)
+        return
+
     if provider == "aws":
-        import boto3
         from jobber.ecr_utils import ECRInfo, ensure_repo, ecr_login
 
-        session = boto3.Session(region_name=args.region) if args.region else boto3.Session()
+        session = retry.session(args.region)
         if not session.region_name:
             print("Region not set; pass --region or configure AWS CLI.", file=sys.stderr)
             sys.exit(1)
         account_id = session.client("sts").get_caller_identity()["Account"]
         info = ECRInfo(account_id=account_id, region=session.region_name, repo_name=args.repo, image_tag=args.tag)
-        ensure_repo(session.client("ecr"), args.repo)
+        ensure_repo(session.client("ecr"), args.repo, account_id=account_id)
         ecr_login(info)
         src = DockerImage(name=args.image, tag=args.tag)
         tag_image(src, info.image_uri)
-        push_image(info.image_uri)
+        try:
+            push_image(info.image_uri)
+        except subprocess.CalledProcessError:
+            exists_cache.forget_image_repo(info.image_uri)
+            raise
         print(f"Pushed {info.image_uri}")
+        if not _publish_lazy_pull(args, info.image_uri, "aws"):
+            sys.exit(1)
         return
 
     # GCP path
@@ -68,21 +206,83 @@ def cmd_push(args: argparse.Namespace) -> None:
     ref = ArtifactRef(project=args.project, region=args.region, repo=args.artifact_repo, image=args.repo or args.image, tag=args.tag)
     gcp_ensure_repo(args.project, args.region, args.artifact_repo)
     gcp_auth(args.region)
-    gcp_push(DockerImage(name=args.image, tag=args.tag), ref)
+    try:
+        gcp_push(DockerImage(name=args.image, tag=args.tag), ref)
+    except subprocess.CalledProcessError:
+        exists_cache.forget_image_repo(ref.uri)
+        raise
     print(f"Pushed {ref.uri}")
+    if not _publish_lazy_pull(args, ref.uri, "gcp"):
+        sys.exit(1)
 
 
-def cmd_submit(args: argparse.Namespace) -> None:
+def _push_to_targets(args: argparse.Namespace, provider: str) -> None:
+    defaults = {
+        "provider": provider,
+        "region": args.region,
+        "repo": args.repo,
+        "project": args.project,
+        "artifact_repo": args.artifact_repo,
+    }
+    try:
+        targets = push_targets.parse_targets(getattr(args, "targets", None) or [{}], defaults)
+    except ValueError as e:
+        print(f"Invalid push targets: {e}", file=sys.stderr)
+        sys.exit(1)
+    results = push_targets.push_to_targets(
+        DockerImage(name=args.image, tag=args.tag),
+        targets,
+        copy_from=getattr(args, "copy_from", None),
+    )
+    print(push_targets.format_report(results))
+    published = [_publish_lazy_pull(args, r.uri, r.target.provider) for r in results if r.ok]
+    if not all(r.ok for r in results) or not all(published):
+        sys.exit(1)
+
+
+def _publish_lazy_pull(args: argparse.Namespace, uri: str, provider: str) -> bool:
+    """
+    With --lazy-pull, publish the SOCI/eStargz variant of a pushed image. Returns False
+    (after reporting) if that failed; the plain image stays pushed either way.
+    """
+    requested = getattr(args, "lazy_pull", None)
+    if not requested:
+        return True
+    from jobber import lazy_pull
+
+    try:
+        fmt = lazy_pull.resolve_format(requested, provider)
+    except ValueError as e:
+        print(f"Pushed {uri}, but not its lazy-pull variant: {e}", file=sys.stderr)
+        return False
+    try:
+        ref = lazy_pull.publish(uri, fmt)
+    except Exception as e:  # missing nerdctl/soci/buildx, registry auth, conversion errors
+        print(f"Pushed {uri}, but publishing its {fmt} variant failed: {type(e).__name__}: {e}", file=sys.stderr)
+        return False
+    print(f"Pushed lazy-pull variant {ref}")
+    return True
+
+
+def _collect_params(args: argparse.Namespace) -> dict:
+    from jobber import hyperparams
+
     extra_hps = {}
-    # params from config
+    # params from config (already typed by YAML)
     if getattr(args, "params", None):
         extra_hps.update(args.params)
     for item in args.param:
-        if "=" not in item:
-            print(f"Invalid --param {item!r}; expected KEY=VALUE", file=sys.stderr)
+        try:
+            k, v = hyperparams.parse_param(item)
+        except (ValueError, OSError, yaml.YAMLError) as e:
+            print(f"Invalid --param {item!r}: {e}", file=sys.stderr)
             sys.exit(1)
-        k, v = item.split("=", 1)
         extra_hps[k] = v
+    return extra_hps
+
+
+def cmd_submit(args: argparse.Namespace) -> None:
+    extra_hps = _collect_params(args)
     provider = cfg.resolve_provider({"provider": args.provider})
     if provider == "gcp":
         try:
@@ -102,51 +302,483 @@ def cmd_submit(args: argparse.Namespace) -> None:
         if not args.project or not args.region or not gcs_bucket or not gcs_prefix:
             print("GCP submit requires --project, --region, and GCS bucket/prefix (via --gcs-bucket/--gcs-prefix or --bucket/--prefix)", file=sys.stderr)
             sys.exit(1)
-        job_name = vertex_submit.submit_job(
-            project=args.project,
-            region=args.region,
-            image_uri=args.image_uri,
-            bucket=gcs_bucket,
-            prefix=gcs_prefix,
-            entry_point=args.entry_point,
-            source_dir=str(Path(args.source_dir).resolve()) if args.source_dir else None,
-            args=extra_hps,
-            machine_type=args.machine_type or "n1-standard-4",
+        args.image_uri, gcs_bucket = _co_locate(args, "gcp", gcs_bucket, gcs_prefix, args.region)
+        job = _submission_record(
+            args,
+            "gcp",
+            extra_hps,
             accelerator_type=args.accelerator_type,
             accelerator_count=args.accelerator_count,
-            replica_count=args.replica_count or 1,
-            job_name=args.job_name,
-            service_account=args.service_account,
-            network=args.network,
-            subnet=args.subnet,
-            ensure_data=getattr(args, "ensure_data", True),
-            tail_logs=args.tail_logs,
+            data_uri=f"gs://{gcs_bucket}/{gcs_prefix}/data",
+            output_uri=f"gs://{gcs_bucket}/{gcs_prefix}/outputs",
+            instance_type=args.machine_type or "n1-standard-4",
+            instance_count=args.replica_count or 1,
         )
+        if getattr(args, "plan", False) or getattr(args, "preflight", False):
+            from jobber import preflight
+
+            machine_type = args.machine_type or "n1-standard-4"
+            checks = preflight.vertex_checks(
+                project=args.project,
+                region=args.region,
+                image_uri=args.image_uri,
+                bucket=gcs_bucket,
+                prefix=gcs_prefix,
+                entry_point=args.entry_point,
+                source_dir=args.source_dir,
+                machine_type=machine_type,
+                accelerator_type=args.accelerator_type,
+                accelerator_count=args.accelerator_count,
+                ensure_data=getattr(args, "ensure_data", True),
+            )
+            payload = {
+                "parent": f"projects/{args.project}/locations/{args.region}",
+                "custom_job": vertex_submit.build_custom_job(
+                    image_uri=args.image_uri,
+                    bucket=gcs_bucket,
+                    prefix=gcs_prefix,
+                    entry_point=args.entry_point,
+                    args=extra_hps,
+                    machine_type=machine_type,
+                    accelerator_type=args.accelerator_type,
+                    accelerator_count=args.accelerator_count,
+                    replica_count=args.replica_count or 1,
+                    job_name=args.job_name,
+                    service_account=args.service_account,
+                    network=args.network,
+                    subnet=args.subnet,
+                    labels=_fingerprint_tags(job),
+                ),
+            }
+            _preflight(args, checks, "CustomJob", payload)
+            if args.plan:
+                _recommend(args, job)
+                return
+        if _dedupe(args, job):
+            return
+        job_name = None
+        with _detach_on_interrupt(job), _defer_to_earlier(args):
+            job_name = vertex_submit.submit_job(
+                project=args.project,
+                region=args.region,
+                image_uri=args.image_uri,
+                bucket=gcs_bucket,
+                prefix=gcs_prefix,
+                entry_point=args.entry_point,
+                source_dir=str(Path(args.source_dir).resolve()) if args.source_dir else None,
+                args=extra_hps,
+                machine_type=args.machine_type or "n1-standard-4",
+                accelerator_type=args.accelerator_type,
+                accelerator_count=args.accelerator_count,
+                replica_count=args.replica_count or 1,
+                job_name=args.job_name,
+                service_account=args.service_account,
+                network=args.network,
+                subnet=args.subnet,
+                ensure_data=getattr(args, "ensure_data", True),
+                tail_logs=args.tail_logs,
+                on_created=_job_recorder(job, args),
+                labels=_fingerprint_tags(job),
+            )
+        if job_name is None:
+            return
         print(f"Submitted Vertex AI job: {job_name}")
         return
 
     from jobber.sm_submit import submit_job
 
-    job_name = submit_job(
-        image_uri=args.image_uri,
-        role_arn=args.role_arn,
-        bucket=args.bucket,
-        prefix=args.prefix,
-        region=args.region,
-        entry_point=args.entry_point,
-        source_dir=str(Path(args.source_dir).resolve()),
-        hyperparameters=extra_hps,
+    if (getattr(args, "locality", None) or "warn") != "off":
+        session = retry.session(args.region)
+        args.image_uri, args.bucket = _co_locate(args, "aws", args.bucket, args.prefix, session.region_name, session)
+    job = _submission_record(
+        args,
+        "aws",
+        extra_hps,
+        data_uri=f"s3://{args.bucket}/{args.prefix}/data",
+        output_uri=f"s3://{args.bucket}/{args.prefix}/outputs",
         instance_type=args.instance_type,
         instance_count=args.instance_count,
-        job_name=args.job_name,
-        tail_logs=args.tail_logs,
-        ensure_data=getattr(args, "ensure_data", True),
-        use_spot=args.use_spot,
-        max_wait_seconds=args.max_wait_seconds,
     )
+    if getattr(args, "plan", False) or getattr(args, "preflight", False):
+        from jobber import preflight
+        from jobber.sm_submit import build_training_request
+
+        session = retry.session(args.region)
+        checks = preflight.aws_checks(
+            session,
+            image_uri=args.image_uri,
+            role_arn=args.role_arn,
+            bucket=args.bucket,
+            prefix=args.prefix,
+            entry_point=args.entry_point,
+            source_dir=args.source_dir,
+            instance_type=args.instance_type,
+            instance_count=args.instance_count,
+            use_spot=args.use_spot,
+            ensure_data=getattr(args, "ensure_data", True),
+        )
+        payload = build_training_request(
+            image_uri=args.image_uri,
+            role_arn=args.role_arn,
+            bucket=args.bucket,
+            prefix=args.prefix,
+            entry_point=args.entry_point,
+            source_dir=args.source_dir,
+            hyperparameters=extra_hps,
+            instance_type=args.instance_type,
+            instance_count=args.instance_count,
+            job_name=args.job_name,
+            use_spot=args.use_spot,
+            max_wait_seconds=args.max_wait_seconds,
+            tags=_fingerprint_tags(job),
+        )
+        _preflight(args, checks, "CreateTrainingJob", payload)
+        if args.plan:
+            _recommend(args, job)
+            return
+
+    if _dedupe(args, job):
+        return
+    job_name = None
+    with _detach_on_interrupt(job), _defer_to_earlier(args):
+        job_name = submit_job(
+            image_uri=args.image_uri,
+            role_arn=args.role_arn,
+            bucket=args.bucket,
+            prefix=args.prefix,
+            region=args.region,
+            entry_point=args.entry_point,
+            source_dir=str(Path(args.source_dir).resolve()),
+            hyperparameters=extra_hps,
+            instance_type=args.instance_type,
+            instance_count=args.instance_count,
+            job_name=args.job_name,
+            tail_logs=args.tail_logs,
+            ensure_data=getattr(args, "ensure_data", True),
+            use_spot=args.use_spot,
+            max_wait_seconds=args.max_wait_seconds,
+            on_created=_job_recorder(job, args),
+            tags=_fingerprint_tags(job),
+        )
+    if job_name is None:
+        return
     print(f"Submitted training job: {job_name}")
 
 
+def _co_locate(args: argparse.Namespace, provider: str, bucket: str, prefix: str, job_region: Optional[str], boto_session=None):
+    """
+    Apply --locality: compare the image registry and data/output bucket regions with the
+    job region, then warn, exit, or copy both into the job region. Returns the image URI
+    and bucket to submit with.
+    """
+    from jobber import locality
+
+    mode = getattr(args, "locality", None) or "warn"
+    if mode == "off" or not job_region:
+        return args.image_uri, bucket
+    found = locality.placements(provider, args.image_uri, bucket, boto_session)
+    remote = locality.mismatches(found, job_region)
+    if not remote:
+        return args.image_uri, bucket
+    print(locality.format_report(found, job_region), file=sys.stderr)
+    if mode == "warn":
+        print("Warning: cross-region reads and writes are slower and billed; --locality replicate copies them first.", file=sys.stderr)
+        return args.image_uri, bucket
+    if mode == "fail":
+        print(f"Refusing to submit: not in {job_region}. Pass --locality replicate or --locality warn.", file=sys.stderr)
+        sys.exit(1)
+    image_uri = args.image_uri
+    try:
+        target_bucket = None
+        if any(p.what != "image" for p in remote):
+            target_bucket = getattr(args, "replica_bucket", None) or locality.replica_bucket(bucket, job_region)
+        if getattr(args, "plan", False):
+            for p in remote:
+                target = locality.replica_image_uri(provider, image_uri, job_region) if p.what == "image" else target_bucket
+                print(f"Would copy {p.uri} -> {target}", file=sys.stderr)
+            return image_uri, bucket
+        for p in remote:
+            if p.what == "image":
+                image_uri = locality.replicate_image(provider, image_uri, job_region)
+            else:
+                locality.replicate_data(provider, bucket, prefix, p.region, target_bucket, job_region)
+                bucket = target_bucket
+    except locality.replication_errors() as e:
+        print(f"Replication to {job_region} failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Submitting with {image_uri} and {bucket} in {job_region}")
+    return image_uri, bucket
+
+
+def _submission_record(args: argparse.Namespace, provider: str, hyperparameters: dict, **fields):
+    """
+    The registry record for this submit (job name filled in once created). The image
+    digest lookup and the code hash behind the dedupe and workload fingerprints are only
+    paid for when --dedupe or --plan uses them.
+    """
+    from jobber import hyperparams, job_registry
+
+    needs_fingerprint = (getattr(args, "dedupe", None) or "off") != "off" or getattr(args, "plan", False)
+    effective = {k: v for k, v in vars(args).items() if not callable(v)}
+    job = job_registry.JobRecord(
+        provider=provider,
+        job_name="",
+        region=args.region,
+        project=getattr(args, "project", None) if provider == "gcp" else None,
+        image_uri=args.image_uri,
+        image_digest=job_registry.image_digest(provider, args.image_uri, args.region, resolve=needs_fingerprint),
+        hyperparameters={k: hyperparams.encode_value(v) for k, v in hyperparameters.items()},
+        config_hash=job_registry.config_hash(effective),
+        **fields,
+    )
+    if not needs_fingerprint:
+        return job
+    try:
+        code_hash = job_registry.source_hash(args.source_dir)
+    except OSError as e:
+        print(f"Warning: could not hash {args.source_dir}; dedupe disabled for this submit: {e}", file=sys.stderr)
+        return job
+    job.fingerprint = job_registry.fingerprint(job, code_hash, entry_point=args.entry_point)
+    job.workload = job_registry.workload_fingerprint(job, code_hash, entry_point=args.entry_point)
+    return job
+
+
+def _dedupe(args: argparse.Namespace, job) -> Optional[str]:
+    """
+    Apply --dedupe to an identical job that is still running or recently succeeded.
+    The local registry is checked first, then the provider (jobs carry their fingerprint
+    as a tag/label), so submits from other machines count too. Returns that job's name
+    when nothing new should be submitted; exits for `refuse`.
+    """
+    from jobber import job_registry
+
+    policy = getattr(args, "dedupe", None) or "off"
+    if policy == "off" or not job.fingerprint:
+        return None
+    window = getattr(args, "dedupe_window", None) or job_registry.DEFAULT_DEDUPE_WINDOW
+    try:
+        job_registry.parse_duration(window)
+    except ValueError as e:
+        print(f"Invalid --dedupe-window: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        existing = job_registry.find_duplicate(job.fingerprint, window)
+        if existing is None:
+            existing = job_registry.find_remote_duplicate(job.provider, job.fingerprint, window, region=job.region, project=job.project)
+    except Exception as e:
+        print(f"Warning: duplicate check failed, submitting anyway: {e}", file=sys.stderr)
+        return None
+    if existing is None:
+        return None
+    return _use_existing(args, existing, policy)
+
+
+def _use_existing(args: argparse.Namespace, existing, policy: str) -> str:
+    """
+    Act on an identical job per --dedupe: refuse, report it, or attach to it.
+    """
+    desc = f"{existing.job_name} ({existing.state}, fingerprint {existing.fingerprint})"
+    if policy == "refuse":
+        print(f"Refusing to submit: identical to {desc}. Pass --dedupe off to run it again.", file=sys.stderr)
+        sys.exit(1)
+    print(f"Identical job already exists: {desc}")
+    if existing.output_uri:
+        print(f"Outputs: {existing.output_uri}")
+    if policy == "attach" and not existing.terminal:
+        print(f"Attaching to {existing.job_name}")
+        if existing.provider == "gcp":
+            from jobber import vertex_submit
+
+            vertex_submit.attach_job(existing.project, existing.region, existing.job_name, tail_logs=args.tail_logs)
+        else:
+            from jobber.sm_submit import attach_job
+
+            attach_job(existing.job_name, existing.region, tail_logs=args.tail_logs)
+    return existing.job_name
+
+
+class _Superseded(Exception):
+    """
+    Raised from on_created when an identical job was created first by a concurrent submit.
+    """
+
+    def __init__(self, existing):
+        super().__init__(f"superseded by {existing.job_name}")
+        self.existing = existing
+
+
+def _fingerprint_tags(job) -> Optional[dict]:
+    """
+    The SageMaker tag / Vertex AI label that lets other machines find this job by fingerprint.
+    """
+    from jobber import job_registry
+
+    return {job_registry.FINGERPRINT_TAG: job.fingerprint} if job.fingerprint else None
+
+
+def _check_superseded(args: argparse.Namespace, job) -> None:
+    """
+    With --dedupe, look for identical jobs created before this one: two submits racing
+    past the duplicate check both create a job. The later one stops itself and defers
+    to the oldest, so concurrent submits converge on one job.
+    """
+    from jobber import job_registry
+
+    if (getattr(args, "dedupe", None) or "off") == "off" or not job.fingerprint:
+        return
+    try:
+        found = job_registry.remote_duplicates(job.provider, job.fingerprint, job.region, job.project)
+    except Exception as e:
+        print(f"Warning: could not check for concurrent duplicates: {e}", file=sys.stderr)
+        return
+    mine = next((j for j in found if j.job_name == job.job_name), job)
+    earlier = [
+        j for j in found if j.job_name != job.job_name and j.state not in ("failed", "stopped") and (j.submitted_at, j.job_name) < (mine.submitted_at, mine.job_name)
+    ]
+    if not earlier:
+        return
+    first = earlier[-1]
+    print(f"Identical job {first.job_name} was created first; stopping {job.job_name}", file=sys.stderr)
+    job_registry.stop_job(job.provider, job.job_name, job.region)
+    job_registry.update_status(job.job_name, job.provider, "Stopped" if job.provider == "aws" else "JOB_STATE_CANCELLED")
+    raise _Superseded(first)
+
+
+@contextmanager
+def _defer_to_earlier(args: argparse.Namespace):
+    """
+    Handle a submit that stopped itself in favour of an earlier identical job.
+    """
+    try:
+        yield
+    except _Superseded as e:
+        _use_existing(args, e.existing, getattr(args, "dedupe", None) or "off")
+
+
+def _recommend(args: argparse.Namespace, job) -> None:
+    """
+    For --plan: compare past runs of this workload and suggest the cheapest configuration
+    that meets --target-time.
+    """
+    from jobber import job_registry, recommender
+
+    if not job.workload:
+        return
+    try:
+        target = job_registry.parse_duration(args.target_time) if getattr(args, "target_time", None) else None
+    except ValueError as e:
+        print(f"Invalid --target-time: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        pricing = recommender.load_pricing(getattr(args, "pricing", None))
+        opts = recommender.workload_options(job.workload, pricing)
+    except Exception as e:
+        print(f"Warning: no recommendation: {e}", file=sys.stderr)
+        return
+    current = (job.instance_type, job.instance_count or 1, job.accelerator_type, job.accelerator_count)
+    print(recommender.format_recommendation(opts, recommender.recommend(opts, target), target, current))
+
+
+@contextmanager
+def _detach_on_interrupt(job):
+    """
+    Ctrl-C while tailing leaves the job running; say how to resume instead of a traceback.
+    """
+    try:
+        yield
+    except KeyboardInterrupt:
+        if not job.job_name:
+            raise
+        print(f"\nDetached; the job keeps running. Resume with `jobber attach {job.job_name}`.", file=sys.stderr)
+        sys.exit(130)
+
+
+def _job_recorder(job, args: Optional[argparse.Namespace] = None):
+    """
+    Callback for submit_job: record the job in the local registry as soon as it exists.
+    Registry problems are reported but never fail the submit. With `args`, also defer
+    to an identical job created concurrently (see _check_superseded).
+    """
+
+    def on_created(job_name: str) -> None:
+        from jobber import job_registry
+
+        job.job_name = job_name
+        try:
+            job_registry.record(job)
+        except Exception as e:
+            print(f"Warning: could not record {job_name} in the job registry: {e}", file=sys.stderr)
+        if args is not None:
+            _check_superseded(args, job)
+
+    return on_created
+
+
+def _preflight(args: argparse.Namespace, checks: dict, operation: str, payload: dict) -> None:
+    """
+    Run the preflight checks concurrently; with --plan also print the request that would be sent.
+    Exits non-zero if any check fails.
+    """
+    import json
+    from jobber import preflight
+
+    results = preflight.run_checks(checks)
+    print(preflight.format_checks(results))
+    if args.plan:
+        print(f"\n{operation} request:")
+        print(json.dumps(payload, indent=2, default=str))
+    failed = [c.name for c in results if c.failed]
+    if failed:
+        print(f"Preflight failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+def cmd_run_local(args: argparse.Namespace) -> None:
+    from jobber import local_run
+
+    provider = cfg.resolve_provider({"provider": args.provider})
+    if not args.image_uri:
+        print("run-local requires --image (local image ref)", file=sys.stderr)
+        sys.exit(1)
+    hps = _collect_params(args)
+    workdir = Path(args.workdir)
+    if provider == "gcp":
+        local = local_run.prepare_vertex(
+            image=args.image_uri,
+            entry_point=args.entry_point,
+            source_dir=args.source_dir,
+            args=hps,
+            data_dir=args.data,
+            workdir=workdir,
+            bucket=args.gcs_bucket or args.bucket,
+            prefix=args.gcs_prefix or args.prefix,
+            sample=args.sample,
+            cpu_only=args.cpu,
+            offline=args.offline,
+        )
+    else:
+        if not args.entry_point:
+            print("SageMaker-style run-local requires --entry-point", file=sys.stderr)
+            sys.exit(1)
+        local = local_run.prepare_sagemaker(
+            image=args.image_uri,
+            entry_point=args.entry_point,
+            source_dir=args.source_dir,
+            hyperparameters=hps,
+            data_dir=args.data,
+            workdir=workdir,
+            sample=args.sample,
+            cpu_only=args.cpu,
+            offline=args.offline,
+        )
+    try:
+        local_run.run_local(local)
+    except subprocess.CalledProcessError as e:
+        print(f"Local run failed with exit code {e.returncode}", file=sys.stderr)
+        sys.exit(e.returncode or 1)
+    print(f"Local run finished; model dir: {local.model_dir}")
+
+
 def cmd_init(args: argparse.Namespace) -> None:
     def prompt(msg: str, default: str | None = None) -> str:
         suffix = f" [{default}]" if default is not None else ""
@@ -276,6 +908,228 @@ def cmd_init(args: argparse.Namespace) -> None:
     print(f"Wrote sample config to {args.path}")
 
 
+def cmd_templates_show(args: argparse.Namespace) -> None:
+    tmpl = docker_templates.get_template(args.name)
+    if getattr(args, "params", False):
+        defaults = tmpl.defaults
+        for name in tmpl.params:
+            print(f"{name}: {defaults.get(name, '(required)')}")
+        return
+    print(tmpl.raw if getattr(args, "raw", False) else tmpl.content)
+
+
+def cmd_image_report(args: argparse.Namespace) -> None:
+    from jobber import image_report
+
+    try:
+        sizes = [image_report.image_size(ref) for ref in args.images]
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+    print(image_report.compare(sizes, mbps=args.pull_mbps))
+
+
+def cmd_templates_add(args: argparse.Namespace) -> None:
+    from jobber import dockerfile_lint
+
+    text = Path(args.source).read_text()
+    findings = dockerfile_lint.lint(text)
+    if findings:
+        print(dockerfile_lint.format_findings(findings, args.source), file=sys.stderr)
+        if args.strict and not args.fix:
+            sys.exit(1)
+    if args.fix and findings:
+        text = dockerfile_lint.fix(text)
+        print("Storing auto-fixed template (review with `jobber templates show --raw`).", file=sys.stderr)
+    docker_templates.add_template_text(args.name, text)
+
+
+def cmd_templates_lint(args: argparse.Namespace) -> None:
+    from jobber import dockerfile_lint
+
+    if args.file:
+        source, text = args.file, Path(args.file).read_text()
+    elif args.name:
+        tmpl = docker_templates.get_template(args.name)
+        try:
+            source, text = args.name, tmpl.content
+        except ValueError:
+            # Templates with required parameters are linted unrendered.
+            source, text = args.name, tmpl.raw
+    else:
+        print("Pass a template name or --file PATH", file=sys.stderr)
+        sys.exit(1)
+    findings = dockerfile_lint.lint(text)
+    if args.fix:
+        print(dockerfile_lint.fix(text), end="")
+        return
+    print(dockerfile_lint.format_findings(findings, source))
+    if findings:
+        sys.exit(1)
+
+
+def cmd_jobs_list(args: argparse.Namespace) -> None:
+    from jobber import job_registry
+
+    params = {}
+    for item in args.param or []:
+        if "=" not in item:
+            print(f"Invalid --param {item!r}; expected KEY=VALUE", file=sys.stderr)
+            sys.exit(1)
+        key, value = item.split("=", 1)
+        params[key] = value
+    try:
+        since = job_registry.parse_since(args.since) if args.since else None
+    except ValueError:
+        print(f"Invalid --since {args.since!r}; use e.g. 7d, 12h, 30m or an ISO date", file=sys.stderr)
+        sys.exit(1)
+    conn = job_registry.connect()
+    if args.refresh:
+        job_registry.refresh(conn)
+    jobs = job_registry.list_jobs(
+        provider=args.provider, state=args.state, since=since, name=args.name, params=params, limit=args.limit, conn=conn
+    )
+    print(job_registry.format_jobs(jobs))
+
+
+def cmd_jobs_show(args: argparse.Namespace) -> None:
+    from jobber import job_registry
+
+    job = job_registry.get(args.name)
+    if job is None:
+        print(f"No recorded job matches {args.name!r}", file=sys.stderr)
+        sys.exit(1)
+    print(job_registry.format_job(job))
+
+
+def cmd_jobs_refresh(args: argparse.Namespace) -> None:
+    from jobber import job_registry
+
+    changed = job_registry.refresh()
+    for job in changed:
+        print(f"{job.job_name}: {job.state} ({job.status})")
+    print(f"{len(changed)} job(s) changed state")
+
+
+def cmd_jobs_report(args: argparse.Namespace) -> None:
+    from jobber import utilization
+
+    try:
+        report = utilization.report_for(args.name, provider=args.provider, region=args.region)
+    except (ModuleNotFoundError, ValueError) as e:
+        print(f"{e}", file=sys.stderr)
+        sys.exit(1)
+    print(utilization.format_report(report))
+
+
+def cmd_attach(args: argparse.Namespace) -> None:
+    from jobber import job_registry
+
+    job_name, provider, region = args.job, args.provider, args.region
+    record = job_registry.get(args.job)
+    if record:
+        job_name, provider, region = record.job_name, record.provider, region or record.region
+    provider = provider or ("gcp" if job_name.startswith("projects/") else "aws")
+    try:
+        if provider == "gcp":
+            if not job_name.startswith("projects/"):
+                print(f"{job_name} is not in the job registry; pass the full projects/.../customJobs/ID name", file=sys.stderr)
+                sys.exit(1)
+            from jobber import vertex_submit
+            from jobber.job_registry import location_of
+
+            vertex_submit.attach_job(job_name.split("/")[1], region or location_of(job_name), job_name, tail_logs=True)
+        else:
+            from jobber.sm_submit import attach_job
+
+            attach_job(job_name, region, tail_logs=True)
+    except KeyboardInterrupt:
+        print(f"\nDetached; the job keeps running. Resume with `jobber attach {args.job}`.", file=sys.stderr)
+        sys.exit(130)
+
+
+def cmd_daemon_start(args: argparse.Namespace) -> None:
+    from jobber import daemon
+
+    if not daemon.supported():
+        print("jobber daemon needs Unix sockets and fork (Linux or macOS)", file=sys.stderr)
+        sys.exit(1)
+    info = daemon.request("status")
+    if info:
+        print(f"jobber daemon already running (pid {info['pid']}, {info['socket']})")
+        return
+    try:
+        if args.foreground:
+            daemon.serve(idle_timeout=args.idle_timeout)
+            return
+        info = daemon.start(idle_timeout=args.idle_timeout)
+    except RuntimeError as e:
+        print(f"{e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"jobber daemon running (pid {info['pid']}, {info['socket']}); preloaded: {', '.join(info['preloaded']) or 'nothing'}")
+
+
+def cmd_daemon_stop(args: argparse.Namespace) -> None:
+    from jobber import daemon
+
+    reply = daemon.request("stop")
+    if not reply:
+        print("jobber daemon is not running")
+        return
+    print(f"Stopped jobber daemon (pid {reply['stopping']}); running commands finish on their own.")
+
+
+def cmd_daemon_status(args: argparse.Namespace) -> None:
+    from jobber import daemon
+
+    info = daemon.request("status")
+    if not info:
+        print("jobber daemon is not running")
+        sys.exit(1)
+    print(f"pid:       {info['pid']}")
+    print(f"socket:    {info['socket']}")
+    print(f"uptime:    {info['uptime']}s")
+    print(f"served:    {info['served']} commands ({info['running']} running)")
+    print(f"preloaded: {', '.join(info['preloaded']) or 'nothing'}")
+
+
+def cmd_logs(args: argparse.Namespace) -> None:
+    from jobber import job_registry, log_archive
+
+    job_name, provider, region = args.job, args.provider, args.region
+    record = job_registry.get(args.job)
+    if record:
+        job_name, provider, region = record.job_name, record.provider, region or record.region
+    provider = provider or ("gcp" if job_name.startswith("projects/") else "aws")
+    try:
+        since = int(job_registry.parse_since(args.since) * 1000) if args.since else None
+    except ValueError:
+        print(f"Invalid --since {args.since!r}; use e.g. 7d, 12h, 30m or an ISO date", file=sys.stderr)
+        sys.exit(1)
+
+    archive = log_archive.LogArchive.open(provider, job_name)
+    if not archive.complete and not args.offline:
+        try:
+            if provider == "gcp":
+                if not job_name.startswith("projects/"):
+                    print(f"{job_name} is not in the job registry; pass the full projects/.../customJobs/ID name", file=sys.stderr)
+                    sys.exit(1)
+                log_archive.sync_vertex(archive, job_name)
+            else:
+                session = retry.session(region)
+                log_archive.sync_sagemaker(archive, job_name, session)
+        except ModuleNotFoundError as e:
+            print(f"{e}; showing archived logs only.", file=sys.stderr)
+        except Exception as e:
+            print(f"Warning: could not fetch new logs ({e}); showing archived logs only.", file=sys.stderr)
+    try:
+        for event in archive.events(since=since, grep=args.grep, stream=args.stream):
+            print(log_archive.format_event(event))
+    except re.error as e:
+        print(f"Invalid --grep pattern: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="jobber", description="Build/push/submit helper CLI.")
     sub = parser.add_subparsers(dest="command", required=True)
@@ -288,7 +1142,7 @@ def build_parser() -> argparse.ArgumentParser:
     p_init.set_defaults(func=cmd_init)
 
     p_build = sub.add_parser("build", help="Build a Docker image.")
-    p_build.add_argument("--config", help="Path to config file (yaml/json) for defaults.")
+    p_build.add_argument("--config", action="append", help="Config file (yaml/json) for defaults; repeat to layer overlays (later wins).")
     p_build.add_argument("--image", required=False, help="Local image name (e.g., myimg).")
     p_build.add_argument("--tag", help="Image tag (default: latest).")
     p_build.add_argument("--dockerfile", help="Path to Dockerfile (default: ./Dockerfile).")
@@ -298,6 +1152,54 @@ def build_parser() -> argparse.ArgumentParser:
         choices=[t.name for t in docker_templates.list_templates()],
         help="Render a canned Dockerfile template to the current directory before building.",
     )
+    p_build.add_argument("--base-image", dest="base_image", help="Template: override the base image.")
+    p_build.add_argument("--python-version", dest="python_version", help="Template: Python version (e.g., 3.11).")
+    p_build.add_argument(
+        "--pip-package",
+        dest="pip_packages",
+        action="append",
+        metavar="SPEC",
+        help="Template: extra pip package (repeat).",
+    )
+    p_build.add_argument(
+        "--apt-package",
+        dest="apt_packages",
+        action="append",
+        metavar="NAME",
+        help="Template: extra apt package (repeat).",
+    )
+    p_build.add_argument(
+        "--template-param",
+        dest="template_params",
+        action="append",
+        metavar="KEY=VALUE",
+        help="Template: set any template parameter (repeat; see `jobber templates show --params`).",
+    )
+    p_build.add_argument(
+        "--context-warn-mb",
+        dest="context_warn_mb",
+        type=int,
+        help=f"Warn (with a size report) when the build context exceeds this many MB (default: {DEFAULT_CONTEXT_WARN_MB}).",
+    )
+    p_build.add_argument(
+        "--fail-on-large-context",
+        dest="fail_on_large_context",
+        action="store_true",
+        help="Abort the build when the context exceeds --context-warn-mb.",
+    )
+    p_build.add_argument("--skip-context-check", dest="skip_context_check", action="store_true", help="Skip the context size analysis.")
+    p_build.add_argument("--only", action="append", metavar="NAME", help="With build.targets in the config: build only this target (repeat).")
+    p_build.add_argument("--parallel", type=int, help="With build.targets: how many targets to build at once (default: 2).")
+    p_build.add_argument(
+        "--remote",
+        action="store_true",
+        help="Build in the cloud (CodeBuild for s3:// staging, Cloud Build for gs://) and push straight to the registry.",
+    )
+    p_build.add_argument("--image-uri", dest="image_uri", help="Remote build: registry URI to push to.")
+    p_build.add_argument("--staging-uri", dest="staging_uri", help="Remote build: s3:// or gs:// prefix for the context archive.")
+    p_build.add_argument("--region", help="Remote build: cloud region.")
+    p_build.add_argument("--project", help="Remote build: GCP project for Cloud Build.")
+    p_build.add_argument("--codebuild-project", dest="codebuild_project", help="Remote build: AWS CodeBuild project name.")
     p_build.set_defaults(func=cmd_build)
 
     p_tpl = sub.add_parser("templates", help="Manage Dockerfile templates.")
@@ -307,19 +1209,40 @@ def build_parser() -> argparse.ArgumentParser:
 
     p_tpl_show = tpl_sub.add_parser("show", help="Show template content.")
     p_tpl_show.add_argument("name")
-    p_tpl_show.set_defaults(func=lambda a: print(docker_templates.get_template(a.name).content))
+    p_tpl_show.add_argument("--raw", action="store_true", help="Show the unrendered template with placeholders.")
+    p_tpl_show.add_argument("--params", action="store_true", help="List template parameters and their defaults.")
+    p_tpl_show.set_defaults(func=cmd_templates_show)
 
     p_tpl_add = tpl_sub.add_parser("add", help="Add a custom template from a file.")
     p_tpl_add.add_argument("name")
     p_tpl_add.add_argument("source")
-    p_tpl_add.set_defaults(func=lambda a: docker_templates.add_template(a.name, Path(a.source)))
+    p_tpl_add.add_argument("--fix", action="store_true", help="Store the lint-fixed (cache-efficient) version.")
+    p_tpl_add.add_argument("--strict", action="store_true", help="Refuse to add the template if lint finds issues.")
+    p_tpl_add.set_defaults(func=cmd_templates_add)
+
+    p_tpl_lint = tpl_sub.add_parser("lint", help="Check a template or Dockerfile for cache-busting patterns.")
+    p_tpl_lint.add_argument("name", nargs="?", help="Template name (omit with --file).")
+    p_tpl_lint.add_argument("--file", help="Lint a Dockerfile path instead of a template.")
+    p_tpl_lint.add_argument("--fix", action="store_true", help="Print the auto-fixed Dockerfile.")
+    p_tpl_lint.set_defaults(func=cmd_templates_lint)
 
     p_tpl_del = tpl_sub.add_parser("delete", help="Delete a template.")
     p_tpl_del.add_argument("name")
     p_tpl_del.set_defaults(func=lambda a: docker_templates.delete_template(a.name))
 
+    p_report = sub.add_parser("image-report", help="Compare image sizes and estimated pull time per job start.")
+    p_report.add_argument("images", nargs="+", help="Image refs or registry URIs; the first is the baseline.")
+    p_report.add_argument(
+        "--pull-mbps",
+        dest="pull_mbps",
+        type=float,
+        default=1000,
+        help="Assumed registry pull bandwidth in Mbit/s (default: 1000).",
+    )
+    p_report.set_defaults(func=cmd_image_report)
+
     p_push = sub.add_parser("push", help="Push local image to ECR.")
-    p_push.add_argument("--config", help="Path to config file (yaml/json) for defaults.")
+    p_push.add_argument("--config", action="append", help="Config file (yaml/json) for defaults; repeat to layer overlays (later wins).")
     p_push.add_argument("--image", required=False, help="Local image name to push (must be built).")
     p_push.add_argument("--repo", required=False, help="ECR repository name.")
     p_push.add_argument("--tag", default="latest", help="Tag (default: latest).")
@@ -327,10 +1250,23 @@ def build_parser() -> argparse.ArgumentParser:
     p_push.add_argument("--provider", choices=["aws", "gcp"], help="Target cloud (default: aws).")
     p_push.add_argument("--project", help="GCP project (Artifact Registry).")
     p_push.add_argument("--artifact-repo", dest="artifact_repo", help="GCP Artifact Registry repository name.")
+    p_push.add_argument(
+        "--lazy-pull",
+        dest="lazy_pull",
+        nargs="?",
+        const="auto",
+        choices=["auto", "soci", "estargz"],
+        help="Also publish a lazy-pull variant (<tag>-soci for ECR, <tag>-estargz for Artifact Registry by default).",
+    )
+    p_push.add_argument(
+        "--copy-from",
+        dest="copy_from",
+        help="Copy this image URI registry-to-registry to the target(s) instead of pushing the local image.",
+    )
     p_push.set_defaults(func=cmd_push)
 
     p_submit = sub.add_parser("submit", help="Submit a training job (SageMaker or Vertex AI).")
-    p_submit.add_argument("--config", help="Path to config file (yaml/json) for defaults.")
+    p_submit.add_argument("--config", action="append", help="Config file (yaml/json) for defaults; repeat to layer overlays (later wins).")
     p_submit.add_argument("--image-uri", required=False, help="ECR image URI.")
     p_submit.add_argument("--role-arn", required=False, help="SageMaker execution role ARN.")
     p_submit.add_argument("--bucket", required=False, help="S3 bucket for outputs.")
@@ -341,7 +1277,9 @@ def build_parser() -> argparse.ArgumentParser:
     p_submit.add_argument("--instance-type", default="ml.m5.xlarge")
     p_submit.add_argument("--instance-count", type=int, default=1)
     p_submit.add_argument("--job-name", help="Optional training job name.")
-    p_submit.add_argument("--param", action="append", default=[], metavar="KEY=VALUE", help="Hyperparameter (repeat).")
+    p_submit.add_argument(
+        "--param", action="append", default=[], metavar="KEY[:TYPE]=VALUE", help="Hyperparameter (repeat); TYPE is str, int, float, bool, list or json (json=@FILE reads a file)."
+    )
     p_submit.add_argument("--tail-logs", action="store_true", help="Stream CloudWatch logs.")
     p_submit.add_argument("--use-spot", action="store_true", help="Use SageMaker managed spot training.")
     p_submit.add_argument(
@@ -355,6 +1293,24 @@ def build_parser() -> argparse.ArgumentParser:
         dest="ensure_data",
         help="Disable placeholder upload if the data prefix is empty (defaults to enabled).",
     )
+    p_submit.add_argument("--plan", action="store_true", help="Run preflight checks and print the job request without submitting.")
+    p_submit.add_argument("--preflight", action="store_true", help="Run preflight checks first and only submit if none fail.")
+    p_submit.add_argument("--target-time", help="With --plan: wall time to meet when recommending an instance (e.g. 2h).")
+    p_submit.add_argument("--pricing", help="YAML/JSON with `instances:`/`accelerators:` USD/hour overriding the built-in table.")
+    p_submit.add_argument(
+        "--dedupe",
+        choices=["off", "attach", "reuse", "refuse"],
+        help="If an identical job is running or recently succeeded: wait on it (attach), print it and exit (reuse), "
+        "or fail (refuse). Default: off.",
+    )
+    p_submit.add_argument("--dedupe-window", help="How long a succeeded job counts as a duplicate (default: 24h).")
+    p_submit.add_argument(
+        "--locality",
+        choices=["warn", "fail", "replicate", "off"],
+        help="When the image registry or data/output bucket is in another region than the job: warn (default), "
+        "fail, or copy the image and data into the job's region first (replicate).",
+    )
+    p_submit.add_argument("--replica-bucket", help="With --locality replicate: bucket for the copied data (default: <bucket>-<region>).")
     p_submit.add_argument("--provider", choices=["aws", "gcp"], help="Target cloud (default: aws).")
     # GCP-specific
     p_submit.add_argument("--project", help="GCP project for Vertex AI.")
@@ -370,6 +1326,73 @@ def build_parser() -> argparse.ArgumentParser:
     p_submit.set_defaults(ensure_data=True)
     p_submit.set_defaults(func=cmd_submit)
 
+    p_local = sub.add_parser("run-local", help="Run the training image locally with the SageMaker/Vertex container layout.")
+    p_local.add_argument("--config", action="append", help="Config file (yaml/json; repeatable); falls back to the submit section.")
+    p_local.add_argument("--image", "--image-uri", dest="image_uri", help="Local image ref to run.")
+    p_local.add_argument("--provider", choices=["aws", "gcp"], help="Container contract to mimic (default: aws).")
+    p_local.add_argument("--entry-point", help="Training script (run as `python ENTRY`).")
+    p_local.add_argument("--source-dir", help="Mount this directory as the code dir (/opt/ml/code or /app).")
+    p_local.add_argument("--data", help="Local directory mounted as the train channel / data prefix.")
+    p_local.add_argument("--sample", type=int, help="Mount only the first N files of --data.")
+    p_local.add_argument("--param", action="append", default=[], metavar="KEY[:TYPE]=VALUE", help="Hyperparameter (repeat); see submit --param.")
+    p_local.add_argument("--cpu", action="store_true", help="CPU only: no GPU passthrough even if available.")
+    p_local.add_argument("--offline", action="store_true", help="Run without network access (docker --network none).")
+    p_local.add_argument("--workdir", default=".jobber-local", help="Host dir for config/model/output (default: .jobber-local).")
+    p_local.add_argument("--bucket", help=argparse.SUPPRESS)
+    p_local.add_argument("--prefix", help=argparse.SUPPRESS)
+    p_local.add_argument("--gcs-bucket", dest="gcs_bucket", help="Vertex: bucket used for the /gcs/<bucket>/<prefix> layout.")
+    p_local.add_argument("--gcs-prefix", dest="gcs_prefix", help="Vertex: prefix used for the /gcs/<bucket>/<prefix> layout.")
+    p_local.set_defaults(func=cmd_run_local)
+
+    p_jobs = sub.add_parser("jobs", help="Query the local registry of submitted jobs.")
+    jobs_sub = p_jobs.add_subparsers(dest="jobs_cmd", required=True)
+    p_jobs_list = jobs_sub.add_parser("list", help="List recorded jobs, newest first.")
+    p_jobs_list.add_argument("--provider", choices=["aws", "gcp"], help="Only jobs on this cloud.")
+    p_jobs_list.add_argument("--state", choices=["pending", "running", "succeeded", "failed", "stopped"], help="Only jobs in this state.")
+    p_jobs_list.add_argument("--since", help="Only jobs submitted after this (7d, 12h, 30m or an ISO date).")
+    p_jobs_list.add_argument("--name", help="Only jobs whose name contains this.")
+    p_jobs_list.add_argument("--param", action="append", default=[], metavar="KEY=VALUE", help="Only jobs run with this hyperparameter (repeat).")
+    p_jobs_list.add_argument("--limit", type=int, default=20, help="Max rows (default: 20; 0 for all).")
+    p_jobs_list.add_argument("--refresh", action="store_true", help="Refresh non-terminal jobs from the provider first.")
+    p_jobs_list.set_defaults(func=cmd_jobs_list)
+    p_jobs_show = jobs_sub.add_parser("show", help="Show everything recorded for one job.")
+    p_jobs_show.add_argument("name", help="Job name, Vertex job id, or a unique prefix.")
+    p_jobs_show.set_defaults(func=cmd_jobs_show)
+    p_jobs_report = jobs_sub.add_parser("report", help="Utilization and phase timing for a running or finished job.")
+    p_jobs_report.add_argument("name", help="Training job name or Vertex job resource name / id.")
+    p_jobs_report.add_argument("--provider", choices=["aws", "gcp"], help="Needed only for jobs not in the registry (default: aws).")
+    p_jobs_report.add_argument("--region", help="Region for jobs not in the registry.")
+    p_jobs_report.set_defaults(func=cmd_jobs_report)
+    p_jobs_refresh = jobs_sub.add_parser("refresh", help="Update the status of non-terminal jobs from the provider.")
+    p_jobs_refresh.set_defaults(func=cmd_jobs_refresh)
+
+    p_attach = sub.add_parser("attach", help="Resume tailing a job's logs where the last tail stopped.")
+    p_attach.add_argument("job", help="Training job name or Vertex job resource name / id.")
+    p_attach.add_argument("--provider", choices=["aws", "gcp"], help="Needed only for jobs not in the registry (default: aws).")
+    p_attach.add_argument("--region", help="Region for jobs not in the registry.")
+    p_attach.set_defaults(func=cmd_attach)
+
+    p_logs = sub.add_parser("logs", help="Show a job's logs from the local archive, fetching only what is missing.")
+    p_logs.add_argument("job", help="Training job name or Vertex job resource name / id.")
+    p_logs.add_argument("--grep", help="Only lines matching this regular expression.")
+    p_logs.add_argument("--since", help="Only lines after this (7d, 12h, 30m or an ISO date).")
+    p_logs.add_argument("--stream", help="Only streams containing this (e.g. algo-2, workerpool0-1).")
+    p_logs.add_argument("--offline", action="store_true", help="Never call the provider; show what is archived.")
+    p_logs.add_argument("--provider", choices=["aws", "gcp"], help="Needed only for jobs not in the registry (default: aws).")
+    p_logs.add_argument("--region", help="Region for jobs not in the registry.")
+    p_logs.set_defaults(func=cmd_logs)
+
+    p_daemon = sub.add_parser("daemon", help="Keep a warm jobber process that other jobber commands forward to.")
+    daemon_sub = p_daemon.add_subparsers(dest="daemon_cmd", required=True)
+    p_daemon_start = daemon_sub.add_parser("start", help="Start the daemon in the background.")
+    p_daemon_start.add_argument("--foreground", action="store_true", help="Run in this process instead of detaching.")
+    p_daemon_start.add_argument("--idle-timeout", type=int, default=0, metavar="SECONDS", help="Exit after this long without commands (default: never).")
+    p_daemon_start.set_defaults(func=cmd_daemon_start)
+    p_daemon_stop = daemon_sub.add_parser("stop", help="Stop the daemon.")
+    p_daemon_stop.set_defaults(func=cmd_daemon_stop)
+    p_daemon_status = daemon_sub.add_parser("status", help="Show whether the daemon is running and what it has loaded.")
+    p_daemon_status.set_defaults(func=cmd_daemon_status)
+
     p_sync = sub.add_parser("sync-data", help="Sync a local folder to object storage.")
     p_sync.add_argument("--src", required=True, help="Local folder path.")
     p_sync.add_argument("--dest", required=True, help="Destination URI (s3://... or gs://...).")
@@ -434,12 +1457,25 @@ def cmd_sync(args: argparse.Namespace) -> None:
 
 
 def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] != ["daemon"]:
+        from jobber import daemon
+
+        code = daemon.forward(argv)
+        if code is not None:
+            sys.exit(code)
     parser = build_parser()
     args = parser.parse_args(argv)
     # Apply config defaults if provided
     if getattr(args, "config", None):
-        conf = cfg.load_config(args.config)
-        defaults = conf.get(args.command, {})
+        try:
+            conf = cfg.load_config(args.config)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            print(f"Could not load config: {e}", file=sys.stderr)
+            sys.exit(1)
+        defaults = {}
+        for section in CONFIG_FALLBACKS.get(args.command, []) + [args.command]:
+            defaults.update(conf.get(section.replace("-", "_"), {}))
         # allow top-level provider to flow into command defaults
         if "provider" not in defaults and "provider" in conf:
             defaults = dict(defaults)
@@ -2,30 +2,136 @@
 Simple config loader/merger for jobber.
 """
 
+import hashlib
 import json
+import os
+import tempfile
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 import yaml
-import subprocess
-import json as jsonlib
-import re
-
-
-def load_config(path: str | Path) -> Dict[str, Any]:
-    p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"Config not found: {path}")
-    text = p.read_text()
-    if p.suffix.lower() in {".yaml", ".yml"}:
-        raw = yaml.safe_load(text) or {}
-        return normalize_keys(raw)
-    if p.suffix.lower() == ".json":
-        raw = json.loads(text)
-        return normalize_keys(raw)
-    # Try YAML as default
-    raw = yaml.safe_load(text) or {}
-    return normalize_keys(raw)
+
+from jobber.paths import cache_dir
+
+
+CACHE_VERSION = 1
+CACHE_MAX_ENTRIES = 512
+
+
+def load_config(paths: str | Path | Sequence[str | Path]) -> Dict[str, Any]:
+    """
+    Load one config, or several layered ones where later files override earlier ones.
+    A file may name base configs with `extends:` (a path or list, relative to the file).
+    Mappings are merged recursively; other values (including lists) are replaced.
+
+    The merged, normalized result is cached by the files' content hashes, so repeated
+    calls with unchanged files skip YAML parsing.
+    """
+    files = [Path(paths)] if isinstance(paths, (str, Path)) else [Path(p) for p in paths]
+    digests = {}
+    for p in files:
+        if not p.exists():
+            raise FileNotFoundError(f"Config not found: {p}")
+        digests[str(p.resolve())] = _digest(p.read_bytes())
+    cache = _cache_path(digests)
+    cached = _read_cache(cache, digests)
+    if cached is not None:
+        return cached
+    deps: Dict[str, str] = {}
+    merged: Dict[str, Any] = {}
+    for p in files:
+        merged = deep_merge(merged, _load_layer(p.resolve(), deps, ()))
+    _write_cache(cache, deps, merged)
+    return merged
+
+
+def _parse(path: Path, text: str) -> Any:
+    if path.suffix.lower() == ".json":
+        return json.loads(text)
+    # YAML for .yaml/.yml and anything else
+    return yaml.safe_load(text) or {}
+
+
+def _load_layer(path: Path, deps: Dict[str, str], chain: Tuple[Path, ...]) -> Dict[str, Any]:
+    if path in chain:
+        raise ValueError("Config extends cycle: " + " -> ".join(str(p) for p in chain + (path,)))
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Config not found: {path}" + (f" (extended by {chain[-1]})" if chain else "")) from None
+    deps[str(path)] = _digest(data)
+    conf = normalize_keys(_parse(path, data.decode()))
+    if not isinstance(conf, dict):
+        raise ValueError(f"{path}: config must be a mapping")
+    bases = conf.pop("extends", None) or []
+    merged: Dict[str, Any] = {}
+    for base in [bases] if isinstance(bases, str) else bases:
+        merged = deep_merge(merged, _load_layer((path.parent / base).resolve(), deps, chain + (path,)))
+    return deep_merge(merged, conf)
+
+
+def deep_merge(base: Dict[str, Any], overlay: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(base)
+    for k, v in overlay.items():
+        if isinstance(v, dict) and isinstance(merged.get(k), dict):
+            merged[k] = deep_merge(merged[k], v)
+        else:
+            merged[k] = v
+    return merged
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _cache_enabled() -> bool:
+    return os.environ.get("JOBBER_CONFIG_CACHE", "1") not in ("0", "false", "no")
+
+
+def _cache_path(digests: Dict[str, str]) -> Path:
+    key = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    for path, digest in digests.items():
+        key.update(f"\0{path}\0{digest}".encode())
+    return cache_dir() / "config" / f"{key.hexdigest()[:32]}.json"
+
+
+def _read_cache(cache: Path, digests: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    The cached config if every file it was built from (including `extends:` bases, which
+    are not part of the key) still has the same content.
+    """
+    if not _cache_enabled():
+        return None
+    try:
+        entry = json.loads(cache.read_text())
+        for path, digest in entry["deps"].items():
+            if digests.get(path, None) != digest and _digest(Path(path).read_bytes()) != digest:
+                return None
+        return entry["config"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_cache(cache: Path, deps: Dict[str, str], conf: Dict[str, Any]) -> None:
+    if not _cache_enabled():
+        return
+    try:
+        text = json.dumps({"deps": deps, "config": conf})
+    except (TypeError, ValueError):
+        return  # e.g. YAML dates; such configs are simply parsed every time
+    if json.loads(text)["config"] != conf:
+        return  # e.g. non-string keys, which JSON would turn into strings
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache.parent, prefix=".config-", suffix=".json")
+        with os.fdopen(fd, "w") as fh:
+            fh.write(text)
+        os.replace(tmp, cache)
+        entries = sorted(cache.parent.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for old in entries[:-CACHE_MAX_ENTRIES]:
+            old.unlink(missing_ok=True)
+    except OSError:
+        pass
 
 
 def merge_defaults(args: dict, defaults: Dict[str, Any]) -> dict:
@@ -37,19 +143,22 @@ def merge_defaults(args: dict, defaults: Dict[str, Any]) -> dict:
 
 
 def guess_aws_region() -> Optional[str]:
+    """
+    Region from the AWS config/env chain (no process or network call).
+    """
     try:
-        out = subprocess.check_output(["aws", "configure", "get", "region"], stderr=subprocess.DEVNULL)
-        region = out.decode().strip()
-        return region or None
+        import boto3
+
+        return boto3.Session().region_name or None
     except Exception:
         return None
 
 
 def guess_aws_account() -> Optional[str]:
     try:
-        out = subprocess.check_output(["aws", "sts", "get-caller-identity", "--output", "json"], stderr=subprocess.DEVNULL)
-        data = jsonlib.loads(out.decode())
-        return data.get("Account")
+        import boto3
+
+        return boto3.Session().client("sts").get_caller_identity().get("Account")
     except Exception:
         return None
 
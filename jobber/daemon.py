@@ -0,0 +1,463 @@
+"""
+Optional long-lived jobber process that serves CLI commands over a Unix socket.
+
+The daemon imports the cloud SDKs, parses the botocore service models and resolves AWS and
+Google credentials once. Each forwarded command runs in a forked worker that inherits that
+warm state along with the caller's stdin/stdout/stderr (passed over the socket), working
+directory and environment, so it behaves like a local run without the startup cost.
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from jobber.paths import cache_dir
+
+
+PRELOAD_MODULES = (
+    "boto3",
+    "jobber.sm_submit",  # the SageMaker SDK: by far the slowest import
+    "jobber.vertex_submit",
+    "google.cloud.storage",
+    "google.cloud.artifactregistry_v1",
+    "jobber.preflight",
+    "jobber.job_registry",
+    "jobber.job_metrics",
+    "jobber.log_archive",
+    "jobber.push_targets",
+    "jobber.remote_build",
+)
+AWS_SERVICES = ("sagemaker", "s3", "ecr", "logs", "cloudwatch", "sts", "iam", "service-quotas", "codebuild")
+# Variables that decide which credentials apply. A worker whose caller's values differ from
+# the daemon's resolves credentials itself.
+AUTH_ENV_PREFIXES = ("AWS_", "GOOGLE_", "CLOUDSDK_")
+# gcloud files that hold the active account and application-default credentials.
+GCLOUD_CREDENTIAL_FILES = ("application_default_credentials.json", "credentials.db", "active_config")
+REFRESH_SECONDS = 600
+FORWARDED_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+def socket_path() -> Path:
+    return Path(os.environ.get("JOBBER_DAEMON_SOCKET") or cache_dir() / "daemon.sock")
+
+
+def log_path() -> Path:
+    return cache_dir() / "daemon.log"
+
+
+def supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds") and hasattr(os, "fork")
+
+
+def credential_files(env: Dict[str, str]) -> List[Path]:
+    """
+    Files the AWS and Google credential chains read, as seen with `env`.
+    """
+    home = Path(env.get("HOME") or Path.home())
+    files = [
+        Path(env.get("AWS_SHARED_CREDENTIALS_FILE") or home / ".aws" / "credentials"),
+        Path(env.get("AWS_CONFIG_FILE") or home / ".aws" / "config"),
+    ]
+    gcloud = Path(env.get("CLOUDSDK_CONFIG") or home / ".config" / "gcloud")
+    files += [gcloud / name for name in GCLOUD_CREDENTIAL_FILES]
+    if env.get("GOOGLE_APPLICATION_CREDENTIALS"):
+        files.append(Path(env["GOOGLE_APPLICATION_CREDENTIALS"]))
+    return files
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def auth_fingerprint(env: Dict[str, str]) -> str:
+    """
+    Identifies the credentials `env` resolves to: the credential variables and the
+    modification times of the credential files (`aws configure`, `gcloud auth login`).
+    """
+    items = sorted((k, v) for k, v in env.items() if k.startswith(AUTH_ENV_PREFIXES))
+    files = [(str(path), _mtime(path)) for path in credential_files(env)]
+    return hashlib.sha256(json.dumps([items, files]).encode()).hexdigest()
+
+
+def build_id() -> Dict[str, Any]:
+    """
+    The jobber code and interpreter this process runs. A daemon started before an upgrade
+    (or from another virtualenv) would otherwise serve commands with stale code.
+    """
+    try:
+        from importlib.metadata import version
+
+        installed = version("jobber")
+    except Exception:
+        installed = None
+    return {"package": str(Path(__file__).resolve().parent), "version": installed, "python": sys.executable}
+
+
+def _connect(path: Path, timeout: Optional[float] = None) -> socket.socket:
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.settimeout(timeout)
+    try:
+        conn.connect(str(path))
+    except OSError:
+        conn.close()
+        raise
+    return conn
+
+
+def _send(conn: socket.socket, message: Dict[str, Any]) -> None:
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _read_message(reader) -> Optional[Dict[str, Any]]:
+    line = reader.readline()
+    return json.loads(line) if line else None
+
+
+def _read_request(conn: socket.socket):
+    """
+    The newline-terminated JSON request and the file descriptors sent with it.
+    """
+    data, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+    while not data.endswith(b"\n"):
+        chunk = conn.recv(65536)
+        if not chunk:
+            raise ValueError("incomplete request")
+        data += chunk
+    return json.loads(data), fds
+
+
+# Client side
+
+
+def request(op: str, timeout: float = 5) -> Optional[Dict[str, Any]]:
+    """
+    Send a control request (status, stop); None if no daemon is listening.
+    """
+    if not supported():
+        return None
+    try:
+        with _connect(socket_path(), timeout) as conn:
+            socket.send_fds(conn, [json.dumps({"op": op}).encode() + b"\n"], [])
+            return _read_message(conn.makefile("rb"))
+    except (OSError, ValueError):
+        return None
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """
+    Run a CLI command in the daemon and return its exit code, or None when no daemon is
+    listening (the caller then runs the command itself). Ctrl-C is passed to the worker.
+    """
+    if os.environ.get("JOBBER_NO_DAEMON") or not supported():
+        return None
+    path = socket_path()
+    if not path.exists():
+        return None
+    try:
+        conn = _connect(path, timeout=5)
+    except OSError:
+        return None
+    with conn:
+        reader = conn.makefile("rb")
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            payload = {"op": "run", "argv": argv, "cwd": os.getcwd(), "env": dict(os.environ), "build": build_id()}
+            socket.send_fds(conn, [json.dumps(payload).encode() + b"\n"], [0, 1, 2])
+            started = _read_message(reader)
+        except (OSError, ValueError):
+            return None
+        if started and "mismatch" in started:
+            daemon_build = started["mismatch"]
+            print(
+                f"jobber daemon runs jobber {daemon_build.get('version') or 'from source'} from {daemon_build.get('package')} "
+                f"with {daemon_build.get('python')}; running this command locally. Restart it with `jobber daemon stop`.",
+                file=sys.stderr,
+            )
+            return None
+        if not started or "pid" not in started:
+            return None
+        conn.settimeout(None)
+        pid = started["pid"]
+
+        def relay(signum, frame):
+            try:
+                os.kill(pid, signum)
+            except OSError:
+                pass
+
+        previous = {sig: signal.signal(sig, relay) for sig in FORWARDED_SIGNALS}
+        try:
+            done = _read_message(reader)
+        except (OSError, ValueError):
+            done = None
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+    if not done or "exit" not in done:
+        print("jobber daemon worker exited without a status", file=sys.stderr)
+        return 1
+    return done["exit"]
+
+
+def start(idle_timeout: int = 0, wait_seconds: float = 120) -> Dict[str, Any]:
+    """
+    Launch the daemon in the background and wait until it accepts connections.
+    """
+    cmd = [sys.executable, "-m", "jobber.cli", "daemon", "start", "--foreground", "--idle-timeout", str(idle_timeout)]
+    log_path().parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path(), "ab") as log:
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True)
+    deadline = time.time() + wait_seconds
+    while time.time() < deadline:
+        info = request("status")
+        if info:
+            return info
+        if proc.poll() is not None:
+            raise RuntimeError(f"daemon exited with status {proc.returncode}; see {log_path()}")
+        time.sleep(0.1)
+    raise RuntimeError(f"daemon did not start within {wait_seconds:.0f}s; see {log_path()}")
+
+
+# Server side
+
+
+def warm() -> List[str]:
+    """
+    Import the SDKs and resolve credentials so forked workers start warm. Returns what
+    was loaded; anything not installed or not configured is skipped.
+    """
+    loaded = []
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            continue
+        loaded.append(name)
+    try:
+        import boto3
+        import botocore.loaders
+        from jobber import retry
+
+        base = boto3.Session()
+        retry.share(botocore.loaders.create_loader(), base.get_credentials())
+        session = retry.session(base.region_name or "us-east-1")
+        for service in AWS_SERVICES:
+            session.client(service)  # parses the service model into the shared loader
+        loaded.append("aws-session")
+    except Exception:
+        pass
+    try:
+        from jobber import gcp_clients
+
+        gcp_clients.access_token()
+        loaded.append("gcp-credentials")
+    except Exception:
+        pass
+    return loaded
+
+
+def _refresh() -> None:
+    """
+    Renew credentials that are close to expiry, so new workers inherit fresh ones.
+    """
+    from jobber import retry
+
+    try:
+        credentials = retry._shared.get("credentials")
+        if credentials is not None:
+            credentials.get_frozen_credentials()
+    except Exception:
+        pass
+    if "google.auth" in sys.modules:
+        try:
+            from jobber import gcp_clients
+
+            gcp_clients.access_token()
+        except Exception:
+            pass
+
+
+def _forget_warm_state() -> None:
+    from jobber import retry
+
+    retry.share()
+    if "jobber.gcp_clients" in sys.modules:
+        sys.modules["jobber.gcp_clients"].reset()
+
+
+def _bind(path: Path) -> socket.socket:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        try:
+            _connect(path, timeout=1).close()
+        except OSError:
+            path.unlink()  # left behind by a daemon that did not shut down cleanly
+        else:
+            raise RuntimeError(f"a jobber daemon is already listening on {path}")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)  # owner-only socket: a worker runs anything with our credentials
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(umask)
+    server.listen(64)
+    return server
+
+
+def _exit_code(e: SystemExit) -> int:
+    if e.code is None or isinstance(e.code, int):
+        return e.code or 0
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def _run_worker(conn: socket.socket, req: Dict[str, Any], fds: List[int], fingerprint: str) -> None:
+    """
+    In the forked child: take over the caller's stdio, cwd and environment, run the
+    command, report the exit code and exit. Never returns.
+    """
+    code = 1
+
+    def terminated(signum, frame):
+        raise SystemExit(128 + signum)
+
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, terminated)
+        for target, fd in zip((0, 1, 2), fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        sys.stdin = open(0, "r", closefd=False)
+        sys.stdout = open(1, "w", buffering=1, closefd=False)
+        sys.stderr = open(2, "w", buffering=1, closefd=False)
+        os.chdir(req["cwd"])
+        os.environ.clear()
+        os.environ.update(req["env"])
+        os.environ["JOBBER_NO_DAEMON"] = "1"
+        if auth_fingerprint(os.environ) != fingerprint:
+            _forget_warm_state()
+        conn.settimeout(None)
+        _send(conn, {"pid": os.getpid()})
+        from jobber import cli
+
+        try:
+            cli.main(req["argv"])
+            code = 0
+        except SystemExit as e:
+            code = _exit_code(e)
+        except KeyboardInterrupt:
+            code = 130
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        try:
+            _send(conn, {"exit": code})
+        except OSError:
+            pass
+        os._exit(code)
+
+
+def serve(path: Optional[Path] = None, idle_timeout: int = 0, preload: bool = True) -> None:
+    """
+    Accept requests until stopped (or idle for `idle_timeout` seconds with no command
+    running). Single-threaded, so forking a worker never copies a held lock.
+    """
+    path = path or socket_path()
+    loaded = warm() if preload else []
+    fingerprint = auth_fingerprint(os.environ)
+    build = build_id()
+    server = _bind(path)
+    server.settimeout(30)
+    started = last_active = last_refresh = time.time()
+    served = 0
+    workers: set = set()
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    print(f"jobber daemon {os.getpid()} listening on {path} (preloaded: {', '.join(loaded) or 'nothing'})", flush=True)
+    try:
+        while True:
+            for pid in list(workers):
+                if os.waitpid(pid, os.WNOHANG)[0]:
+                    workers.discard(pid)
+            now = time.time()
+            if workers:
+                last_active = now
+            if idle_timeout and now - last_active > idle_timeout:
+                print("jobber daemon idle; exiting", flush=True)
+                return
+            if preload and now - last_refresh > REFRESH_SECONDS:
+                _refresh()
+                last_refresh = now
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            fds: List[int] = []
+            try:
+                conn.settimeout(5)
+                req, fds = _read_request(conn)
+                op = req.get("op")
+                if op == "status":
+                    info = {"pid": os.getpid(), "socket": str(path), "uptime": int(now - started), "served": served, "running": len(workers), "preloaded": loaded}
+                    _send(conn, info)
+                elif op == "stop":
+                    _send(conn, {"stopping": os.getpid()})
+                    return
+                elif op == "run" and len(fds) == 3 and req.get("build") != build:
+                    _send(conn, {"mismatch": build})
+                elif op == "run" and len(fds) == 3:
+                    current = auth_fingerprint(os.environ)
+                    if current != fingerprint:
+                        # Credential files changed (e.g. a new SSO session): drop the
+                        # shared credentials rather than hand workers the old ones.
+                        print("Credential files changed; reloading credentials", flush=True)
+                        _forget_warm_state()
+                        if preload:
+                            warm()
+                        fingerprint = current
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                    pid = os.fork()
+                    if pid == 0:
+                        server.close()
+                        _run_worker(conn, req, fds, fingerprint)
+                    workers.add(pid)
+                    served += 1
+                    last_active = now
+                else:
+                    _send(conn, {"error": f"unsupported request {op!r}"})
+            except (OSError, ValueError) as e:
+                print(f"Dropped a request: {e}", flush=True)
+            finally:
+                for fd in fds:
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
+                conn.close()
+    finally:
+        server.close()
+        path.unlink(missing_ok=True)
@@ -2,13 +2,19 @@
 Dockerfile template loader for jobber.
 """
 
+import re
+import shlex
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional
 
 
 TEMPLATES_DIR = Path(__file__).parent / "templates"
 
+# `{{ name }}` placeholders; `# jobber: name=value` header lines provide their defaults.
+PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+DEFAULT_RE = re.compile(r"^#\s*jobber:\s*(\w+)\s*=(.*)$")
+
 
 @dataclass
 class DockerTemplate:
@@ -16,9 +22,73 @@ class DockerTemplate:
     path: Path
 
     @property
-    def content(self) -> str:
+    def raw(self) -> str:
         return self.path.read_text()
 
+    @property
+    def defaults(self) -> Dict[str, str]:
+        out = {}
+        for line in self.raw.splitlines():
+            m = DEFAULT_RE.match(line.strip())
+            if m:
+                out[m.group(1)] = m.group(2).strip()
+        return out
+
+    @property
+    def params(self) -> List[str]:
+        return sorted(set(PLACEHOLDER_RE.findall(self.raw)) | set(self.defaults))
+
+    @property
+    def content(self) -> str:
+        return self.render()
+
+    def render(self, params: Optional[Dict[str, Any]] = None, extra_packages: Optional[Dict[str, List[str]]] = None) -> str:
+        """
+        Render the template. `params` replace header defaults; `extra_packages` are
+        appended to the matching `*_packages` defaults (e.g. {"pip_packages": ["einops"]}).
+        """
+        values: Dict[str, Any] = dict(self.defaults)
+        for key, val in (params or {}).items():
+            if val is not None:
+                values[key] = val
+        for key, pkgs in (extra_packages or {}).items():
+            if pkgs:
+                values[key] = _as_list(values.get(key)) + list(pkgs)
+        body = "\n".join(line for line in self.raw.splitlines() if not DEFAULT_RE.match(line.strip())) + "\n"
+        # Defaults may reference other params (e.g. base_image=python:{{ python_version }}-slim).
+        rendered = {k: _render_value(k, v) for k, v in values.items()}
+        for _ in range(3):
+            expanded = {k: _substitute(v, rendered, self.name) for k, v in rendered.items()}
+            if expanded == rendered:
+                break
+            rendered = expanded
+        return _substitute(body, rendered, self.name)
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        return value.split()
+    return [str(v) for v in value]
+
+
+def _render_value(key: str, value: Any) -> str:
+    # `*_packages` params are package lists; quote each so specs like `numpy<2` survive the shell.
+    if key.endswith("_packages"):
+        return " ".join(shlex.quote(p) for p in _as_list(value))
+    return str(value)
+
+
+def _substitute(text: str, values: Dict[str, str], name: str) -> str:
+    def repl(m: re.Match) -> str:
+        key = m.group(1)
+        if key not in values:
+            raise ValueError(f"Template {name} needs a value for {key!r}")
+        return values[key]
+
+    return PLACEHOLDER_RE.sub(repl, text)
+
 
 def list_templates() -> List[DockerTemplate]:
     templates = []
@@ -35,8 +105,12 @@ def get_template(name: str) -> DockerTemplate:
 
 
 def add_template(name: str, source_path: Path) -> None:
+    add_template_text(name, Path(source_path).read_text())
+
+
+def add_template_text(name: str, text: str) -> None:
     dest = TEMPLATES_DIR / f"{name}.Dockerfile"
-    dest.write_text(Path(source_path).read_text())
+    dest.write_text(text)
 
 
 def delete_template(name: str) -> None:
@@ -12,6 +12,13 @@ def run(cmd: list[str]) -> None:
     subprocess.run(cmd, check=True)
 
 
+def capture(cmd: list[str]) -> str:
+    """
+    Run a command quietly and return its stdout.
+    """
+    return subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode()
+
+
 @dataclass
 class DockerImage:
     name: str
@@ -0,0 +1,363 @@
+"""
+Dockerfile cache-efficiency linter for jobber templates and custom Dockerfiles.
+"""
+
+import re
+import shlex
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+# Rough download/install sizes (MB) used to estimate what a cache miss costs.
+HEAVY_PACKAGES_MB = {
+    "torch": 2500,
+    "tensorflow": 600,
+    "tensorflow-gpu": 600,
+    "jax": 100,
+    "jaxlib": 300,
+    "torchvision": 40,
+    "torchaudio": 10,
+    "xformers": 200,
+    "flash-attn": 250,
+    "deepspeed": 50,
+    "transformers": 10,
+    "scipy": 40,
+    "pandas": 15,
+    "numpy": 20,
+    "opencv-python": 60,
+    "opencv-python-headless": 50,
+}
+DEFAULT_PIP_PACKAGE_MB = 5
+REQUIREMENTS_FILE_MB = 200
+APT_PACKAGE_MB = 10
+APT_LISTS_MB = 40
+
+PIP_CACHE_MOUNT_RE = re.compile(r"--mount=\S*target=/root/\.cache/pip")
+APT_LISTS_MOUNT_RE = re.compile(r"--mount=\S*target=/var/lib/apt(/lists)?\b")
+PIP_INSTALL_RE = re.compile(r"(?:^|\s)(?:python[\d.]*\s+-m\s+)?pip[\d.]*\s+install\b")
+APT_INSTALL_RE = re.compile(r"\bapt(?:-get)?\s+install\b")
+SPECIFIER_RE = re.compile(r"(==|>=|<=|~=|!=|<|>|@)")
+# pip options that consume the following token.
+PIP_VALUE_OPTS = {
+    "-r",
+    "--requirement",
+    "-c",
+    "--constraint",
+    "-i",
+    "--index-url",
+    "--extra-index-url",
+    "-f",
+    "--find-links",
+    "--retries",
+    "--timeout",
+    "-t",
+    "--target",
+    "--prefix",
+    "--root",
+    "-e",
+    "--editable",
+    "--platform",
+    "--python-version",
+    "--only-binary",
+    "--no-binary",
+    "--trusted-host",
+}
+UNPINNED_EXEMPT = {"pip", "setuptools", "wheel"}
+
+
+@dataclass
+class Instruction:
+    line: int
+    keyword: str
+    args: str
+    stage: int
+    text: str
+    comments: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Finding:
+    rule: str
+    line: int
+    message: str
+    cost_mb: int = 0
+    fix: Optional[str] = None
+    cost_label: str = "per rebuild"
+
+    def format(self) -> str:
+        cost = ""
+        if self.cost_mb >= 1000:
+            cost = f" [~{self.cost_mb / 1000:.1f} GB {self.cost_label}]"
+        elif self.cost_mb:
+            cost = f" [~{self.cost_mb} MB {self.cost_label}]"
+        hint = f"\n      fix: {self.fix}" if self.fix else ""
+        return f"line {self.line}: {self.rule}: {self.message}{cost}{hint}"
+
+
+def parse(text: str) -> tuple[List[str], List[Instruction]]:
+    """
+    Split a Dockerfile into leading parser directives and instructions (continuations joined).
+    """
+    header: List[str] = []
+    instructions: List[Instruction] = []
+    pending_comments: List[str] = []
+    lines = text.splitlines()
+    stage = -1
+    i = 0
+    in_header = True
+    while i < len(lines):
+        raw = lines[i]
+        stripped = raw.strip()
+        if in_header and re.match(r"^#\s*\w+\s*=", stripped):
+            header.append(raw)
+            i += 1
+            continue
+        in_header = False
+        if not stripped or stripped.startswith("#"):
+            pending_comments.append(raw)
+            i += 1
+            continue
+        start = i
+        block = [raw]
+        while block[-1].rstrip().endswith("\\") and i + 1 < len(lines):
+            i += 1
+            block.append(lines[i])
+        i += 1
+        joined = " ".join(l.strip().rstrip("\\").strip() for l in block if not l.strip().startswith("#"))
+        keyword, _, args = joined.partition(" ")
+        keyword = keyword.upper()
+        if keyword == "FROM":
+            stage += 1
+        instructions.append(
+            Instruction(line=start + 1, keyword=keyword, args=args.strip(), stage=stage, text="\n".join(block), comments=pending_comments)
+        )
+        pending_comments = []
+    if pending_comments and instructions:
+        instructions[-1].text += "\n" + "\n".join(pending_comments)
+    return header, instructions
+
+
+def _segments(command: str) -> List[str]:
+    return [s.strip() for s in re.split(r"&&|\|\||;", command) if s.strip()]
+
+
+def _tokens(segment: str) -> List[str]:
+    try:
+        return shlex.split(segment)
+    except ValueError:
+        return segment.split()
+
+
+def _pip_packages(segment: str) -> tuple[List[str], bool]:
+    """
+    Return (package specs, uses requirements file) for one `pip install` segment.
+    """
+    tokens = _tokens(segment)
+    try:
+        idx = tokens.index("install")
+    except ValueError:
+        return [], False
+    packages: List[str] = []
+    uses_requirements = False
+    skip = False
+    for tok in tokens[idx + 1 :]:
+        if skip:
+            skip = False
+            continue
+        if tok in {"-r", "--requirement"}:
+            uses_requirements = True
+        if tok in PIP_VALUE_OPTS:
+            skip = True
+            continue
+        if tok.startswith("-"):
+            if tok.startswith("--requirement=") or tok.startswith("-r"):
+                uses_requirements = True
+            continue
+        if tok.startswith((".", "/", "$")) or tok.endswith(".whl") or "://" in tok:
+            continue
+        packages.append(tok)
+    return packages, uses_requirements
+
+
+def _package_name(spec: str) -> str:
+    return re.split(r"[\[<>=!~@;\s]", spec, maxsplit=1)[0].lower()
+
+
+def _install_cost_mb(instr: Instruction) -> int:
+    if instr.keyword != "RUN":
+        return 0
+    cost = 0
+    for seg in _segments(instr.args):
+        if PIP_INSTALL_RE.search(seg):
+            packages, uses_req = _pip_packages(seg)
+            cost += sum(HEAVY_PACKAGES_MB.get(_package_name(p), DEFAULT_PIP_PACKAGE_MB) for p in packages)
+            if uses_req:
+                cost += REQUIREMENTS_FILE_MB
+        elif APT_INSTALL_RE.search(seg):
+            names = [t for t in _tokens(seg)[2:] if not t.startswith("-") and t != "install"]
+            cost += APT_PACKAGE_MB * len(names)
+    return cost
+
+
+def _installs_dependencies(instr: Instruction) -> bool:
+    return instr.keyword == "RUN" and bool(PIP_INSTALL_RE.search(instr.args) or APT_INSTALL_RE.search(instr.args))
+
+
+def _is_broad_copy(instr: Instruction) -> bool:
+    if instr.keyword not in {"COPY", "ADD"}:
+        return False
+    tokens = [t for t in _tokens(instr.args) if not t.startswith("--")]
+    if "--from" in instr.args or len(tokens) < 2:
+        return False
+    return any(src in {".", "./", "*", "./*"} for src in tokens[:-1])
+
+
+def lint(text: str) -> List[Finding]:
+    """
+    Find cache-busting patterns: broad COPY before dependency installs, unpinned pip
+    installs, apt installs that keep their package lists, and pip installs that keep
+    their download cache in the layer.
+    """
+    _, instructions = parse(text)
+    findings: List[Finding] = []
+    pip_no_cache_env = bool(re.search(r"PIP_NO_CACHE_DIR\s*=\s*(1|true|yes|on)", text, re.IGNORECASE))
+
+    for idx, instr in enumerate(instructions):
+        if _is_broad_copy(instr):
+            later = [
+                j
+                for j in instructions[idx + 1 :]
+                if j.stage == instr.stage and _installs_dependencies(j)
+            ]
+            if later:
+                cost = sum(_install_cost_mb(j) for j in later)
+                lines = ", ".join(str(j.line) for j in later)
+                findings.append(
+                    Finding(
+                        rule="broad-copy-before-install",
+                        line=instr.line,
+                        message=f"`{instr.keyword} {instr.args}` precedes dependency installs (lines {lines}); every code edit reinstalls them",
+                        cost_mb=cost,
+                        fix="copy only requirement files first and move the broad COPY after the installs (`jobber templates lint --fix`)",
+                    )
+                )
+        if instr.keyword != "RUN":
+            continue
+        for seg in _segments(instr.args):
+            if PIP_INSTALL_RE.search(seg):
+                packages, _ = _pip_packages(seg)
+                unpinned = [p for p in packages if not SPECIFIER_RE.search(p) and _package_name(p) not in UNPINNED_EXEMPT]
+                if unpinned:
+                    findings.append(
+                        Finding(
+                            rule="unpinned-install",
+                            line=instr.line,
+                            message=f"pip install without version specifiers: {', '.join(unpinned)}; cached layers and fresh builds can diverge",
+                            cost_mb=sum(HEAVY_PACKAGES_MB.get(_package_name(p), DEFAULT_PIP_PACKAGE_MB) for p in unpinned),
+                            fix="pin versions (pkg==X.Y.Z) or install from a locked requirements file",
+                        )
+                    )
+                if "--no-cache-dir" not in seg and not PIP_CACHE_MOUNT_RE.search(instr.args) and not pip_no_cache_env:
+                    findings.append(
+                        Finding(
+                            rule="pip-cache-in-layer",
+                            line=instr.line,
+                            message="pip install keeps its download cache in the image layer",
+                            cost_mb=_install_cost_mb(Instruction(instr.line, "RUN", seg, instr.stage, seg)),
+                            fix="add --no-cache-dir or use `RUN --mount=type=cache,target=/root/.cache/pip`",
+                            cost_label="extra in image",
+                        )
+                    )
+        if APT_INSTALL_RE.search(instr.args):
+            cleaned = "/var/lib/apt/lists" in instr.args and "rm " in instr.args
+            if not cleaned and not APT_LISTS_MOUNT_RE.search(instr.args):
+                findings.append(
+                    Finding(
+                        rule="apt-lists-in-layer",
+                        line=instr.line,
+                        message="apt-get install without removing /var/lib/apt/lists in the same RUN",
+                        cost_mb=APT_LISTS_MB,
+                        fix="end the RUN with `&& rm -rf /var/lib/apt/lists/*` or mount a cache on /var/lib/apt",
+                        cost_label="extra in image",
+                    )
+                )
+    return findings
+
+
+def fix(text: str) -> str:
+    """
+    Rewrite a Dockerfile to avoid the lint findings where it can be done mechanically:
+    broad COPYs move after the stage's last dependency install (requirement files they
+    provided are copied explicitly first), pip installs get --no-cache-dir and apt
+    installs clean their lists.
+    """
+    header, instructions = parse(text)
+    pip_no_cache_env = bool(re.search(r"PIP_NO_CACHE_DIR\s*=\s*(1|true|yes|on)", text, re.IGNORECASE))
+    out: List[Instruction] = []
+    stages = sorted({i.stage for i in instructions})
+    for stage in stages:
+        block = [i for i in instructions if i.stage == stage]
+        last_install = max((n for n, i in enumerate(block) if _installs_dependencies(i)), default=-1)
+        moved: List[Instruction] = []
+        needed_files: List[str] = []
+        for n, instr in enumerate(block):
+            if n < last_install and _is_broad_copy(instr):
+                moved.append(instr)
+                continue
+            if moved and instr.keyword == "RUN":
+                for seg in _segments(instr.args):
+                    if PIP_INSTALL_RE.search(seg):
+                        needed_files += _requirement_files(seg)
+                extra = [f for f in needed_files if not any(f in o.args for o in out if o.keyword in {"COPY", "ADD"})]
+                for f in extra:
+                    out.append(Instruction(line=0, keyword="COPY", args=f"{f} ./{f}", stage=stage, text=f"COPY {f} ./{f}"))
+                needed_files = []
+            out.append(_fix_run(instr, pip_no_cache_env))
+            if n == last_install:
+                out.extend(moved)
+                moved = []
+        out.extend(moved)
+    body = []
+    for instr in out:
+        body.extend(instr.comments)
+        body.append(instr.text)
+    return "\n".join(header + body) + "\n"
+
+
+def _requirement_files(segment: str) -> List[str]:
+    tokens = _tokens(segment)
+    files = []
+    for i, tok in enumerate(tokens):
+        if tok in {"-r", "--requirement", "-c", "--constraint"} and i + 1 < len(tokens):
+            files.append(tokens[i + 1])
+        elif tok.startswith("--requirement="):
+            files.append(tok.split("=", 1)[1])
+    return [f for f in files if not f.startswith("/") and "$" not in f]
+
+
+def _fix_run(instr: Instruction, pip_no_cache_env: bool) -> Instruction:
+    if instr.keyword != "RUN":
+        return instr
+    text = instr.text
+    if not PIP_CACHE_MOUNT_RE.search(instr.args) and not pip_no_cache_env:
+        text = re.sub(
+            r"((?:python[\d.]*\s+-m\s+)?pip[\d.]*\s+install)(?![^&;|]*--no-cache-dir)",
+            r"\1 --no-cache-dir",
+            text,
+        )
+    if APT_INSTALL_RE.search(instr.args) and "/var/lib/apt/lists" not in instr.args and not APT_LISTS_MOUNT_RE.search(instr.args):
+        text = text.rstrip() + " && \\\n    rm -rf /var/lib/apt/lists/*"
+    if text == instr.text:
+        return instr
+    return Instruction(line=instr.line, keyword=instr.keyword, args=instr.args, stage=instr.stage, text=text, comments=instr.comments)
+
+
+def format_findings(findings: List[Finding], source: str = "Dockerfile") -> str:
+    if not findings:
+        return f"{source}: no cache-efficiency issues found"
+    total = sum(f.cost_mb for f in findings if f.rule == "broad-copy-before-install")
+    lines = [f"{source}: {len(findings)} cache-efficiency issue(s)"]
+    lines += [f"  {f.format()}" for f in findings]
+    if total:
+        lines.append(f"  code edits currently trigger ~{total / 1000:.1f} GB of reinstalls")
+    return "\n".join(lines)
@@ -2,10 +2,15 @@
 Minimal ECR helpers for jobber.
 """
 
+import re
+from typing import Optional, Tuple
+
 import boto3
 from botocore.exceptions import ClientError
 from dataclasses import dataclass
 
+from jobber import exists_cache
+
 
 @dataclass
 class ECRInfo:
@@ -23,7 +28,39 @@ class ECRInfo:
         return f"{self.registry}/{self.repo_name}:{self.image_tag}"
 
 
-def ensure_repo(ecr_client, repo_name: str) -> None:
+ECR_URI_RE = re.compile(r"^(\d{12})\.dkr\.ecr\.([a-z0-9-]+)\.amazonaws\.com(?:\.cn)?/([^:@]+)(?::([^@]+))?(?:@(sha256:[0-9a-f]+))?$")
+
+
+def parse_image_uri(image_uri: str) -> Optional[Tuple[str, str, str, Optional[str], Optional[str]]]:
+    """
+    Split an ECR image URI into (account, region, repo, tag, digest); None if it is not ECR.
+    """
+    m = ECR_URI_RE.match(image_uri or "")
+    return m.groups() if m else None
+
+
+def describe_image(boto_session, image_uri: str) -> dict:
+    """
+    describe_images for the tag or digest in an ECR URI (raises ClientError if missing).
+    """
+    parsed = parse_image_uri(image_uri)
+    if not parsed:
+        raise ValueError(f"Not an ECR image URI: {image_uri}")
+    account, region, repo, tag, digest = parsed
+    image_id = {"imageDigest": digest} if digest else {"imageTag": tag or "latest"}
+    ecr = boto_session.client("ecr", region_name=region)
+    resp = ecr.describe_images(registryId=account, repositoryName=repo, imageIds=[image_id])
+    return resp.get("imageDetails", [{}])[0]
+
+
+def ensure_repo(ecr_client, repo_name: str, account_id: str | None = None) -> None:
+    """
+    Create the repository if it is missing. With `account_id`, a recent confirmation from
+    the exists cache skips the describe call.
+    """
+    scope = f"{account_id}/{ecr_client.meta.region_name}" if account_id else None
+    if scope and exists_cache.fresh("ecr-repo", scope, repo_name):
+        return
     try:
         ecr_client.describe_repositories(repositoryNames=[repo_name])
     except ClientError as e:
@@ -31,6 +68,8 @@ def ensure_repo(ecr_client, repo_name: str) -> None:
             ecr_client.create_repository(repositoryName=repo_name)
         else:
             raise
+    if scope:
+        exists_cache.remember("ecr-repo", scope, repo_name)
 
 
 def ecr_login(info: ECRInfo) -> None:
@@ -0,0 +1,120 @@
+"""
+Short-lived on-disk record of cloud resources jobber has confirmed exist (buckets, data
+prefixes, registry repos), so repeat submits and pushes can skip the existence round-trip.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from jobber.paths import cache_dir
+
+
+DEFAULT_TTL_SECONDS = 3600
+_lock = threading.Lock()
+
+
+def ttl_seconds() -> int:
+    """
+    Entry lifetime; override with JOBBER_EXISTS_TTL (seconds, 0 disables the cache).
+    """
+    raw = os.environ.get("JOBBER_EXISTS_TTL")
+    if raw is None or raw == "":
+        return DEFAULT_TTL_SECONDS
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return DEFAULT_TTL_SECONDS
+
+
+def _path() -> Path:
+    return cache_dir() / "exists.json"
+
+
+def _key(kind: str, scope: str, name: str) -> str:
+    return f"{kind}|{scope}|{name}"
+
+
+def _load() -> Dict[str, float]:
+    try:
+        data = json.loads(_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save(entries: Dict[str, float]) -> None:
+    path = _path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".exists-", suffix=".json")
+    with os.fdopen(fd, "w") as fh:
+        json.dump(entries, fh, indent=0, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def fresh(kind: str, scope: str, name: str) -> bool:
+    ttl = ttl_seconds()
+    if not ttl:
+        return False
+    seen = _load().get(_key(kind, scope, name))
+    return seen is not None and time.time() - seen < ttl
+
+
+def remember(kind: str, scope: str, name: str) -> None:
+    ttl = ttl_seconds()
+    if not ttl:
+        return
+    now = time.time()
+    with _lock:
+        entries = {k: v for k, v in _load().items() if now - v < ttl}
+        entries[_key(kind, scope, name)] = now
+        try:
+            _save(entries)
+        except OSError:
+            pass  # a read-only home should not break a submit
+
+
+def forget(kind: str, scope: str, name: str) -> None:
+    with _lock:
+        entries = _load()
+        if entries.pop(_key(kind, scope, name), None) is not None:
+            try:
+                _save(entries)
+            except OSError:
+                pass
+
+
+def forget_image_repo(image_uri: str) -> None:
+    """
+    Drop the repo entry behind a registry image URI (ECR or Artifact Registry), e.g.
+    after a push to it failed.
+    """
+    host, _, path = image_uri.partition("/")
+    path = path.split("@", 1)[0].rsplit(":", 1)[0]
+    if host.endswith("-docker.pkg.dev"):
+        parts = path.split("/")
+        if len(parts) >= 2:
+            forget("gar-repo", f"{parts[0]}/{host[: -len('-docker.pkg.dev')]}", parts[1])
+    elif ".dkr.ecr." in host:
+        account, region = host.split(".")[0], host.split(".")[3]
+        forget("ecr-repo", f"{account}/{region}", path)
+
+
+def aws_scope(boto_session) -> Optional[str]:
+    """
+    Identify the caller without an STS round-trip: a fingerprint of the access key plus
+    the region. Returns None when no credentials resolve (nothing is cached then).
+    """
+    try:
+        creds = boto_session.get_credentials()
+    except Exception:
+        return None
+    if creds is None or not getattr(creds, "access_key", None):
+        return None
+    fingerprint = hashlib.sha256(creds.access_key.encode()).hexdigest()[:12]
+    return f"{fingerprint}/{boto_session.region_name or '-'}"
@@ -3,10 +3,23 @@ Artifact Registry helpers for GCP.
 """
 
 import subprocess
+import time
 from dataclasses import dataclass
+from typing import Optional, Tuple
+from urllib.parse import quote
 
+from jobber import exists_cache
+from jobber import gcp_clients
 from jobber.docker_utils import DockerImage, run as docker_run
 
+# Registries docker has been logged into during this process, with the expiry (epoch
+# seconds) of the token docker was given.
+_logged_in: dict[str, float] = {}
+# Log in again when the stored token has less than this left, so a push started now
+# does not outlive it. Tokens without a stated expiry are assumed to last an hour.
+LOGIN_MARGIN_SECONDS = 600
+DEFAULT_TOKEN_SECONDS = 3600
+
 
 @dataclass
 class ArtifactRef:
@@ -25,48 +38,74 @@ class ArtifactRef:
         return f"{self.registry}/{self.project}/{self.repo}/{self.image}:{self.tag}"
 
 
+def parse_image_uri(image_uri: str) -> Optional[Tuple[str, str, str, str, Optional[str], Optional[str]]]:
+    """
+    Split an Artifact Registry URI into (project, location, repo, image, tag, digest);
+    None if it is not an Artifact Registry URI.
+    """
+    host, _, path = (image_uri or "").partition("/")
+    parts = path.split("/", 2)
+    if not host.endswith("-docker.pkg.dev") or len(parts) < 3:
+        return None
+    project, repo, image = parts
+    image, _, digest = image.partition("@")
+    image, _, tag = image.partition(":")
+    return project, host[: -len("-docker.pkg.dev")], repo, image, tag or None, digest or None
+
+
+def image_digest(image_uri: str) -> str:
+    """
+    Resolve the manifest digest behind an Artifact Registry tag (raises NotFound if missing).
+    """
+    parsed = parse_image_uri(image_uri)
+    if not parsed:
+        raise ValueError(f"Not an Artifact Registry image URI: {image_uri}")
+    project, location, repo, image, tag, digest = parsed
+    package = f"projects/{project}/locations/{location}/repositories/{repo}/packages/{quote(image, safe='')}"
+    client = gcp_clients.artifact_client()
+    if digest:
+        client.get_version(name=f"{package}/versions/{digest}")
+        return digest
+    return client.get_tag(name=f"{package}/tags/{tag or 'latest'}").version.rsplit("/", 1)[-1]
+
+
 def configure_docker(region: str) -> None:
     """
-    Ensure docker is authenticated against Artifact Registry for the region.
+    Log docker into Artifact Registry for the region with a short-lived OAuth2 token
+    from the shared credentials (no gcloud process). Repeated calls reuse the login
+    until the token is within LOGIN_MARGIN_SECONDS of expiry, then log in again.
     """
-    cmd = ["gcloud", "auth", "configure-docker", f"{region}-docker.pkg.dev", "--quiet"]
-    subprocess.run(cmd, check=True)
+    registry = f"{region}-docker.pkg.dev"
+    if _logged_in.get(registry, 0) - time.time() > LOGIN_MARGIN_SECONDS:
+        return
+    token, expiry = gcp_clients.access_token_with_expiry(LOGIN_MARGIN_SECONDS)
+    cmd = ["docker", "login", "-u", "oauth2accesstoken", "--password-stdin", f"https://{registry}"]
+    print(f"+ {' '.join(cmd)}")
+    subprocess.run(cmd, check=True, input=token.encode(), stdout=subprocess.DEVNULL)
+    _logged_in[registry] = expiry if expiry is not None else time.time() + DEFAULT_TOKEN_SECONDS
 
 
 def ensure_repo(project: str, region: str, repo: str, description: str | None = None) -> None:
     """
-    Ensure an Artifact Registry repository exists. Creates it if missing.
+    Ensure an Artifact Registry repository exists. Creates it if missing. A recent
+    confirmation from the exists cache skips the lookup.
     """
-    describe = [
-        "gcloud",
-        "artifacts",
-        "repositories",
-        "describe",
-        repo,
-        f"--project={project}",
-        f"--location={region}",
-        "--quiet",
-    ]
-    try:
-        subprocess.run(describe, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    scope = f"{project}/{region}"
+    if exists_cache.fresh("gar-repo", scope, repo):
         return
-    except subprocess.CalledProcessError:
-        pass
-
-    create = [
-        "gcloud",
-        "artifacts",
-        "repositories",
-        "create",
-        repo,
-        "--repository-format=docker",
-        f"--project={project}",
-        f"--location={region}",
-        "--quiet",
-    ]
-    if description:
-        create.append(f"--description={description}")
-    subprocess.run(create, check=True)
+    client = gcp_clients.artifact_client()
+    parent = f"projects/{project}/locations/{region}"
+    try:
+        client.get_repository(name=f"{parent}/repositories/{repo}")
+    except gcp_clients.not_found_error():
+        artifactregistry_v1 = gcp_clients.artifact_types()
+        repository = artifactregistry_v1.Repository(
+            format_=artifactregistry_v1.Repository.Format.DOCKER,
+            description=description or "",
+        )
+        print(f"Creating Artifact Registry repository {repo} in {project}/{region}")
+        client.create_repository(parent=parent, repository_id=repo, repository=repository).result()
+    exists_cache.remember("gar-repo", scope, repo)
 
 
 def push_image(local: DockerImage, target: ArtifactRef) -> None:
@@ -0,0 +1,143 @@
+"""
+Shared Google Cloud credentials and API clients for jobber.
+
+Clients are created once per process and reuse one set of application-default
+credentials, so consecutive GCP operations pay for API round-trips only.
+"""
+
+import threading
+import time
+from datetime import timezone
+from typing import Any, Dict, Optional, Tuple
+
+from jobber import retry
+
+SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+_lock = threading.Lock()
+_credentials: Optional[Tuple[Any, Optional[str]]] = None
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+
+
+def _require(module: str, package: str, extra: Optional[str] = None):
+    import importlib
+
+    try:
+        return importlib.import_module(module)
+    except ModuleNotFoundError as e:
+        hint = f"pip install 'jobber[{extra}]'" if extra else f"pip install {package}"
+        raise ModuleNotFoundError(f"{package} not installed; install with `{hint}`.", name=e.name) from e
+
+
+def credentials() -> Tuple[Any, Optional[str]]:
+    """
+    Application-default credentials and their default project, resolved once.
+    """
+    global _credentials
+    with _lock:
+        if _credentials is None:
+            google_auth = _require("google.auth", "google-auth")
+            _credentials = google_auth.default(scopes=SCOPES)
+        return _credentials
+
+
+def access_token(min_seconds: float = 0) -> str:
+    """
+    A current OAuth2 access token, refreshed only when the cached one has expired or
+    has less than `min_seconds` left.
+    """
+    return access_token_with_expiry(min_seconds)[0]
+
+
+def access_token_with_expiry(min_seconds: float = 0) -> Tuple[str, Optional[float]]:
+    """
+    The access token and its expiry (epoch seconds; None if the credentials do not say).
+    """
+    creds, _ = credentials()
+    with _lock:
+        expiry = _expiry_seconds(creds)
+        if not creds.valid or (expiry is not None and expiry - time.time() < min_seconds):
+            requests = _require("google.auth.transport.requests", "google-auth")
+            creds.refresh(requests.Request())
+            expiry = _expiry_seconds(creds)
+        return creds.token, expiry
+
+
+def _expiry_seconds(creds) -> Optional[float]:
+    # google-auth keeps expiry as a naive UTC datetime.
+    expiry = getattr(creds, "expiry", None)
+    return expiry.replace(tzinfo=timezone.utc).timestamp() if expiry is not None else None
+
+
+def storage_client(project: Optional[str] = None):
+    def make():
+        storage = _require("google.cloud.storage", "google-cloud-storage")
+        creds, default_project = credentials()
+        return storage.Client(project=project or default_project, credentials=creds)
+
+    return _cached("storage", project, make)
+
+
+def artifact_types():
+    """
+    The artifactregistry_v1 module (message types such as Repository).
+    """
+    return _require("google.cloud.artifactregistry_v1", "google-cloud-artifact-registry")
+
+
+def artifact_client():
+    def make():
+        creds, _ = credentials()
+        return retry.wrap(artifact_types().ArtifactRegistryClient(credentials=creds), "artifactregistry")
+
+    return _cached("artifactregistry", None, make)
+
+
+def logging_types():
+    """
+    The google.cloud.logging module (Client, ASCENDING). Needs the `logs` extra.
+    """
+    return _require("google.cloud.logging", "google-cloud-logging", extra="logs")
+
+
+def logging_client(project: str):
+    def make():
+        creds, _ = credentials()
+        return logging_types().Client(project=project, credentials=creds)
+
+    return _cached("logging", project, make)
+
+
+def monitoring_types():
+    """
+    The google.cloud.monitoring_v3 module (MetricServiceClient and request types). Needs
+    the `metrics` extra.
+    """
+    return _require("google.cloud.monitoring_v3", "google-cloud-monitoring", extra="metrics")
+
+
+def not_found_error():
+    """
+    The exception class client libraries raise for a missing resource.
+    """
+    return _require("google.api_core.exceptions", "google-api-core").NotFound
+
+
+def _cached(kind: str, key: Optional[str], make):
+    with _lock:
+        client = _clients.get((kind, key))
+    if client is None:
+        client = make()
+        with _lock:
+            client = _clients.setdefault((kind, key), client)
+    return client
+
+
+def reset() -> None:
+    """
+    Forget cached credentials and clients (e.g. after switching accounts).
+    """
+    global _credentials
+    with _lock:
+        _credentials = None
+        _clients.clear()
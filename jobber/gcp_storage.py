@@ -6,40 +6,69 @@ import subprocess
 from pathlib import Path
 from typing import Optional
 
+from jobber import gcp_clients
+
 
 def ensure_bucket(bucket: str, region: Optional[str] = None) -> None:
     """
-    Ensure a GCS bucket exists. Uses gsutil to create if missing.
+    Ensure a GCS bucket exists, creating it (in `region` if given) when missing.
     """
-    check_cmd = ["gsutil", "ls", f"gs://{bucket}"]
-    try:
-        run(check_cmd)
+    client = gcp_clients.storage_client()
+    if client.lookup_bucket(bucket) is not None:
         return
-    except subprocess.CalledProcessError:
-        pass
-
-    mb_cmd = ["gsutil", "mb"]
-    if region:
-        mb_cmd += ["-l", region]
-    mb_cmd.append(f"gs://{bucket}")
-    run(mb_cmd)
+    print(f"Creating gs://{bucket}" + (f" in {region}" if region else ""))
+    client.create_bucket(bucket, location=region)
 
 
 def sync_local_to_gcs(src: Path, dest_gs: str) -> None:
     """
     Sync a local folder to GCS (dest_gs should be gs://...).
     """
-    cmd = ["gsutil", "-m", "rsync", "-r", str(src), dest_gs]
-    run(cmd)
+    run(sync_command(src, dest_gs))
+
+
+def sync_command(src: Path, dest_gs: str) -> list[str]:
+    return ["gsutil", "-m", "rsync", "-r", str(src), dest_gs]
 
 
 def upload_placeholder(bucket: str, prefix: str) -> None:
     """
     Upload a small placeholder file to prefix/data/placeholder.txt.
     """
-    key = f"gs://{bucket}/{prefix.rstrip('/')}/data/placeholder.txt"
-    cmd = ["gsutil", "cp", "-", key]
-    run(cmd, input=b"placeholder")
+    key = f"{prefix.rstrip('/')}/data/placeholder.txt"
+    print(f"Uploading placeholder gs://{bucket}/{key}")
+    gcp_clients.storage_client().bucket(bucket).blob(key).upload_from_string(b"placeholder")
+
+
+def has_objects(bucket: str, prefix: str) -> bool:
+    """
+    True if at least one object lives under gs://bucket/prefix.
+    """
+    blobs = gcp_clients.storage_client().list_blobs(bucket, prefix=prefix, max_results=1)
+    return any(True for _ in blobs)
+
+
+def upload_file(bucket: str, key: str, path: Path, skip_existing: bool = False) -> bool:
+    """
+    Upload a local file to gs://bucket/key. With `skip_existing`, leave an existing object
+    alone. Returns True if the file was uploaded.
+    """
+    blob = gcp_clients.storage_client().bucket(bucket).blob(key)
+    if skip_existing and blob.exists():
+        return False
+    blob.upload_from_filename(str(path))
+    return True
+
+
+def upload_bytes(bucket: str, key: str, body: bytes, skip_existing: bool = False) -> bool:
+    """
+    Upload `body` to gs://bucket/key; like upload_file for in-memory content.
+    """
+    blob = gcp_clients.storage_client().bucket(bucket).blob(key)
+    if skip_existing and blob.exists():
+        return False
+    blob.upload_from_string(body)
+    return True
 
 
 def run(cmd: list[str], input: bytes | None = None) -> None:
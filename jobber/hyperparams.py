@@ -0,0 +1,162 @@
+"""
+Typed hyperparameters and their encoding for SageMaker and Vertex AI.
+
+Values are encoded the same way for both providers: strings as written, everything else as
+compact JSON with sorted keys. Sets that exceed SageMaker's hyperparameter limits keep their
+small values inline and move the rest into a hyperparameters.json stored under the job's
+prefix, named by its content hash so identical configs are uploaded once.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+
+# SageMaker CreateTrainingJob limits.
+MAX_PARAMS = 100
+MAX_KEY_LENGTH = 256
+MAX_VALUE_LENGTH = 2500
+# Keeps the inline set (and the Vertex container argv) small.
+MAX_INLINE_BYTES = 16 * 1024
+
+CONFIG_PARAM = "jobber-config"
+CONFIG_CHANNEL = "jobber-config"
+CONFIG_FILE = "hyperparameters.json"
+TYPES = ("str", "int", "float", "bool", "list", "json")
+
+_INT_RE = re.compile(r"-?(0|[1-9][0-9]*)")
+
+
+def infer_value(text: str) -> Any:
+    """
+    Type a value written without an annotation. Scalars are typed only when that is
+    lossless: "5" is an int but "007" and "1e-3" stay strings, so they are passed on as
+    written. JSON lists and objects are parsed, and encode_value re-encodes them compactly
+    with sorted keys, so their text can change ("[1, 2]" is passed as "[1,2]").
+    """
+    if text in ("true", "false"):
+        return text == "true"
+    if _INT_RE.fullmatch(text):
+        return int(text)
+    try:
+        number = float(text)
+    except ValueError:
+        number = None
+    if number is not None and json.dumps(number) == text:
+        return number
+    if text[:1] in ("[", "{"):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_value(text: str, type_: Optional[str] = None) -> Any:
+    """
+    Parse a value with an explicit type. `json` also accepts `@path` to a JSON or YAML file.
+    """
+    if type_ is None:
+        return infer_value(text)
+    if type_ == "str":
+        return text
+    if type_ == "int":
+        return int(text)
+    if type_ == "float":
+        return float(text)
+    if type_ == "bool":
+        lowered = text.lower()
+        if lowered not in ("true", "false", "1", "0", "yes", "no"):
+            raise ValueError(f"not a boolean: {text!r}")
+        return lowered in ("true", "1", "yes")
+    if type_ == "list":
+        return [infer_value(item.strip()) for item in text.split(",")] if text else []
+    if type_ == "json":
+        if text.startswith("@"):
+            return yaml.safe_load(Path(text[1:]).read_text())
+        return json.loads(text)
+    raise ValueError(f"unknown type {type_!r}; expected one of {', '.join(TYPES)}")
+
+
+def parse_param(item: str) -> Tuple[str, Any]:
+    """
+    Parse `KEY=VALUE` or `KEY:TYPE=VALUE`.
+    """
+    if "=" not in item:
+        raise ValueError("expected KEY=VALUE or KEY:TYPE=VALUE")
+    key, value = item.split("=", 1)
+    type_ = None
+    if ":" in key:
+        key, type_ = key.rsplit(":", 1)
+    if not key:
+        raise ValueError("empty key")
+    return key, parse_value(value, type_)
+
+
+def encode_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+@dataclass
+class EncodedParams:
+    inline: Dict[str, str]
+    spilled: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def document(self) -> bytes:
+        return json.dumps(self.spilled, sort_keys=True, separators=(",", ":")).encode()
+
+    @property
+    def digest(self) -> str:
+        return hashlib.sha256(self.document).hexdigest()[:16]
+
+    def config_prefix(self, prefix: str) -> str:
+        return f"{prefix.strip('/')}/config/{self.digest}"
+
+    def config_key(self, prefix: str) -> str:
+        return f"{self.config_prefix(prefix)}/{CONFIG_FILE}"
+
+    def with_config_path(self, path: str) -> Dict[str, str]:
+        """
+        The inline set plus the parameter telling the script where the rest lives.
+        """
+        return {**self.inline, CONFIG_PARAM: path} if self.spilled else dict(self.inline)
+
+
+def _fits(inline: Dict[str, str], reserve: int) -> bool:
+    if len(inline) + reserve > MAX_PARAMS:
+        return False
+    if any(len(k) > MAX_KEY_LENGTH or len(v) > MAX_VALUE_LENGTH for k, v in inline.items()):
+        return False
+    return sum(len(k) + len(v) for k, v in inline.items()) <= MAX_INLINE_BYTES
+
+
+def encode(params: Dict[str, Any]) -> EncodedParams:
+    """
+    Encode in key order; if the set is too large to pass inline, move values out, largest
+    first, until the rest fits alongside the config path parameter.
+    """
+    inline = {k: encode_value(params[k]) for k in sorted(params)}
+    if _fits(inline, reserve=0):
+        return EncodedParams(inline)
+    spilled: Dict[str, Any] = {}
+    for key in sorted(inline, key=lambda k: (-len(k) - len(inline[k]), k)):
+        if _fits(inline, reserve=1):
+            break
+        spilled[key] = params[key]
+        del inline[key]
+    return EncodedParams(inline, spilled)
+
+
+def load(path: str) -> Dict[str, Any]:
+    """
+    Read a spilled hyperparameters.json (for training scripts that have jobber installed).
+    """
+    return json.loads(Path(path).read_text())
@@ -0,0 +1,89 @@
+"""
+Image size and pull-time comparison for jobber.
+"""
+
+import json
+import subprocess
+from dataclasses import dataclass
+from typing import List, Optional
+
+from jobber.docker_utils import capture
+
+
+DEFAULT_PULL_MBPS = 1000
+
+
+@dataclass
+class ImageSize:
+    ref: str
+    bytes: int
+    source: str  # "registry" (compressed layers, what a job pulls) or "local" (uncompressed)
+    layers: Optional[int] = None
+
+    def pull_seconds(self, mbps: float) -> float:
+        return self.bytes * 8 / (mbps * 1_000_000)
+
+
+def _registry_size(ref: str) -> Optional[ImageSize]:
+    try:
+        out = capture(["docker", "manifest", "inspect", "-v", ref])
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    data = json.loads(out)
+    # A manifest list yields one entry per platform; size what a linux/amd64 job pulls.
+    entries = data if isinstance(data, list) else [data]
+    chosen = entries[0]
+    for entry in entries:
+        platform = (entry.get("Descriptor") or {}).get("platform") or {}
+        if platform.get("os") == "linux" and platform.get("architecture") == "amd64":
+            chosen = entry
+            break
+    manifest = chosen.get("SchemaV2Manifest") or chosen.get("OCIManifest") or {}
+    layers = manifest.get("layers") or []
+    if not layers:
+        return None
+    return ImageSize(ref=ref, bytes=sum(int(l.get("size", 0)) for l in layers), source="registry", layers=len(layers))
+
+
+def _local_size(ref: str) -> Optional[ImageSize]:
+    try:
+        out = capture(["docker", "image", "inspect", "--format", "{{.Size}} {{len .RootFS.Layers}}", ref])
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    size, layers = out.split()
+    return ImageSize(ref=ref, bytes=int(size), source="local", layers=int(layers))
+
+
+def image_size(ref: str) -> ImageSize:
+    """
+    Prefer the registry manifest (compressed bytes a job actually downloads); fall back to
+    the local daemon's uncompressed size for images that were never pushed.
+    """
+    size = _registry_size(ref) or _local_size(ref)
+    if size is None:
+        raise ValueError(f"Image not found locally or in its registry: {ref}")
+    return size
+
+
+def compare(sizes: List[ImageSize], mbps: float = DEFAULT_PULL_MBPS) -> str:
+    """
+    Format a size / estimated pull-time table; the first image is the baseline.
+    """
+    lines = [f"{'image':<60} {'size':>10} {'layers':>6} {'pull@' + str(int(mbps)) + 'Mbps':>12}  delta/job start"]
+    base = sizes[0] if sizes else None
+    for s in sizes:
+        delta = ""
+        if base is not None and s is not base:
+            saved = base.pull_seconds(mbps) - s.pull_seconds(mbps)
+            pct = 100 * (base.bytes - s.bytes) / base.bytes if base.bytes else 0.0
+            if saved >= 0:
+                delta = f"saves {saved:.1f}s ({pct:.0f}% smaller)"
+            else:
+                delta = f"costs {-saved:.1f}s ({-pct:.0f}% larger)"
+        note = "" if s.source == "registry" else " *"
+        lines.append(
+            f"{s.ref:<60} {s.bytes / 1e9:>8.2f}GB {s.layers or 0:>6} {s.pull_seconds(mbps):>11.1f}s  {delta}{note}"
+        )
+    if any(s.source == "local" for s in sizes):
+        lines.append("* local uncompressed size; push the image for the compressed size a job downloads")
+    return "\n".join(lines)
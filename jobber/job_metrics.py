@@ -0,0 +1,88 @@
+"""
+Collect run metrics for finished jobs: wall time, utilization and, if the training script
+logs it, throughput. Metrics are fetched once per succeeded job and kept in the registry.
+"""
+
+import re
+import statistics
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+from jobber import job_registry, retry, utilization
+from jobber.job_registry import JobRecord
+
+
+# Training scripts opt in to throughput tracking by logging e.g. `images_per_sec=812.4`.
+THROUGHPUT_RE = re.compile(r"images_per_sec[=:]\s*([0-9]+(?:\.[0-9]+)?)")
+
+Metrics = Tuple[Optional[float], Dict[str, float]]
+
+
+def sagemaker_metrics(job: JobRecord, boto_session=None) -> Metrics:
+    session = boto_session or retry.session(job.region)
+    desc = session.client("sagemaker").describe_training_job(TrainingJobName=job.job_name)
+    start, end = desc.get("TrainingStartTime"), desc.get("TrainingEndTime")
+    duration = (end - start).total_seconds() if start and end else None
+    metrics: Dict[str, float] = {}
+    if desc.get("BillableTimeInSeconds"):
+        metrics["billable_seconds"] = float(desc["BillableTimeInSeconds"])
+    for item in desc.get("FinalMetricDataList") or []:
+        metrics[item["MetricName"]] = float(item["Value"])
+    if start and end:
+        hosts = (desc.get("ResourceConfig") or {}).get("InstanceCount") or 1
+        series = utilization.sagemaker_series(session, job.job_name, start, end, hosts)
+        metrics.update({key: round(statistics.fmean(values), 1) for key, values in series.items()})
+    throughput = reported_throughput(session, job.job_name)
+    if throughput is not None:
+        metrics["images_per_sec"] = throughput
+    return duration, metrics
+
+
+def reported_throughput(boto_session, job_name: str) -> Optional[float]:
+    """
+    Mean `images_per_sec` the script logged, or None if it never did.
+    """
+    logs = boto_session.client("logs")
+    values: List[float] = []
+    try:
+        pages = logs.get_paginator("filter_log_events").paginate(
+            logGroupName=utilization.SAGEMAKER_NAMESPACE, logStreamNamePrefix=f"{job_name}/", filterPattern='"images_per_sec"'
+        )
+        for page in pages:
+            for event in page.get("events", []):
+                values += [float(v) for v in THROUGHPUT_RE.findall(event.get("message", ""))]
+    except Exception as e:
+        if getattr(e, "response", {}).get("Error", {}).get("Code") != "ResourceNotFoundException":
+            raise
+    return round(statistics.fmean(values), 2) if values else None
+
+
+def vertex_metrics(job: JobRecord) -> Metrics:
+    """
+    Running time from the CustomJob, plus mean utilization when google-cloud-monitoring
+    is installed.
+    """
+    report = utilization.vertex_report(job.job_name)
+    running = [p.seconds for p in report.phases if p.name == "Running"]
+    return (running[0] if running else None), report.means()
+
+
+COLLECTORS: Dict[str, Callable[[JobRecord], Metrics]] = {"aws": sagemaker_metrics, "gcp": vertex_metrics}
+
+
+def ensure_metrics(jobs: List[JobRecord], conn=None, collectors: Optional[Dict[str, Callable[[JobRecord], Metrics]]] = None) -> List[JobRecord]:
+    """
+    Fill in metrics for succeeded jobs that have none yet and store them. Jobs are final
+    once succeeded, so each one is fetched at most once.
+    """
+    collectors = collectors or COLLECTORS
+    for job in jobs:
+        if job.state != "succeeded" or job.duration_seconds is not None:
+            continue
+        try:
+            job.duration_seconds, job.metrics = collectors[job.provider](job)
+        except Exception as e:
+            print(f"Warning: could not read metrics for {job.job_name}: {e}", file=sys.stderr)
+            continue
+        job_registry.update_metrics(job.job_name, job.provider, job.duration_seconds, job.metrics, conn=conn)
+    return jobs
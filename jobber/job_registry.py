@@ -0,0 +1,627 @@
+"""
+Local SQLite index of jobs submitted through jobber.
+
+Every submit is recorded with what it ran (image digest, hyperparameters, data/output
+URIs, compute, config hash). History queries read only this file; `refresh` asks the
+provider APIs about non-terminal jobs only.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from jobber.paths import data_dir
+
+
+TERMINAL_STATES = {"succeeded", "failed", "stopped"}
+SAGEMAKER_STATES = {
+    "InProgress": "running",
+    "Stopping": "running",
+    "Completed": "succeeded",
+    "Failed": "failed",
+    "Stopped": "stopped",
+}
+VERTEX_STATES = {
+    "JOB_STATE_QUEUED": "pending",
+    "JOB_STATE_PENDING": "pending",
+    "JOB_STATE_PAUSED": "pending",
+    "JOB_STATE_RUNNING": "running",
+    "JOB_STATE_UPDATING": "running",
+    "JOB_STATE_CANCELLING": "running",
+    "JOB_STATE_SUCCEEDED": "succeeded",
+    "JOB_STATE_PARTIALLY_SUCCEEDED": "succeeded",
+    "JOB_STATE_FAILED": "failed",
+    "JOB_STATE_EXPIRED": "failed",
+    "JOB_STATE_CANCELLED": "stopped",
+}
+
+# Each entry upgrades the schema by one version (PRAGMA user_version).
+MIGRATIONS = [
+    """
+    CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY,
+        provider TEXT NOT NULL,
+        job_name TEXT NOT NULL,
+        region TEXT,
+        project TEXT,
+        submitted_at REAL NOT NULL,
+        state TEXT NOT NULL,
+        status TEXT,
+        status_checked_at REAL,
+        image_uri TEXT,
+        image_digest TEXT,
+        hyperparameters TEXT NOT NULL DEFAULT '{}',
+        data_uri TEXT,
+        output_uri TEXT,
+        instance_type TEXT,
+        instance_count INTEGER,
+        config_hash TEXT,
+        UNIQUE (provider, job_name)
+    );
+    CREATE INDEX jobs_submitted ON jobs (submitted_at);
+    CREATE INDEX jobs_state ON jobs (state);
+    """,
+    """
+    ALTER TABLE jobs ADD COLUMN fingerprint TEXT;
+    CREATE INDEX jobs_fingerprint ON jobs (fingerprint);
+    """,
+    """
+    ALTER TABLE jobs ADD COLUMN accelerator_type TEXT;
+    ALTER TABLE jobs ADD COLUMN accelerator_count INTEGER;
+    ALTER TABLE jobs ADD COLUMN workload TEXT;
+    ALTER TABLE jobs ADD COLUMN duration_seconds REAL;
+    ALTER TABLE jobs ADD COLUMN metrics TEXT NOT NULL DEFAULT '{}';
+    CREATE INDEX jobs_workload ON jobs (workload);
+    """,
+]
+DEFAULT_DEDUPE_WINDOW = "24h"
+# SageMaker tag / Vertex AI label carrying the submit fingerprint on the job itself.
+FINGERPRINT_TAG = "jobber-fingerprint"
+
+
+@dataclass
+class JobRecord:
+    provider: str
+    job_name: str
+    submitted_at: float = field(default_factory=time.time)
+    state: str = "pending"
+    status: Optional[str] = None
+    region: Optional[str] = None
+    project: Optional[str] = None
+    image_uri: Optional[str] = None
+    image_digest: Optional[str] = None
+    hyperparameters: Dict[str, str] = field(default_factory=dict)
+    data_uri: Optional[str] = None
+    output_uri: Optional[str] = None
+    instance_type: Optional[str] = None
+    instance_count: Optional[int] = None
+    config_hash: Optional[str] = None
+    status_checked_at: Optional[float] = None
+    fingerprint: Optional[str] = None
+    accelerator_type: Optional[str] = None
+    accelerator_count: Optional[int] = None
+    # Same as fingerprint but without region and compute, so runs of one workload on
+    # different instance types can be compared.
+    workload: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def terminal(self) -> bool:
+        return self.state in TERMINAL_STATES
+
+
+def db_path() -> Path:
+    return data_dir() / "jobs.sqlite"
+
+
+def connect(path: Optional[Path] = None) -> sqlite3.Connection:
+    path = Path(path or db_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    _migrate(conn)
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for i, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        with conn:
+            conn.executescript(script)
+            conn.execute(f"PRAGMA user_version = {i}")
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """
+    Stable short hash of the effective submit configuration.
+    """
+    blob = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def source_hash(source_dir: Optional[str]) -> Optional[str]:
+    """
+    Content hash of the code bundle (relative paths + bytes, sorted); None without one.
+    """
+    from jobber.build_context import iter_context_files
+
+    if not source_dir or not Path(source_dir).is_dir():
+        return None
+    digest = hashlib.sha256()
+    for rel, path in iter_context_files(source_dir, rules=[]):
+        if "__pycache__" in rel.split("/") or rel.endswith(".pyc"):
+            continue
+        digest.update(rel.encode() + b"\0")
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+COMPUTE_KEYS = ("region", "instance_type", "instance_count", "accelerator_type", "accelerator_count")
+
+
+def fingerprint(job: JobRecord, code_hash: Optional[str] = None, **extra: Any) -> str:
+    """
+    Identity of a submission: image (digest when known), code bundle, hyperparameters,
+    data URI and compute. Two submits with the same fingerprint would do the same work.
+    `extra` carries provider-specific settings such as the entry point.
+    """
+    return config_hash(_identity(job, code_hash, extra))
+
+
+def workload_fingerprint(job: JobRecord, code_hash: Optional[str] = None, **extra: Any) -> str:
+    """
+    The fingerprint without region and compute: the same work on any instance type.
+    """
+    identity = _identity(job, code_hash, extra)
+    return config_hash({k: v for k, v in identity.items() if k not in COMPUTE_KEYS})
+
+
+def _identity(job: JobRecord, code_hash: Optional[str], extra: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "provider": job.provider,
+        "region": job.region,
+        "project": job.project,
+        "image": job.image_digest or job.image_uri,
+        "code": code_hash,
+        "hyperparameters": {k: str(v) for k, v in job.hyperparameters.items()},
+        "data_uri": job.data_uri,
+        "instance_type": job.instance_type,
+        "instance_count": job.instance_count,
+        "accelerator_type": job.accelerator_type,
+        "accelerator_count": job.accelerator_count,
+        **{k: v for k, v in extra.items() if v is not None},
+    }
+
+
+def find_duplicate(
+    fp: str,
+    window: str = DEFAULT_DEDUPE_WINDOW,
+    conn: Optional[sqlite3.Connection] = None,
+    fetchers: Optional[Dict[str, Callable[[List[JobRecord]], Dict[str, str]]]] = None,
+) -> Optional[JobRecord]:
+    """
+    Newest job with this fingerprint that is still pending/running, or that succeeded
+    within `window`. Open candidates are refreshed from the provider first so a job that
+    has since failed does not count.
+    """
+    conn = conn or connect()
+    query = (
+        "SELECT * FROM jobs WHERE fingerprint = ? AND "
+        "(state NOT IN ('succeeded', 'failed', 'stopped') OR (state = 'succeeded' AND submitted_at >= ?)) "
+        "ORDER BY submitted_at DESC"
+    )
+    args = (fp, time.time() - parse_duration(window))
+    open_jobs = [r["job_name"] for r in conn.execute(query, args) if r["state"] not in TERMINAL_STATES]
+    if open_jobs:
+        refresh(conn, fetchers, job_names=open_jobs)
+    row = conn.execute(query, args).fetchone()
+    return _from_row(row) if row else None
+
+
+def remote_duplicates(provider: str, fp: str, region: Optional[str] = None, project: Optional[str] = None) -> List[JobRecord]:
+    """
+    Jobs tagged (SageMaker) or labelled (Vertex AI) with this fingerprint, newest first.
+    Unlike the local registry this sees submits from every machine, e.g. a CI retry on a
+    fresh runner. SageMaker Search is eventually consistent: a job created seconds ago
+    may not be listed yet.
+    """
+    jobs = _sagemaker_tagged(fp, region) if provider == "aws" else _vertex_labelled(fp, project, region)
+    return sorted(jobs, key=lambda j: (j.submitted_at, j.job_name), reverse=True)
+
+
+def find_remote_duplicate(
+    provider: str,
+    fp: str,
+    window: str = DEFAULT_DEDUPE_WINDOW,
+    region: Optional[str] = None,
+    project: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Optional[JobRecord]:
+    """
+    find_duplicate against the provider. The match is added to the local registry (if
+    missing there) so later lookups, `jobs` and `attach` know it.
+    """
+    cutoff = time.time() - parse_duration(window)
+    for job in remote_duplicates(provider, fp, region, project):
+        if not job.terminal or (job.state == "succeeded" and job.submitted_at >= cutoff):
+            conn = conn or connect()
+            if get(job.job_name, conn=conn) is None:
+                record(job, conn=conn)
+            return job
+    return None
+
+
+def _sagemaker_tagged(fp: str, region: Optional[str]) -> List[JobRecord]:
+    from jobber import retry
+
+    session = retry.session(region)
+    resp = session.client("sagemaker").search(
+        Resource="TrainingJob",
+        SearchExpression={"Filters": [{"Name": f"Tags.{FINGERPRINT_TAG}", "Operator": "Equals", "Value": fp}]},
+        SortBy="CreationTime",
+        SortOrder="Descending",
+        MaxResults=20,
+    )
+    jobs = []
+    for result in resp.get("Results", []):
+        tj = result["TrainingJob"]
+        resources = tj.get("ResourceConfig", {})
+        jobs.append(
+            JobRecord(
+                provider="aws",
+                job_name=tj["TrainingJobName"],
+                submitted_at=tj["CreationTime"].timestamp(),
+                state=normalize_state("aws", tj["TrainingJobStatus"]),
+                status=tj["TrainingJobStatus"],
+                status_checked_at=time.time(),
+                region=session.region_name,
+                image_uri=tj.get("AlgorithmSpecification", {}).get("TrainingImage"),
+                output_uri=tj.get("OutputDataConfig", {}).get("S3OutputPath"),
+                instance_type=resources.get("InstanceType"),
+                instance_count=resources.get("InstanceCount"),
+                fingerprint=fp,
+            )
+        )
+    return jobs
+
+
+def _vertex_labelled(fp: str, project: Optional[str], region: Optional[str]) -> List[JobRecord]:
+    from google.cloud import aiplatform_v1
+    from jobber import retry
+
+    if not project or not region:
+        return []
+    client = retry.wrap(aiplatform_v1.JobServiceClient(client_options={"api_endpoint": f"{region}-aiplatform.googleapis.com"}), "aiplatform")
+    jobs = []
+    for job in client.list_custom_jobs(parent=f"projects/{project}/locations/{region}", filter=f'labels.{FINGERPRINT_TAG}="{fp}"'):
+        status = aiplatform_v1.JobState(job.state).name
+        jobs.append(
+            JobRecord(
+                provider="gcp",
+                job_name=job.name,
+                submitted_at=job.create_time.timestamp(),
+                state=normalize_state("gcp", status),
+                status=status,
+                status_checked_at=time.time(),
+                region=region,
+                project=project,
+                output_uri=job.job_spec.base_output_directory.output_uri_prefix or None,
+                fingerprint=fp,
+            )
+        )
+    return jobs
+
+
+def stop_job(provider: str, job_name: str, region: Optional[str] = None) -> None:
+    """
+    Ask the provider to stop a training job (SageMaker) or cancel a CustomJob (Vertex AI).
+    """
+    from jobber import retry
+
+    if provider == "gcp":
+        from google.cloud import aiplatform_v1
+
+        location = region or location_of(job_name)
+        client = retry.wrap(aiplatform_v1.JobServiceClient(client_options={"api_endpoint": f"{location}-aiplatform.googleapis.com"}), "aiplatform")
+        client.cancel_custom_job(name=job_name)
+        return
+    retry.session(region).client("sagemaker").stop_training_job(TrainingJobName=job_name)
+
+
+def image_digest(provider: str, image_uri: Optional[str], region: Optional[str] = None, resolve: bool = True) -> Optional[str]:
+    """
+    Best-effort registry digest for the submitted image (None if it cannot be resolved).
+    Without `resolve`, only a digest pinned in the URI is returned (no registry call).
+    """
+    if not image_uri:
+        return None
+    if "@sha256:" in image_uri:
+        return image_uri.split("@", 1)[1]
+    if not resolve:
+        return None
+    try:
+        if provider == "aws":
+            from jobber import ecr_utils, retry
+
+            if not ecr_utils.parse_image_uri(image_uri):
+                return None
+            return ecr_utils.describe_image(retry.session(region), image_uri).get("imageDigest")
+        from jobber import gcp_artifact
+
+        if not gcp_artifact.parse_image_uri(image_uri):
+            return None
+        return gcp_artifact.image_digest(image_uri)
+    except Exception:
+        return None
+
+
+def record(job: JobRecord, conn: Optional[sqlite3.Connection] = None) -> JobRecord:
+    conn = conn or connect()
+    row = asdict(job)
+    row["hyperparameters"] = json.dumps(job.hyperparameters, sort_keys=True)
+    row["metrics"] = json.dumps(job.metrics, sort_keys=True)
+    cols = ", ".join(row)
+    marks = ", ".join(f":{k}" for k in row)
+    updates = ", ".join(f"{k} = excluded.{k}" for k in row if k not in {"provider", "job_name"})
+    with conn:
+        conn.execute(f"INSERT INTO jobs ({cols}) VALUES ({marks}) ON CONFLICT (provider, job_name) DO UPDATE SET {updates}", row)
+    return job
+
+
+def _from_row(row: sqlite3.Row) -> JobRecord:
+    data = {k: row[k] for k in row.keys() if k != "id"}
+    data["hyperparameters"] = json.loads(data["hyperparameters"] or "{}")
+    data["metrics"] = json.loads(data["metrics"] or "{}")
+    return JobRecord(**data)
+
+
+def _like_escape(text: str) -> str:
+    """
+    Escape LIKE wildcards so user input matches literally (queries use ESCAPE '\\').
+    """
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def get(job_name: str, conn: Optional[sqlite3.Connection] = None) -> Optional[JobRecord]:
+    """
+    Look a job up by exact name, or by a unique prefix/suffix (e.g. a Vertex job id).
+    """
+    conn = conn or connect()
+    row = conn.execute("SELECT * FROM jobs WHERE job_name = ?", (job_name,)).fetchone()
+    if row is None:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE job_name LIKE ? ESCAPE '\\' OR job_name LIKE ? ESCAPE '\\' ORDER BY submitted_at DESC LIMIT 2",
+            (f"{_like_escape(job_name)}%", f"%/{_like_escape(job_name)}"),
+        ).fetchall()
+        row = rows[0] if len(rows) == 1 else None
+    return _from_row(row) if row else None
+
+
+def list_jobs(
+    provider: Optional[str] = None,
+    state: Optional[str] = None,
+    since: Optional[float] = None,
+    name: Optional[str] = None,
+    params: Optional[Dict[str, str]] = None,
+    workload: Optional[str] = None,
+    limit: Optional[int] = 20,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[JobRecord]:
+    """
+    Newest first. `params` match hyperparameter values exactly (as submitted strings).
+    """
+    conn = conn or connect()
+    where, args = [], []
+    if provider:
+        where.append("provider = ?")
+        args.append(provider)
+    if state:
+        where.append("state = ?")
+        args.append(state)
+    if since:
+        where.append("submitted_at >= ?")
+        args.append(since)
+    if name:
+        where.append("job_name LIKE ? ESCAPE '\\'")
+        args.append(f"%{_like_escape(name)}%")
+    if workload:
+        where.append("workload = ?")
+        args.append(workload)
+    for key, value in (params or {}).items():
+        where.append("json_extract(hyperparameters, ?) = ?")
+        args += [f'$."{key}"', str(value)]
+    sql = "SELECT * FROM jobs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY submitted_at DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return [_from_row(r) for r in conn.execute(sql, args)]
+
+
+def update_status(job_name: str, provider: str, status: str, conn: Optional[sqlite3.Connection] = None) -> None:
+    conn = conn or connect()
+    state = normalize_state(provider, status)
+    with conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, state = ?, status_checked_at = ? WHERE provider = ? AND job_name = ?",
+            (status, state, time.time(), provider, job_name),
+        )
+
+
+def update_metrics(
+    job_name: str,
+    provider: str,
+    duration_seconds: Optional[float],
+    metrics: Dict[str, float],
+    conn: Optional[sqlite3.Connection] = None,
+) -> None:
+    conn = conn or connect()
+    with conn:
+        conn.execute(
+            "UPDATE jobs SET duration_seconds = ?, metrics = ? WHERE provider = ? AND job_name = ?",
+            (duration_seconds, json.dumps(metrics, sort_keys=True), provider, job_name),
+        )
+
+
+def history(workload: str, conn: Optional[sqlite3.Connection] = None) -> List[JobRecord]:
+    """
+    Succeeded runs of a workload, newest first.
+    """
+    conn = conn or connect()
+    rows = conn.execute("SELECT * FROM jobs WHERE workload = ? AND state = 'succeeded' ORDER BY submitted_at DESC", (workload,))
+    return [_from_row(r) for r in rows]
+
+
+def normalize_state(provider: str, status: str) -> str:
+    table = SAGEMAKER_STATES if provider == "aws" else VERTEX_STATES
+    return table.get(status, "pending")
+
+
+def refresh(
+    conn: Optional[sqlite3.Connection] = None,
+    fetchers: Optional[Dict[str, Callable[[List[JobRecord]], Dict[str, str]]]] = None,
+    job_names: Optional[Iterable[str]] = None,
+) -> List[JobRecord]:
+    """
+    Query provider status for non-terminal jobs only (optionally just `job_names`) and
+    store it. Returns the jobs whose state changed. Terminal jobs are never re-queried.
+    """
+    conn = conn or connect()
+    pending = [_from_row(r) for r in conn.execute("SELECT * FROM jobs WHERE state NOT IN ('succeeded', 'failed', 'stopped')")]
+    if job_names is not None:
+        wanted = set(job_names)
+        pending = [j for j in pending if j.job_name in wanted]
+    current = statuses(pending, fetchers)
+    changed = []
+    for job in pending:
+        status = current.get(job.job_name)
+        if status is None:
+            continue
+        update_status(job.job_name, job.provider, status, conn=conn)
+        if normalize_state(job.provider, status) != job.state:
+            changed.append(get(job.job_name, conn=conn))
+    return changed
+
+
+def statuses(
+    jobs: Iterable[JobRecord], fetchers: Optional[Dict[str, Callable[[List[JobRecord]], Dict[str, str]]]] = None
+) -> Dict[str, str]:
+    """
+    Raw provider status by job name, with one batched query per provider (and region);
+    jobs the provider does not report are left out.
+    """
+    fetchers = fetchers or {"aws": _sagemaker_statuses, "gcp": _vertex_statuses}
+    jobs = list(jobs)
+    out: Dict[str, str] = {}
+    for provider, fetch in fetchers.items():
+        batch = [j for j in jobs if j.provider == provider]
+        if batch:
+            out.update(fetch(batch))
+    return out
+
+
+def _sagemaker_statuses(jobs: List[JobRecord]) -> Dict[str, str]:
+    """
+    One paginated list_training_jobs per region (from the oldest open job onward)
+    instead of a describe call per job.
+    """
+    from jobber import retry
+
+    out: Dict[str, str] = {}
+    by_region: Dict[Optional[str], List[JobRecord]] = {}
+    for job in jobs:
+        by_region.setdefault(job.region, []).append(job)
+    for region, group in by_region.items():
+        session = retry.session(region)
+        sm = session.client("sagemaker")
+        wanted = {j.job_name for j in group}
+        oldest = datetime.fromtimestamp(min(j.submitted_at for j in group) - 3600, tz=timezone.utc)
+        for page in sm.get_paginator("list_training_jobs").paginate(CreationTimeAfter=oldest):
+            for summary in page.get("TrainingJobSummaries", []):
+                if summary["TrainingJobName"] in wanted:
+                    out[summary["TrainingJobName"]] = summary["TrainingJobStatus"]
+            if wanted <= set(out):
+                break
+    return out
+
+
+def _vertex_statuses(jobs: List[JobRecord]) -> Dict[str, str]:
+    from google.cloud import aiplatform_v1
+    from jobber import retry
+
+    out: Dict[str, str] = {}
+    clients: Dict[str, Any] = {}
+    for job in jobs:
+        region = job.region or location_of(job.job_name)
+        if region not in clients:
+            clients[region] = retry.wrap(aiplatform_v1.JobServiceClient(client_options={"api_endpoint": f"{region}-aiplatform.googleapis.com"}), "aiplatform")
+        resp = clients[region].get_custom_job(name=job.job_name)
+        out[job.job_name] = aiplatform_v1.JobState(resp.state).name
+    return out
+
+
+def location_of(resource_name: str) -> str:
+    """
+    The region in a Vertex AI resource name (projects/P/locations/REGION/...), or us-central1.
+    """
+    m = re.search(r"/locations/([^/]+)/", resource_name)
+    return m.group(1) if m else "us-central1"
+
+
+DURATION_RE = re.compile(r"(\d+)([dhm])")
+
+
+def parse_duration(value: str) -> float:
+    """
+    '7d', '12h', '30m' as seconds.
+    """
+    m = DURATION_RE.fullmatch(value.strip())
+    if not m:
+        raise ValueError(f"invalid duration {value!r}; use e.g. 7d, 12h or 30m")
+    unit = {"d": "days", "h": "hours", "m": "minutes"}[m.group(2)]
+    return timedelta(**{unit: int(m.group(1))}).total_seconds()
+
+
+def parse_since(value: str) -> float:
+    """
+    '7d', '12h', '30m' relative to now, or an ISO date/datetime.
+    """
+    if DURATION_RE.fullmatch(value.strip()):
+        return time.time() - parse_duration(value)
+    return datetime.fromisoformat(value).timestamp()
+
+
+def format_jobs(jobs: Iterable[JobRecord]) -> str:
+    lines = [f"{'SUBMITTED':<17} {'PROVIDER':<8} {'STATE':<10} {'INSTANCE':<18} {'JOB':<40} PARAMS"]
+    for job in jobs:
+        when = datetime.fromtimestamp(job.submitted_at).strftime("%Y-%m-%d %H:%M")
+        name = job.job_name.rsplit("/", 1)[-1] if job.provider == "gcp" else job.job_name
+        compute = job.instance_type or "-"
+        if job.instance_count and job.instance_count > 1:
+            compute += f" x{job.instance_count}"
+        params = " ".join(f"{k}={v}" for k, v in sorted(job.hyperparameters.items()))
+        lines.append(f"{when:<17} {job.provider:<8} {job.state:<10} {compute:<18} {name:<40} {params}")
+    return "\n".join(lines)
+
+
+def format_job(job: JobRecord) -> str:
+    data = asdict(job)
+    for key in ("submitted_at", "status_checked_at"):
+        if data[key]:
+            data[key] = datetime.fromtimestamp(data[key]).isoformat(timespec="seconds")
+    width = max(len(k) for k in data)
+    lines = []
+    for key, value in data.items():
+        if key in ("hyperparameters", "metrics"):
+            value = json.dumps(value, sort_keys=True)
+        lines.append(f"{key:<{width}}  {value if value is not None else '-'}")
+    return "\n".join(lines)
@@ -0,0 +1,77 @@
+"""
+Lazy-pull variants of pushed images: a SOCI index (ECR, for runtimes with the SOCI
+snapshotter such as ECS on Fargate) or eStargz layers (containerd's stargz snapshotter).
+
+Each variant is published under its own tag (`<tag>-soci`, `<tag>-estargz`) next to the
+original, so runtimes that cannot lazy-load keep pulling the plain image.
+"""
+
+import subprocess
+import tempfile
+from typing import List, Optional
+
+
+FORMATS = ("soci", "estargz")
+DEFAULT_FORMAT = {"aws": "soci", "gcp": "estargz"}
+
+
+def resolve_format(name: str, provider: str) -> str:
+    fmt = DEFAULT_FORMAT[provider] if name == "auto" else name
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown lazy-pull format {name!r}; expected auto, {', '.join(FORMATS)}")
+    if fmt == "soci" and provider != "aws":
+        raise ValueError("SOCI indexes are only published to ECR; use estargz for Artifact Registry")
+    return fmt
+
+
+def variant_ref(image_uri: str, fmt: str) -> str:
+    """
+    `repo:tag` -> `repo:tag-<fmt>` (`repo` alone is treated as `repo:latest`).
+    """
+    name, sep, tag = image_uri.rpartition(":")
+    if not sep or "/" in tag:
+        name, tag = image_uri, "latest"
+    return f"{name}:{tag}-{fmt}"
+
+
+def _run(cmd: List[str], input: Optional[str] = None) -> None:
+    print(f"+ {' '.join(cmd)}")
+    subprocess.run(cmd, check=True, input=input, text=True)
+
+
+def soci_commands(image_uri: str, target: str) -> List[List[str]]:
+    """
+    Pull into containerd, convert to an image index carrying a SOCI v2 index, push.
+    nerdctl reads registry credentials from the docker config that push has just logged
+    into, so no token is ever passed on a command line.
+    """
+    return [
+        ["nerdctl", "pull", image_uri],
+        ["soci", "convert", image_uri, target],
+        ["nerdctl", "push", target],
+    ]
+
+
+def estargz_command(image_uri: str, target: str, context: str) -> List[str]:
+    """
+    Re-export the pushed image with every layer recompressed as eStargz. BuildKit reads
+    the Dockerfile (`FROM <image>`) from stdin.
+    """
+    output = f"type=image,name={target},push=true,compression=estargz,force-compression=true,oci-mediatypes=true"
+    return ["docker", "buildx", "build", "--output", output, "-f", "-", context]
+
+
+def publish(image_uri: str, fmt: str) -> str:
+    """
+    Publish the lazy-pull variant of an already pushed image; returns its reference.
+    Needs `nerdctl` and `soci` (SOCI) or a docker-container buildx builder (eStargz),
+    and docker logged into the registry.
+    """
+    target = variant_ref(image_uri, fmt)
+    if fmt == "soci":
+        for cmd in soci_commands(image_uri, target):
+            _run(cmd)
+    else:
+        with tempfile.TemporaryDirectory(prefix="jobber-estargz-") as context:
+            _run(estargz_command(image_uri, target, context), input=f"FROM {image_uri}\n")
+    return target
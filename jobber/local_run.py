@@ -0,0 +1,176 @@
+"""
+Run a training image locally with the same container contract as SageMaker / Vertex AI.
+"""
+
+import json
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from jobber import hyperparams
+from jobber.docker_utils import run
+
+
+SM_ROOT = "/opt/ml"
+VERTEX_ROOT = "/gcs"
+
+
+@dataclass
+class LocalRun:
+    cmd: List[str]
+    workdir: Path
+    model_dir: Path
+    output_dir: Path
+
+
+def stage_data(data_dir: Path, dest: Path, sample: Optional[int] = None) -> Path:
+    """
+    Return the directory to mount as the training channel. With `sample`, copy only the
+    first N files (sorted, relative layout preserved) so smoke runs stay small.
+    """
+    if not sample:
+        return data_dir
+    if dest.exists():
+        shutil.rmtree(dest)
+    dest.mkdir(parents=True)
+    files = sorted(p for p in data_dir.rglob("*") if p.is_file())
+    for src in files[:sample]:
+        target = dest / src.relative_to(data_dir)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, target)
+    return dest
+
+
+def gpu_flags(cpu_only: bool) -> List[str]:
+    if cpu_only or shutil.which("nvidia-smi") is None:
+        return []
+    return ["--gpus", "all"]
+
+
+def _docker_run_base(gpus: List[str], offline: bool) -> List[str]:
+    cmd = ["docker", "run", "--rm", *gpus]
+    if offline:
+        cmd += ["--network", "none"]
+    if not gpus:
+        cmd += ["-e", "CUDA_VISIBLE_DEVICES="]
+    return cmd
+
+
+def prepare_sagemaker(
+    image: str,
+    entry_point: str,
+    source_dir: Optional[str],
+    hyperparameters: Dict[str, Any],
+    data_dir: Optional[str],
+    workdir: Path,
+    sample: Optional[int] = None,
+    cpu_only: bool = False,
+    offline: bool = False,
+) -> LocalRun:
+    """
+    Mirror the SageMaker training layout: /opt/ml/input/config/*.json,
+    /opt/ml/input/data/train, /opt/ml/model and /opt/ml/output, plus SM_* env vars.
+    """
+    workdir = workdir.resolve()
+    config_dir = workdir / "input" / "config"
+    model_dir = workdir / "model"
+    output_dir = workdir / "output"
+    for d in (config_dir, model_dir, output_dir / "data"):
+        d.mkdir(parents=True, exist_ok=True)
+    hps = {k: hyperparams.encode_value(v) for k, v in hyperparameters.items()}
+    (config_dir / "hyperparameters.json").write_text(json.dumps(hps, indent=2))
+    (config_dir / "resourceconfig.json").write_text(
+        json.dumps({"current_host": "algo-1", "hosts": ["algo-1"], "network_interface_name": "eth0"})
+    )
+    (config_dir / "inputdataconfig.json").write_text(
+        json.dumps({"train": {"TrainingInputMode": "File", "S3DistributionType": "FullyReplicated", "RecordWrapperType": "None"}})
+    )
+
+    gpus = gpu_flags(cpu_only)
+    cmd = _docker_run_base(gpus, offline)
+    cmd += ["-v", f"{config_dir}:{SM_ROOT}/input/config:ro"]
+    cmd += ["-v", f"{model_dir}:{SM_ROOT}/model", "-v", f"{output_dir}:{SM_ROOT}/output"]
+    if data_dir:
+        data = stage_data(Path(data_dir).resolve(), workdir / "data-sample", sample)
+        cmd += ["-v", f"{data}:{SM_ROOT}/input/data/train:ro"]
+    code_dir = f"{SM_ROOT}/code"
+    if source_dir:
+        cmd += ["-v", f"{Path(source_dir).resolve()}:{code_dir}:ro", "-w", code_dir]
+    env = {
+        "SM_MODEL_DIR": f"{SM_ROOT}/model",
+        "SM_OUTPUT_DIR": f"{SM_ROOT}/output",
+        "SM_OUTPUT_DATA_DIR": f"{SM_ROOT}/output/data",
+        "SM_INPUT_DIR": f"{SM_ROOT}/input",
+        "SM_INPUT_CONFIG_DIR": f"{SM_ROOT}/input/config",
+        "SM_CHANNELS": json.dumps(["train"]),
+        "SM_CHANNEL_TRAIN": f"{SM_ROOT}/input/data/train",
+        "SM_HPS": json.dumps(hps),
+        "SM_HOSTS": json.dumps(["algo-1"]),
+        "SM_CURRENT_HOST": "algo-1",
+        "SM_NUM_GPUS": "1" if gpus else "0",
+        "SM_USER_ENTRY_POINT": entry_point,
+    }
+    for k, v in hps.items():
+        env[f"SM_HP_{k.upper().replace('-', '_')}"] = v
+    for k, v in env.items():
+        cmd += ["-e", f"{k}={v}"]
+    args: List[str] = []
+    for k, v in hps.items():
+        args += [f"--{k}", v]
+    cmd += [image, "python", entry_point, *args]
+    return LocalRun(cmd=cmd, workdir=workdir, model_dir=model_dir, output_dir=output_dir)
+
+
+def prepare_vertex(
+    image: str,
+    entry_point: Optional[str],
+    source_dir: Optional[str],
+    args: Dict[str, Any],
+    data_dir: Optional[str],
+    workdir: Path,
+    bucket: Optional[str] = None,
+    prefix: Optional[str] = None,
+    sample: Optional[int] = None,
+    cpu_only: bool = False,
+    offline: bool = False,
+) -> LocalRun:
+    """
+    Mirror a Vertex AI CustomJob: AIP_* output env vars (backed by local dirs mounted where
+    Cloud Storage FUSE would expose them), the data prefix under /gcs/<bucket>/<prefix>/data,
+    and the container args that vertex_submit builds.
+    """
+    from jobber.vertex_submit import build_args
+
+    workdir = workdir.resolve()
+    output_dir = workdir / "outputs"
+    model_dir = output_dir / "model"
+    for d in (model_dir, output_dir / "checkpoints", output_dir / "logs"):
+        d.mkdir(parents=True, exist_ok=True)
+    gcs_prefix = f"{VERTEX_ROOT}/{bucket}/{prefix.strip('/')}" if bucket and prefix else f"{VERTEX_ROOT}/local"
+
+    gpus = gpu_flags(cpu_only)
+    cmd = _docker_run_base(gpus, offline)
+    cmd += ["-v", f"{output_dir}:{gcs_prefix}/outputs"]
+    if data_dir:
+        data = stage_data(Path(data_dir).resolve(), workdir / "data-sample", sample)
+        cmd += ["-v", f"{data}:{gcs_prefix}/data:ro"]
+    if source_dir:
+        cmd += ["-v", f"{Path(source_dir).resolve()}:/app:ro", "-w", "/app"]
+    env = {
+        "AIP_MODEL_DIR": f"{gcs_prefix}/outputs/model/",
+        "AIP_CHECKPOINT_DIR": f"{gcs_prefix}/outputs/checkpoints/",
+        "AIP_TENSORBOARD_LOG_DIR": f"{gcs_prefix}/outputs/logs/",
+        "CLOUD_ML_JOB_ID": "local",
+    }
+    for k, v in env.items():
+        cmd += ["-e", f"{k}={v}"]
+    cmd.append(image)
+    if entry_point:
+        cmd += ["python", entry_point]
+    cmd += build_args(args)
+    return LocalRun(cmd=cmd, workdir=workdir, model_dir=model_dir, output_dir=output_dir)
+
+
+def run_local(local: LocalRun) -> None:
+    run(local.cmd)
@@ -0,0 +1,255 @@
+"""
+Data locality for submits: where the image registry and the data/output bucket live
+relative to the job's region, and copies of either into that region.
+
+Data and outputs share one bucket (`<bucket>/<prefix>/data` and `.../outputs`), so a
+bucket in another region means cross-region reads at start-up and cross-region writes
+of every checkpoint and model artifact.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+from jobber import retry
+
+
+# Multi-region and dual-region locations (GCS buckets, Artifact Registry) and the
+# regions they serve without inter-region transfer.
+MULTI_REGIONS = {"us": "us-", "eu": "europe-", "europe": "europe-", "asia": "asia-"}
+DUAL_REGIONS = {
+    "nam4": ("us-central1", "us-east1"),
+    "eur4": ("europe-north1", "europe-west4"),
+    "asia1": ("asia-northeast1", "asia-northeast2"),
+}
+MAX_BUCKET_NAME = 63
+
+
+@dataclass
+class Placement:
+    what: str
+    uri: str
+    region: Optional[str]
+    note: str = ""
+
+    def colocated(self, job_region: str) -> bool:
+        """
+        True when in the job's region, or when the region is unknown (nothing to act on).
+        """
+        return self.region is None or same_region(self.region, job_region)
+
+
+def same_region(location: str, job_region: str) -> bool:
+    location, job_region = location.lower(), job_region.lower()
+    if location == job_region:
+        return True
+    if location in MULTI_REGIONS:
+        return job_region.startswith(MULTI_REGIONS[location])
+    return job_region in DUAL_REGIONS.get(location, ())
+
+
+def s3_bucket_region(boto_session, bucket: str) -> Optional[str]:
+    """
+    The bucket's region from head_bucket (S3 reports it even on a 301 or 403);
+    None if the bucket does not exist.
+    """
+    from botocore.exceptions import ClientError
+
+    try:
+        resp = boto_session.client("s3").head_bucket(Bucket=bucket)
+    except ClientError as e:
+        headers = e.response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+        if headers.get("x-amz-bucket-region"):
+            return headers["x-amz-bucket-region"]
+        if e.response.get("Error", {}).get("Code") in {"404", "NoSuchBucket", "NotFound"}:
+            return None
+        raise
+    return resp.get("BucketRegion") or resp.get("ResponseMetadata", {}).get("HTTPHeaders", {}).get("x-amz-bucket-region")
+
+
+def gcs_bucket_location(bucket: str) -> Optional[str]:
+    """
+    The bucket's location, lowercased (`us-central1`, `us`, `nam4`); None if missing.
+    """
+    from jobber import gcp_clients
+
+    found = gcp_clients.storage_client().lookup_bucket(bucket)
+    return found.location.lower() if found is not None and found.location else None
+
+
+def image_region(provider: str, image_uri: str) -> Optional[str]:
+    """
+    The region in an ECR (aws) or Artifact Registry (gcp) URI; None for other registries.
+    """
+    if provider == "aws":
+        from jobber import ecr_utils
+
+        parsed = ecr_utils.parse_image_uri(image_uri)
+        return parsed[1] if parsed else None
+    from jobber import gcp_artifact
+
+    parsed = gcp_artifact.parse_image_uri(image_uri)
+    return parsed[1] if parsed else None
+
+
+def placements(provider: str, image_uri: str, bucket: str, boto_session=None) -> List[Placement]:
+    """
+    Resolve the image registry and data/output bucket regions. Lookups that fail are
+    reported as unknown with the reason instead of failing the submit.
+    """
+    region = image_region(provider, image_uri)
+    image = Placement("image", image_uri, region, "" if region else "not an ECR/Artifact Registry URI; not checked")
+    scheme = "s3" if provider == "aws" else "gs"
+    data = Placement("data+outputs", f"{scheme}://{bucket}", None)
+    try:
+        data.region = s3_bucket_region(boto_session or retry.session(), bucket) if provider == "aws" else gcs_bucket_location(bucket)
+        if data.region is None:
+            data.note = "bucket does not exist; submit creates it in the job region"
+    except Exception as e:
+        data.note = f"region not resolved ({e})"
+    return [image, data]
+
+
+def mismatches(found: List[Placement], job_region: str) -> List[Placement]:
+    return [p for p in found if not p.colocated(job_region)]
+
+
+def format_report(found: List[Placement], job_region: str) -> str:
+    lines = [f"Locality (job region {job_region}):"]
+    for p in found:
+        if p.region is None:
+            status, where = "?", p.note
+        else:
+            status = "ok" if p.colocated(job_region) else "REMOTE"
+            where = p.region + ("" if p.region.lower() == job_region.lower() or status == "REMOTE" else " (multi-region)")
+        lines.append(f"  {status:<6} {p.what:<13} {p.uri} [{where}]")
+    return "\n".join(lines)
+
+
+def replica_image_uri(provider: str, image_uri: str, region: str) -> str:
+    """
+    The same repository and tag in another region's registry.
+    """
+    if provider == "aws":
+        from jobber import ecr_utils
+
+        parsed = ecr_utils.parse_image_uri(image_uri)
+        if not parsed:
+            raise ValueError(f"Not an ECR image URI: {image_uri}")
+        account, _, repo, tag, _ = parsed
+        return ecr_utils.ECRInfo(account_id=account, region=region, repo_name=repo, image_tag=tag or "latest").image_uri
+    from jobber import gcp_artifact
+
+    parsed = gcp_artifact.parse_image_uri(image_uri)
+    if not parsed:
+        raise ValueError(f"Not an Artifact Registry image URI: {image_uri}")
+    project, _, repo, image, tag, _ = parsed
+    return gcp_artifact.ArtifactRef(project=project, region=region, repo=repo, image=image, tag=tag or "latest").uri
+
+
+def replica_bucket(bucket: str, region: str) -> str:
+    name = f"{bucket}-{region}"
+    if len(name) > MAX_BUCKET_NAME:
+        raise ValueError(f"replica bucket name {name} is longer than {MAX_BUCKET_NAME} characters; set --replica-bucket")
+    return name
+
+
+def replication_errors() -> tuple:
+    """
+    Exception classes a failed copy raises besides a failed subprocess: API and credential
+    errors from boto3 and the Google client libraries (whichever are installed), and a
+    missing client library.
+    """
+    import subprocess
+
+    errors = [ValueError, ModuleNotFoundError, subprocess.CalledProcessError]
+    try:
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        errors += [ClientError, BotoCoreError]
+    except ModuleNotFoundError:
+        pass
+    try:
+        from google.api_core.exceptions import GoogleAPICallError, RetryError
+
+        errors += [GoogleAPICallError, RetryError]
+    except ModuleNotFoundError:
+        pass
+    try:
+        from google.auth.exceptions import GoogleAuthError
+
+        errors.append(GoogleAuthError)
+    except ModuleNotFoundError:
+        pass
+    return tuple(errors)
+
+
+def replicate_image(provider: str, image_uri: str, region: str) -> str:
+    """
+    Copy the image into the same repository in `region` (created if missing) and return
+    its URI. Skipped when the replica already has the same digest.
+    """
+    from jobber import push_targets
+
+    target = replica_image_uri(provider, image_uri, region)
+    if provider == "aws":
+        from jobber import ecr_utils
+
+        account, source_region, repo, _, _ = ecr_utils.parse_image_uri(image_uri)
+        session = retry.session(region)
+        if _same_digest(lambda uri: ecr_utils.describe_image(session, uri)["imageDigest"], image_uri, target):
+            return target
+        ecr_utils.ensure_repo(session.client("ecr"), repo, account_id=account)
+        ecr_utils.ecr_login(ecr_utils.ECRInfo(account_id=account, region=source_region, repo_name=repo))
+        ecr_utils.ecr_login(ecr_utils.ECRInfo(account_id=account, region=region, repo_name=repo))
+    else:
+        from jobber import gcp_artifact
+
+        project, location, repo, _, _, _ = gcp_artifact.parse_image_uri(image_uri)
+        if _same_digest(gcp_artifact.image_digest, image_uri, target):
+            return target
+        gcp_artifact.ensure_repo(project, region, repo)
+        gcp_artifact.configure_docker(location)
+        gcp_artifact.configure_docker(region)
+    print(f"Copying {image_uri} -> {target}")
+    push_targets.copy_image(image_uri, target)
+    return target
+
+
+def _same_digest(digest_of, source: str, target: str) -> bool:
+    try:
+        return digest_of(source) == digest_of(target)
+    except Exception:
+        return False
+
+
+def data_sync_command(provider: str, source: str, target: str, source_region: Optional[str] = None, region: Optional[str] = None) -> List[str]:
+    """
+    Bucket-to-bucket sync; objects are copied server-side and only new or changed ones move.
+    """
+    if provider == "aws":
+        cmd = ["aws", "s3", "sync", source, target]
+        if source_region:
+            cmd += ["--source-region", source_region]
+        if region:
+            cmd += ["--region", region]
+        return cmd
+    return ["gsutil", "-m", "rsync", "-r", source, target]
+
+
+def replicate_data(provider: str, bucket: str, prefix: str, source_region: str, target_bucket: str, region: str) -> None:
+    """
+    Copy `<bucket>/<prefix>/data` into `target_bucket` (created in `region` if missing).
+    """
+    scheme = "s3" if provider == "aws" else "gs"
+    key = f"{prefix.rstrip('/')}/data"
+    if provider == "aws":
+        from jobber import s3_utils
+
+        s3_utils.ensure_bucket(target_bucket, boto_session=retry.session(region))
+        run = s3_utils.run
+    else:
+        from jobber import gcp_storage
+
+        gcp_storage.ensure_bucket(target_bucket, region)
+        run = gcp_storage.run
+    run(data_sync_command(provider, f"{scheme}://{bucket}/{key}", f"{scheme}://{target_bucket}/{key}", source_region, region))
@@ -0,0 +1,331 @@
+"""
+Per-job local log archive: gzip chunks of JSON lines plus an index of time ranges,
+streams and fetch cursors. Finished jobs are served from disk; unfinished ones fetch
+only the events after the stored cursors.
+
+Several processes may sync one archive (a tail in one terminal, `jobber logs` in
+another). Fetch-and-append runs under an flock on the archive directory, from cursors
+re-read under that lock, so each event is archived once.
+"""
+
+import fcntl
+import gzip
+import io
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from jobber.paths import data_dir
+
+
+CHUNK_EVENTS = 20000
+# Providers keep ingesting logs for a little while after a job ends; only then is the
+# archive considered complete.
+COMPLETE_GRACE_SECONDS = 300
+
+
+@dataclass
+class LogEvent:
+    timestamp: int  # epoch milliseconds
+    stream: str
+    message: str
+
+
+@dataclass
+class Chunk:
+    file: str
+    first: int
+    last: int
+    events: int
+    size: int
+    streams: List[str] = field(default_factory=list)
+
+
+def archive_dir(provider: str, job_name: str) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9._-]+", "_", job_name)
+    return data_dir() / "logs" / provider / safe
+
+
+class LogArchive:
+    def __init__(self, root: Path):
+        self.root = root
+        self.chunks: List[Chunk] = []
+        # Per-stream provider cursor (CloudWatch nextForwardToken, Vertex timestamp/insertId).
+        self.cursors: Dict[str, Any] = {}
+        self.complete = False
+        self._lock_depth = 0
+        if self.root.exists():
+            with self.locked():
+                pass
+
+    @classmethod
+    def open(cls, provider: str, job_name: str) -> "LogArchive":
+        return cls(archive_dir(provider, job_name))
+
+    @property
+    def _index_path(self) -> Path:
+        return self.root / "index.json"
+
+    @contextmanager
+    def locked(self) -> Iterator["LogArchive"]:
+        """
+        Hold the archive lock and reload the index, which another process may have
+        advanced. Read cursors, fetch and append inside one `locked()` block.
+        """
+        if self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield self
+            finally:
+                self._lock_depth -= 1
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            self._lock_depth = 1
+            try:
+                self._load()
+                yield self
+            finally:
+                self._lock_depth = 0
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        """
+        Read the index (under the lock; see locked()).
+        """
+        try:
+            data = json.loads(self._index_path.read_text())
+        except (OSError, ValueError):
+            return
+        self.chunks = [Chunk(**c) for c in data.get("chunks", [])]
+        self.cursors = data.get("cursors", {})
+        self.complete = data.get("complete", False)
+        # Drop bytes written after the last index update (e.g. interrupted mid-append);
+        # their events are re-fetched from the stored cursors.
+        if self.chunks:
+            last = self.root / self.chunks[-1].file
+            if last.exists() and last.stat().st_size > self.chunks[-1].size:
+                with open(last, "r+b") as fh:
+                    fh.truncate(self.chunks[-1].size)
+
+    def _save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {
+            "chunks": [c.__dict__ for c in self.chunks],
+            "cursors": self.cursors,
+            "complete": self.complete,
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".index-", suffix=".json")
+        with os.fdopen(fd, "w") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, self._index_path)
+
+    def append(self, events: List[LogEvent], cursors: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Add events and advance cursors in one step: the index is only rewritten after the
+        events are on disk, so a cursor never points past archived data.
+        """
+        with self.locked():
+            self._append(events, cursors)
+
+    def _append(self, events: List[LogEvent], cursors: Optional[Dict[str, Any]]) -> None:
+        if events:
+            self.root.mkdir(parents=True, exist_ok=True)
+            events = sorted(events, key=lambda e: e.timestamp)
+            chunk = self.chunks[-1] if self.chunks else None
+            if chunk is None or chunk.events >= CHUNK_EVENTS:
+                chunk = Chunk(file=f"{len(self.chunks) + 1:06d}.jsonl.gz", first=events[0].timestamp, last=events[0].timestamp, events=0, size=0)
+                self.chunks.append(chunk)
+            # Each append is its own gzip member; readers see one continuous stream.
+            path = self.root / chunk.file
+            with gzip.open(path, "ab") as fh:
+                for e in events:
+                    fh.write(json.dumps({"t": e.timestamp, "s": e.stream, "m": e.message}).encode() + b"\n")
+            chunk.size = path.stat().st_size
+            chunk.events += len(events)
+            chunk.first = min(chunk.first, events[0].timestamp)
+            chunk.last = max(chunk.last, events[-1].timestamp)
+            chunk.streams = sorted(set(chunk.streams) | {e.stream for e in events})
+        if cursors:
+            self.cursors.update(cursors)
+        self._save()
+
+    def mark_complete(self) -> None:
+        with self.locked():
+            self.complete = True
+            self._save()
+
+    def events(
+        self, since: Optional[int] = None, grep: Optional[str] = None, stream: Optional[str] = None, skip: int = 0
+    ) -> Iterator[LogEvent]:
+        """
+        Archived events in order. `since` (epoch ms) skips whole chunks via the index;
+        `grep` is a regular expression matched against the message; `skip` drops the
+        first events in archive order (what a tail has already printed). Only indexed
+        bytes are read, so a concurrent append is never seen half-written.
+        """
+        pattern = re.compile(grep) if grep else None
+        for chunk in list(self.chunks):
+            if skip >= chunk.events:
+                skip -= chunk.events
+                continue
+            if since is not None and chunk.last < since:
+                skip = 0
+                continue
+            if stream and not any(stream in s for s in chunk.streams):
+                skip = 0
+                continue
+            with open(self.root / chunk.file, "rb") as raw_fh:
+                data = raw_fh.read(chunk.size)
+            with gzip.open(io.BytesIO(data), "rt") as fh:
+                for line in fh:
+                    if skip:
+                        skip -= 1
+                        continue
+                    raw = json.loads(line)
+                    if since is not None and raw["t"] < since:
+                        continue
+                    if stream and stream not in raw["s"]:
+                        continue
+                    if pattern and not pattern.search(raw["m"]):
+                        continue
+                    yield LogEvent(raw["t"], raw["s"], raw["m"])
+
+    @property
+    def size(self) -> int:
+        return sum(c.size for c in self.chunks)
+
+    @property
+    def event_count(self) -> int:
+        return sum(c.events for c in self.chunks)
+
+
+def _finished_long_enough(end: Optional[datetime]) -> bool:
+    return end is not None and time.time() - end.timestamp() > COMPLETE_GRACE_SECONDS
+
+
+def sync_sagemaker(archive: LogArchive, job_name: str, boto_session) -> int:
+    """
+    Fetch events newer than the stored per-stream tokens. Returns the number archived.
+    """
+    if archive.complete:
+        return 0
+    group = "/aws/sagemaker/TrainingJobs"
+    logs = boto_session.client("logs")
+    desc = boto_session.client("sagemaker").describe_training_job(TrainingJobName=job_name)
+    added = 0
+    try:
+        pages = logs.get_paginator("describe_log_streams").paginate(logGroupName=group, logStreamNamePrefix=f"{job_name}/")
+        streams = [s["logStreamName"] for page in pages for s in page.get("logStreams", [])]
+    except Exception as e:
+        if getattr(e, "response", {}).get("Error", {}).get("Code") != "ResourceNotFoundException":
+            raise
+        streams = []
+    for name in streams:
+        while True:
+            fetched, drained = fetch_sagemaker_stream(archive, logs, name)
+            added += fetched
+            if drained:
+                break
+    if desc["TrainingJobStatus"] in {"Completed", "Failed", "Stopped"} and _finished_long_enough(desc.get("TrainingEndTime")):
+        archive.mark_complete()
+    return added
+
+
+def fetch_sagemaker_stream(archive: LogArchive, logs, stream: str, group: str = "/aws/sagemaker/TrainingJobs") -> Tuple[int, bool]:
+    """
+    Archive one page of a CloudWatch stream after its stored token. Returns the number of
+    events and whether the stream is drained (CloudWatch repeats the forward token then).
+    """
+    with archive.locked():
+        token = archive.cursors.get(stream)
+        params = {"logGroupName": group, "logStreamName": stream, "startFromHead": True}
+        if token:
+            params["nextToken"] = token
+        resp = logs.get_log_events(**params)
+        events = [LogEvent(e["timestamp"], stream, e["message"]) for e in resp.get("events", [])]
+        archive.append(events, {stream: resp["nextForwardToken"]})
+    return len(events), resp["nextForwardToken"] == token
+
+
+VERTEX_CURSOR = "_vertex"
+
+
+def sync_vertex(archive: LogArchive, job_name: str) -> int:
+    """
+    Fetch Cloud Logging entries for a CustomJob after the stored cursor, and mark the
+    archive complete once the job has ended. Needs google-cloud-logging.
+    """
+    from google.cloud import aiplatform_v1
+    from jobber import retry
+    from jobber.job_registry import location_of
+
+    if archive.complete:
+        return 0
+    region = location_of(job_name)
+    client = retry.wrap(aiplatform_v1.JobServiceClient(client_options={"api_endpoint": f"{region}-aiplatform.googleapis.com"}), "aiplatform")
+    job = client.get_custom_job(name=job_name)
+    added = retry.call("logging", fetch_vertex, archive, job_name)
+    terminal = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+    if aiplatform_v1.JobState(job.state).name in terminal and _finished_long_enough(job.end_time):
+        archive.mark_complete()
+    return added
+
+
+def fetch_vertex(archive: LogArchive, job_name: str, on_event: Optional[Callable[[LogEvent], None]] = None) -> int:
+    """
+    Archive (and pass to `on_event`) Cloud Logging entries newer than the stored
+    (timestamp, insertId) cursor.
+    """
+    from jobber import gcp_clients
+
+    cloud_logging = gcp_clients.logging_types()
+    project, job_id = job_name.split("/")[1], job_name.rsplit("/", 1)[-1]
+    client = gcp_clients.logging_client(project)
+    with archive.locked():
+        return _fetch_vertex_locked(archive, client, cloud_logging, job_id, on_event)
+
+
+def _fetch_vertex_locked(archive: LogArchive, client, cloud_logging, job_id: str, on_event: Optional[Callable[[LogEvent], None]]) -> int:
+    cursor = archive.cursors.get(VERTEX_CURSOR) or {}
+    flt = f'resource.type="ml_job" AND resource.labels.job_id="{job_id}"'
+    if cursor.get("timestamp"):
+        flt += f' AND timestamp>="{cursor["timestamp"]}"'
+    batch: List[LogEvent] = []
+    added = 0
+
+    def flush() -> None:
+        nonlocal added, batch
+        archive.append(batch, {VERTEX_CURSOR: cursor} if cursor else None)
+        for event in batch:
+            if on_event:
+                on_event(event)
+        added += len(batch)
+        batch = []
+
+    for entry in client.list_entries(filter_=flt, order_by=cloud_logging.ASCENDING, page_size=1000):
+        stamp = entry.timestamp.isoformat()
+        if cursor and (stamp, entry.insert_id or "") <= (cursor.get("timestamp", ""), cursor.get("insert_id", "")):
+            continue
+        payload = entry.payload
+        message = payload.get("message", json.dumps(payload)) if isinstance(payload, dict) else str(payload)
+        stream = (entry.labels or {}).get("ml.googleapis.com/task_name") or "main"
+        batch.append(LogEvent(int(entry.timestamp.timestamp() * 1000), stream, message.rstrip("\n")))
+        cursor = {"timestamp": stamp, "insert_id": entry.insert_id or ""}
+        if len(batch) >= 1000:
+            flush()
+    flush()
+    return added
+
+
+def format_event(event: LogEvent) -> str:
+    when = datetime.fromtimestamp(event.timestamp / 1000, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return f"{when} {event.stream}: {event.message}"
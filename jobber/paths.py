@@ -0,0 +1,26 @@
+"""
+Per-user locations for jobber state.
+"""
+
+import os
+from pathlib import Path
+
+
+def cache_dir() -> Path:
+    """
+    Disposable cache data: $JOBBER_CACHE_DIR, else $XDG_CACHE_HOME/jobber, else ~/.cache/jobber.
+    """
+    if os.environ.get("JOBBER_CACHE_DIR"):
+        return Path(os.environ["JOBBER_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "jobber"
+
+
+def data_dir() -> Path:
+    """
+    Persistent state (job registry): $JOBBER_DATA_DIR, else $XDG_DATA_HOME/jobber, else ~/.local/share/jobber.
+    """
+    if os.environ.get("JOBBER_DATA_DIR"):
+        return Path(os.environ["JOBBER_DATA_DIR"])
+    base = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(base) / "jobber"
@@ -0,0 +1,278 @@
+"""
+Preflight checks for jobber submits: catch missing images, empty data prefixes, bad roles,
+quotas and entry points before a job is created or an instance is provisioned.
+"""
+
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from jobber import gcp_clients
+
+
+# Vertex AI custom training machine types, e.g. n1-standard-8, a2-highgpu-1g, g2-standard-12.
+MACHINE_TYPE_RE = re.compile(r"^(n1|n2|n2d|e2|c2|c2d|c3|m1|m2|a2|a3|g2)-[a-z]+-\d+g?$")
+# Families that come with a fixed GPU; the accelerator type must match.
+MACHINE_ACCELERATORS = {
+    "a2": ("NVIDIA_TESLA_A100", "NVIDIA_A100_80GB"),
+    "a3": ("NVIDIA_H100_80GB", "NVIDIA_H100_MEGA_80GB", "NVIDIA_H200_141GB"),
+    "g2": ("NVIDIA_L4",),
+}
+
+
+class PreflightError(Exception):
+    pass
+
+
+class PreflightWarning(Exception):
+    pass
+
+
+@dataclass
+class Check:
+    name: str
+    status: str  # ok | warn | fail
+    detail: str
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> bool:
+        return self.status == "fail"
+
+
+def run_checks(checks: Dict[str, Callable[[], str]], max_workers: Optional[int] = None) -> List[Check]:
+    """
+    Run every check concurrently (they are independent API round-trips) and return the
+    results in declaration order. A check returns a detail string, raises PreflightWarning
+    for something that will not block the job, or raises anything else to fail.
+    """
+    if not checks:
+        return []
+
+    def _run(name: str, fn: Callable[[], str]) -> Check:
+        start = time.time()
+        try:
+            status, detail = "ok", fn()
+        except PreflightWarning as e:
+            status, detail = "warn", str(e)
+        except Exception as e:
+            status, detail = "fail", str(e) or type(e).__name__
+        return Check(name=name, status=status, detail=detail, seconds=time.time() - start)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(checks)) as pool:
+        futures = [pool.submit(_run, name, fn) for name, fn in checks.items()]
+        return [f.result() for f in futures]
+
+
+def format_checks(checks: List[Check]) -> str:
+    lines = ["Preflight:"]
+    for c in checks:
+        lines.append(f"  [{c.status:<4}] {c.name:<12} {c.detail}  ({c.seconds:.1f}s)")
+    return "\n".join(lines)
+
+
+def check_entry_point(entry_point: Optional[str], source_dir: Optional[str]) -> str:
+    if not source_dir:
+        if entry_point:
+            raise PreflightWarning(f"{entry_point} is expected inside the image (no source_dir)")
+        return "image default command"
+    src = Path(source_dir)
+    if not src.is_dir():
+        raise PreflightError(f"source_dir {source_dir} does not exist")
+    if not entry_point:
+        raise PreflightError(f"source_dir {source_dir} is set but no entry point")
+    if not (src / entry_point).is_file():
+        raise PreflightError(f"{entry_point} not found in {source_dir}")
+    return f"{entry_point} in {source_dir}"
+
+
+def aws_checks(
+    boto_session,
+    image_uri: str,
+    role_arn: str,
+    bucket: str,
+    prefix: str,
+    entry_point: Optional[str],
+    source_dir: Optional[str],
+    instance_type: str,
+    instance_count: int = 1,
+    use_spot: bool = False,
+    ensure_data: bool = True,
+) -> Dict[str, Callable[[], str]]:
+    return {
+        "image": lambda: check_ecr_image(boto_session, image_uri),
+        "data": lambda: check_s3_data(boto_session, bucket, prefix, ensure_data),
+        "role": lambda: check_role(boto_session, role_arn),
+        "quota": lambda: check_sagemaker_quota(boto_session, instance_type, instance_count, use_spot),
+        "entry_point": lambda: check_entry_point(entry_point, source_dir),
+    }
+
+
+def check_ecr_image(boto_session, image_uri: str) -> str:
+    from jobber import ecr_utils
+
+    if not image_uri:
+        raise PreflightError("no image URI")
+    parsed = ecr_utils.parse_image_uri(image_uri)
+    if not parsed:
+        raise PreflightWarning(f"{image_uri} is not an ECR URI; not checked")
+    _, _, repo, tag, digest = parsed
+    try:
+        detail = ecr_utils.describe_image(boto_session, image_uri)
+    except Exception as e:
+        code = getattr(e, "response", {}).get("Error", {}).get("Code")
+        if code in {"ImageNotFoundException", "RepositoryNotFoundException"}:
+            raise PreflightError(f"{image_uri} not found in ECR ({code})") from e
+        raise
+    size = detail.get("imageSizeInBytes")
+    return f"{repo}:{tag or digest} found" + (f" ({size / 1e9:.2f} GB)" if size else "")
+
+
+def check_s3_data(boto_session, bucket: str, prefix: str, ensure_data: bool = True) -> str:
+    key_prefix = f"{prefix.rstrip('/')}/data/"
+    s3 = boto_session.client("s3")
+    try:
+        resp = s3.list_objects_v2(Bucket=bucket, Prefix=key_prefix, MaxKeys=1)
+    except Exception as e:
+        code = getattr(e, "response", {}).get("Error", {}).get("Code")
+        if code == "NoSuchBucket":
+            raise PreflightWarning(f"bucket {bucket} does not exist; submit will create it") from e
+        raise
+    uri = f"s3://{bucket}/{key_prefix}"
+    if resp.get("KeyCount", 0) == 0:
+        if ensure_data:
+            raise PreflightWarning(f"{uri} is empty; submit will upload a placeholder")
+        raise PreflightError(f"{uri} is empty")
+    return f"{uri} has objects"
+
+
+def check_role(boto_session, role_arn: str) -> str:
+    if not role_arn:
+        raise PreflightError("no role ARN")
+    name = role_arn.rsplit("/", 1)[-1]
+    iam = boto_session.client("iam")
+    try:
+        role = iam.get_role(RoleName=name)["Role"]
+    except Exception as e:
+        code = getattr(e, "response", {}).get("Error", {}).get("Code")
+        if code == "NoSuchEntity":
+            raise PreflightError(f"role {name} does not exist") from e
+        if code == "AccessDenied":
+            raise PreflightWarning(f"cannot read role {name} (iam:GetRole denied); not checked") from e
+        raise
+    policy = role.get("AssumeRolePolicyDocument") or {}
+    if isinstance(policy, str):
+        policy = json.loads(policy)
+    if not _trusts_service(policy, "sagemaker.amazonaws.com"):
+        raise PreflightError(f"role {name} does not trust sagemaker.amazonaws.com")
+    return f"{name} assumable by SageMaker"
+
+
+def _trusts_service(policy: dict, service: str) -> bool:
+    statements = policy.get("Statement", [])
+    if isinstance(statements, dict):
+        statements = [statements]
+    for st in statements:
+        if st.get("Effect") != "Allow":
+            continue
+        actions = st.get("Action", [])
+        actions = [actions] if isinstance(actions, str) else actions
+        if "sts:AssumeRole" not in actions and "sts:*" not in actions:
+            continue
+        services = (st.get("Principal") or {}).get("Service", [])
+        services = [services] if isinstance(services, str) else services
+        if service in services:
+            return True
+    return False
+
+
+def check_sagemaker_quota(boto_session, instance_type: str, instance_count: int = 1, use_spot: bool = False) -> str:
+    quota_name = f"{instance_type} for {'spot ' if use_spot else ''}training job usage"
+    client = boto_session.client("service-quotas")
+    try:
+        for page in client.get_paginator("list_service_quotas").paginate(ServiceCode="sagemaker"):
+            for quota in page.get("Quotas", []):
+                if quota.get("QuotaName") == quota_name:
+                    value = int(quota.get("Value", 0))
+                    if value < instance_count:
+                        raise PreflightError(f"{quota_name} is {value}, job needs {instance_count}")
+                    return f"{quota_name}: {value} (need {instance_count})"
+    except PreflightError:
+        raise
+    except Exception as e:
+        raise PreflightWarning(f"could not read service quotas ({e}); not checked") from e
+    raise PreflightWarning(f"no quota named {quota_name!r}; instance type may be unavailable")
+
+
+def vertex_checks(
+    project: str,
+    region: str,
+    image_uri: str,
+    bucket: str,
+    prefix: str,
+    entry_point: Optional[str],
+    source_dir: Optional[str],
+    machine_type: str,
+    accelerator_type: Optional[str] = None,
+    accelerator_count: Optional[int] = None,
+    ensure_data: bool = True,
+) -> Dict[str, Callable[[], str]]:
+    return {
+        "image": lambda: check_artifact_image(image_uri),
+        "data": lambda: check_gcs_data(bucket, prefix, ensure_data),
+        "machine": lambda: check_machine_type(machine_type, accelerator_type, accelerator_count),
+        "entry_point": lambda: check_entry_point(entry_point, source_dir),
+    }
+
+
+def check_artifact_image(image_uri: str) -> str:
+    from jobber import gcp_artifact
+
+    if not image_uri:
+        raise PreflightError("no image URI")
+    if not gcp_artifact.parse_image_uri(image_uri):
+        raise PreflightWarning(f"{image_uri} is not an Artifact Registry URI; not checked")
+    try:
+        not_found = gcp_clients.not_found_error()
+        digest = gcp_artifact.image_digest(image_uri)
+    except ModuleNotFoundError as e:
+        raise PreflightWarning(f"{e}; image not checked") from e
+    except not_found as e:
+        raise PreflightError(f"{image_uri} not found in Artifact Registry") from e
+    return f"found ({digest[:19]})"
+
+
+def check_gcs_data(bucket: str, prefix: str, ensure_data: bool = True) -> str:
+    from jobber import gcp_storage
+
+    key_prefix = f"{prefix.rstrip('/')}/data/"
+    uri = f"gs://{bucket}/{key_prefix}"
+    try:
+        client = gcp_clients.storage_client()
+    except ModuleNotFoundError as e:
+        raise PreflightWarning(f"{e}; data prefix not checked") from e
+    if client.lookup_bucket(bucket) is None:
+        raise PreflightError(f"bucket {bucket} does not exist")
+    if gcp_storage.has_objects(bucket, key_prefix):
+        return f"{uri} has objects"
+    if ensure_data:
+        raise PreflightWarning(f"{uri} is empty; submit will upload a placeholder")
+    raise PreflightError(f"{uri} is empty")
+
+
+def check_machine_type(machine_type: str, accelerator_type: Optional[str] = None, accelerator_count: Optional[int] = None) -> str:
+    if not MACHINE_TYPE_RE.match(machine_type or ""):
+        raise PreflightError(f"{machine_type!r} is not a Vertex AI training machine type")
+    if bool(accelerator_type) != bool(accelerator_count):
+        raise PreflightError("accelerator type and count must be set together")
+    family = machine_type.split("-", 1)[0]
+    required = MACHINE_ACCELERATORS.get(family)
+    if required and accelerator_type not in required:
+        raise PreflightError(f"{machine_type} needs accelerator {' or '.join(required)}, not {accelerator_type}")
+    if accelerator_type:
+        return f"{machine_type} + {accelerator_count}x {accelerator_type}"
+    return machine_type
@@ -0,0 +1,168 @@
+"""
+Multi-registry push fan-out for jobber (ECR and Artifact Registry in one run).
+"""
+
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from jobber import config as cfg
+from jobber import exists_cache
+from jobber import retry
+from jobber.docker_utils import DockerImage, push_image, run, tag_image
+
+
+TARGET_KEYS = {"provider", "region", "repo", "project", "artifact_repo"}
+
+
+@dataclass
+class PushTarget:
+    provider: str = "aws"
+    region: Optional[str] = None
+    repo: Optional[str] = None
+    project: Optional[str] = None
+    artifact_repo: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        where = self.artifact_repo or self.repo or "?"
+        return f"{self.provider}:{self.region or '-'}:{where}"
+
+
+@dataclass
+class PushResult:
+    target: PushTarget
+    uri: Optional[str]
+    ok: bool
+    seconds: float
+    mode: str = "push"
+    error: Optional[str] = None
+
+
+def parse_targets(raw: List[Dict[str, Any]], defaults: Optional[Dict[str, Any]] = None) -> List[PushTarget]:
+    """
+    Build PushTargets from the `push.targets` config list, filling gaps from `defaults`
+    (the top-level push args: provider/region/repo/project/artifact_repo).
+    """
+    defaults = defaults or {}
+    targets = []
+    for i, entry in enumerate(raw):
+        if not isinstance(entry, dict):
+            raise ValueError(f"push target #{i} must be a mapping, got {type(entry).__name__}")
+        unknown = set(entry) - TARGET_KEYS
+        if unknown:
+            raise ValueError(f"push target #{i} has unknown keys: {', '.join(sorted(unknown))}")
+        merged = {k: entry.get(k) if entry.get(k) is not None else defaults.get(k) for k in TARGET_KEYS}
+        merged["provider"] = cfg.resolve_provider(merged)
+        targets.append(PushTarget(**merged))
+    return targets
+
+
+def resolve_target(target: PushTarget, image: str, tag: str) -> str:
+    """
+    Ensure the target repository exists, authenticate docker against its registry,
+    and return the full image URI to push to.
+    """
+    if target.provider == "aws":
+        from jobber.ecr_utils import ECRInfo, ecr_login, ensure_repo
+
+        session = retry.session(target.region)
+        if not session.region_name:
+            raise ValueError("AWS push target needs a region")
+        repo = target.repo or image
+        account_id = session.client("sts").get_caller_identity()["Account"]
+        info = ECRInfo(account_id=account_id, region=session.region_name, repo_name=repo, image_tag=tag)
+        ensure_repo(session.client("ecr"), repo, account_id=account_id)
+        ecr_login(info)
+        return info.image_uri
+
+    from jobber.gcp_artifact import ArtifactRef, configure_docker, ensure_repo
+
+    if not target.project or not target.artifact_repo or not target.region:
+        raise ValueError("GCP push target needs project, artifact_repo and region")
+    ref = ArtifactRef(
+        project=target.project,
+        region=target.region,
+        repo=target.artifact_repo,
+        image=target.repo or image,
+        tag=tag,
+    )
+    ensure_repo(target.project, target.region, target.artifact_repo)
+    configure_docker(target.region)
+    return ref.uri
+
+
+def copy_image(source_uri: str, target_uri: str) -> None:
+    """
+    Copy an image registry-to-registry without pulling layers through the local daemon.
+    """
+    run(["docker", "buildx", "imagetools", "create", "--tag", target_uri, source_uri])
+
+
+def push_to_targets(
+    local: DockerImage,
+    targets: List[PushTarget],
+    copy_from: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> List[PushResult]:
+    """
+    Push one local image to every target concurrently.
+
+    Repos are ensured and registries logged into in parallel, the local image is tagged
+    for all targets in a single step, then the pushes (or registry-to-registry copies
+    from `copy_from`) run in parallel. Failures are captured per target.
+    """
+    if not targets:
+        return []
+    workers = max_workers or len(targets)
+    mode = "copy" if copy_from else "push"
+    started = {id(t): time.time() for t in targets}
+
+    def _resolve(target: PushTarget) -> PushResult:
+        try:
+            uri = resolve_target(target, local.name, local.tag)
+        except Exception as e:  # report per target instead of aborting the fan-out
+            return PushResult(target=target, uri=None, ok=False, seconds=0.0, mode=mode, error=f"{type(e).__name__}: {e}")
+        return PushResult(target=target, uri=uri, ok=True, seconds=0.0, mode=mode)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_resolve, targets))
+
+    if not copy_from:
+        for res in results:
+            if res.ok:
+                tag_image(local, res.uri)
+
+    def _transfer(res: PushResult) -> PushResult:
+        if not res.ok:
+            res.seconds = time.time() - started[id(res.target)]
+            return res
+        try:
+            if copy_from:
+                copy_image(copy_from, res.uri)
+            else:
+                push_image(res.uri)
+        except subprocess.CalledProcessError as e:
+            exists_cache.forget_image_repo(res.uri)
+            res.ok = False
+            res.error = str(e)
+        res.seconds = time.time() - started[id(res.target)]
+        return res
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_transfer, results))
+
+
+def format_report(results: List[PushResult]) -> str:
+    lines = ["Push summary:"]
+    for res in results:
+        status = "ok" if res.ok else "FAILED"
+        line = f"  {status:<6} {res.target.label:<40} {res.uri or '-'} ({res.seconds:.1f}s, {res.mode})"
+        if res.error:
+            line += f": {res.error}"
+        lines.append(line)
+    ok = sum(1 for r in results if r.ok)
+    lines.append(f"{ok}/{len(results)} targets succeeded")
+    return "\n".join(lines)
@@ -0,0 +1,198 @@
+"""
+Suggest the cheapest instance configuration that meets a target wall time, from past
+runs of the same workload (see job_registry.workload_fingerprint) and a pricing table.
+"""
+
+import statistics
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from jobber import job_metrics, job_registry
+from jobber.job_registry import JobRecord
+
+
+# Approximate on-demand USD/hour for training (SageMaker us-east-1, Vertex AI us-central1).
+# Prices change and vary by region: override or extend with --pricing FILE.
+INSTANCE_PRICES: Dict[str, float] = {
+    "ml.m5.large": 0.115,
+    "ml.m5.xlarge": 0.23,
+    "ml.m5.2xlarge": 0.461,
+    "ml.m5.4xlarge": 0.922,
+    "ml.m5.12xlarge": 2.765,
+    "ml.c5.xlarge": 0.204,
+    "ml.c5.2xlarge": 0.408,
+    "ml.c5.4xlarge": 0.816,
+    "ml.g4dn.xlarge": 0.736,
+    "ml.g4dn.2xlarge": 0.94,
+    "ml.g4dn.12xlarge": 4.89,
+    "ml.g5.xlarge": 1.408,
+    "ml.g5.2xlarge": 1.515,
+    "ml.g5.4xlarge": 2.03,
+    "ml.g5.12xlarge": 7.09,
+    "ml.g5.48xlarge": 20.36,
+    "ml.p3.2xlarge": 3.825,
+    "ml.p3.8xlarge": 14.688,
+    "ml.p3.16xlarge": 28.152,
+    "ml.p4d.24xlarge": 37.688,
+    "n1-standard-4": 0.219,
+    "n1-standard-8": 0.437,
+    "n1-standard-16": 0.874,
+    "n1-highmem-8": 0.545,
+    "e2-standard-4": 0.154,
+    "a2-highgpu-1g": 0.846,
+}
+# Vertex AI bills accelerators per GPU on top of the machine type.
+ACCELERATOR_PRICES: Dict[str, float] = {
+    "NVIDIA_TESLA_T4": 0.403,
+    "NVIDIA_TESLA_P100": 1.679,
+    "NVIDIA_TESLA_V100": 2.852,
+    "NVIDIA_TESLA_A100": 2.934,
+}
+
+
+@dataclass
+class Pricing:
+    instances: Dict[str, float] = field(default_factory=lambda: dict(INSTANCE_PRICES))
+    accelerators: Dict[str, float] = field(default_factory=lambda: dict(ACCELERATOR_PRICES))
+
+    def hourly(self, instance_type: Optional[str], count: int = 1, accelerator_type: Optional[str] = None, accelerator_count: Optional[int] = None) -> Optional[float]:
+        base = self.instances.get(instance_type or "")
+        if base is None:
+            return None
+        if accelerator_type:
+            gpu = self.accelerators.get(accelerator_type)
+            if gpu is None:
+                return None
+            base += gpu * (accelerator_count or 1)
+        return base * (count or 1)
+
+
+def load_pricing(path: Optional[str] = None) -> Pricing:
+    """
+    Built-in table, overlaid with a YAML/JSON file of `instances:` and `accelerators:` maps.
+    """
+    pricing = Pricing()
+    if path:
+        # Not config.load_config: it normalizes keys, and instance names must stay as written.
+        data = yaml.safe_load(Path(path).read_text()) or {}
+        pricing.instances.update({k: float(v) for k, v in (data.get("instances") or {}).items()})
+        pricing.accelerators.update({k: float(v) for k, v in (data.get("accelerators") or {}).items()})
+    return pricing
+
+
+@dataclass
+class Option:
+    instance_type: str
+    instance_count: int
+    accelerator_type: Optional[str]
+    accelerator_count: Optional[int]
+    runs: int
+    seconds: float
+    hourly: Optional[float]
+    metrics: Dict[str, float]
+
+    @property
+    def label(self) -> str:
+        text = self.instance_type
+        if self.accelerator_type:
+            text += f" + {self.accelerator_count or 1}x {self.accelerator_type}"
+        if self.instance_count > 1:
+            text += f" x{self.instance_count}"
+        return text
+
+    @property
+    def cost(self) -> Optional[float]:
+        return None if self.hourly is None else self.hourly * self.seconds / 3600
+
+    def key(self) -> Tuple:
+        return (self.instance_type, self.instance_count, self.accelerator_type, self.accelerator_count)
+
+
+def options(history: List[JobRecord], pricing: Pricing) -> List[Option]:
+    """
+    One option per compute configuration seen in `history`, with the median wall time and
+    mean metrics over its runs. Sorted by cost (unpriced last).
+    """
+    groups: Dict[Tuple, List[JobRecord]] = {}
+    for job in history:
+        if job.duration_seconds is None or not job.instance_type:
+            continue
+        key = (job.instance_type, job.instance_count or 1, job.accelerator_type, job.accelerator_count)
+        groups.setdefault(key, []).append(job)
+    out = []
+    for (itype, count, accel, accel_count), runs in groups.items():
+        metric_names = {k for r in runs for k in r.metrics}
+        out.append(
+            Option(
+                instance_type=itype,
+                instance_count=count,
+                accelerator_type=accel,
+                accelerator_count=accel_count,
+                runs=len(runs),
+                seconds=statistics.median(r.duration_seconds for r in runs),
+                hourly=pricing.hourly(itype, count, accel, accel_count),
+                metrics={k: round(statistics.fmean(r.metrics[k] for r in runs if k in r.metrics), 2) for k in metric_names},
+            )
+        )
+    return sorted(out, key=lambda o: (o.cost is None, o.cost or 0, o.seconds))
+
+
+def recommend(opts: List[Option], target_seconds: Optional[float] = None) -> Optional[Option]:
+    """
+    Cheapest priced option whose median wall time meets the target; without a target the
+    cheapest overall; if none meets it, the fastest.
+    """
+    priced = [o for o in opts if o.cost is not None]
+    meeting = [o for o in priced if target_seconds is None or o.seconds <= target_seconds]
+    if meeting:
+        return min(meeting, key=lambda o: (o.cost, o.seconds))
+    return min(opts, key=lambda o: o.seconds) if opts else None
+
+
+def workload_options(workload: str, pricing: Pricing, conn=None) -> List[Option]:
+    """
+    Refresh open runs of the workload, fetch metrics for finished ones (once), and build
+    the options.
+    """
+    conn = conn or job_registry.connect()
+    runs = job_registry.list_jobs(workload=workload, limit=None, conn=conn)
+    open_runs = [j.job_name for j in runs if not j.terminal]
+    if open_runs:
+        job_registry.refresh(conn, job_names=open_runs)
+    history = job_metrics.ensure_metrics(job_registry.history(workload, conn=conn), conn=conn)
+    return options(history, pricing)
+
+
+def _duration(seconds: float) -> str:
+    minutes = int(round(seconds / 60))
+    return f"{minutes // 60}h{minutes % 60:02d}m" if minutes >= 60 else f"{minutes}m"
+
+
+def format_recommendation(opts: List[Option], best: Optional[Option], target_seconds: Optional[float] = None, current: Optional[Tuple] = None) -> str:
+    if not opts:
+        return "Recommendation: no finished runs of this workload yet; submit once to get a baseline."
+    target = f", target {_duration(target_seconds)}" if target_seconds else ""
+    lines = [f"Recommendation ({sum(o.runs for o in opts)} past runs{target}):"]
+    lines.append(f"  {'CONFIG':<40} {'RUNS':>4} {'MEDIAN':>7} {'$/HR':>7} {'$/RUN':>7} {'GPU%':>5} {'CPU%':>5} {'IMG/S':>7}")
+    for o in opts:
+        mark = "*" if current and o.key() == current else " "
+        hourly = f"{o.hourly:.2f}" if o.hourly is not None else "?"
+        cost = f"{o.cost:.2f}" if o.cost is not None else "?"
+        gpu, cpu, ips = (o.metrics.get(k) for k in ("gpu_util", "cpu_util", "images_per_sec"))
+        fmt = lambda v: "-" if v is None else f"{v:g}"
+        lines.append(
+            f"{mark} {o.label:<40} {o.runs:>4} {_duration(o.seconds):>7} {hourly:>7} {cost:>7} {fmt(gpu):>5} {fmt(cpu):>5} {fmt(ips):>7}"
+        )
+    if best.cost is None:
+        lines.append(f"  -> no priced configuration (add prices with --pricing); fastest is {best.label}")
+    elif target_seconds is None or best.seconds <= target_seconds:
+        why = f"cheapest within {_duration(target_seconds)}" if target_seconds else "cheapest"
+        lines.append(f"  -> {best.label}: {why} (median {_duration(best.seconds)}, ~${best.cost:.2f} per run)")
+    else:
+        lines.append(f"  -> no run met the target; fastest is {best.label} (median {_duration(best.seconds)})")
+    if current and all(o.key() != current for o in opts):
+        lines.append("  (the requested configuration has no finished runs yet)")
+    return "\n".join(lines)
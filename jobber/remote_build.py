@@ -0,0 +1,232 @@
+"""
+Remote image builds for jobber: AWS CodeBuild or GCP Cloud Build.
+
+Only the filtered, content-hashed build context leaves the machine; the image is built
+in-region and pushed straight to ECR / Artifact Registry.
+"""
+
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+from jobber import build_context
+from jobber import exists_cache
+from jobber import retry
+
+
+CODEBUILD_TERMINAL = {"SUCCEEDED", "FAILED", "FAULT", "STOPPED", "TIMED_OUT"}
+
+BUILDSPEC = """\
+version: 0.2
+env:
+  variables:
+    DOCKER_BUILDKIT: "1"
+phases:
+  pre_build:
+    commands:
+      - aws ecr get-login-password --region "$AWS_DEFAULT_REGION" | docker login --username AWS --password-stdin "$REGISTRY"
+  build:
+    commands:
+      - docker build -t "$IMAGE_URI" -f "$DOCKERFILE" .
+  post_build:
+    commands:
+      - docker push "$IMAGE_URI"
+"""
+
+
+@dataclass
+class StagedContext:
+    uri: str
+    sha256: str
+    size: int
+    uploaded: bool
+
+
+def split_uri(uri: str) -> tuple[str, str, str]:
+    """
+    Split s3://bucket/prefix or gs://bucket/prefix into (scheme, bucket, prefix).
+    """
+    if not (uri.startswith("s3://") or uri.startswith("gs://")):
+        raise ValueError(f"Staging URI must start with s3:// or gs://: {uri}")
+    scheme = uri[:2]
+    parts = uri[5:].split("/", 1)
+    if not parts[0]:
+        raise ValueError(f"Staging URI has no bucket: {uri}")
+    return scheme, parts[0], parts[1].strip("/") if len(parts) > 1 else ""
+
+
+def stage_context(context: str, dockerfile: Optional[str], staging_uri: str, boto_session=None) -> StagedContext:
+    """
+    Archive the context and upload it under <staging>/context/<sha256>.zip (CodeBuild
+    only accepts zip objects as S3 sources) or .tar.gz (Cloud Build), skipping the upload
+    when an identical archive is already there.
+    """
+    scheme, bucket, prefix = split_uri(staging_uri)
+    fmt = "zip" if scheme == "s3" else "tar.gz"
+    archive = build_context.archive_context(context, dockerfile, fmt=fmt)
+    key = f"{prefix}/context/{archive.sha256}.{fmt}".lstrip("/")
+    print(f"Context: {archive.files} files, {archive.size / 1e6:.1f} MB compressed (sha256 {archive.sha256[:12]})")
+    try:
+        if scheme == "s3":
+            uploaded = _upload_s3(boto_session, bucket, key, archive.path)
+        else:
+            uploaded = _upload_gcs(bucket, key, archive.path)
+    finally:
+        archive.path.unlink(missing_ok=True)
+    uri = f"{scheme}://{bucket}/{key}"
+    print(f"{'Uploaded' if uploaded else 'Reusing'} context {uri}")
+    return StagedContext(uri=uri, sha256=archive.sha256, size=archive.size, uploaded=uploaded)
+
+
+def _upload_s3(boto_session, bucket: str, key: str, path: Path) -> bool:
+    from botocore.exceptions import ClientError
+
+    s3 = boto_session.client("s3")
+    try:
+        s3.head_object(Bucket=bucket, Key=key)
+        return False
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") not in {"404", "NoSuchKey", "NotFound"}:
+            raise
+    s3.upload_file(str(path), bucket, key)
+    return True
+
+
+def _upload_gcs(bucket: str, key: str, path: Path) -> bool:
+    from jobber import gcp_storage
+
+    return gcp_storage.upload_file(bucket, key, path, skip_existing=True)
+
+
+def codebuild_build(
+    boto_session,
+    project_name: str,
+    staged: StagedContext,
+    image_uri: str,
+    dockerfile: str = "Dockerfile",
+    poll: int = 10,
+) -> str:
+    """
+    Run a CodeBuild build of the staged context and push to ECR. Returns the build id.
+    """
+    from jobber.ecr_utils import ensure_repo
+
+    _, bucket, key = split_uri(staged.uri)
+    registry, _, repo_tag = image_uri.partition("/")
+    ensure_repo(boto_session.client("ecr"), repo_tag.rsplit(":", 1)[0], account_id=registry.split(".", 1)[0])
+    client = boto_session.client("codebuild")
+    resp = client.start_build(
+        projectName=project_name,
+        sourceTypeOverride="S3",
+        sourceLocationOverride=f"{bucket}/{key}",
+        buildspecOverride=BUILDSPEC,
+        privilegedModeOverride=True,
+        environmentVariablesOverride=[
+            {"name": "IMAGE_URI", "value": image_uri, "type": "PLAINTEXT"},
+            {"name": "REGISTRY", "value": registry, "type": "PLAINTEXT"},
+            {"name": "DOCKERFILE", "value": dockerfile, "type": "PLAINTEXT"},
+        ],
+    )
+    build_id = resp["build"]["id"]
+    print(f"Started CodeBuild build {build_id}")
+    try:
+        _wait_for_codebuild(client, build_id, poll=poll)
+    except RuntimeError:
+        exists_cache.forget_image_repo(image_uri)
+        raise
+    return build_id
+
+
+def _wait_for_codebuild(client, build_id: str, poll: int = 10) -> None:
+    start = time.time()
+    last = None
+    while True:
+        build = client.batch_get_builds(ids=[build_id])["builds"][0]
+        status = build["buildStatus"]
+        phase = build.get("currentPhase")
+        if (status, phase) != last:
+            elapsed = int(time.time() - start)
+            print(f"[{elapsed:>4}s] status={status} phase={phase}")
+            last = (status, phase)
+        if status in CODEBUILD_TERMINAL:
+            if status != "SUCCEEDED":
+                logs = build.get("logs", {}).get("deepLink")
+                raise RuntimeError(f"CodeBuild build {build_id} ended with {status}" + (f"; logs: {logs}" if logs else ""))
+            return
+        time.sleep(poll)
+
+
+def cloud_build(project: str, region: str, staged: StagedContext, image_uri: str, dockerfile: str = "Dockerfile") -> None:
+    """
+    Run a Cloud Build build of the staged context and push to Artifact Registry.
+    """
+    from jobber.gcp_artifact import ensure_repo
+
+    parts = image_uri.split("/")
+    if len(parts) >= 4 and parts[0].endswith("-docker.pkg.dev"):
+        ensure_repo(parts[1], parts[0][: -len("-docker.pkg.dev")], parts[2])
+    build_config = {
+        "steps": [
+            {
+                "name": "gcr.io/cloud-builders/docker",
+                "env": ["DOCKER_BUILDKIT=1"],
+                "args": ["build", "-t", image_uri, "-f", dockerfile, "."],
+            }
+        ],
+        "images": [image_uri],
+    }
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", prefix="jobber-cloudbuild-", delete=False) as fh:
+        yaml.safe_dump(build_config, fh, sort_keys=False)
+        config_path = fh.name
+    try:
+        cmd = [
+            "gcloud",
+            "builds",
+            "submit",
+            staged.uri,
+            f"--config={config_path}",
+            f"--project={project}",
+            f"--region={region}",
+        ]
+        print(f"+ {' '.join(cmd)}")
+        subprocess.run(cmd, check=True)
+    except subprocess.CalledProcessError:
+        exists_cache.forget_image_repo(image_uri)
+        raise
+    finally:
+        Path(config_path).unlink(missing_ok=True)
+
+
+def remote_build(
+    context: str,
+    dockerfile: Optional[str],
+    image_uri: str,
+    staging_uri: str,
+    region: Optional[str] = None,
+    project: Optional[str] = None,
+    codebuild_project: Optional[str] = None,
+) -> str:
+    """
+    Stage the context and build/push remotely. The backend follows the staging URI:
+    s3:// uses CodeBuild, gs:// uses Cloud Build. Returns the pushed image URI.
+    """
+    scheme, _, _ = split_uri(staging_uri)
+    df_rel = build_context.dockerfile_in_archive(context, dockerfile)
+    if scheme == "s3":
+        if not codebuild_project:
+            raise ValueError("Remote builds on AWS need a CodeBuild project (--codebuild-project)")
+        session = retry.session(region)
+        staged = stage_context(context, dockerfile, staging_uri, boto_session=session)
+        codebuild_build(session, codebuild_project, staged, image_uri, dockerfile=df_rel)
+        return image_uri
+
+    if not project or not region:
+        raise ValueError("Remote builds on GCP need --project and --region")
+    staged = stage_context(context, dockerfile, staging_uri)
+    cloud_build(project, region, staged, image_uri, dockerfile=df_rel)
+    return image_uri
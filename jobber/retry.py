@@ -0,0 +1,306 @@
+"""
+Client-side rate limiting and throttling retries shared by every cloud API call in the
+process.
+
+Each service gets one adaptive token bucket: throttling responses halve its rate and
+successes grow it back, so concurrent sweeps and watchers converge under the API limit
+instead of failing. boto3 sessions from `session()` apply the bucket to every request
+(including paginator pages) and retry throttling responses with the same backoff; Google
+clients are wrapped with `wrap()`.
+"""
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Optional
+
+
+@dataclass(frozen=True)
+class Policy:
+    rate: float = 10.0  # requests per second when not throttled
+    burst: int = 20
+    max_attempts: int = 8
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+
+DEFAULT_POLICY = Policy()
+# Keyed by botocore service id (hyphenated) or Google API short name.
+DEFAULT_POLICIES: Dict[str, Policy] = {
+    "cloudwatch-logs": Policy(rate=5.0, burst=10),
+    "cloudwatch": Policy(rate=5.0, burst=10),
+    "sagemaker": Policy(rate=5.0, burst=10),
+    "service-quotas": Policy(rate=2.0, burst=5),
+    "aiplatform": Policy(rate=5.0, burst=10),
+    "logging": Policy(rate=2.0, burst=5),
+}
+THROTTLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "ProvisionedThroughputExceededException",
+    "SlowDown",
+    "BandwidthLimitExceeded",
+    "PriorRequestNotComplete",
+}
+# google.api_core exception classes for 429 / 503.
+GOOGLE_THROTTLE_ERRORS = {"TooManyRequests", "ResourceExhausted", "ServiceUnavailable"}
+# The subset refused before the request was processed (429). A 503 may arrive after the
+# server acted, so calls that are not safe to repeat retry only these.
+GOOGLE_REJECTED_ERRORS = {"TooManyRequests", "ResourceExhausted"}
+# Wrapped client methods that create something: repeating one after a 503 can create a
+# second job or resource.
+NON_IDEMPOTENT_PREFIXES = ("create_",)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with additive-increase / multiplicative-decrease rate.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.max_rate = rate
+        self.min_rate = max(rate / 32, 0.05)
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self._sleep(wait)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+_lock = threading.Lock()
+_buckets: Dict[str, TokenBucket] = {}
+
+
+def _env_overrides() -> Dict[str, Policy]:
+    """
+    JOBBER_API_LIMITS="cloudwatch-logs=3/6,aiplatform=1" sets rate[/burst] per service;
+    JOBBER_API_MAX_ATTEMPTS applies to all. Malformed entries, and rates or bursts the
+    bucket cannot work with (rate <= 0, burst < 1), are ignored.
+    """
+    out: Dict[str, Policy] = {}
+    for item in filter(None, (os.environ.get("JOBBER_API_LIMITS") or "").split(",")):
+        name, _, value = item.partition("=")
+        rate, _, burst = value.partition("/")
+        try:
+            per_second = float(rate)
+            size = int(burst) if burst else max(1, int(per_second * 2))
+        except ValueError:
+            continue
+        if not per_second > 0 or size < 1:
+            continue
+        base = DEFAULT_POLICIES.get(name.strip(), DEFAULT_POLICY)
+        out[name.strip()] = replace(base, rate=per_second, burst=size)
+    return out
+
+
+def policy_for(service: str) -> Policy:
+    policy = _env_overrides().get(service) or DEFAULT_POLICIES.get(service, DEFAULT_POLICY)
+    attempts = os.environ.get("JOBBER_API_MAX_ATTEMPTS")
+    if attempts and attempts.isdigit():
+        policy = replace(policy, max_attempts=max(1, int(attempts)))
+    return policy
+
+
+def bucket(service: str) -> TokenBucket:
+    """
+    The process-wide bucket for a service, shared by all threads and clients.
+    """
+    with _lock:
+        if service not in _buckets:
+            policy = policy_for(service)
+            _buckets[service] = TokenBucket(policy.rate, policy.burst)
+        return _buckets[service]
+
+
+def reset() -> None:
+    with _lock:
+        _buckets.clear()
+
+
+def is_throttle(error: BaseException, idempotent: bool = True) -> bool:
+    """
+    True for throttling errors worth retrying. With `idempotent=False`, only errors that
+    mean the request was rejected unprocessed (429) count.
+    """
+    code = (getattr(error, "response", None) or {}).get("Error", {}).get("Code")
+    if code in THROTTLE_CODES:
+        return True
+    names = GOOGLE_THROTTLE_ERRORS if idempotent else GOOGLE_REJECTED_ERRORS
+    return type(error).__name__ in names or getattr(error, "code", None) == 429
+
+
+def backoff(attempt: int, policy: Policy) -> float:
+    """
+    Full-jitter exponential backoff for the given (1-based) attempt.
+    """
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** (attempt - 1)))
+
+
+def call(service: str, fn: Callable[..., Any], *args: Any, idempotent: bool = True, **kwargs: Any) -> Any:
+    """
+    Call `fn` under the service's rate limit, retrying throttling errors with backoff.
+    Pass `idempotent=False` for calls that must not be repeated after a 503.
+    """
+    policy = policy_for(service)
+    limiter = bucket(service)
+    attempt = 1
+    while True:
+        limiter.acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if not is_throttle(e, idempotent) or attempt >= policy.max_attempts:
+                raise
+            limiter.on_throttle()
+            time.sleep(backoff(attempt, policy))
+            attempt += 1
+            continue
+        limiter.on_success()
+        return result
+
+
+class RateLimitedClient:
+    """
+    Proxy that routes every method call of an API client through `call()`. Methods named
+    like NON_IDEMPOTENT_PREFIXES are retried on 429 only.
+    """
+
+    def __init__(self, client: Any, service: str):
+        self._client = client
+        self._service = service
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        idempotent = not name.startswith(NON_IDEMPOTENT_PREFIXES)
+
+        def limited(*args: Any, **kwargs: Any) -> Any:
+            return call(self._service, attr, *args, idempotent=idempotent, **kwargs)
+
+        return limited
+
+
+def wrap(client: Any, service: str) -> Any:
+    return RateLimitedClient(client, service)
+
+
+def _service_of(event_name: str) -> str:
+    # e.g. "before-send.cloudwatch-logs.GetLogEvents"
+    parts = event_name.split(".")
+    return parts[1] if len(parts) > 1 else "default"
+
+
+def _before_send(event_name: str = "", **kwargs: Any) -> None:
+    bucket(_service_of(event_name)).acquire()
+    return None
+
+
+def _is_throttle_response(parsed: Optional[dict], status: Optional[int]) -> bool:
+    return (parsed or {}).get("Error", {}).get("Code") in THROTTLE_CODES or status == 429
+
+
+def _observe(event_name: str = "", parsed_response: Optional[dict] = None, response_dict: Optional[dict] = None, **kwargs: Any) -> None:
+    # Fires once per HTTP attempt, including the ones botocore retries itself.
+    if response_dict is None:
+        return
+    limiter = bucket(_service_of(event_name))
+    status = response_dict.get("status_code")
+    if _is_throttle_response(parsed_response, status):
+        limiter.on_throttle()
+    elif status is not None and status < 400:
+        limiter.on_success()
+
+
+def _retry_throttle(event_name: str = "", response: Optional[tuple] = None, attempts: int = 1, **kwargs: Any) -> Optional[float]:
+    """
+    needs-retry hook, reached once botocore's own handler declines: keep retrying
+    throttling responses with backoff up to the policy's max_attempts.
+    """
+    if response is None:
+        return None
+    http, parsed = response
+    policy = policy_for(_service_of(event_name))
+    if _is_throttle_response(parsed, getattr(http, "status_code", None)) and attempts < policy.max_attempts:
+        return backoff(attempts, policy)
+    return None
+
+
+def instrument(boto_session):
+    """
+    Apply the shared buckets and throttling retries to every client the session creates.
+    """
+    events = getattr(boto_session, "events", None)
+    if events is not None:
+        events.register("before-send", _before_send, unique_id="jobber-rate-limit")
+        events.register("response-received", _observe, unique_id="jobber-rate-observe")
+        events.register("needs-retry", _retry_throttle, unique_id="jobber-throttle-retry")
+    return boto_session
+
+
+_shared: Dict[str, Any] = {}
+
+
+def share(loader: Any = None, credentials: Any = None) -> None:
+    """
+    Have session() reuse a botocore loader (parsed service models) and resolved
+    credentials; the daemon sets these once so its workers skip both. No arguments
+    clears them.
+    """
+    _shared.clear()
+    if loader is not None:
+        _shared["loader"] = loader
+        _shared["credentials"] = credentials
+
+
+def session(region: Optional[str] = None):
+    import boto3
+
+    if not _shared:
+        return instrument(boto3.Session(region_name=region) if region else boto3.Session())
+    import botocore.session
+    from botocore.credentials import CredentialProvider, CredentialResolver
+
+    core = botocore.session.get_session()
+    core.register_component("data_loader", _shared["loader"])
+    credentials = _shared["credentials"]
+    if credentials is not None:
+        provider = type("SharedCredentials", (CredentialProvider,), {"METHOD": "jobber-shared", "load": lambda self: credentials})()
+        core.register_component("credential_provider", CredentialResolver([provider]))
+    return instrument(boto3.Session(botocore_session=core, region_name=region) if region else boto3.Session(botocore_session=core))
@@ -6,36 +6,101 @@ import subprocess
 from pathlib import Path
 from typing import Optional
 
+from jobber import exists_cache, retry
 
-def sync_local_to_s3(src: Path, dest_s3: str, region: Optional[str] = None) -> None:
+
+def session(region: Optional[str] = None):
+    return retry.session(region)
+
+
+def sync_command(src: Path, dest_s3: str, region: Optional[str] = None) -> list[str]:
     cmd = ["aws", "s3", "sync", str(src), dest_s3]
     if region:
         cmd += ["--region", region]
-    run(cmd)
+    return cmd
 
 
-def ensure_bucket(bucket: str, region: Optional[str] = None) -> None:
-    cmd = ["aws", "s3api", "head-bucket", "--bucket", bucket]
-    if region:
-        cmd += ["--region", region]
+def sync_local_to_s3(src: Path, dest_s3: str, region: Optional[str] = None) -> None:
+    run(sync_command(src, dest_s3, region))
+
+
+def ensure_bucket(bucket: str, region: Optional[str] = None, boto_session=None) -> None:
+    """
+    Create the bucket if it does not exist (in the session's region). A recent
+    confirmation from the exists cache skips the head_bucket call.
+    """
+    from botocore.exceptions import ClientError
+
+    boto_session = boto_session or session(region)
+    scope = exists_cache.aws_scope(boto_session)
+    if scope and exists_cache.fresh("s3-bucket", scope, bucket):
+        return
+    s3 = boto_session.client("s3")
     try:
-        run(cmd)
-    except subprocess.CalledProcessError:
-        # Try to create the bucket
-        cmd = ["aws", "s3api", "create-bucket", "--bucket", bucket]
-        if region and region != "us-east-1":
-            cmd += ["--create-bucket-configuration", f"LocationConstraint={region}"]
-        if region:
-            cmd += ["--region", region]
-        run(cmd)
-
-
-def upload_placeholder(bucket: str, prefix: str, region: Optional[str] = None) -> None:
+        s3.head_bucket(Bucket=bucket)
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code")
+        if code not in {"404", "NoSuchBucket", "NotFound"}:
+            raise
+        params = {"Bucket": bucket}
+        region_name = s3.meta.region_name
+        if region_name and region_name != "us-east-1":
+            params["CreateBucketConfiguration"] = {"LocationConstraint": region_name}
+        print(f"Creating s3://{bucket}")
+        s3.create_bucket(**params)
+    if scope:
+        exists_cache.remember("s3-bucket", scope, bucket)
+
+
+def upload_placeholder(bucket: str, prefix: str, region: Optional[str] = None, boto_session=None) -> None:
     key = f"{prefix.rstrip('/')}/data/placeholder.txt"
-    cmd = ["aws", "s3", "cp", "-", f"s3://{bucket}/{key}", "--quiet"]
-    if region:
-        cmd += ["--region", region]
-    run(cmd, input=b"placeholder")
+    boto_session = boto_session or session(region)
+    boto_session.client("s3").put_object(Bucket=bucket, Key=key, Body=b"placeholder")
+
+
+def upload_bytes(bucket: str, key: str, body: bytes, boto_session, skip_existing: bool = False) -> bool:
+    """
+    Put `body` at s3://bucket/key. With `skip_existing`, leave an existing object alone
+    (for content-addressed keys). Returns True if the object was written.
+    """
+    from botocore.exceptions import ClientError
+
+    s3 = boto_session.client("s3")
+    if skip_existing:
+        try:
+            s3.head_object(Bucket=bucket, Key=key)
+            return False
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in {"404", "NoSuchKey", "NotFound"}:
+                raise
+    s3.put_object(Bucket=bucket, Key=key, Body=body)
+    return True
+
+
+def ensure_data(bucket: str, prefix: str, region: Optional[str] = None, boto_session=None) -> None:
+    """
+    Upload prefix/data/placeholder.txt if the data prefix is empty.
+    """
+    boto_session = boto_session or session(region)
+    scope = exists_cache.aws_scope(boto_session)
+    key_prefix = f"{prefix.rstrip('/')}/data/"
+    if scope and exists_cache.fresh("s3-data", scope, f"{bucket}/{key_prefix}"):
+        return
+    resp = boto_session.client("s3").list_objects_v2(Bucket=bucket, Prefix=key_prefix, MaxKeys=1)
+    if resp.get("KeyCount", 0) == 0:
+        upload_placeholder(bucket, prefix, boto_session=boto_session)
+    if scope:
+        exists_cache.remember("s3-data", scope, f"{bucket}/{key_prefix}")
+
+
+def forget(bucket: str, prefix: str, boto_session) -> None:
+    """
+    Drop cached bucket/data-prefix confirmations (after a failure that points at them).
+    """
+    scope = exists_cache.aws_scope(boto_session)
+    if scope:
+        exists_cache.forget("s3-bucket", scope, bucket)
+        exists_cache.forget("s3-data", scope, f"{bucket}/{prefix.rstrip('/')}/data/")
 
 
 def run(cmd: list[str], input: bytes | None = None) -> None:
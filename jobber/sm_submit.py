@@ -2,8 +2,9 @@
 Minimal SageMaker submit helper for jobber (custom image).
 """
 
+import sys
 import time
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Optional
 import warnings
 
 # Suppress upstream DeprecationWarning until sagemaker exposes a stable non-shim import.
@@ -13,7 +14,6 @@ warnings.filterwarnings(
     category=DeprecationWarning,
 )
 
-import boto3
 from botocore.exceptions import ClientError
 from sagemaker.core.helper.session_helper import Session
 from sagemaker.core.training.configs import (
@@ -22,8 +22,17 @@ from sagemaker.core.training.configs import (
     OutputDataConfig,
     SourceCode,
 )
-from sagemaker.core.shapes.shapes import StoppingCondition
+from sagemaker.core.shapes.shapes import StoppingCondition, Tag
 from sagemaker.train import ModelTrainer
+from sagemaker.train.constants import DEFAULT_CONTAINER_ARGUMENTS, DEFAULT_CONTAINER_ENTRYPOINT, SM_CODE, SM_DRIVERS
+from sagemaker.train.defaults import TrainDefaults
+
+from jobber import hyperparams, log_archive, retry, s3_utils
+
+# Failure messages that mean a cached bucket/data-prefix confirmation no longer holds.
+STALE_MARKERS = ("NoSuchBucket", "bucket does not exist", "No S3 objects found", "AccessDenied")
+# Where SageMaker mounts the spilled hyperparameters file.
+CONFIG_PATH = f"/opt/ml/input/data/{hyperparams.CONFIG_CHANNEL}/{hyperparams.CONFIG_FILE}"
 
 
 def submit_job(
@@ -34,7 +43,7 @@ def submit_job(
     region: Optional[str],
     entry_point: Optional[str],
     source_dir: str,
-    hyperparameters: Dict[str, str],
+    hyperparameters: Dict[str, Any],
     instance_type: str,
     instance_count: int = 1,
     job_name: Optional[str] = None,
@@ -42,22 +51,30 @@ def submit_job(
     ensure_data: bool = False,
     use_spot: bool = False,
     max_wait_seconds: Optional[int] = None,
+    on_created: Optional[Callable[[str], None]] = None,
+    wait: bool = True,
+    tags: Optional[Dict[str, str]] = None,
 ) -> str:
-    boto_session = boto3.Session(region_name=region) if region else boto3.Session()
+    """
+    Create the training job and (unless `wait=False`) wait for it. `on_created` is called
+    with the job name as soon as SageMaker accepts it (before waiting). Hyperparameters too
+    large to pass inline are uploaded under the prefix and mounted as the jobber-config channel.
+    """
+    boto_session = retry.session(region)
     session = Session(boto_session=boto_session)
     _ensure_bucket_exists(boto_session, bucket)
     if ensure_data:
         _ensure_placeholder_data(boto_session, bucket, prefix)
 
+    encoded = hyperparams.encode(hyperparameters or {})
+    inputs = [InputData(channel_name="train", data_source=f"s3://{bucket}/{prefix}/data")]
+    if encoded.spilled:
+        if s3_utils.upload_bytes(bucket, encoded.config_key(prefix), encoded.document, boto_session, skip_existing=True):
+            print(f"Uploaded {len(encoded.spilled)} hyperparameters to s3://{bucket}/{encoded.config_key(prefix)}")
+        inputs.append(InputData(channel_name=hyperparams.CONFIG_CHANNEL, data_source=f"s3://{bucket}/{encoded.config_prefix(prefix)}/"))
+
     source_code = SourceCode(source_dir=source_dir, entry_script=entry_point) if source_dir else None
-    stopping = None
-    if max_wait_seconds is not None:
-        if use_spot:
-            stopping = StoppingCondition(
-                max_runtime_in_seconds=max_wait_seconds, max_wait_time_in_seconds=max_wait_seconds
-            )
-        else:
-            stopping = StoppingCondition(max_runtime_in_seconds=max_wait_seconds)
+    stopping = _stopping_condition(use_spot, max_wait_seconds)
 
     trainer = ModelTrainer(
         sagemaker_session=session,
@@ -72,59 +89,181 @@ def submit_job(
         stopping_condition=stopping,
         output_data_config=OutputDataConfig(s3_output_path=f"s3://{bucket}/{prefix}/outputs"),
         base_job_name=job_name or "jobber",
-        hyperparameters=hyperparameters or {},
+        hyperparameters=encoded.with_config_path(CONFIG_PATH),
+        tags=[Tag(key=k, value=v) for k, v in tags.items()] if tags else None,
     )
 
-    train_input = InputData(channel_name="train", data_source=f"s3://{bucket}/{prefix}/data")
-    if tail_logs:
-        trainer.train(input_data_config=[train_input], wait=False, logs=False)
+    try:
+        trainer.train(input_data_config=inputs, wait=False, logs=False)
         job_name = trainer._latest_training_job.training_job_name
-        _stream_training_logs(job_name, boto_session, poll=5)
-    else:
-        trainer.train(input_data_config=[train_input], wait=True, logs=False)
+        if on_created:
+            on_created(job_name)
+        if tail_logs:
+            _stream_training_logs(job_name, boto_session, poll=5)
+        elif wait:
+            trainer._latest_training_job.wait(logs=False)
+    except Exception as e:
+        _forget_if_stale(boto_session, bucket, prefix, e)
+        raise
     return trainer._latest_training_job.training_job_name
 
 
-def _ensure_bucket_exists(boto_session, bucket: str) -> None:
-    s3 = boto_session.client("s3")
-    try:
-        s3.head_bucket(Bucket=bucket)
+def attach_job(job_name: str, region: Optional[str] = None, tail_logs: bool = False) -> None:
+    """
+    Wait for an existing training job (streaming its logs with `tail_logs`); raise if it fails.
+    """
+    boto_session = retry.session(region)
+    if tail_logs:
+        _stream_training_logs(job_name, boto_session, poll=5)
         return
-    except ClientError as e:
-        code = e.response.get("Error", {}).get("Code")
-        if code not in {"404", "NoSuchBucket", "NotFound"}:
-            raise
-    params = {"Bucket": bucket}
-    region_name = s3.meta.region_name
-    if region_name and region_name != "us-east-1":
-        params["CreateBucketConfiguration"] = {"LocationConstraint": region_name}
-    s3.create_bucket(**params)
+    sm = boto_session.client("sagemaker")
+    sm.get_waiter("training_job_completed_or_stopped").wait(TrainingJobName=job_name, WaiterConfig={"Delay": 30, "MaxAttempts": 2880})
+    status = sm.describe_training_job(TrainingJobName=job_name)["TrainingJobStatus"]
+    if status != "Completed":
+        raise RuntimeError(f"Training job {job_name} ended with status {status}")
+
+
+def _stopping_condition(use_spot: bool, max_wait_seconds: Optional[int]) -> Optional[StoppingCondition]:
+    if max_wait_seconds is None:
+        return None
+    if use_spot:
+        return StoppingCondition(max_runtime_in_seconds=max_wait_seconds, max_wait_time_in_seconds=max_wait_seconds)
+    return StoppingCondition(max_runtime_in_seconds=max_wait_seconds)
+
+
+def build_training_request(
+    image_uri: str,
+    role_arn: str,
+    bucket: str,
+    prefix: str,
+    entry_point: Optional[str],
+    source_dir: Optional[str],
+    hyperparameters: Dict[str, Any],
+    instance_type: str,
+    instance_count: int = 1,
+    job_name: Optional[str] = None,
+    use_spot: bool = False,
+    max_wait_seconds: Optional[int] = None,
+    tags: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    The CreateTrainingJob request (boto3 shape) that submit_job would send, built without
+    touching AWS. The code/driver channels are staged by the SageMaker SDK at submit time,
+    so their S3 URIs are shown as placeholders; the job name gets its timestamp then too.
+    """
+    stopping = TrainDefaults.get_stopping_condition(stopping_condition=_stopping_condition(use_spot, max_wait_seconds))
+    base = job_name or "jobber"
+    channels = [_s3_channel("train", f"s3://{bucket}/{prefix}/data")]
+    encoded = hyperparams.encode(hyperparameters or {})
+    if encoded.spilled:
+        channels.append(_s3_channel(hyperparams.CONFIG_CHANNEL, f"s3://{bucket}/{encoded.config_prefix(prefix)}/"))
+    algorithm: Dict[str, Any] = {"TrainingImage": image_uri, "TrainingInputMode": "File"}
+    if source_dir:
+        staged = f"<staged by the SageMaker SDK under {base}/<job-name>/input>"
+        channels += [_s3_channel(SM_CODE, staged), _s3_channel(SM_DRIVERS, staged)]
+        algorithm["ContainerEntrypoint"] = list(DEFAULT_CONTAINER_ENTRYPOINT)
+        algorithm["ContainerArguments"] = list(DEFAULT_CONTAINER_ARGUMENTS)
+    condition: Dict[str, Any] = {"MaxRuntimeInSeconds": stopping.max_runtime_in_seconds}
+    if use_spot and stopping.max_wait_time_in_seconds:
+        condition["MaxWaitTimeInSeconds"] = stopping.max_wait_time_in_seconds
+    request = {
+        "TrainingJobName": f"{base}-<timestamp>",
+        "AlgorithmSpecification": algorithm,
+        "HyperParameters": encoded.with_config_path(CONFIG_PATH),
+        "InputDataConfig": channels,
+        "OutputDataConfig": {"S3OutputPath": f"s3://{bucket}/{prefix}/outputs"},
+        "ResourceConfig": {
+            "InstanceType": instance_type,
+            "InstanceCount": instance_count,
+            "VolumeSizeInGB": Compute(instance_type=instance_type).volume_size_in_gb,
+        },
+        "RoleArn": role_arn,
+        "StoppingCondition": condition,
+        "EnableManagedSpotTraining": use_spot,
+    }
+    if tags:
+        request["Tags"] = [{"Key": k, "Value": v} for k, v in tags.items()]
+    return request
+
+
+def _s3_channel(name: str, uri: str) -> Dict[str, Any]:
+    return {
+        "ChannelName": name,
+        "DataSource": {"S3DataSource": {"S3DataType": "S3Prefix", "S3Uri": uri, "S3DataDistributionType": "FullyReplicated"}},
+        "InputMode": "File",
+    }
+
+
+def _ensure_bucket_exists(boto_session, bucket: str) -> None:
+    s3_utils.ensure_bucket(bucket, boto_session=boto_session)
 
 
 def _ensure_placeholder_data(boto_session, bucket: str, prefix: str) -> None:
-    s3 = boto_session.client("s3")
-    key_prefix = f"{prefix.rstrip('/')}/data/"
-    resp = s3.list_objects_v2(Bucket=bucket, Prefix=key_prefix, MaxKeys=1)
-    if resp.get("KeyCount", 0) == 0:
-        dummy_key = key_prefix + "placeholder.txt"
-        s3.put_object(Bucket=bucket, Key=dummy_key, Body=b"placeholder")
+    s3_utils.ensure_data(bucket, prefix, boto_session=boto_session)
+
+
+def _forget_if_stale(boto_session, bucket: str, prefix: str, error: Exception) -> None:
+    """
+    Drop cached bucket/data confirmations when a submit failure points at them.
+    """
+    message = str(error)
+    if any(marker in message for marker in STALE_MARKERS):
+        s3_utils.forget(bucket, prefix, boto_session)
+
+
+def _open_archive(job_name: str):
+    try:
+        return log_archive.LogArchive.open("aws", job_name)
+    except OSError as e:
+        print(f"Warning: not archiving logs: {e}", file=sys.stderr)
+        return None
+
+
+def _fetch_into_archive(archive, logs_client, stream: str):
+    """
+    Archive the next page of a stream from the archive's cursor (re-read under its lock,
+    so a concurrent `jobber logs` or second tail does not fetch the same events).
+    Returns None to stop archiving after a write error; streaming itself carries on.
+    """
+    try:
+        log_archive.fetch_sagemaker_stream(archive, logs_client, stream)
+    except OSError as e:
+        print(f"Warning: not archiving logs: {e}", file=sys.stderr)
+        return None
+    return archive
 
 
 def _stream_training_logs(job_name: str, boto_session, poll: int = 5) -> None:
     """
     Stream CloudWatch logs for the training job until it finishes, with status updates.
+    Per-stream forward tokens are persisted with the log archive so tailing can resume.
     """
     logs_client = boto_session.client("logs")
     sm_client = boto_session.client("sagemaker")
     group = "/aws/sagemaker/TrainingJobs"
-    next_tokens: dict[str, str] = {}
+    archive = _open_archive(job_name)
+    # Resume after the last archived event of each stream (e.g. `jobber attach` after a
+    # dropped connection) instead of replaying from the head.
+    next_tokens: dict[str, str] = dict(archive.cursors) if archive else {}
     terminal = {"Completed", "Failed", "Stopped"}
     start = time.time()
     first_log_at: float | None = None
+    if next_tokens:
+        print(f"Resuming {len(next_tokens)} log stream(s) after {archive.event_count} archived events")
+        first_log_at = start
     last_status = None
     last_secondary = None
     last_message = None
     last_wait_msg = 0.0
+    printed = archive.event_count if archive else 0
+
+    def show(name: str, message: str) -> None:
+        nonlocal first_log_at
+        if first_log_at is None:
+            first_log_at = time.time()
+            waited = int(first_log_at - start)
+            print(f"[{waited:>4}s] first logs available")
+        print(f"{name}: {message}")
 
     while True:
         desc = sm_client.describe_training_job(TrainingJobName=job_name)
@@ -156,6 +295,10 @@ def _stream_training_logs(job_name: str, boto_session, poll: int = 5) -> None:
 
         for stream in streams:
             name = stream["logStreamName"]
+            if archive is not None:
+                archive = _fetch_into_archive(archive, logs_client, name)
+                if archive is not None:
+                    continue
             params = {
                 "logGroupName": group,
                 "logStreamName": name,
@@ -166,11 +309,13 @@ def _stream_training_logs(job_name: str, boto_session, poll: int = 5) -> None:
             resp = logs_client.get_log_events(**params)
             next_tokens[name] = resp["nextForwardToken"]
             for event in resp.get("events", []):
-                if first_log_at is None:
-                    first_log_at = time.time()
-                    waited = int(first_log_at - start)
-                    print(f"[{waited:>4}s] first logs available")
-                print(f"{name}: {event['message']}")
+                show(name, event["message"])
+        if archive is not None:
+            # Print from the archive: it also holds what other processes fetched.
+            for event in archive.events(skip=printed):
+                show(event.stream, event.message)
+                printed += 1
+            next_tokens = dict(archive.cursors)
 
         if status in terminal:
             if status == "Failed":
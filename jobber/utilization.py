@@ -0,0 +1,307 @@
+"""
+Per-job resource utilization and phase timing, to tell GPU-bound jobs from ones waiting
+on input download or the data loader.
+"""
+
+import statistics
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from jobber import retry
+
+
+SAGEMAKER_NAMESPACE = "/aws/sagemaker/TrainingJobs"
+# CloudWatch metric name -> report key. SageMaker sums CPU and GPU utilization over
+# cores/GPUs (400% on a fully busy 4-vCPU host); DiskUtilization is disk space used.
+SAGEMAKER_METRICS = {
+    "CPUUtilization": "cpu_util",
+    "MemoryUtilization": "mem_util",
+    "GPUUtilization": "gpu_util",
+    "GPUMemoryUtilization": "gpu_mem_util",
+    "DiskUtilization": "disk_util",
+}
+# Cloud Monitoring metric type -> (report key, scale to percent). Vertex AI reports
+# custom-training metrics under the cloudml_job resource as fractions.
+VERTEX_METRICS = {
+    "ml.googleapis.com/training/cpu/utilization": ("cpu_util", 100.0),
+    "ml.googleapis.com/training/memory/utilization": ("mem_util", 100.0),
+    "ml.googleapis.com/training/accelerator/utilization": ("gpu_util", 100.0),
+    "ml.googleapis.com/training/accelerator/memory/utilization": ("gpu_mem_util", 100.0),
+}
+# (vCPUs, GPUs) per host, used to turn SageMaker's summed utilization into per-unit shares.
+INSTANCE_SHAPES: Dict[str, Tuple[int, int]] = {
+    "ml.m5.large": (2, 0),
+    "ml.m5.xlarge": (4, 0),
+    "ml.m5.2xlarge": (8, 0),
+    "ml.m5.4xlarge": (16, 0),
+    "ml.c5.xlarge": (4, 0),
+    "ml.c5.2xlarge": (8, 0),
+    "ml.c5.4xlarge": (16, 0),
+    "ml.g4dn.xlarge": (4, 1),
+    "ml.g4dn.2xlarge": (8, 1),
+    "ml.g4dn.12xlarge": (48, 4),
+    "ml.g5.xlarge": (4, 1),
+    "ml.g5.2xlarge": (8, 1),
+    "ml.g5.4xlarge": (16, 1),
+    "ml.g5.12xlarge": (48, 4),
+    "ml.g5.48xlarge": (192, 8),
+    "ml.p3.2xlarge": (8, 1),
+    "ml.p3.8xlarge": (32, 4),
+    "ml.p3.16xlarge": (64, 8),
+    "ml.p4d.24xlarge": (96, 8),
+}
+
+
+@dataclass
+class Phase:
+    name: str
+    seconds: float
+    message: Optional[str] = None
+
+
+@dataclass
+class UtilizationReport:
+    job_name: str
+    provider: str
+    status: str
+    instance_type: Optional[str] = None
+    instance_count: int = 1
+    phases: List[Phase] = field(default_factory=list)
+    # Report key -> per-minute values (averaged over hosts).
+    series: Dict[str, List[float]] = field(default_factory=dict)
+    notes: List[str] = field(default_factory=list)
+
+    def summary(self, key: str) -> Optional[Tuple[float, float, float]]:
+        """
+        (mean, p90, max) of a series, or None if it has no datapoints.
+        """
+        values = sorted(self.series.get(key) or [])
+        if not values:
+            return None
+        p90 = values[min(len(values) - 1, int(0.9 * len(values)))]
+        return statistics.fmean(values), p90, values[-1]
+
+    def means(self) -> Dict[str, float]:
+        return {key: round(s[0], 1) for key in self.series if (s := self.summary(key))}
+
+
+def _seconds(start, end) -> float:
+    return max(0.0, (end - start).total_seconds())
+
+
+def sagemaker_report(job_name: str, boto_session=None, region: Optional[str] = None) -> UtilizationReport:
+    session = boto_session or retry.session(region)
+    desc = session.client("sagemaker").describe_training_job(TrainingJobName=job_name)
+    resources = desc.get("ResourceConfig") or {}
+    report = UtilizationReport(
+        job_name=job_name,
+        provider="aws",
+        status=desc["TrainingJobStatus"],
+        instance_type=resources.get("InstanceType"),
+        instance_count=resources.get("InstanceCount") or 1,
+    )
+    now = datetime.now(timezone.utc)
+    for transition in desc.get("SecondaryStatusTransitions") or []:
+        end = transition.get("EndTime") or now
+        report.phases.append(Phase(transition["Status"], _seconds(transition["StartTime"], end), transition.get("StatusMessage")))
+    start = desc.get("TrainingStartTime")
+    if start:
+        report.series = sagemaker_series(session, job_name, start, desc.get("TrainingEndTime") or now, report.instance_count)
+    report.notes = diagnose(report)
+    return report
+
+
+def sagemaker_series(boto_session, job_name: str, start, end, hosts: int = 1, period: int = 60) -> Dict[str, List[float]]:
+    """
+    Per-period averages of each instance metric, averaged across hosts. One paginated
+    GetMetricData call covers every metric and host.
+    """
+    names = list(SAGEMAKER_METRICS)
+    queries = []
+    for i, metric in enumerate(names):
+        for host in range(1, hosts + 1):
+            queries.append(
+                {
+                    "Id": f"m{i}h{host}",
+                    "MetricStat": {
+                        "Metric": {
+                            "Namespace": SAGEMAKER_NAMESPACE,
+                            "MetricName": metric,
+                            "Dimensions": [{"Name": "Host", "Value": f"{job_name}/algo-{host}"}],
+                        },
+                        "Period": period,
+                        "Stat": "Average",
+                    },
+                }
+            )
+    points: Dict[str, Dict[object, List[float]]] = {}
+    client = boto_session.client("cloudwatch")
+    for page in client.get_paginator("get_metric_data").paginate(
+        MetricDataQueries=queries, StartTime=start, EndTime=end, ScanBy="TimestampAscending"
+    ):
+        for result in page.get("MetricDataResults", []):
+            key = SAGEMAKER_METRICS[names[int(result["Id"][1:].split("h")[0])]]
+            by_time = points.setdefault(key, {})
+            timestamps = result.get("Timestamps") or list(range(len(result.get("Values", []))))
+            for ts, value in zip(timestamps, result.get("Values", [])):
+                by_time.setdefault(ts, []).append(value)
+    return {key: [statistics.fmean(v) for _, v in sorted(by_time.items())] for key, by_time in points.items() if by_time}
+
+
+def vertex_report(job_name: str) -> UtilizationReport:
+    """
+    Phase timing from the CustomJob; utilization from Cloud Monitoring when
+    google-cloud-monitoring is installed.
+    """
+    from google.cloud import aiplatform_v1
+    from jobber import gcp_clients
+    from jobber.job_registry import location_of
+
+    region = location_of(job_name)
+    client = retry.wrap(aiplatform_v1.JobServiceClient(client_options={"api_endpoint": f"{region}-aiplatform.googleapis.com"}), "aiplatform")
+    job = client.get_custom_job(name=job_name)
+    spec = job.job_spec.worker_pool_specs[0] if job.job_spec.worker_pool_specs else None
+    report = UtilizationReport(
+        job_name=job_name,
+        provider="gcp",
+        status=aiplatform_v1.JobState(job.state).name,
+        instance_type=spec.machine_spec.machine_type if spec else None,
+        instance_count=spec.replica_count if spec else 1,
+    )
+    now = datetime.now(timezone.utc)
+    if job.create_time:
+        report.phases.append(Phase("Pending", _seconds(job.create_time, job.start_time or now)))
+    if job.start_time:
+        report.phases.append(Phase("Running", _seconds(job.start_time, job.end_time or now)))
+        try:
+            monitoring = gcp_clients.monitoring_types()
+        except ModuleNotFoundError as e:
+            report.notes.append(f"utilization not collected: {e}")
+        else:
+            project = job_name.split("/")[1]
+            report.series = vertex_series(monitoring, project, job_name.rsplit("/", 1)[-1], job.start_time, job.end_time or now)
+    report.notes += diagnose(report)
+    return report
+
+
+def vertex_series(monitoring, project: str, job_id: str, start, end, period: int = 60) -> Dict[str, List[float]]:
+    from jobber import gcp_clients
+
+    creds, _ = gcp_clients.credentials()
+    client = monitoring.MetricServiceClient(credentials=creds)
+    interval = monitoring.TimeInterval(start_time=start, end_time=end)
+    aggregation = monitoring.Aggregation(
+        alignment_period={"seconds": period},
+        per_series_aligner=monitoring.Aggregation.Aligner.ALIGN_MEAN,
+        cross_series_reducer=monitoring.Aggregation.Reducer.REDUCE_MEAN,
+    )
+    out: Dict[str, List[float]] = {}
+    for metric_type, (key, scale) in VERTEX_METRICS.items():
+        results = client.list_time_series(
+            request={
+                "name": f"projects/{project}",
+                "filter": f'metric.type = "{metric_type}" AND resource.labels.job_id = "{job_id}"',
+                "interval": interval,
+                "aggregation": aggregation,
+            }
+        )
+        for ts in results:
+            # Points arrive newest first.
+            values = [p.value.double_value * scale for p in reversed(ts.points)]
+            if values:
+                out[key] = values
+    return out
+
+
+def diagnose(report: UtilizationReport) -> List[str]:
+    """
+    Plain-language hints about where time went. Only fires on clear signals.
+    """
+    notes = []
+    total = sum(p.seconds for p in report.phases)
+    download = sum(p.seconds for p in report.phases if p.name == "Downloading")
+    training = sum(p.seconds for p in report.phases if p.name in ("Training", "Running"))
+    if total and download > 0.2 * total:
+        notes.append(
+            f"input download took {download / total:.0%} of the job; consider FastFile input mode, fewer/larger files, or a smaller data prefix"
+        )
+    vcpus, gpus = INSTANCE_SHAPES.get(report.instance_type or "", (None, None))
+    if report.provider == "gcp":
+        vcpus = gpus = 1  # Cloud Monitoring values are already per-unit shares.
+    gpu, cpu = report.summary("gpu_util"), report.summary("cpu_util")
+    if gpu and gpus and training:
+        gpu_share = gpu[0] / gpus
+        cpu_share = cpu[0] / vcpus if cpu and vcpus else None
+        if gpu_share < 50 and cpu_share is not None and cpu_share > 80:
+            notes.append(f"GPUs averaged {gpu_share:.0f}% while CPUs were {cpu_share:.0f}% busy: likely data-loader bound")
+        elif gpu_share < 50:
+            notes.append(f"GPUs averaged {gpu_share:.0f}%: the job is not GPU-bound (input pipeline, I/O, or too small a batch)")
+    elif cpu and vcpus and not gpus and cpu[0] / vcpus < 30 and training:
+        notes.append(f"CPUs averaged {cpu[0] / vcpus:.0f}%: a smaller instance would likely do")
+    return notes
+
+
+def format_report(report: UtilizationReport) -> str:
+    compute = report.instance_type or "?"
+    if report.instance_count > 1:
+        compute += f" x{report.instance_count}"
+    lines = [f"{report.job_name} ({report.status}, {compute})"]
+    total = sum(p.seconds for p in report.phases)
+    if report.phases:
+        lines.append("Phases:")
+        for phase in report.phases:
+            share = f"{phase.seconds / total:>4.0%}" if total else "   -"
+            lines.append(f"  {phase.name:<24} {_clock(phase.seconds):>8} {share}")
+    if report.series:
+        lines.append(f"Utilization (per-minute, {_unit_note(report)}):")
+        lines.append(f"  {'METRIC':<14} {'MEAN':>6} {'P90':>6} {'MAX':>6}  TIMELINE")
+        for key in ("gpu_util", "gpu_mem_util", "cpu_util", "mem_util", "disk_util"):
+            s = report.summary(key)
+            if s:
+                lines.append(f"  {key:<14} {s[0]:>6.1f} {s[1]:>6.1f} {s[2]:>6.1f}  {sparkline(report.series[key])}")
+    else:
+        lines.append("Utilization: no datapoints (yet)")
+    lines += [f"Note: {n}" for n in report.notes]
+    return "\n".join(lines)
+
+
+def _unit_note(report: UtilizationReport) -> str:
+    if report.provider == "aws":
+        return "% summed over vCPUs/GPUs on each host"
+    return "% per unit"
+
+
+def _clock(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+SPARKS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values: List[float], width: int = 40) -> str:
+    if not values:
+        return ""
+    # Downsample to `width` buckets so long jobs stay on one line.
+    step = max(1, -(-len(values) // width))
+    buckets = [statistics.fmean(values[i : i + step]) for i in range(0, len(values), step)]
+    top = max(buckets) or 1.0
+    return "".join(SPARKS[min(len(SPARKS) - 1, int(v / top * (len(SPARKS) - 1)))] for v in buckets)
+
+
+def report_for(job_name: str, provider: Optional[str] = None, region: Optional[str] = None) -> UtilizationReport:
+    """
+    Build the report for a running or finished job, taking provider/region from the job
+    registry when the job was submitted through jobber.
+    """
+    from jobber import job_registry
+
+    record = job_registry.get(job_name)
+    if record:
+        job_name, provider, region = record.job_name, record.provider, region or record.region
+    if (provider or ("gcp" if job_name.startswith("projects/") else "aws")) == "gcp":
+        if not job_name.startswith("projects/"):
+            raise ValueError(f"{job_name} is not in the job registry; pass the full projects/.../customJobs/ID name")
+        return vertex_report(job_name)
+    return sagemaker_report(job_name, region=region)
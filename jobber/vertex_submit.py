@@ -4,11 +4,11 @@ Minimal Vertex AI CustomJob submit helper for jobber.
 
 import subprocess
 import time
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from google.cloud import aiplatform_v1
 
-from jobber import gcp_storage
+from jobber import gcp_clients, gcp_storage, hyperparams, log_archive, retry
 
 
 def submit_job(
@@ -19,7 +19,7 @@ def submit_job(
     prefix: str,
     entry_point: Optional[str],
     source_dir: Optional[str],
-    args: Dict[str, str],
+    args: Dict[str, Any],
     machine_type: str,
     accelerator_type: Optional[str] = None,
     accelerator_count: Optional[int] = None,
@@ -30,19 +30,79 @@ def submit_job(
     subnet: Optional[str] = None,
     ensure_data: bool = False,
     tail_logs: bool = False,
+    on_created: Optional[Callable[[str], None]] = None,
+    labels: Optional[Dict[str, str]] = None,
 ) -> str:
     if ensure_data:
         gcp_storage.upload_placeholder(bucket, prefix)
+    encoded = hyperparams.encode(args or {})
+    if encoded.spilled and gcp_storage.upload_bytes(bucket, encoded.config_key(prefix), encoded.document, skip_existing=True):
+        print(f"Uploaded {len(encoded.spilled)} hyperparameters to gs://{bucket}/{encoded.config_key(prefix)}")
 
-    job_display_name = job_name or "jobber"
-    # Map hyperparameters to args list
-    arg_list: List[str] = []
-    for k, v in args.items():
-        arg_list.extend([f"--{k}", str(v)])
+    custom_job = build_custom_job(
+        image_uri=image_uri,
+        bucket=bucket,
+        prefix=prefix,
+        entry_point=entry_point,
+        args=args,
+        machine_type=machine_type,
+        accelerator_type=accelerator_type,
+        accelerator_count=accelerator_count,
+        replica_count=replica_count,
+        job_name=job_name,
+        service_account=service_account,
+        network=network,
+        subnet=subnet,
+        labels=labels,
+    )
 
+    client = retry.wrap(aiplatform_v1.JobServiceClient(client_options={"api_endpoint": f"{region}-aiplatform.googleapis.com"}), "aiplatform")
+    parent = client.common_location_path(project, region)
+    resp = client.create_custom_job(parent=parent, custom_job=custom_job)
+    name = resp.name  # projects/.../locations/.../customJobs/...
+    if on_created:
+        on_created(name)
+    if tail_logs:
+        _stream_job_logs(project, region, name, client)
+    return name
+
+
+def attach_job(project: str, region: str, job_name: str, tail_logs: bool = False) -> None:
+    """
+    Wait for an existing CustomJob (streaming its logs with `tail_logs`); raise if it fails.
+    """
+    client = retry.wrap(aiplatform_v1.JobServiceClient(client_options={"api_endpoint": f"{region}-aiplatform.googleapis.com"}), "aiplatform")
+    if tail_logs:
+        _stream_job_logs(project, region, job_name, client)
+    else:
+        _wait_for_job_terminal(client, job_name)
+
+
+def build_custom_job(
+    image_uri: str,
+    bucket: str,
+    prefix: str,
+    entry_point: Optional[str],
+    args: Dict[str, Any],
+    machine_type: str,
+    accelerator_type: Optional[str] = None,
+    accelerator_count: Optional[int] = None,
+    replica_count: int = 1,
+    job_name: Optional[str] = None,
+    service_account: Optional[str] = None,
+    network: Optional[str] = None,
+    subnet: Optional[str] = None,
+    labels: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    The CustomJob body that submit_job sends to create_custom_job. Oversized `args` are
+    read from the spilled hyperparameters.json through the Cloud Storage FUSE mount.
+    """
+    job_display_name = job_name or "jobber"
+    encoded = hyperparams.encode(args or {})
     container_spec = {
         "image_uri": image_uri,
-        "args": arg_list,
+        "args": build_args(encoded.with_config_path(f"/gcs/{bucket}/{encoded.config_key(prefix)}")),
     }
     if entry_point:
         container_spec["command"] = ["python", entry_point]
@@ -69,17 +129,54 @@ def submit_job(
         custom_job["job_spec"]["network"] = network
     if subnet:
         custom_job["job_spec"]["subnetwork"] = subnet
+    if labels:
+        custom_job["labels"] = labels
+    return custom_job
 
-    client = aiplatform_v1.JobServiceClient(client_options={"api_endpoint": f"{region}-aiplatform.googleapis.com"})
-    parent = client.common_location_path(project, region)
-    resp = client.create_custom_job(parent=parent, custom_job=custom_job)
-    name = resp.name  # projects/.../locations/.../customJobs/...
-    if tail_logs:
-        _stream_job_logs(project, region, name, client)
-    return name
+
+def build_args(args: Dict[str, Any]) -> List[str]:
+    """
+    Map hyperparameters to the container's `--key value` argument list.
+    """
+    arg_list: List[str] = []
+    for k, v in args.items():
+        arg_list.extend([f"--{k}", hyperparams.encode_value(v)])
+    return arg_list
 
 
 def _stream_job_logs(project: str, region: str, job_name: str, client: aiplatform_v1.JobServiceClient, poll: int = 10) -> None:
+    """
+    Tail job logs until the job is terminal. With google-cloud-logging installed, entries
+    are polled from Cloud Logging after the archived (timestamp, insertId) cursor, so an
+    interrupted tail resumes where it stopped; otherwise hand off to `gcloud ai custom-jobs stream-logs`.
+    """
+    try:
+        gcp_clients.logging_types()
+        archive = log_archive.LogArchive.open("gcp", job_name)
+    except (ModuleNotFoundError, OSError):
+        return _stream_job_logs_gcloud(project, region, job_name, client, poll=poll)
+    if archive.cursors.get(log_archive.VERTEX_CURSOR):
+        print(f"Resuming logs after {archive.event_count} archived events")
+    printed = archive.event_count
+
+    def fetch() -> None:
+        nonlocal printed
+        # Safe to retry whole: entries before the stored cursor are skipped.
+        retry.call("logging", log_archive.fetch_vertex, archive, job_name)
+        # Print from the archive: it also holds what other processes fetched.
+        for event in archive.events(skip=printed):
+            print(f"{event.stream}: {event.message}")
+            printed += 1
+
+    try:
+        _wait_for_job_terminal(client, job_name, poll=poll, on_poll=fetch)
+    except RuntimeError:
+        fetch()  # pick up the lines explaining the failure
+        raise
+    fetch()
+
+
+def _stream_job_logs_gcloud(project: str, region: str, job_name: str, client: aiplatform_v1.JobServiceClient, poll: int = 10) -> None:
     """
     Stream logs via gcloud; also poll job status and terminate the log stream when the job is terminal.
     """
@@ -101,7 +198,9 @@ def _stream_job_logs(project: str, region: str, job_name: str, client: aiplatfor
                 proc.kill()
 
 
-def _wait_for_job_terminal(client: aiplatform_v1.JobServiceClient, job_name: str, poll: int = 10) -> None:
+def _wait_for_job_terminal(
+    client: aiplatform_v1.JobServiceClient, job_name: str, poll: int = 10, on_poll: Optional[Callable[[], None]] = None
+) -> None:
     terminal = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_PAUSED"}
     last_state = None
     start = time.time()
@@ -112,6 +211,8 @@ def _wait_for_job_terminal(client: aiplatform_v1.JobServiceClient, job_name: str
             elapsed = int(time.time() - start)
             print(f"[{elapsed:>4}s] state={state}")
             last_state = state
+        if on_poll:
+            on_poll()
         if state in terminal:
             if state != "JOB_STATE_SUCCEEDED":
                 raise RuntimeError(f"Vertex job failed with state: {state}")
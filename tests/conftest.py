@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path, monkeypatch):
+    # Keep the exists cache and job registry per test so state never leaks between tests or into ~.
+    monkeypatch.setenv("JOBBER_CACHE_DIR", str(tmp_path / "jobber-cache"))
+    monkeypatch.setenv("JOBBER_DATA_DIR", str(tmp_path / "jobber-data"))
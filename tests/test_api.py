@@ -0,0 +1,99 @@
+import asyncio
+import subprocess
+import sys
+import types
+
+import pytest
+
+from jobber import api, job_registry, s3_utils, sm_submit
+
+
+def aws_spec(**kw):
+    return api.JobSpec(image_uri="123.dkr.ecr.us-east-1.amazonaws.com/t:latest", bucket="b", role_arn="arn:role", region="us-east-1", source_dir=None, **kw)
+
+
+def test_spec_from_config_maps_submit_section():
+    conf = {
+        "provider": "gcp",
+        "submit": {
+            "image_uri": "us-docker.pkg.dev/p/r/t:latest",
+            "project": "p",
+            "region": "us-central1",
+            "gcs_bucket": "gb",
+            "gcs_prefix": "run",
+            "params": {"epochs": 5},
+            "tail_logs": True,  # CLI-only, ignored
+        },
+    }
+    spec = api.JobSpec.from_config(conf, job_name="sweep-1")
+    assert (spec.provider, spec.bucket, spec.prefix, spec.job_name) == ("gcp", "gb", "run", "sweep-1")
+    assert spec.hyperparameters == {"epochs": 5}
+    spec.validate()
+
+    with pytest.raises(ValueError, match="role_arn"):
+        api.JobSpec(image_uri="i", bucket="b").validate()
+
+
+def test_submit_returns_handle_without_waiting(monkeypatch):
+    seen = {}
+
+    def fake_submit_job(**kwargs):
+        seen.update(kwargs)
+        kwargs["on_created"]("jobber-2024-01-01-00-00-00-000")
+        return "jobber-2024-01-01-00-00-00-000"
+
+    monkeypatch.setattr(sm_submit, "submit_job", fake_submit_job)
+    handle = api.submit(aws_spec(hyperparameters={"lr": 0.1}))
+    assert seen["wait"] is False and seen["hyperparameters"] == {"lr": 0.1}
+    assert (handle.provider, handle.name, handle.region) == ("aws", "jobber-2024-01-01-00-00-00-000", "us-east-1")
+    recorded = job_registry.get(handle.name)
+    assert recorded.hyperparameters == {"lr": "0.1"} and recorded.output_uri == "s3://b/jobber-run/outputs"
+    assert api.job(handle.name).submitted_at == recorded.submitted_at
+
+
+def test_wait_all_async_batches_status_queries(monkeypatch):
+    rounds = []
+    timeline = {"a": ["InProgress", "Completed"], "b": ["InProgress", "Failed"], "c": ["InProgress", "InProgress", "Completed"], "d": ["InProgress", "InProgress", "Completed"]}
+
+    def fake_statuses(jobs):
+        rounds.append(sorted(j.job_name for j in jobs))
+        return {j.job_name: timeline[j.job_name][min(len(rounds), len(timeline[j.job_name])) - 1] for j in jobs}
+
+    monkeypatch.setattr(job_registry, "_sagemaker_statuses", fake_statuses)
+    handles = [api.JobHandle("aws", name, "us-east-1", submitted_at=0) for name in "abcd"]
+
+    async def run():
+        with pytest.raises(api.JobFailed) as failed:
+            await api.wait_all_async(handles, poll=0)
+        return failed.value
+
+    failed = asyncio.run(run())
+    assert failed.handle.name == "b" and failed.status == "Failed"
+    assert rounds == [["a", "b", "c", "d"], ["a", "b", "c", "d"], ["c", "d"]]
+    assert [h.state for h in handles] == ["succeeded", "failed", "succeeded", "succeeded"]
+
+
+def test_single_handle_is_described(monkeypatch):
+    class FakeSM:
+        def describe_training_job(self, TrainingJobName):
+            return {"TrainingJobStatus": "Completed"}
+
+    monkeypatch.setattr(api.retry, "session", lambda region=None: types.SimpleNamespace(client=lambda name: FakeSM()))
+    handle = api.job("train-1", region="us-east-1")
+    assert asyncio.run(handle.wait_async(poll=0)) == "Completed"
+
+
+def test_sync_async_runs_transfer_as_subprocess(monkeypatch, tmp_path):
+    ensured = []
+    monkeypatch.setattr(s3_utils, "ensure_bucket", lambda bucket, region=None: ensured.append(bucket))
+    monkeypatch.setattr(s3_utils, "sync_command", lambda src, dest, region=None: [sys.executable, "-c", "import sys; sys.exit('fail' in sys.argv[1])", dest])
+
+    async def run():
+        return await asyncio.gather(*(api.sync_async(tmp_path, f"s3://bucket{i}/data") for i in range(3)))
+
+    assert asyncio.run(run()) == ["s3://bucket0/data", "s3://bucket1/data", "s3://bucket2/data"]
+    assert sorted(ensured) == ["bucket0", "bucket1", "bucket2"]
+    with pytest.raises(subprocess.CalledProcessError):
+        asyncio.run(api.sync_async(tmp_path, "s3://bucket/fail"))
+    with pytest.raises(ValueError, match="gs://"):
+        api.sync(tmp_path, "s3://bucket/data", provider="gcp")
@@ -0,0 +1,89 @@
+import tarfile
+import zipfile
+
+from jobber import build_context as bc
+
+
+def _make_tree(root):
+    (root / "src").mkdir()
+    (root / "src" / "train.py").write_text("print('hi')\n")
+    (root / "src" / "cache.pyc").write_bytes(b"x")
+    (root / "data").mkdir()
+    (root / "data" / "big.bin").write_bytes(b"0" * 100)
+    (root / "data" / "keep.txt").write_text("keep")
+    (root / "requirements.txt").write_text("numpy\n")
+
+
+def test_is_ignored_semantics():
+    rules = bc.parse_ignore("# comment\ndata\n*.pyc\n**/*.ckpt\n!data/keep.txt\n/build/\n")
+    assert bc.is_ignored("data/big.bin", rules)
+    assert not bc.is_ignored("data/keep.txt", rules)
+    assert bc.is_ignored("cache.pyc", rules)
+    assert not bc.is_ignored("src/cache.pyc", rules)
+    assert bc.is_ignored("a/b/model.ckpt", rules)
+    assert bc.is_ignored("model.ckpt", rules)
+    assert bc.is_ignored("build/out.o", rules)
+    assert not bc.is_ignored("train.py", rules)
+
+
+def test_iter_context_files_respects_dockerignore(tmp_path):
+    _make_tree(tmp_path)
+    (tmp_path / ".dockerignore").write_text("data\n**/*.pyc\n")
+    files = [rel for rel, _ in bc.iter_context_files(tmp_path)]
+    assert files == [".dockerignore", "requirements.txt", "src/train.py"]
+
+
+def test_archive_context_is_reproducible(tmp_path):
+    _make_tree(tmp_path)
+    (tmp_path / ".dockerignore").write_text("data\n")
+    (tmp_path / "Dockerfile").write_text("FROM context\n")
+    df = tmp_path.parent / "outside.Dockerfile"
+    df.write_text("FROM scratch\n")
+    first = bc.archive_context(tmp_path, str(df))
+    second = bc.archive_context(tmp_path, str(df))
+    try:
+        assert first.sha256 == second.sha256
+        with tarfile.open(first.path) as tar:
+            names = tar.getnames()
+            assert tar.extractfile(".jobber/Dockerfile").read() == b"FROM scratch\n"
+            assert tar.extractfile("Dockerfile").read() == b"FROM context\n"
+        assert bc.dockerfile_in_archive(tmp_path, str(df)) == ".jobber/Dockerfile"
+        assert bc.dockerfile_in_archive(tmp_path, str(tmp_path / "Dockerfile")) == "Dockerfile"
+        assert "src/train.py" in names
+        assert not any(n.startswith("data/") for n in names)
+        assert first.files == len(names)
+    finally:
+        first.path.unlink()
+        second.path.unlink()
+
+
+def test_archive_context_zip_is_reproducible(tmp_path):
+    _make_tree(tmp_path)
+    (tmp_path / "run.sh").write_text("#!/bin/sh\n")
+    (tmp_path / "run.sh").chmod(0o755)
+    first = bc.archive_context(tmp_path, fmt="zip")
+    second = bc.archive_context(tmp_path, fmt="zip")
+    try:
+        assert first.sha256 == second.sha256 and first.path.suffix == ".zip"
+        with zipfile.ZipFile(first.path) as zf:
+            assert zf.namelist() == sorted(zf.namelist())
+            assert (zf.getinfo("run.sh").external_attr >> 16) & 0o777 == 0o755
+            assert {i.date_time for i in zf.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+    finally:
+        first.path.unlink()
+        second.path.unlink()
+
+
+def test_analyze_context_reports_and_suggests(tmp_path, monkeypatch):
+    monkeypatch.setattr(bc, "SUGGEST_MIN_BYTES", 50)
+    _make_tree(tmp_path)
+    (tmp_path / "src" / "model.ckpt").write_bytes(b"1" * 60)
+    (tmp_path / ".dockerignore").write_text("**/*.pyc\n")
+    report = bc.analyze_context(tmp_path, top=2)
+    assert report.files == 6
+    assert report.largest_dirs[0] == ("data", 104)
+    assert report.largest_files[0] == ("data/big.bin", 100)
+    assert "data/" in report.suggestions
+    assert "**/*.ckpt" in report.suggestions
+    text = bc.format_report(report)
+    assert "consider adding to .dockerignore" in text
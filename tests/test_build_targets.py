@@ -0,0 +1,78 @@
+import subprocess
+import threading
+import time
+
+import pytest
+
+from jobber import build_targets
+
+
+def test_parse_targets_fills_defaults_and_names():
+    targets = build_targets.parse_targets(
+        [
+            {"template": "cpu", "tags": ["cpu", "latest"]},
+            {"template": "gpu-cu121", "platforms": ["linux/amd64"]},
+            {"name": "graviton", "dockerfile": "Dockerfile.arm", "image": "train-arm", "platforms": "linux/arm64", "push": True},
+        ],
+        {"image": "train", "tag": "v3"},
+    )
+    assert [t.name for t in targets] == ["cpu", "gpu-cu121", "graviton"]
+    assert targets[0].refs == ["train:cpu", "train:latest"]
+    assert targets[1].refs == ["train:v3"]
+    assert targets[2].refs == ["train-arm:v3"] and targets[2].platforms == ["linux/arm64"]
+
+
+@pytest.mark.parametrize(
+    "raw, message",
+    [
+        ([{"template": "cpu"}, {"template": "cpu"}], "duplicate"),
+        ([{"template": "no-such-template"}], "Unknown template"),
+        ([{"template": "cpu", "dockerfile": "Dockerfile"}], "both"),
+        ([{"template": "cpu", "platform": "linux/arm64"}], "unknown keys: platform"),
+        ([{"template": "cpu", "platforms": ["linux/amd64", "linux/arm64"]}], "must set push: true"),
+    ],
+)
+def test_parse_targets_rejects_bad_entries(raw, message):
+    with pytest.raises(ValueError, match=message):
+        build_targets.parse_targets(raw, {"image": "train"})
+
+
+def test_build_command_platforms_and_push():
+    target = build_targets.BuildTarget(name="g", image="acct.dkr.ecr.us-east-1.amazonaws.com/t", tags=["arm"], platforms=["linux/amd64", "linux/arm64"], push=True, build_args={"CUDA": "12.1"})
+    cmd = build_targets.build_command(target, ".", "/tmp/g.Dockerfile")
+    assert cmd[:3] == ["docker", "buildx", "build"]
+    assert cmd[cmd.index("--platform") + 1] == "linux/amd64,linux/arm64"
+    assert cmd[cmd.index("--build-arg") + 1] == "CUDA=12.1"
+    assert cmd[-2:] == ["--push", "."]
+
+
+def test_render_dockerfiles_keeps_variants_apart(tmp_path):
+    targets = build_targets.parse_targets([{"template": "cpu"}, {"name": "py312", "template": "cpu", "template_params": {"python_version": "3.12"}}], {"image": "t"})
+    paths = build_targets.render_dockerfiles(targets, str(tmp_path), tmp_path / "out", {"python_version": "3.11"})
+    assert "3.11" in open(paths["cpu"]).read()
+    assert "3.12" in open(paths["py312"]).read()
+
+
+def test_build_targets_caps_parallelism_and_reports_failures(monkeypatch):
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_run(name, cmd):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        if name == "cu128":
+            raise subprocess.CalledProcessError(1, cmd, output="#9 ERROR: failed to solve: cuda-toolkit-12-8 not found")
+
+    monkeypatch.setattr(build_targets, "_run_prefixed", fake_run)
+    targets = build_targets.parse_targets([{"template": n} for n in ("cpu", "gpu-cu121", "gpu-cu128")], {"image": "t"})
+    targets[2].name = "cu128"
+    results = build_targets.build_targets(targets, ".", {t.name: "Dockerfile" for t in targets}, parallel=2)
+    assert peak[0] == 2
+    assert [r.ok for r in results] == [True, True, False]
+    assert "cuda-toolkit-12-8 not found" in results[2].error
+    report = build_targets.format_report(results)
+    assert "2/3 targets built" in report and "FAILED" in report
@@ -1,3 +1,4 @@
+import time
 import types
 import pytest
 import sys
@@ -5,6 +6,7 @@ from types import SimpleNamespace
 
 import jobber.cli as cli
 import jobber.config as cfg
+from jobber import locality
 
 
 def test_parser_subcommands():
@@ -80,8 +82,8 @@ def test_cmd_push(monkeypatch):
         def get_caller_identity(self):
             return {"Account": "123"}
 
-    def fake_ensure_repo(ecr_client, repo_name):
-        calls["ensure_repo"] = repo_name
+    def fake_ensure_repo(ecr_client, repo_name, account_id=None):
+        calls["ensure_repo"] = (repo_name, account_id)
 
     def fake_ecr_login(info):
         calls["login"] = info.registry
@@ -116,7 +118,7 @@ def test_cmd_push(monkeypatch):
 
     args = SimpleNamespace(image="local/img", repo="repo", tag="t", region="us-east-1", provider=None, project=None, artifact_repo=None)
     cli.cmd_push(args)
-    assert calls["ensure_repo"] == "repo"
+    assert calls["ensure_repo"] == ("repo", "123")
     assert calls["pushed"].endswith(":t")
 
 
@@ -128,6 +130,7 @@ def test_cmd_submit(monkeypatch):
         return "job-123"
 
     monkeypatch.setitem(sys.modules, "jobber.sm_submit", types.SimpleNamespace(submit_job=fake_submit_job))
+    monkeypatch.setattr(locality, "s3_bucket_region", lambda session, bucket: session.region_name)
 
     args = SimpleNamespace(
         image_uri="uri",
@@ -159,7 +162,7 @@ def test_cmd_submit(monkeypatch):
     )
     cli.cmd_submit(args)
     assert recorded["image_uri"] == "uri"
-    assert recorded["hyperparameters"] == {"epochs": "5", "lr": "0.1"}
+    assert recorded["hyperparameters"] == {"epochs": 5, "lr": 0.1}
 
 
 def test_cli_config_defaults(tmp_path, monkeypatch):
@@ -187,6 +190,7 @@ def test_cli_config_defaults(tmp_path, monkeypatch):
         return "job-xyz"
 
     monkeypatch.setitem(sys.modules, "jobber.sm_submit", types.SimpleNamespace(submit_job=fake_submit_job))
+    monkeypatch.setattr(locality, "s3_bucket_region", lambda session, bucket: "us-east-1")
 
     argv = [
         "submit",
@@ -209,6 +213,59 @@ def test_cli_config_defaults(tmp_path, monkeypatch):
     assert recorded["hyperparameters"]["foo"] == "bar"
 
 
+def test_cmd_submit_locality(tmp_path, monkeypatch, capsys):
+    conf = tmp_path / "jobber.yml"
+    image = "123456789012.dkr.ecr.us-west-2.amazonaws.com/train:v1"
+    conf.write_text(f"submit:\n  image-uri: {image}\n  role-arn: arn\n  bucket: data\n  region: us-east-1\n  instance-type: ml.m5.xlarge\n")
+    recorded = {}
+    copied = []
+    monkeypatch.setitem(sys.modules, "jobber.sm_submit", types.SimpleNamespace(submit_job=lambda **kw: recorded.update(kw) or "job"))
+    monkeypatch.setattr(locality, "s3_bucket_region", lambda session, bucket: "eu-west-1")
+    monkeypatch.setattr(locality, "replicate_image", lambda provider, uri, region: copied.append(uri) or locality.replica_image_uri(provider, uri, region))
+    monkeypatch.setattr(locality, "replicate_data", lambda *a: copied.append(a))
+    argv = ["submit", "--config", str(conf), "--source-dir", str(tmp_path)]
+
+    with pytest.raises(SystemExit):
+        cli.main(argv + ["--locality", "fail"])
+    err = capsys.readouterr().err
+    assert "REMOTE image" in err and "[us-west-2]" in err and "[eu-west-1]" in err
+    assert not recorded
+
+    cli.main(argv)
+    assert recorded["bucket"] == "data" and "Warning: cross-region" in capsys.readouterr().err
+
+    cli.main(argv + ["--locality", "replicate"])
+    assert recorded["image_uri"] == "123456789012.dkr.ecr.us-east-1.amazonaws.com/train:v1"
+    assert recorded["bucket"] == "data-us-east-1"
+    assert copied == [image, ("aws", "data", "jobber-run", "eu-west-1", "data-us-east-1", "us-east-1")]
+
+    from botocore.exceptions import ClientError
+
+    def denied(*a):
+        raise ClientError({"Error": {"Code": "AccessDenied", "Message": "no CreateRepository"}}, "CreateRepository")
+
+    monkeypatch.setattr(locality, "replicate_image", denied)
+    recorded.clear()
+    with pytest.raises(SystemExit):
+        cli.main(argv + ["--locality", "replicate"])
+    assert "Replication to us-east-1 failed: An error occurred (AccessDenied)" in capsys.readouterr().err
+    assert not recorded
+
+
+def test_cli_layered_configs(tmp_path, monkeypatch):
+    (tmp_path / "base.yml").write_text("submit:\n  role-arn: arn\n  bucket: b\n  prefix: p\n  instance-type: ml.m5.xlarge\n  params:\n    epochs: 10\n    lr: 0.1\n")
+    (tmp_path / "prod.yml").write_text("extends: base.yml\nsubmit:\n  bucket: prod-bucket\n  image-uri: uri\n")
+    (tmp_path / "run.yml").write_text("submit:\n  params:\n    lr: 0.01\n")
+    recorded = {}
+    monkeypatch.setitem(sys.modules, "jobber.sm_submit", types.SimpleNamespace(submit_job=lambda **kw: recorded.update(kw) or "job"))
+    monkeypatch.setattr(locality, "s3_bucket_region", lambda session, bucket: session.region_name)
+
+    cli.main(["submit", "--config", str(tmp_path / "prod.yml"), "--config", str(tmp_path / "run.yml"), "--source-dir", str(tmp_path)])
+    assert recorded["bucket"] == "prod-bucket"
+    assert recorded["role_arn"] == "arn"
+    assert recorded["hyperparameters"] == {"epochs": 10, "lr": 0.01}
+
+
 def test_cli_init(tmp_path, monkeypatch):
     outfile = tmp_path / "jobber.yml"
     argv = ["init", "--path", str(outfile), "--region", "us-west-2", "--role-arn", "arn:aws:iam::123:role/Role", "--provider", "aws"]
@@ -337,6 +394,7 @@ def test_cmd_submit_gcp(monkeypatch):
     import jobber as jobber_pkg
 
     monkeypatch.setattr(jobber_pkg, "vertex_submit", fake_module, raising=False)
+    monkeypatch.setattr(locality, "gcs_bucket_location", lambda bucket: "us")
 
     args = SimpleNamespace(
         image_uri="us-central1-docker.pkg.dev/p/r/img:tag",
@@ -372,7 +430,7 @@ def test_cmd_submit_gcp(monkeypatch):
     assert recorded["region"] == "us-central1"
     assert recorded["bucket"] == "b"
     assert recorded["prefix"] == "p"
-    assert recorded["args"]["epochs"] == "1"
+    assert recorded["args"]["epochs"] == 1
 
 
 def test_cli_init_gcp(tmp_path, monkeypatch):
@@ -449,3 +507,332 @@ def test_cmd_submit_gcp_missing_deps(monkeypatch, capsys):
         cli.cmd_submit(args)
     err = capsys.readouterr().err
     assert "google-cloud-aiplatform" in err
+
+
+def test_cmd_push_targets_from_config(tmp_path, monkeypatch):
+    conf = tmp_path / "jobber.yml"
+    conf.write_text(
+        "push:\n"
+        "  image: local/img\n"
+        "  repo: repo\n"
+        "  targets:\n"
+        "    - provider: aws\n"
+        "      region: us-east-1\n"
+        "    - provider: gcp\n"
+        "      project: proj\n"
+        "      region: us-central1\n"
+        "      artifact-repo: ar\n"
+    )
+    seen = {}
+
+    def fake_push_to_targets(local, targets, copy_from=None):
+        seen["local"] = local.ref
+        seen["targets"] = targets
+        return [cli.push_targets.PushResult(target=t, uri="u", ok=True, seconds=0.0) for t in targets]
+
+    monkeypatch.setattr(cli.push_targets, "push_to_targets", fake_push_to_targets)
+    cli.main(["push", "--config", str(conf)])
+    assert seen["local"] == "local/img:latest"
+    assert [t.provider for t in seen["targets"]] == ["aws", "gcp"]
+    assert seen["targets"][0].repo == "repo"
+    assert seen["targets"][1].artifact_repo == "ar"
+
+
+def test_cmd_push_targets_lazy_pull(tmp_path, monkeypatch, capsys):
+    from jobber import lazy_pull
+
+    targets = [{"provider": "aws", "region": "us-east-1"}, {"provider": "gcp", "project": "proj", "region": "us-central1", "artifact_repo": "ar"}]
+    monkeypatch.setattr(
+        cli.push_targets,
+        "push_to_targets",
+        lambda local, targets, copy_from=None: [cli.push_targets.PushResult(target=t, uri=f"{t.provider}/img:latest", ok=True, seconds=0.0) for t in targets],
+    )
+    published = []
+
+    def fake_publish(uri, fmt):
+        published.append((uri, fmt))
+        if fmt == "estargz":
+            raise FileNotFoundError("docker")
+        return uri + "-" + fmt
+
+    monkeypatch.setattr(lazy_pull, "publish", fake_publish)
+    args = SimpleNamespace(provider=None, image="img", tag="latest", region=None, repo="img", project=None, artifact_repo=None, targets=targets, copy_from=None, lazy_pull="auto")
+    with pytest.raises(SystemExit):
+        cli.cmd_push(args)
+    assert published == [("aws/img:latest", "soci"), ("gcp/img:latest", "estargz")]
+    captured = capsys.readouterr()
+    assert "Pushed lazy-pull variant aws/img:latest-soci" in captured.out
+    assert "publishing its estargz variant failed" in captured.err
+
+
+def test_cmd_build_targets_from_config(tmp_path, monkeypatch):
+    conf = tmp_path / "jobber.yml"
+    conf.write_text(
+        "build:\n"
+        f"  context: {tmp_path}\n"
+        "  image: train\n"
+        "  parallel: 3\n"
+        "  targets:\n"
+        "    - template: cpu\n"
+        "    - template: gpu-cu121\n"
+        "      platforms: [linux/amd64]\n"
+        "    - template: gpu-cu128\n"
+    )
+    from jobber import build_targets
+
+    seen = {}
+
+    def fake_build_targets(targets, context, dockerfiles, parallel=None):
+        seen.update(names=[t.name for t in targets], context=context, parallel=parallel)
+        seen["rendered"] = all(open(dockerfiles[t.name]).read() for t in targets)
+        return [build_targets.BuildResult(target=t, ok=True, seconds=1.0) for t in targets]
+
+    monkeypatch.setattr(build_targets, "build_targets", fake_build_targets)
+    cli.main(["build", "--config", str(conf), "--only", "cpu", "--only", "gpu-cu121"])
+    assert seen == {"names": ["cpu", "gpu-cu121"], "context": str(tmp_path), "parallel": 3, "rendered": True}
+    assert not (tmp_path / "Dockerfile").exists()
+
+
+def test_cmd_build_targets_reject_remote(tmp_path, monkeypatch, capsys):
+    conf = tmp_path / "jobber.yml"
+    conf.write_text(f"build:\n  context: {tmp_path}\n  image: train\n  targets:\n    - template: cpu\n")
+    from jobber import build_targets
+
+    monkeypatch.setattr(build_targets, "build_targets", lambda *a, **kw: pytest.fail("should not build"))
+    monkeypatch.setattr(cli, "_remote_build", lambda *a: pytest.fail("should not build remotely"))
+    with pytest.raises(SystemExit):
+        cli.main(["build", "--config", str(conf), "--remote"])
+    assert "build.targets cannot be built with --remote" in capsys.readouterr().err
+
+
+def test_cmd_build_fails_on_large_context(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cli, "build_image", lambda image, context, dockerfile: pytest.fail("should not build"))
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "blob.bin").write_bytes(b"0" * (2 * 1024 * 1024))
+    args = SimpleNamespace(
+        image="img",
+        tag=None,
+        context=str(tmp_path),
+        dockerfile=None,
+        template=None,
+        context_warn_mb=1,
+        fail_on_large_context=True,
+    )
+    with pytest.raises(SystemExit):
+        cli.cmd_build(args)
+    err = capsys.readouterr().err
+    assert "data/blob.bin" in err
+    assert "threshold 1 MB" in err
+
+    # 0 is a threshold (report on any context), not "unset".
+    (tmp_path / "data" / "blob.bin").write_bytes(b"0")
+    args.context_warn_mb = 0
+    with pytest.raises(SystemExit):
+        cli.cmd_build(args)
+    assert "threshold 0 MB" in capsys.readouterr().err
+
+
+def test_cmd_build_template_params(tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "build_image", lambda image, context, dockerfile: None)
+    args = cli.build_parser().parse_args(
+        [
+            "build",
+            "--image",
+            "img",
+            "--context",
+            str(tmp_path),
+            "--template",
+            "gpu-cu128",
+            "--python-version",
+            "3.11",
+            "--pip-package",
+            "einops",
+            "--template-param",
+            "framework-index-url=https://example.invalid/simple",
+        ]
+    )
+    cli.cmd_build(args)
+    content = (tmp_path / "Dockerfile").read_text()
+    assert "python3.11 -m venv" in content
+    assert "einops" in content
+    assert "--index-url https://example.invalid/simple" in content
+
+
+def test_templates_add_strict_rejects_and_fix_stores(tmp_path, monkeypatch, capsys):
+    stored = {}
+    monkeypatch.setattr(cli.docker_templates, "add_template_text", lambda name, text: stored.update({name: text}))
+    src = tmp_path / "bad.Dockerfile"
+    src.write_text("FROM python:3.10\nCOPY . .\nRUN pip install torch\n")
+    with pytest.raises(SystemExit):
+        cli.main(["templates", "add", "bad", str(src), "--strict"])
+    assert "broad-copy-before-install" in capsys.readouterr().err
+    assert stored == {}
+    cli.main(["templates", "add", "bad", str(src), "--fix"])
+    assert stored["bad"].rstrip().endswith("COPY . .")
+    assert "--no-cache-dir" in stored["bad"]
+
+
+def test_run_local_uses_submit_config(tmp_path, monkeypatch):
+    conf = tmp_path / "jobber.yml"
+    conf.write_text(
+        "submit:\n"
+        "  image-uri: registry/img:latest\n"
+        "  entry-point: train.py\n"
+        "  params:\n"
+        "    epochs: 3\n"
+        "run-local:\n"
+        "  image-uri: local/img:dev\n"
+    )
+    ran = {}
+    import jobber.local_run as local_run
+
+    monkeypatch.setattr(local_run, "run_local", lambda local: ran.setdefault("cmd", local.cmd))
+    cli.main(["run-local", "--config", str(conf), "--cpu", "--workdir", str(tmp_path / "w"), "--param", "lr=0.1"])
+    cmd = ran["cmd"]
+    assert cmd[-7:] == ["local/img:dev", "python", "train.py", "--epochs", "3", "--lr", "0.1"]
+
+
+def test_submit_plan_prints_request_and_does_not_submit(tmp_path, monkeypatch, capsys):
+    import boto3
+    import jobber.sm_submit as sm_submit
+    from jobber import preflight
+
+    def fail_role():
+        raise preflight.PreflightError("role r does not exist")
+
+    monkeypatch.setattr(boto3, "Session", lambda region_name=None: SimpleNamespace(region_name=region_name))
+    monkeypatch.setattr(preflight, "aws_checks", lambda session, **kw: {"image": lambda: "found", "role": fail_role})
+    monkeypatch.setattr(sm_submit, "submit_job", lambda **kw: pytest.fail("--plan must not submit"))
+    (tmp_path / "train.py").write_text("")
+    argv = ["submit", "--plan", "--image-uri", "uri", "--role-arn", "arn", "--bucket", "b", "--source-dir", str(tmp_path), "--entry-point", "train.py"]
+    with pytest.raises(SystemExit):
+        cli.main(argv + ["--param", "epochs=2"])
+    out = capsys.readouterr()
+    assert "[ok  ] image" in out.out and "[fail] role" in out.out
+    assert "CreateTrainingJob request:" in out.out
+    assert '"epochs": "2"' in out.out
+    assert "Preflight failed: role" in out.err
+
+
+def test_submit_records_job_and_jobs_list(monkeypatch, capsys):
+    def fake_submit_job(on_created=None, **kwargs):
+        on_created("train-abc")
+        return "train-abc"
+
+    monkeypatch.setitem(sys.modules, "jobber.sm_submit", types.SimpleNamespace(submit_job=fake_submit_job))
+    cli.main(
+        [
+            "submit",
+            "--image-uri",
+            "123456789012.dkr.ecr.us-east-1.amazonaws.com/img@sha256:feed",
+            "--role-arn",
+            "arn",
+            "--bucket",
+            "b",
+            "--entry-point",
+            "train.py",
+            "--param",
+            "lr=0.1",
+        ]
+    )
+    capsys.readouterr()
+
+    cli.main(["jobs", "list", "--param", "lr=0.1"])
+    out = capsys.readouterr().out
+    assert "train-abc" in out and "lr=0.1" in out
+    cli.main(["jobs", "show", "train-abc"])
+    out = capsys.readouterr().out
+    assert "sha256:feed" in out and "s3://b/jobber-run/data" in out
+    with pytest.raises(SystemExit):
+        cli.main(["jobs", "show", "missing"])
+
+
+def test_submit_dedupe_policies(tmp_path, monkeypatch, capsys):
+    from jobber import job_registry
+
+    submitted = []
+
+    def fake_submit_job(on_created=None, **kwargs):
+        submitted.append(kwargs["hyperparameters"])
+        on_created(f"train-{len(submitted)}")
+        return f"train-{len(submitted)}"
+
+    monkeypatch.setitem(sys.modules, "jobber.sm_submit", types.SimpleNamespace(submit_job=fake_submit_job))
+    monkeypatch.setattr(job_registry, "_sagemaker_statuses", lambda jobs: {j.job_name: "InProgress" for j in jobs})
+    monkeypatch.setattr(job_registry, "remote_duplicates", lambda *a: [])
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "train.py").write_text("print('hi')\n")
+    argv = ["submit", "--image-uri", "img@sha256:aa", "--role-arn", "arn", "--bucket", "b", "--source-dir", str(src), "--entry-point", "train.py"]
+
+    cli.main(argv + ["--dedupe", "reuse"])
+    cli.main(argv + ["--dedupe", "reuse"])
+    assert len(submitted) == 1
+    assert "Identical job already exists: train-1 (running" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        cli.main(argv + ["--dedupe", "refuse"])
+    assert "Refusing to submit" in capsys.readouterr().err
+
+    cli.main(argv + ["--dedupe", "reuse", "--param", "lr=0.2"])
+    cli.main(argv)
+    assert len(submitted) == 3
+
+
+def test_plain_submit_skips_digest_and_code_hash(tmp_path, monkeypatch):
+    from jobber import job_registry, retry
+
+    monkeypatch.setitem(sys.modules, "jobber.sm_submit", types.SimpleNamespace(submit_job=lambda on_created=None, **kw: on_created("train-plain") or "train-plain"))
+    monkeypatch.setattr(job_registry, "source_hash", lambda source_dir: pytest.fail("plain submits must not hash the code"))
+    monkeypatch.setattr(retry, "session", lambda region=None: pytest.fail("no registry call"))
+    cli.main(["submit", "--image-uri", "123456789012.dkr.ecr.us-east-1.amazonaws.com/img:v1", "--role-arn", "arn", "--bucket", "b", "--source-dir", str(tmp_path), "--locality", "off"])
+    recorded = job_registry.get("train-plain")
+    assert recorded.image_digest is None and recorded.fingerprint is None and recorded.workload is None
+
+
+def test_submit_dedupe_finds_jobs_from_other_machines(tmp_path, monkeypatch, capsys):
+    from jobber import job_registry
+
+    created, stopped = [], []
+    remote = []
+
+    def fake_submit_job(on_created=None, tags=None, **kwargs):
+        created.append(tags)
+        name = f"train-{len(created)}"
+        # A concurrent submit created the same job a moment earlier.
+        remote[:] = [job_registry.JobRecord("aws", name, submitted_at=2, state="pending", fingerprint=tags["jobber-fingerprint"]),
+                     job_registry.JobRecord("aws", "train-other", submitted_at=1, state="running", fingerprint=tags["jobber-fingerprint"])]
+        on_created(name)
+        return name
+
+    monkeypatch.setitem(sys.modules, "jobber.sm_submit", types.SimpleNamespace(submit_job=fake_submit_job))
+    monkeypatch.setattr(job_registry, "remote_duplicates", lambda provider, fp, region=None, project=None: list(remote))
+    monkeypatch.setattr(job_registry, "stop_job", lambda provider, name, region=None: stopped.append(name))
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "train.py").write_text("print('hi')\n")
+    argv = ["submit", "--image-uri", "img@sha256:aa", "--role-arn", "arn", "--bucket", "b", "--source-dir", str(src), "--entry-point", "train.py", "--dedupe", "reuse"]
+
+    # Another runner's job, found only through its fingerprint tag.
+    remote[:] = [job_registry.JobRecord("aws", "train-ci-1", submitted_at=time.time(), state="running", fingerprint="x")]
+    cli.main(argv)
+    assert created == [] and "Identical job already exists: train-ci-1" in capsys.readouterr().out
+    assert job_registry.get("train-ci-1").state == "running"
+
+    # Two submits racing past the check: the later job stops itself.
+    remote.clear()
+    cli.main(argv)
+    assert created[0]["jobber-fingerprint"] and stopped == ["train-1"]
+    captured = capsys.readouterr()
+    assert "train-other was created first; stopping train-1" in captured.err
+    assert "Identical job already exists: train-other" in captured.out and "Submitted" not in captured.out
+    assert job_registry.get("train-1").state == "stopped"
+
+
+def test_logs_offline_serves_archive(capsys):
+    from jobber.log_archive import LogArchive, LogEvent
+
+    LogArchive.open("aws", "train-1").append([LogEvent(0, "train-1/algo-1", "epoch 1 loss=0.3"), LogEvent(1, "train-1/algo-1", "epoch 2")])
+    cli.main(["logs", "train-1", "--offline", "--grep", "loss"])
+    out = capsys.readouterr().out
+    assert "train-1/algo-1: epoch 1 loss=0.3" in out and "epoch 2" not in out
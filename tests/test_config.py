@@ -47,3 +47,45 @@ def test_resolve_provider():
     assert cfg.resolve_provider({}) == "aws"
     with pytest.raises(ValueError):
         cfg.resolve_provider({"provider": "azure"})
+
+
+def test_layered_configs_with_extends(tmp_path):
+    (tmp_path / "base.yml").write_text("submit:\n  bucket: b\n  instance-type: ml.m5.xlarge\n  params:\n    epochs: 10\n    aug: [flip]\n")
+    (tmp_path / "env").mkdir()
+    (tmp_path / "env" / "prod.yml").write_text("extends: ../base.yml\nsubmit:\n  bucket: prod\n  params:\n    aug: [crop]\n")
+    (tmp_path / "run.json").write_text('{"submit": {"params": {"lr": 0.01}}}')
+    conf = cfg.load_config([tmp_path / "env" / "prod.yml", tmp_path / "run.json"])
+    assert conf == {"submit": {"bucket": "prod", "instance_type": "ml.m5.xlarge", "params": {"epochs": 10, "aug": ["crop"], "lr": 0.01}}}
+
+
+def test_extends_errors(tmp_path):
+    (tmp_path / "a.yml").write_text("extends: b.yml\n")
+    (tmp_path / "b.yml").write_text("extends: [a.yml]\n")
+    with pytest.raises(ValueError, match="cycle"):
+        cfg.load_config(tmp_path / "a.yml")
+    (tmp_path / "c.yml").write_text("extends: missing.yml\n")
+    with pytest.raises(FileNotFoundError, match="missing.yml"):
+        cfg.load_config(tmp_path / "c.yml")
+
+
+def test_parsed_config_cache(tmp_path, monkeypatch):
+    base = tmp_path / "base.yml"
+    run = tmp_path / "run.yml"
+    base.write_text("submit:\n  bucket: b\n")
+    run.write_text("extends: base.yml\nsubmit:\n  prefix: p\n")
+    assert cfg.load_config(run) == {"submit": {"bucket": "b", "prefix": "p"}}
+
+    def no_yaml(text):
+        raise AssertionError("YAML parsed despite a cache hit")
+
+    monkeypatch.setattr(cfg.yaml, "safe_load", no_yaml)
+    assert cfg.load_config(run) == {"submit": {"bucket": "b", "prefix": "p"}}
+    monkeypatch.undo()
+
+    # A changed base (not part of the cache key) still invalidates the entry.
+    base.write_text("submit:\n  bucket: other\n")
+    assert cfg.load_config(run)["submit"]["bucket"] == "other"
+
+    monkeypatch.setenv("JOBBER_CONFIG_CACHE", "0")
+    base.write_text("submit:\n  bucket: third\n")
+    assert cfg.load_config(run)["submit"]["bucket"] == "third"
@@ -0,0 +1,102 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from jobber import daemon
+
+
+pytestmark = pytest.mark.skipif(not daemon.supported(), reason="needs Unix sockets and fork")
+
+
+@pytest.fixture
+def sock(monkeypatch):
+    # tmp_path can exceed the ~100 byte limit on Unix socket paths.
+    with tempfile.TemporaryDirectory(prefix="jd") as d:
+        path = Path(d) / "d.sock"
+        monkeypatch.setenv("JOBBER_DAEMON_SOCKET", str(path))
+        monkeypatch.delenv("JOBBER_NO_DAEMON", raising=False)
+        yield path
+
+
+def test_forward_without_daemon_runs_locally(sock):
+    assert daemon.forward(["templates", "list"]) is None
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(sock))
+    stale.close()  # bound but nobody listening
+    assert daemon.forward(["templates", "list"]) is None
+    assert daemon.request("status") is None
+
+
+def test_forward_is_disabled_by_env(sock, monkeypatch):
+    monkeypatch.setenv("JOBBER_NO_DAEMON", "1")
+    assert daemon.forward(["templates", "list"]) is None
+
+
+def test_auth_fingerprint_only_tracks_credential_env():
+    base = {"AWS_PROFILE": "dev", "PATH": "/bin"}
+    assert daemon.auth_fingerprint(base) == daemon.auth_fingerprint({**base, "PATH": "/usr/bin"})
+    assert daemon.auth_fingerprint(base) != daemon.auth_fingerprint({**base, "AWS_PROFILE": "prod"})
+
+
+def test_auth_fingerprint_tracks_credential_files(tmp_path):
+    env = {"HOME": str(tmp_path)}
+    (tmp_path / ".aws").mkdir()
+    before = daemon.auth_fingerprint(env)
+    (tmp_path / ".aws" / "credentials").write_text("[default]\n")
+    after_login = daemon.auth_fingerprint(env)
+    assert after_login != before
+    os.utime(tmp_path / ".aws" / "credentials", ns=(1, 1))
+    assert daemon.auth_fingerprint(env) != after_login
+    assert tmp_path / ".config" / "gcloud" / "application_default_credentials.json" in daemon.credential_files(env)
+
+
+def _start(code):
+    proc = subprocess.Popen([sys.executable, "-c", code], env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 20
+    while daemon.request("status") is None:
+        assert proc.poll() is None and time.time() < deadline
+        time.sleep(0.05)
+    return proc
+
+
+def test_daemon_running_other_code_is_bypassed(sock, capfd):
+    proc = _start("from jobber import daemon; daemon.build_id = lambda: {'package': '/old', 'version': '0.0.1', 'python': 'py'}; daemon.serve(preload=False)")
+    try:
+        assert daemon.forward(["templates", "list"]) is None
+        assert "runs jobber 0.0.1 from /old" in capfd.readouterr().err
+        assert daemon.request("status")["served"] == 0
+    finally:
+        daemon.request("stop")
+        proc.wait(timeout=10)
+
+
+def test_daemon_runs_forwarded_commands(sock, tmp_path, capfd, monkeypatch):
+    proc = _start("from jobber import daemon; daemon.serve(preload=False)")
+    try:
+        assert daemon.forward(["templates", "list"]) == 0
+        assert "gpu-cu121" in capfd.readouterr().out
+
+        # Runs in the caller's working directory.
+        (tmp_path / "run").mkdir()
+        monkeypatch.chdir(tmp_path / "run")
+        (tmp_path / "run" / "Dockerfile").write_text("FROM python:3.11-slim\nCOPY requirements.txt .\n")
+        assert daemon.forward(["templates", "lint", "--fix", "--file", "Dockerfile"]) == 0
+        assert "FROM python:3.11-slim" in capfd.readouterr().out
+
+        assert daemon.forward(["templates", "lint"]) == 1
+        assert "Pass a template name" in capfd.readouterr().err
+
+        status = daemon.request("status")
+        assert status["served"] == 3 and status["pid"] == proc.pid
+        assert daemon.request("stop") == {"stopping": proc.pid}
+        proc.wait(timeout=10)
+        assert not sock.exists()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
@@ -0,0 +1,60 @@
+from jobber import docker_templates
+from jobber import dockerfile_lint as lint
+
+
+BAD = """\
+# syntax=docker/dockerfile:1.6
+FROM nvidia/cuda:12.8.0-runtime-ubuntu22.04
+WORKDIR /app
+# code first (bad)
+COPY . .
+RUN apt-get update && apt-get install -y python3 python3-pip
+RUN python3 -m pip install torch torchvision
+RUN pip install -r requirements.txt
+"""
+
+
+def _rules(findings):
+    return {f.rule for f in findings}
+
+
+def test_lint_flags_cache_busting_patterns():
+    findings = lint.lint(BAD)
+    assert _rules(findings) == {
+        "broad-copy-before-install",
+        "apt-lists-in-layer",
+        "unpinned-install",
+        "pip-cache-in-layer",
+    }
+    broad = next(f for f in findings if f.rule == "broad-copy-before-install")
+    assert broad.line == 5
+    assert broad.cost_mb >= 2500
+    unpinned = next(f for f in findings if f.rule == "unpinned-install")
+    assert "torch" in unpinned.message
+    assert "GB" in lint.format_findings(findings)
+
+
+def test_fix_reorders_and_cleans():
+    fixed = lint.fix(BAD)
+    assert fixed.startswith("# syntax=docker/dockerfile:1.6\n")
+    assert fixed.index("COPY requirements.txt ./requirements.txt") < fixed.index("pip install --no-cache-dir -r requirements.txt")
+    assert fixed.rstrip().endswith("COPY . .")
+    assert "rm -rf /var/lib/apt/lists/*" in fixed
+    assert "# code first (bad)" in fixed
+    assert _rules(lint.lint(fixed)) == {"unpinned-install"}
+
+
+def test_cache_mounts_and_pins_are_clean():
+    text = """\
+FROM python:3.10-slim
+RUN --mount=type=cache,target=/var/lib/apt/lists apt-get update && apt-get install -y git
+RUN --mount=type=cache,target=/root/.cache/pip pip install --upgrade pip && pip install 'numpy<2' torch==2.2.0
+COPY --from=builder /opt/venv /opt/venv
+COPY . .
+"""
+    assert lint.lint(text) == []
+
+
+def test_builtin_templates_lint_clean():
+    for tmpl in docker_templates.list_templates():
+        assert lint.lint(tmpl.content) == [], tmpl.name
@@ -0,0 +1,79 @@
+import types
+
+from jobber import ecr_utils, exists_cache, sm_submit
+
+
+def test_remember_fresh_forget_and_ttl(monkeypatch):
+    assert not exists_cache.fresh("s3-bucket", "scope", "b")
+    exists_cache.remember("s3-bucket", "scope", "b")
+    assert exists_cache.fresh("s3-bucket", "scope", "b")
+    assert not exists_cache.fresh("s3-bucket", "other", "b")
+
+    now = exists_cache.time.time()
+    monkeypatch.setattr(exists_cache.time, "time", lambda: now + exists_cache.DEFAULT_TTL_SECONDS + 1)
+    assert not exists_cache.fresh("s3-bucket", "scope", "b")
+    monkeypatch.undo()
+
+    exists_cache.forget("s3-bucket", "scope", "b")
+    assert not exists_cache.fresh("s3-bucket", "scope", "b")
+
+
+def test_ttl_zero_disables(monkeypatch):
+    monkeypatch.setenv("JOBBER_EXISTS_TTL", "0")
+    exists_cache.remember("gar-repo", "p/r", "repo")
+    assert not exists_cache.fresh("gar-repo", "p/r", "repo")
+
+
+def test_forget_image_repo_parses_registry_uris():
+    exists_cache.remember("ecr-repo", "123456789012/us-east-1", "team/train")
+    exists_cache.remember("gar-repo", "proj/us-central1", "repo")
+    exists_cache.forget_image_repo("123456789012.dkr.ecr.us-east-1.amazonaws.com/team/train:v1")
+    exists_cache.forget_image_repo("us-central1-docker.pkg.dev/proj/repo/img@sha256:abc")
+    assert not exists_cache.fresh("ecr-repo", "123456789012/us-east-1", "team/train")
+    assert not exists_cache.fresh("gar-repo", "proj/us-central1", "repo")
+
+
+def test_ecr_ensure_repo_skips_describe_when_fresh():
+    calls = []
+    client = types.SimpleNamespace(
+        meta=types.SimpleNamespace(region_name="us-east-1"),
+        describe_repositories=lambda repositoryNames: calls.append(repositoryNames),
+    )
+    ecr_utils.ensure_repo(client, "repo", account_id="123")
+    ecr_utils.ensure_repo(client, "repo", account_id="123")
+    assert calls == [["repo"]]
+    ecr_utils.ensure_repo(client, "repo")  # no account: never cached
+    assert len(calls) == 2
+
+
+def test_submit_checks_cached_and_invalidated_on_stale_failure():
+    calls = []
+
+    class FakeS3:
+        meta = types.SimpleNamespace(region_name="us-east-1")
+
+        def head_bucket(self, Bucket):
+            calls.append("head")
+
+        def list_objects_v2(self, Bucket, Prefix, MaxKeys):
+            calls.append("list")
+            return {"KeyCount": 1}
+
+    session = types.SimpleNamespace(
+        region_name="us-east-1",
+        client=lambda name: FakeS3(),
+        get_credentials=lambda: types.SimpleNamespace(access_key="AKIA123"),
+    )
+    for _ in range(2):
+        sm_submit._ensure_bucket_exists(session, "b")
+        sm_submit._ensure_placeholder_data(session, "b", "p")
+    assert calls == ["head", "list"]
+
+    sm_submit._forget_if_stale(session, "b", "p", RuntimeError("training failed: user code error"))
+    sm_submit._ensure_bucket_exists(session, "b")
+    assert calls == ["head", "list"]
+
+    sm_submit._forget_if_stale(session, "b", "p", RuntimeError("ValidationException: No S3 objects found under S3 URL"))
+    sm_submit._ensure_bucket_exists(session, "b")
+    sm_submit._ensure_placeholder_data(session, "b", "p")
+    assert calls == ["head", "list", "head", "list"]
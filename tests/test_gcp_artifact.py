@@ -1,4 +1,5 @@
 import subprocess
+import types
 
 import jobber.gcp_artifact as gcp_artifact
 from jobber.gcp_artifact import ArtifactRef, configure_docker, push_image
@@ -11,47 +12,82 @@ def test_artifact_ref_formatting():
     assert ref.uri == "us-central1-docker.pkg.dev/proj/repo/img:t"
 
 
-def test_configure_docker(monkeypatch):
-    calls = []
+class NotFound(Exception):
+    pass
 
-    def fake_run(cmd, check):
-        calls.append((cmd, check))
 
-    monkeypatch.setattr(subprocess, "run", fake_run)
-    configure_docker("us-west1")
-    assert calls[0][0][:3] == ["gcloud", "auth", "configure-docker"]
-    assert "us-west1-docker.pkg.dev" in calls[0][0]
-    assert calls[0][1] is True
+class FakeArtifactClient:
+    def __init__(self, repos=()):
+        self.repos = set(repos)
+        self.created = []
 
+    def get_repository(self, name):
+        if name not in self.repos:
+            raise NotFound(name)
+        return types.SimpleNamespace(name=name)
 
-def test_ensure_repo_exists(monkeypatch):
+    def create_repository(self, parent, repository_id, repository):
+        self.created.append((parent, repository_id, repository))
+        return types.SimpleNamespace(result=lambda: None)
+
+
+class FakeRepository(dict):
+    Format = types.SimpleNamespace(DOCKER="DOCKER")
+
+    def __init__(self, **fields):
+        super().__init__(fields)
+
+
+def _fake_clients(monkeypatch, client):
+    monkeypatch.setattr(gcp_artifact.gcp_clients, "artifact_client", lambda: client)
+    monkeypatch.setattr(gcp_artifact.gcp_clients, "not_found_error", lambda: NotFound)
+    monkeypatch.setattr(gcp_artifact.gcp_clients, "artifact_types", lambda: types.SimpleNamespace(Repository=FakeRepository))
+
+
+def test_configure_docker(monkeypatch):
     calls = []
 
-    def fake_run(cmd, check, stdout=None, stderr=None):
-        calls.append(cmd)
-        # describe succeeds
-        if "describe" in cmd:
-            return
+    def fake_run(cmd, check, input=None, stdout=None):
+        calls.append((cmd, check, input))
 
+    now = [1000.0]
     monkeypatch.setattr(subprocess, "run", fake_run)
-    gcp_artifact.ensure_repo("proj", "us-central1", "repo")
-    assert "describe" in calls[0]
+    monkeypatch.setattr(gcp_artifact.time, "time", lambda: now[0])
+    monkeypatch.setattr(gcp_artifact.gcp_clients, "access_token_with_expiry", lambda min_seconds: ("tok", now[0] + 3600))
+    monkeypatch.setattr(gcp_artifact, "_logged_in", {})
+    configure_docker("us-west1")
+    configure_docker("us-west1")
     assert len(calls) == 1
+    cmd, check, data = calls[0]
+    assert cmd[:4] == ["docker", "login", "-u", "oauth2accesstoken"]
+    assert cmd[-1] == "https://us-west1-docker.pkg.dev"
+    assert data == b"tok" and check is True
 
+    # A long build later, the token docker holds is about to expire: log in again.
+    now[0] += 3600 - gcp_artifact.LOGIN_MARGIN_SECONDS + 1
+    configure_docker("us-west1")
+    assert len(calls) == 2
 
-def test_ensure_repo_creates(monkeypatch):
-    calls = []
 
-    def fake_run(cmd, check, stdout=None, stderr=None):
-        calls.append(cmd)
-        if "describe" in cmd:
-            raise subprocess.CalledProcessError(1, cmd)
+def test_ensure_repo_exists(monkeypatch):
+    client = FakeArtifactClient(repos={"projects/proj/locations/us-central1/repositories/repo"})
+    _fake_clients(monkeypatch, client)
+    gcp_artifact.ensure_repo("proj", "us-central1", "repo")
+    assert client.created == []
 
-    monkeypatch.setattr(subprocess, "run", fake_run)
+
+def test_ensure_repo_creates(monkeypatch):
+    client = FakeArtifactClient()
+    _fake_clients(monkeypatch, client)
     gcp_artifact.ensure_repo("proj", "us-central1", "repo", description="d")
-    assert "describe" in calls[0]
-    assert "create" in calls[1]
-    assert "--description=d" in calls[1]
+    parent, repo_id, repository = client.created[0]
+    assert parent == "projects/proj/locations/us-central1"
+    assert repo_id == "repo"
+    assert repository == {"format_": "DOCKER", "description": "d"}
+    # Confirmed repos are cached, so a second call does not hit the API.
+    client.created.clear()
+    monkeypatch.setattr(client, "get_repository", lambda name: (_ for _ in ()).throw(AssertionError("cached")))
+    gcp_artifact.ensure_repo("proj", "us-central1", "repo")
 
 
 def test_push_image(monkeypatch):
@@ -0,0 +1,79 @@
+import types
+
+import pytest
+
+from jobber import gcp_clients
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    gcp_clients.reset()
+    yield
+    gcp_clients.reset()
+
+
+def test_credentials_and_clients_are_shared(monkeypatch):
+    calls = {"default": 0, "storage": [], "refresh": 0}
+
+    class FakeCreds:
+        valid = False
+        token = None
+
+        def refresh(self, request):
+            calls["refresh"] += 1
+            self.valid, self.token = True, "tok"
+
+    creds = FakeCreds()
+
+    def fake_default(scopes):
+        calls["default"] += 1
+        return creds, "proj"
+
+    class FakeStorageClient:
+        def __init__(self, project, credentials):
+            calls["storage"].append((project, credentials))
+
+    modules = {
+        "google.auth": types.SimpleNamespace(default=fake_default),
+        "google.auth.transport.requests": types.SimpleNamespace(Request=object),
+        "google.cloud.storage": types.SimpleNamespace(Client=FakeStorageClient),
+    }
+    monkeypatch.setattr(gcp_clients, "_require", lambda module, package: modules[module])
+
+    first = gcp_clients.storage_client()
+    assert gcp_clients.storage_client() is first
+    assert gcp_clients.access_token() == "tok"
+    assert gcp_clients.access_token() == "tok"
+    assert calls == {"default": 1, "storage": [("proj", creds)], "refresh": 1}
+
+
+def test_missing_library_names_the_package():
+    with pytest.raises(ModuleNotFoundError, match="pip install google-cloud-artifact-registry"):
+        gcp_clients._require("jobber_no_such_module.artifactregistry_v1", "google-cloud-artifact-registry")
+    with pytest.raises(ModuleNotFoundError, match=r"pip install 'jobber\[logs\]'"):
+        gcp_clients._require("jobber_no_such_module.logging", "google-cloud-logging", extra="logs")
+
+
+def test_access_token_refreshes_when_too_close_to_expiry(monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    refreshed = []
+
+    class FakeCreds:
+        valid, token = True, "old"
+        expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(minutes=5)
+
+        def refresh(self, request):
+            refreshed.append(1)
+            self.token, self.expiry = "new", datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+
+    modules = {
+        "google.auth": types.SimpleNamespace(default=lambda scopes: (FakeCreds(), "proj")),
+        "google.auth.transport.requests": types.SimpleNamespace(Request=object),
+    }
+    monkeypatch.setattr(gcp_clients, "_require", lambda module, package: modules[module])
+
+    assert gcp_clients.access_token() == "old"
+    token, expiry = gcp_clients.access_token_with_expiry(min_seconds=600)
+    assert token == "new" and refreshed == [1]
+    assert expiry > datetime.now().timestamp() + 3000
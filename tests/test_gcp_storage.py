@@ -1,38 +1,56 @@
 import subprocess
+import types
 from pathlib import Path
 
 from jobber import gcp_storage
 
 
-def test_ensure_bucket_existing(monkeypatch):
-    calls = []
+class FakeBlob:
+    def __init__(self, bucket, key, store):
+        self.bucket, self.key, self.store = bucket, key, store
 
-    def fake_run(cmd, check=True, input=None):
-        calls.append(cmd)
-        if "ls" in cmd:
-            return
+    def exists(self):
+        return (self.bucket, self.key) in self.store
 
-    monkeypatch.setattr(subprocess, "run", fake_run)
-    gcp_storage.ensure_bucket("my-bucket", region="us-central1")
-    assert calls[0][:2] == ["gsutil", "ls"]
-    assert "gs://my-bucket" in calls[0]
-    # No mb since ls succeeded
-    assert len(calls) == 1
+    def upload_from_string(self, data):
+        self.store[(self.bucket, self.key)] = data
 
+    def upload_from_filename(self, path):
+        self.store[(self.bucket, self.key)] = Path(path).read_bytes()
 
-def test_ensure_bucket_create(monkeypatch):
-    calls = []
 
-    def fake_run(cmd, check=True, input=None):
-        calls.append(cmd)
-        if "ls" in cmd:
-            raise subprocess.CalledProcessError(1, cmd)
+class FakeStorageClient:
+    def __init__(self, buckets=()):
+        self.buckets = set(buckets)
+        self.store = {}
+        self.created = []
 
-    monkeypatch.setattr(subprocess, "run", fake_run)
+    def lookup_bucket(self, name):
+        return name if name in self.buckets else None
+
+    def create_bucket(self, name, location=None):
+        self.created.append((name, location))
+        self.buckets.add(name)
+
+    def bucket(self, name):
+        return types.SimpleNamespace(blob=lambda key: FakeBlob(name, key, self.store))
+
+    def list_blobs(self, bucket, prefix, max_results=None):
+        return [k for (b, k) in self.store if b == bucket and k.startswith(prefix)][:max_results]
+
+
+def test_ensure_bucket_existing(monkeypatch):
+    client = FakeStorageClient(buckets={"my-bucket"})
+    monkeypatch.setattr(gcp_storage.gcp_clients, "storage_client", lambda project=None: client)
     gcp_storage.ensure_bucket("my-bucket", region="us-central1")
-    assert calls[0][:2] == ["gsutil", "ls"]
-    assert calls[1][:2] == ["gsutil", "mb"]
-    assert "-l" in calls[1]
+    assert client.created == []
+
+
+def test_ensure_bucket_create(monkeypatch):
+    client = FakeStorageClient()
+    monkeypatch.setattr(gcp_storage.gcp_clients, "storage_client", lambda project=None: client)
+    gcp_storage.ensure_bucket("my-bucket", region="us-central1")
+    assert client.created == [("my-bucket", "us-central1")]
 
 
 def test_sync_local_to_gcs(monkeypatch, tmp_path):
@@ -49,15 +67,20 @@ def test_sync_local_to_gcs(monkeypatch, tmp_path):
     assert calls[0][-1] == "gs://bucket/prefix"
 
 
-def test_upload_placeholder(monkeypatch):
-    calls = []
-
-    def fake_run(cmd, check=True, input=None):
-        calls.append((cmd, input))
-
-    monkeypatch.setattr(subprocess, "run", fake_run)
+def test_upload_placeholder_and_has_objects(monkeypatch):
+    client = FakeStorageClient(buckets={"b"})
+    monkeypatch.setattr(gcp_storage.gcp_clients, "storage_client", lambda project=None: client)
+    assert not gcp_storage.has_objects("b", "p/data/")
     gcp_storage.upload_placeholder("b", "p")
-    cmd, data = calls[0]
-    assert cmd[:2] == ["gsutil", "cp"]
-    assert cmd[-1] == "gs://b/p/data/placeholder.txt"
-    assert data == b"placeholder"
+    assert client.store == {("b", "p/data/placeholder.txt"): b"placeholder"}
+    assert gcp_storage.has_objects("b", "p/data/")
+
+
+def test_upload_file_skips_existing(monkeypatch, tmp_path):
+    client = FakeStorageClient(buckets={"b"})
+    monkeypatch.setattr(gcp_storage.gcp_clients, "storage_client", lambda project=None: client)
+    f = tmp_path / "ctx.tar.gz"
+    f.write_bytes(b"abc")
+    assert gcp_storage.upload_file("b", "context/x.tar.gz", f, skip_existing=True) is True
+    assert gcp_storage.upload_file("b", "context/x.tar.gz", f, skip_existing=True) is False
+    assert client.store[("b", "context/x.tar.gz")] == b"abc"
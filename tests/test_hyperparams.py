@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from jobber import hyperparams
+
+
+def test_infer_value_is_lossless():
+    assert hyperparams.infer_value("5") == 5
+    assert hyperparams.infer_value("0.1") == 0.1
+    assert hyperparams.infer_value("true") is True
+    assert hyperparams.infer_value("[1, 2]") == [1, 2]
+    assert hyperparams.infer_value('{"a": 1}') == {"a": 1}
+    for text in ("007", "1e-3", "1.50", "True", "[oops", "resnet50"):
+        assert hyperparams.infer_value(text) == text
+    # JSON is parsed, so its text is normalised on the way out.
+    assert hyperparams.encode_value(hyperparams.infer_value('{"b": [1, 2], "a": 1}')) == '{"a":1,"b":[1,2]}'
+
+
+def test_parse_param_types(tmp_path):
+    arch = tmp_path / "arch.yaml"
+    arch.write_text("layers:\n  - 64\n  - 128\n")
+    assert hyperparams.parse_param("lr:float=1e-3") == ("lr", 0.001)
+    assert hyperparams.parse_param("seed:str=007") == ("seed", "007")
+    assert hyperparams.parse_param("aug:list=flip,crop,90") == ("aug", ["flip", "crop", 90])
+    assert hyperparams.parse_param("amp:bool=yes") == ("amp", True)
+    assert hyperparams.parse_param(f"model:json=@{arch}") == ("model", {"layers": [64, 128]})
+    assert hyperparams.parse_param("url=http://x/?a=b") == ("url", "http://x/?a=b")
+    for bad in ("noequals", "n:int=five", "x:tuple=1", "=1"):
+        with pytest.raises(ValueError):
+            hyperparams.parse_param(bad)
+
+
+def test_encoding_is_stable():
+    a = hyperparams.encode({"b": {"y": 1, "x": [True, None]}, "a": "text"})
+    b = hyperparams.encode({"a": "text", "b": {"x": [True, None], "y": 1}})
+    assert a.inline == b.inline == {"a": "text", "b": '{"x":[true,null],"y":1}'}
+    assert list(a.inline) == ["a", "b"]
+    assert not a.spilled
+
+
+def test_large_values_spill_largest_first():
+    params = {"epochs": 3, "model": {"layers": list(range(2000))}, "aug": ["flip"] * 10}
+    encoded = hyperparams.encode(params)
+    assert encoded.inline == {"aug": json.dumps(["flip"] * 10, separators=(",", ":")), "epochs": "3"}
+    assert json.loads(encoded.document) == {"model": params["model"]}
+    assert encoded.config_key("p/") == f"p/config/{encoded.digest}/hyperparameters.json"
+    assert encoded.with_config_path("/cfg.json")["jobber-config"] == "/cfg.json"
+    # Same content, same object: re-submits reuse the uploaded file.
+    assert hyperparams.encode(dict(reversed(list(params.items())))).digest == encoded.digest
+
+
+def test_too_many_params_spill():
+    encoded = hyperparams.encode({f"p{i:03d}": i for i in range(150)})
+    assert len(encoded.inline) + 1 <= hyperparams.MAX_PARAMS
+    assert len(encoded.inline) + len(encoded.spilled) == 150
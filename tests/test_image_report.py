@@ -0,0 +1,42 @@
+import json
+import subprocess
+
+import pytest
+
+from jobber import image_report
+
+
+def test_image_size_prefers_registry_manifest(monkeypatch):
+    manifest = [
+        {"Descriptor": {"platform": {"os": "linux", "architecture": "arm64"}}, "SchemaV2Manifest": {"layers": [{"size": 1}]}},
+        {
+            "Descriptor": {"platform": {"os": "linux", "architecture": "amd64"}},
+            "SchemaV2Manifest": {"layers": [{"size": 1_000_000_000}, {"size": 500_000_000}]},
+        },
+    ]
+    monkeypatch.setattr(image_report, "capture", lambda cmd: json.dumps(manifest))
+    size = image_report.image_size("reg/img:t")
+    assert size.source == "registry"
+    assert size.bytes == 1_500_000_000
+    assert size.layers == 2
+    assert size.pull_seconds(1000) == pytest.approx(12.0)
+
+
+def test_image_size_falls_back_to_local(monkeypatch):
+    def fake_capture(cmd):
+        if cmd[:2] == ["docker", "manifest"]:
+            raise subprocess.CalledProcessError(1, cmd)
+        return "2000000000 12\n"
+
+    monkeypatch.setattr(image_report, "capture", fake_capture)
+    size = image_report.image_size("local:t")
+    assert size.source == "local"
+    assert size.bytes == 2_000_000_000
+
+
+def test_compare_reports_savings():
+    fat = image_report.ImageSize(ref="fat", bytes=8_000_000_000, source="registry", layers=10)
+    slim = image_report.ImageSize(ref="slim", bytes=4_000_000_000, source="registry", layers=6)
+    text = image_report.compare([fat, slim], mbps=1000)
+    assert "saves 32.0s (50% smaller)" in text
+    assert "*" not in text
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from jobber import job_metrics
+from jobber.job_registry import JobRecord
+
+
+class FakeSession:
+    def __init__(self, **clients):
+        self.clients = clients
+
+    def client(self, name, region_name=None):
+        return self.clients[name]
+
+
+def _paginator(pages):
+    return SimpleNamespace(paginate=lambda **kw: pages(kw))
+
+
+def test_sagemaker_metrics():
+    start = datetime(2024, 1, 1, 12, 0)
+    queries = {}
+
+    class FakeSM:
+        def describe_training_job(self, TrainingJobName):
+            return {
+                "TrainingStartTime": start,
+                "TrainingEndTime": start + timedelta(minutes=30),
+                "BillableTimeInSeconds": 1850,
+                "ResourceConfig": {"InstanceCount": 2},
+                "FinalMetricDataList": [{"MetricName": "val_loss", "Value": 0.25}],
+            }
+
+    def metric_pages(kw):
+        queries["q"] = kw["MetricDataQueries"]
+        results = [{"Id": q["Id"], "Values": [50.0, 70.0] if q["Id"].startswith("m2") else []} for q in kw["MetricDataQueries"]]
+        return [{"MetricDataResults": results}]
+
+    cloudwatch = SimpleNamespace(get_paginator=lambda name: _paginator(metric_pages))
+    logs = SimpleNamespace(
+        get_paginator=lambda name: _paginator(lambda kw: [{"events": [{"message": "step 10 images_per_sec=800"}, {"message": "images_per_sec: 900.0"}]}])
+    )
+    session = FakeSession(sagemaker=FakeSM(), cloudwatch=cloudwatch, logs=logs)
+
+    duration, metrics = job_metrics.sagemaker_metrics(JobRecord(provider="aws", job_name="j"), boto_session=session)
+    assert duration == 1800
+    assert metrics == {"billable_seconds": 1850.0, "val_loss": 0.25, "gpu_util": 60.0, "images_per_sec": 850.0}
+    hosts = {q["MetricStat"]["Metric"]["Dimensions"][0]["Value"] for q in queries["q"]}
+    assert hosts == {"j/algo-1", "j/algo-2"}
@@ -0,0 +1,177 @@
+import time
+
+from jobber import job_registry
+
+
+def _job(name, provider="aws", **kw):
+    return job_registry.JobRecord(provider=provider, job_name=name, **kw)
+
+
+def test_record_get_and_upsert():
+    conn = job_registry.connect()
+    job_registry.record(_job("train-1", hyperparameters={"lr": "0.1"}, instance_type="ml.g5.xlarge"), conn=conn)
+    job_registry.record(_job("train-1", hyperparameters={"lr": "0.2"}, instance_type="ml.g5.xlarge"), conn=conn)
+    job_registry.record(_job("projects/p/locations/us-central1/customJobs/42", provider="gcp"), conn=conn)
+
+    assert job_registry.get("train-1", conn=conn).hyperparameters == {"lr": "0.2"}
+    assert job_registry.get("42", conn=conn).provider == "gcp"
+    assert job_registry.get("nope", conn=conn) is None
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(job_registry.MIGRATIONS)
+
+
+def test_list_filters():
+    conn = job_registry.connect()
+    now = time.time()
+    job_registry.record(_job("old", submitted_at=now - 10 * 86400, hyperparameters={"lr": "0.1"}), conn=conn)
+    job_registry.record(_job("new-a", submitted_at=now - 60, hyperparameters={"lr": "0.1", "epochs": "3"}), conn=conn)
+    job_registry.record(_job("new-b", submitted_at=now, hyperparameters={"lr": "0.2"}, state="failed"), conn=conn)
+    job_registry.record(_job("vtx", provider="gcp", submitted_at=now), conn=conn)
+
+    names = lambda **kw: [j.job_name for j in job_registry.list_jobs(conn=conn, **kw)]
+    assert names(provider="aws") == ["new-b", "new-a", "old"]
+    assert set(names(since=job_registry.parse_since("7d"))) == {"new-b", "vtx", "new-a"}
+    assert names(params={"lr": "0.1"}) == ["new-a", "old"]
+    assert names(params={"lr": "0.1", "epochs": "3"}) == ["new-a"]
+    assert names(state="failed") == ["new-b"]
+    assert names(name="new", limit=1) == ["new-b"]
+
+
+def test_name_lookups_treat_wildcards_literally():
+    conn = job_registry.connect()
+    job_registry.record(_job("train_50pct-1", submitted_at=1), conn=conn)
+    job_registry.record(_job("trainX50pct-2", submitted_at=2), conn=conn)
+    job_registry.record(_job("projects/p/locations/l/customJobs/7", provider="gcp", submitted_at=3), conn=conn)
+
+    names = lambda **kw: [j.job_name for j in job_registry.list_jobs(conn=conn, **kw)]
+    assert names(name="train_") == ["train_50pct-1"]
+    assert names(name="%") == []
+    assert job_registry.get("train_", conn=conn).job_name == "train_50pct-1"
+    assert job_registry.get("%", conn=conn) is None
+    assert job_registry.get("7", conn=conn).provider == "gcp"
+
+
+def test_refresh_queries_only_non_terminal_jobs():
+    conn = job_registry.connect()
+    job_registry.record(_job("done", state="succeeded"), conn=conn)
+    job_registry.record(_job("running"), conn=conn)
+    job_registry.record(_job("projects/p/locations/europe-west4/customJobs/7", provider="gcp"), conn=conn)
+    asked = {}
+
+    def fake_aws(jobs):
+        asked["aws"] = [j.job_name for j in jobs]
+        return {"running": "Completed"}
+
+    def fake_gcp(jobs):
+        asked["gcp"] = [j.job_name for j in jobs]
+        return {jobs[0].job_name: "JOB_STATE_RUNNING"}
+
+    changed = job_registry.refresh(conn, fetchers={"aws": fake_aws, "gcp": fake_gcp})
+    assert asked == {"aws": ["running"], "gcp": ["projects/p/locations/europe-west4/customJobs/7"]}
+    assert sorted((j.job_name, j.state) for j in changed) == [
+        ("projects/p/locations/europe-west4/customJobs/7", "running"),
+        ("running", "succeeded"),
+    ]
+    assert job_registry.get("running", conn=conn).status == "Completed"
+
+    asked.clear()
+    job_registry.refresh(conn, fetchers={"aws": fake_aws, "gcp": fake_gcp})
+    assert "aws" not in asked
+
+
+def test_parse_since_and_digest_shortcut():
+    assert abs(job_registry.parse_since("12h") - (time.time() - 12 * 3600)) < 5
+    assert job_registry.parse_since("2024-01-02") < time.time()
+    assert job_registry.image_digest("aws", "repo@sha256:abc") == "sha256:abc"
+    assert job_registry.image_digest("aws", "docker.io/library/python:3.11") is None
+
+
+def test_fingerprint_tracks_code_and_inputs(tmp_path):
+    (tmp_path / "train.py").write_text("print(1)\n")
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "train.cpython-311.pyc").write_bytes(b"x")
+    job = _job("", image_uri="img:v1", image_digest="sha256:aa", hyperparameters={"lr": "0.1"}, instance_type="ml.g5.xlarge")
+    base = job_registry.fingerprint(job, job_registry.source_hash(str(tmp_path)))
+
+    (tmp_path / "__pycache__" / "train.cpython-311.pyc").write_bytes(b"y")
+    assert job_registry.fingerprint(job, job_registry.source_hash(str(tmp_path))) == base
+    assert job_registry.fingerprint(_job("", image_uri="img:v1", image_digest="sha256:bb", hyperparameters={"lr": "0.1"}, instance_type="ml.g5.xlarge")) != base
+    (tmp_path / "train.py").write_text("print(2)\n")
+    assert job_registry.fingerprint(job, job_registry.source_hash(str(tmp_path))) != base
+
+
+def test_find_duplicate_refreshes_open_jobs_and_honours_window():
+    conn = job_registry.connect()
+    now = time.time()
+    job_registry.record(_job("old-ok", state="succeeded", submitted_at=now - 3 * 86400, fingerprint="fp"), conn=conn)
+    job_registry.record(_job("open", submitted_at=now - 60, fingerprint="fp"), conn=conn)
+    job_registry.record(_job("other", fingerprint="zz"), conn=conn)
+    statuses = {"open": "InProgress"}
+    fetchers = {"aws": lambda jobs: {j.job_name: statuses[j.job_name] for j in jobs}}
+
+    assert job_registry.find_duplicate("fp", conn=conn, fetchers=fetchers).job_name == "open"
+    statuses["open"] = "Failed"
+    assert job_registry.find_duplicate("fp", conn=conn, fetchers=fetchers) is None
+    assert job_registry.find_duplicate("fp", window="7d", conn=conn, fetchers=fetchers).job_name == "old-ok"
+
+
+def test_sagemaker_statuses_list_from_utc_creation_time(monkeypatch):
+    import types
+    from datetime import datetime, timezone
+
+    from jobber import retry
+
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    time.tzset()
+    seen = {}
+
+    class FakePaginator:
+        def paginate(self, CreationTimeAfter):
+            seen["after"] = CreationTimeAfter
+            return [{"TrainingJobSummaries": [{"TrainingJobName": "train-1", "TrainingJobStatus": "InProgress"}]}]
+
+    sm = types.SimpleNamespace(get_paginator=lambda name: FakePaginator())
+    monkeypatch.setattr(retry, "session", lambda region=None: types.SimpleNamespace(client=lambda name: sm))
+    try:
+        statuses = job_registry._sagemaker_statuses([_job("train-1", region="us-east-1", submitted_at=1_700_000_000)])
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+    assert statuses == {"train-1": "InProgress"}
+    assert seen["after"] == datetime(2023, 11, 14, 21, 13, 20, tzinfo=timezone.utc)
+    assert seen["after"].utcoffset().total_seconds() == 0
+
+
+def test_find_remote_duplicate_searches_fingerprint_tag(monkeypatch):
+    import types
+    from datetime import datetime, timezone
+
+    from jobber import retry
+
+    now = time.time()
+    searches = []
+
+    def search(**kwargs):
+        searches.append(kwargs["SearchExpression"]["Filters"])
+        return {
+            "Results": [
+                {"TrainingJob": {"TrainingJobName": "train-new", "TrainingJobStatus": "Failed", "CreationTime": datetime.fromtimestamp(now - 60, timezone.utc)}},
+                {
+                    "TrainingJob": {
+                        "TrainingJobName": "train-old",
+                        "TrainingJobStatus": "Completed",
+                        "CreationTime": datetime.fromtimestamp(now - 3600, timezone.utc),
+                        "OutputDataConfig": {"S3OutputPath": "s3://b/p/outputs"},
+                    }
+                },
+            ]
+        }
+
+    sm = types.SimpleNamespace(search=search)
+    monkeypatch.setattr(retry, "session", lambda region=None: types.SimpleNamespace(client=lambda name: sm, region_name="us-east-1"))
+    conn = job_registry.connect()
+
+    found = job_registry.find_remote_duplicate("aws", "fp1", "24h", conn=conn)
+    assert searches[0] == [{"Name": "Tags.jobber-fingerprint", "Operator": "Equals", "Value": "fp1"}]
+    assert (found.job_name, found.state, found.output_uri) == ("train-old", "succeeded", "s3://b/p/outputs")
+    assert job_registry.get("train-old", conn=conn).fingerprint == "fp1"
+    assert job_registry.find_remote_duplicate("aws", "fp1", "30m", conn=conn) is None
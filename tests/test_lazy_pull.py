@@ -0,0 +1,33 @@
+import pytest
+
+from jobber import lazy_pull
+
+URI = "123456789012.dkr.ecr.us-east-1.amazonaws.com/train:cu121"
+
+
+def test_variant_ref_and_format():
+    assert lazy_pull.variant_ref(URI, "soci") == URI + "-soci"
+    assert lazy_pull.variant_ref("localhost:5000/train", "estargz") == "localhost:5000/train:latest-estargz"
+    assert lazy_pull.resolve_format("auto", "aws") == "soci"
+    assert lazy_pull.resolve_format("auto", "gcp") == "estargz"
+    with pytest.raises(ValueError, match="ECR"):
+        lazy_pull.resolve_format("soci", "gcp")
+
+
+def test_publish_soci_keeps_credentials_off_argv(monkeypatch):
+    ran = []
+    monkeypatch.setattr(lazy_pull.subprocess, "run", lambda cmd, **kw: ran.append(cmd))
+    assert lazy_pull.publish(URI, "soci") == URI + "-soci"
+    assert ran == [["nerdctl", "pull", URI], ["soci", "convert", URI, URI + "-soci"], ["nerdctl", "push", URI + "-soci"]]
+    assert not any("--user" in cmd for cmd in ran)
+
+
+def test_publish_estargz_rebuilds_from_pushed_image(monkeypatch):
+    ran = []
+    monkeypatch.setattr(lazy_pull.subprocess, "run", lambda cmd, **kw: ran.append((cmd, kw.get("input"))))
+    uri = "us-central1-docker.pkg.dev/p/r/train:cu121"
+    assert lazy_pull.publish(uri, "estargz") == uri + "-estargz"
+    cmd, stdin = ran[0]
+    assert stdin == f"FROM {uri}\n"
+    output = cmd[cmd.index("--output") + 1]
+    assert f"name={uri}-estargz" in output and "compression=estargz" in output and "push=true" in output
@@ -0,0 +1,84 @@
+import json
+import sys
+import types
+
+from jobber import local_run
+
+
+def _env(cmd):
+    return dict(cmd[i + 1].split("=", 1) for i, tok in enumerate(cmd) if tok == "-e")
+
+
+def _mounts(cmd):
+    return [cmd[i + 1] for i, tok in enumerate(cmd) if tok == "-v"]
+
+
+def test_prepare_sagemaker_layout(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_run.shutil, "which", lambda name: "/usr/bin/nvidia-smi")
+    data = tmp_path / "data"
+    (data / "sub").mkdir(parents=True)
+    for i in range(3):
+        (data / "sub" / f"f{i}.txt").write_text(str(i))
+    src = tmp_path / "code"
+    src.mkdir()
+    local = local_run.prepare_sagemaker(
+        image="img:t",
+        entry_point="train.py",
+        source_dir=str(src),
+        hyperparameters={"epochs": 1, "batch-size": "4"},
+        data_dir=str(data),
+        workdir=tmp_path / "work",
+        sample=2,
+    )
+    cmd = local.cmd
+    assert cmd[:3] == ["docker", "run", "--rm"]
+    assert "--gpus" in cmd
+    hps = json.loads((tmp_path / "work" / "input" / "config" / "hyperparameters.json").read_text())
+    assert hps == {"epochs": "1", "batch-size": "4"}
+    sample_dir = tmp_path / "work" / "data-sample"
+    assert sorted(p.name for p in sample_dir.rglob("*.txt")) == ["f0.txt", "f1.txt"]
+    assert f"{sample_dir}:/opt/ml/input/data/train:ro" in _mounts(cmd)
+    assert f"{local.model_dir}:/opt/ml/model" in _mounts(cmd)
+    env = _env(cmd)
+    assert env["SM_CHANNEL_TRAIN"] == "/opt/ml/input/data/train"
+    assert env["SM_HP_BATCH_SIZE"] == "4"
+    assert env["SM_NUM_GPUS"] == "1"
+    assert cmd[-7:] == ["img:t", "python", "train.py", "--epochs", "1", "--batch-size", "4"]
+
+
+def test_prepare_sagemaker_cpu_offline(tmp_path):
+    local = local_run.prepare_sagemaker(
+        image="img",
+        entry_point="train.py",
+        source_dir=None,
+        hyperparameters={},
+        data_dir=None,
+        workdir=tmp_path,
+        cpu_only=True,
+        offline=True,
+    )
+    assert "--gpus" not in local.cmd
+    assert ["--network", "none"] == local.cmd[3:5]
+    assert _env(local.cmd)["CUDA_VISIBLE_DEVICES"] == ""
+
+
+def test_prepare_vertex_uses_vertex_args(tmp_path, monkeypatch):
+    fake = types.SimpleNamespace(build_args=lambda args: ["--lr", str(args["lr"])])
+    monkeypatch.setitem(sys.modules, "jobber.vertex_submit", fake)
+    data = tmp_path / "data"
+    data.mkdir()
+    local = local_run.prepare_vertex(
+        image="img",
+        entry_point="train.py",
+        source_dir=None,
+        args={"lr": 0.1},
+        data_dir=str(data),
+        workdir=tmp_path / "w",
+        bucket="b",
+        prefix="p",
+        cpu_only=True,
+    )
+    env = _env(local.cmd)
+    assert env["AIP_MODEL_DIR"] == "/gcs/b/p/outputs/model/"
+    assert f"{data}:/gcs/b/p/data:ro" in _mounts(local.cmd)
+    assert local.cmd[-5:] == ["img", "python", "train.py", "--lr", "0.1"]
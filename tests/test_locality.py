@@ -0,0 +1,91 @@
+import types
+
+import pytest
+from botocore.exceptions import ClientError
+
+from jobber import gcp_clients, locality, push_targets, s3_utils
+
+
+class FakeS3:
+    def __init__(self, regions):
+        self.regions = regions
+
+    def head_bucket(self, Bucket):
+        region = self.regions.get(Bucket)
+        if region is None:
+            raise ClientError({"Error": {"Code": "404"}, "ResponseMetadata": {"HTTPHeaders": {}}}, "HeadBucket")
+        if Bucket.startswith("foreign"):
+            # Buckets we cannot read still report their region.
+            raise ClientError({"Error": {"Code": "403"}, "ResponseMetadata": {"HTTPHeaders": {"x-amz-bucket-region": region}}}, "HeadBucket")
+        return {"BucketRegion": region}
+
+
+def fake_session(regions):
+    return types.SimpleNamespace(client=lambda name: FakeS3(regions), region_name="us-east-1")
+
+
+def test_same_region_accepts_covering_multi_regions():
+    assert locality.same_region("us-central1", "us-central1")
+    assert locality.same_region("US", "us-central1")
+    assert locality.same_region("europe", "europe-west4")
+    assert locality.same_region("nam4", "us-east1")
+    assert not locality.same_region("eu", "us-central1")
+    assert not locality.same_region("eu-west-1", "us-east-1")
+
+
+def test_aws_placements_report_remote_image_and_bucket():
+    session = fake_session({"data": "eu-west-1", "foreign-data": "us-west-2", "local": "us-east-1"})
+    image = "123456789012.dkr.ecr.us-west-2.amazonaws.com/train:v1"
+    found = locality.placements("aws", image, "data", session)
+    assert [(p.what, p.region) for p in found] == [("image", "us-west-2"), ("data+outputs", "eu-west-1")]
+    assert len(locality.mismatches(found, "us-east-1")) == 2
+    report = locality.format_report(found, "us-east-1")
+    assert "REMOTE image" in report and "s3://data [eu-west-1]" in report
+
+    assert locality.placements("aws", image, "foreign-data", session)[1].region == "us-west-2"
+    missing = locality.placements("aws", "ghcr.io/org/train:v1", "new-bucket", session)
+    assert locality.mismatches(missing, "us-east-1") == []
+    assert "not checked" in missing[0].note and "creates it" in missing[1].note
+
+
+def test_gcp_placements_treat_multi_region_bucket_as_local(monkeypatch):
+    buckets = {"b": types.SimpleNamespace(location="US")}
+    monkeypatch.setattr(gcp_clients, "storage_client", lambda project=None: types.SimpleNamespace(lookup_bucket=buckets.get))
+    found = locality.placements("gcp", "europe-west4-docker.pkg.dev/p/r/img:tag", "b")
+    assert [p.region for p in found] == ["europe-west4", "us"]
+    assert [p.what for p in locality.mismatches(found, "us-central1")] == ["image"]
+    assert "[us (multi-region)]" in locality.format_report(found, "us-central1")
+    assert locality.replica_image_uri("gcp", found[0].uri, "us-central1") == "us-central1-docker.pkg.dev/p/r/img:tag"
+
+
+def test_replicate_data_syncs_bucket_to_bucket(monkeypatch):
+    ran, ensured = [], []
+    monkeypatch.setattr(locality.retry, "session", lambda region=None: f"session-{region}")
+    monkeypatch.setattr(s3_utils, "ensure_bucket", lambda bucket, boto_session=None: ensured.append((bucket, boto_session)))
+    monkeypatch.setattr(s3_utils, "run", ran.append)
+    locality.replicate_data("aws", "data", "runs/a/", "eu-west-1", "data-us-east-1", "us-east-1")
+    assert ensured == [("data-us-east-1", "session-us-east-1")]
+    assert ran == [["aws", "s3", "sync", "s3://data/runs/a/data", "s3://data-us-east-1/runs/a/data", "--source-region", "eu-west-1", "--region", "us-east-1"]]
+    with pytest.raises(ValueError, match="--replica-bucket"):
+        locality.replica_bucket("b" * 50, "ap-southeast-1")
+
+
+def test_replicate_image_skips_copy_when_digest_matches(monkeypatch):
+    from jobber import ecr_utils
+
+    digests = {"us-west-2": "sha256:aa", "us-east-1": "sha256:aa"}
+    copies, logins = [], []
+    monkeypatch.setattr(ecr_utils, "describe_image", lambda session, uri: {"imageDigest": digests[ecr_utils.parse_image_uri(uri)[1]]})
+    monkeypatch.setattr(ecr_utils, "ensure_repo", lambda *a, **k: None)
+    monkeypatch.setattr(ecr_utils, "ecr_login", lambda info: logins.append(info.region))
+    monkeypatch.setattr(push_targets, "copy_image", lambda src, dst: copies.append((src, dst)))
+    monkeypatch.setattr(locality.retry, "session", lambda region=None: types.SimpleNamespace(client=lambda name: None))
+    image = "123456789012.dkr.ecr.us-west-2.amazonaws.com/train:v1"
+    target = "123456789012.dkr.ecr.us-east-1.amazonaws.com/train:v1"
+
+    assert locality.replicate_image("aws", image, "us-east-1") == target
+    assert copies == [] and logins == []
+
+    digests["us-east-1"] = "sha256:bb"
+    assert locality.replicate_image("aws", image, "us-east-1") == target
+    assert copies == [(image, target)] and logins == ["us-west-2", "us-east-1"]
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from jobber import log_archive
+from jobber.log_archive import LogArchive, LogEvent
+
+
+def test_append_read_filters_and_rotation(monkeypatch):
+    monkeypatch.setattr(log_archive, "CHUNK_EVENTS", 3)
+    archive = LogArchive.open("aws", "job-1")
+    archive.append([LogEvent(2000, "job-1/algo-1", "loss=0.5"), LogEvent(1000, "job-1/algo-1", "start")], {"job-1/algo-1": "t1"})
+    archive.append([LogEvent(3000, "job-1/algo-2", "loss=0.4")], {"job-1/algo-2": "t2"})
+    archive.append([LogEvent(9000, "job-1/algo-1", "done")])
+
+    reopened = LogArchive.open("aws", "job-1")
+    assert [c.events for c in reopened.chunks] == [3, 1]
+    assert reopened.cursors == {"job-1/algo-1": "t1", "job-1/algo-2": "t2"}
+    assert [e.message for e in reopened.events()] == ["start", "loss=0.5", "loss=0.4", "done"]
+    assert [e.message for e in reopened.events(grep=r"loss=0\.4")] == ["loss=0.4"]
+    assert [e.message for e in reopened.events(since=2500)] == ["loss=0.4", "done"]
+    assert [e.message for e in reopened.events(stream="algo-2")] == ["loss=0.4"]
+
+
+def test_interrupted_append_is_truncated():
+    archive = LogArchive.open("aws", "job-2")
+    archive.append([LogEvent(1, "s", "kept")], {"s": "t1"})
+    # Simulate a crash after writing events but before the index update.
+    with open(archive.root / archive.chunks[-1].file, "ab") as fh:
+        fh.write(b"partial gzip garbage")
+    reopened = LogArchive.open("aws", "job-2")
+    assert [e.message for e in reopened.events()] == ["kept"]
+    assert reopened.cursors == {"s": "t1"}
+
+
+class FakeLogs:
+    def __init__(self, pages):
+        self.pages = pages  # token -> (events, next token)
+        self.calls = []
+
+    def get_paginator(self, name):
+        return SimpleNamespace(paginate=lambda **kw: [{"logStreams": [{"logStreamName": "job/algo-1"}]}])
+
+    def get_log_events(self, logGroupName, logStreamName, startFromHead, nextToken=None):
+        self.calls.append(nextToken)
+        events, token = self.pages[nextToken]
+        return {"events": [{"timestamp": t, "message": m} for t, m in events], "nextForwardToken": token}
+
+
+class FakeSession:
+    def __init__(self, logs, status, ended_minutes_ago=None):
+        end = datetime.now(timezone.utc) - timedelta(minutes=ended_minutes_ago) if ended_minutes_ago is not None else None
+        self.clients = {
+            "logs": logs,
+            "sagemaker": SimpleNamespace(describe_training_job=lambda TrainingJobName: {"TrainingJobStatus": status, "TrainingEndTime": end}),
+        }
+
+    def client(self, name, region_name=None):
+        return self.clients[name]
+
+
+def test_sync_sagemaker_fetches_only_the_missing_tail():
+    archive = LogArchive.open("aws", "job")
+    logs = FakeLogs({None: ([(1, "a"), (2, "b")], "f1"), "f1": ([], "f1")})
+    assert log_archive.sync_sagemaker(archive, "job", FakeSession(logs, "InProgress")) == 2
+    assert not archive.complete
+
+    logs.pages.update({"f1": ([(3, "c")], "f2"), "f2": ([], "f2")})
+    logs.calls.clear()
+    assert log_archive.sync_sagemaker(archive, "job", FakeSession(logs, "Completed", ended_minutes_ago=30)) == 1
+    assert logs.calls == ["f1", "f2"]
+    assert archive.complete
+    assert [e.message for e in archive.events()] == ["a", "b", "c"]
+
+    logs.calls.clear()
+    assert log_archive.sync_sagemaker(archive, "job", FakeSession(logs, "Completed", ended_minutes_ago=30)) == 0
+    assert logs.calls == []
+
+
+def test_two_archives_on_one_directory_do_not_fetch_twice():
+    # Two tails (or a tail and `jobber logs`) each hold their own LogArchive.
+    first, second = LogArchive.open("aws", "job"), LogArchive.open("aws", "job")
+    logs = FakeLogs({None: ([(1, "a"), (2, "b")], "f1"), "f1": ([(3, "c")], "f2"), "f2": ([], "f2")})
+    assert log_archive.fetch_sagemaker_stream(first, logs, "job/algo-1") == (2, False)
+    # The second instance re-reads the cursor under the lock instead of starting at the head.
+    assert log_archive.fetch_sagemaker_stream(second, logs, "job/algo-1") == (1, False)
+    assert logs.calls == [None, "f1"]
+    assert [e.message for e in LogArchive.open("aws", "job").events()] == ["a", "b", "c"]
+    assert [e.message for e in second.events(skip=2)] == ["c"]
+
+
+def test_fetch_vertex_skips_entries_up_to_cursor(monkeypatch):
+    from jobber import gcp_clients
+
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    entries = [
+        SimpleNamespace(timestamp=t0, insert_id="a", payload="seen", labels={}),
+        SimpleNamespace(timestamp=t0, insert_id="b", payload={"message": "new"}, labels={"ml.googleapis.com/task_name": "workerpool0-0"}),
+    ]
+    filters = []
+
+    class FakeClient:
+        def __init__(self, project, credentials):
+            pass
+
+        def list_entries(self, filter_, order_by, page_size):
+            filters.append(filter_)
+            return entries
+
+    fake_logging = SimpleNamespace(Client=FakeClient, ASCENDING="timestamp asc")
+    monkeypatch.setattr(gcp_clients, "logging_types", lambda: fake_logging)
+    monkeypatch.setattr(gcp_clients, "credentials", lambda: (None, "p"))
+    gcp_clients.reset()
+
+    archive = LogArchive.open("gcp", "projects/p/locations/us-central1/customJobs/7")
+    archive.append([], {log_archive.VERTEX_CURSOR: {"timestamp": t0.isoformat(), "insert_id": "a"}})
+    seen = []
+    assert log_archive.fetch_vertex(archive, "projects/p/locations/us-central1/customJobs/7", on_event=seen.append) == 1
+    assert [(e.stream, e.message) for e in seen] == [("workerpool0-0", "new")]
+    assert 'resource.labels.job_id="7"' in filters[0] and "timestamp>=" in filters[0]
+    assert archive.cursors[log_archive.VERTEX_CURSOR] == {"timestamp": t0.isoformat(), "insert_id": "b"}
+    gcp_clients.reset()
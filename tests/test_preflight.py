@@ -0,0 +1,138 @@
+import threading
+import types
+
+import pytest
+from botocore.exceptions import ClientError
+
+from jobber import preflight
+
+
+def _client_error(code, op="Op"):
+    return ClientError({"Error": {"Code": code}}, op)
+
+
+class FakeSession:
+    def __init__(self, **clients):
+        self.clients = clients
+
+    def client(self, name, region_name=None):
+        return self.clients[name]
+
+
+def test_run_checks_is_concurrent_and_ordered():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def ok():
+        barrier.wait()
+        return "fine"
+
+    def warn():
+        barrier.wait()
+        raise preflight.PreflightWarning("meh")
+
+    def fail():
+        barrier.wait()
+        raise preflight.PreflightError("broken")
+
+    # All three must be in flight at once for the barrier to release.
+    results = preflight.run_checks({"a": ok, "b": warn, "c": fail})
+    assert [(c.name, c.status, c.detail) for c in results] == [("a", "ok", "fine"), ("b", "warn", "meh"), ("c", "fail", "broken")]
+    assert [c.failed for c in results] == [False, False, True]
+    assert "[fail] c" in preflight.format_checks(results)
+
+
+def test_ecr_image_missing_fails():
+    class FakeECR:
+        def describe_images(self, registryId, repositoryName, imageIds):
+            assert (registryId, repositoryName, imageIds) == ("123456789012", "team/img", [{"imageTag": "v1"}])
+            raise _client_error("ImageNotFoundException")
+
+    session = FakeSession(ecr=FakeECR())
+    with pytest.raises(preflight.PreflightError, match="not found"):
+        preflight.check_ecr_image(session, "123456789012.dkr.ecr.us-east-1.amazonaws.com/team/img:v1")
+    with pytest.raises(preflight.PreflightWarning):
+        preflight.check_ecr_image(session, "docker.io/library/python:3.11")
+
+
+def test_role_trust_policy():
+    trust = {"Statement": [{"Effect": "Allow", "Principal": {"Service": "sagemaker.amazonaws.com"}, "Action": "sts:AssumeRole"}]}
+    other = {"Statement": [{"Effect": "Allow", "Principal": {"Service": ["ec2.amazonaws.com"]}, "Action": ["sts:AssumeRole"]}]}
+
+    class FakeIAM:
+        def get_role(self, RoleName):
+            if RoleName == "missing":
+                raise _client_error("NoSuchEntity")
+            return {"Role": {"AssumeRolePolicyDocument": trust if RoleName == "sm" else other}}
+
+    session = FakeSession(iam=FakeIAM())
+    assert "assumable" in preflight.check_role(session, "arn:aws:iam::1:role/service/sm")
+    with pytest.raises(preflight.PreflightError, match="does not trust"):
+        preflight.check_role(session, "arn:aws:iam::1:role/ec2")
+    with pytest.raises(preflight.PreflightError, match="does not exist"):
+        preflight.check_role(session, "arn:aws:iam::1:role/missing")
+
+
+def test_s3_data_and_quota():
+    class FakeS3:
+        def list_objects_v2(self, Bucket, Prefix, MaxKeys):
+            assert Prefix == "p/data/"
+            return {"KeyCount": 0}
+
+    class FakeQuotas:
+        def get_paginator(self, name):
+            pages = [{"Quotas": [{"QuotaName": "ml.g5.xlarge for training job usage", "Value": 1.0}]}]
+            return types.SimpleNamespace(paginate=lambda ServiceCode: pages)
+
+    session = FakeSession(s3=FakeS3(), **{"service-quotas": FakeQuotas()})
+    with pytest.raises(preflight.PreflightWarning, match="placeholder"):
+        preflight.check_s3_data(session, "b", "p", ensure_data=True)
+    with pytest.raises(preflight.PreflightError, match="empty"):
+        preflight.check_s3_data(session, "b", "p", ensure_data=False)
+    assert "need 1" in preflight.check_sagemaker_quota(session, "ml.g5.xlarge", 1)
+    with pytest.raises(preflight.PreflightError, match="job needs 2"):
+        preflight.check_sagemaker_quota(session, "ml.g5.xlarge", 2)
+    with pytest.raises(preflight.PreflightWarning):
+        preflight.check_sagemaker_quota(session, "ml.g5.xlarge", 1, use_spot=True)
+
+
+def test_entry_point_and_machine_type(tmp_path):
+    (tmp_path / "train.py").write_text("print('hi')\n")
+    assert preflight.check_entry_point("train.py", str(tmp_path))
+    with pytest.raises(preflight.PreflightError, match="not found"):
+        preflight.check_entry_point("main.py", str(tmp_path))
+    assert preflight.check_machine_type("a2-highgpu-1g", "NVIDIA_TESLA_A100", 1)
+    with pytest.raises(preflight.PreflightError, match="not a Vertex"):
+        preflight.check_machine_type("ml.m5.xlarge")
+    with pytest.raises(preflight.PreflightError, match="needs accelerator"):
+        preflight.check_machine_type("g2-standard-8", "NVIDIA_TESLA_T4", 1)
+    with pytest.raises(preflight.PreflightError, match="together"):
+        preflight.check_machine_type("n1-standard-4", "NVIDIA_TESLA_T4", None)
+
+
+def test_gcs_data_and_artifact_image(monkeypatch):
+    class NotFound(Exception):
+        pass
+
+    requested = []
+
+    class FakeArtifactClient:
+        def get_tag(self, name):
+            requested.append(name)
+            if name.endswith("/tags/missing"):
+                raise NotFound(name)
+            return types.SimpleNamespace(version=name.split("/tags/")[0] + "/versions/sha256:0123456789abcdef0123")
+
+    storage = types.SimpleNamespace(lookup_bucket=lambda name: name if name == "b" else None)
+    monkeypatch.setattr(preflight.gcp_clients, "storage_client", lambda project=None: storage)
+    monkeypatch.setattr(preflight.gcp_clients, "artifact_client", lambda: FakeArtifactClient())
+    monkeypatch.setattr(preflight.gcp_clients, "not_found_error", lambda: NotFound)
+    monkeypatch.setattr("jobber.gcp_storage.has_objects", lambda bucket, prefix: False)
+
+    with pytest.raises(preflight.PreflightError, match="is empty"):
+        preflight.check_gcs_data("b", "p", ensure_data=False)
+    with pytest.raises(preflight.PreflightError, match="does not exist"):
+        preflight.check_gcs_data("other", "p")
+    assert "sha256:0123" in preflight.check_artifact_image("us-central1-docker.pkg.dev/proj/repo/team/img:v1")
+    assert requested[0] == "projects/proj/locations/us-central1/repositories/repo/packages/team%2Fimg/tags/v1"
+    with pytest.raises(preflight.PreflightError, match="not found"):
+        preflight.check_artifact_image("us-central1-docker.pkg.dev/proj/repo/img:missing")
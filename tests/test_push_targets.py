@@ -0,0 +1,72 @@
+import subprocess
+
+import pytest
+
+import jobber.push_targets as pt
+from jobber.docker_utils import DockerImage
+
+
+def test_parse_targets_fills_defaults():
+    targets = pt.parse_targets(
+        [{"provider": "aws", "region": "us-west-2"}, {"provider": "gcp", "project": "proj", "artifact_repo": "ar"}],
+        defaults={"provider": "aws", "region": "us-east-1", "repo": "repo"},
+    )
+    assert targets[0].region == "us-west-2"
+    assert targets[0].repo == "repo"
+    assert targets[1].provider == "gcp"
+    assert targets[1].region == "us-east-1"
+    assert targets[1].artifact_repo == "ar"
+
+
+def test_parse_targets_rejects_unknown_keys():
+    with pytest.raises(ValueError):
+        pt.parse_targets([{"provider": "aws", "bucket": "b"}])
+
+
+def test_push_to_targets_tags_once_then_pushes(monkeypatch):
+    calls = {"tag": [], "push": []}
+
+    def fake_resolve(target, image, tag):
+        if target.region == "bad":
+            raise RuntimeError("no creds")
+        return f"{target.region}.example/{image}:{tag}"
+
+    monkeypatch.setattr(pt, "resolve_target", fake_resolve)
+    monkeypatch.setattr(pt, "tag_image", lambda src, ref: calls["tag"].append(ref))
+    monkeypatch.setattr(pt, "push_image", lambda ref: calls["push"].append(ref))
+
+    targets = [pt.PushTarget(region="a"), pt.PushTarget(region="b"), pt.PushTarget(region="bad")]
+    results = pt.push_to_targets(DockerImage(name="img", tag="t"), targets)
+
+    assert sorted(calls["tag"]) == ["a.example/img:t", "b.example/img:t"]
+    assert sorted(calls["push"]) == ["a.example/img:t", "b.example/img:t"]
+    assert [r.ok for r in results] == [True, True, False]
+    assert "no creds" in results[2].error
+    report = pt.format_report(results)
+    assert "2/3 targets succeeded" in report
+
+
+def test_push_to_targets_copy_from(monkeypatch):
+    calls = []
+
+    monkeypatch.setattr(pt, "resolve_target", lambda target, image, tag: f"{target.region}.example/{image}:{tag}")
+    monkeypatch.setattr(pt, "tag_image", lambda src, ref: pytest.fail("copy mode must not tag locally"))
+    monkeypatch.setattr(pt, "run", lambda cmd: calls.append(cmd))
+
+    results = pt.push_to_targets(DockerImage(name="img"), [pt.PushTarget(region="a")], copy_from="src.example/img:latest")
+    assert calls[0][:4] == ["docker", "buildx", "imagetools", "create"]
+    assert calls[0][-1] == "src.example/img:latest"
+    assert results[0].mode == "copy"
+
+
+def test_push_failure_reported(monkeypatch):
+    monkeypatch.setattr(pt, "resolve_target", lambda target, image, tag: "r/img:t")
+    monkeypatch.setattr(pt, "tag_image", lambda src, ref: None)
+
+    def fail_push(ref):
+        raise subprocess.CalledProcessError(1, ["docker", "push", ref])
+
+    monkeypatch.setattr(pt, "push_image", fail_push)
+    results = pt.push_to_targets(DockerImage(name="img"), [pt.PushTarget(region="a")])
+    assert results[0].ok is False
+    assert "docker" in results[0].error
@@ -0,0 +1,61 @@
+from jobber import job_registry, recommender
+
+
+def _run(name, itype, seconds, count=1, **kw):
+    return job_registry.JobRecord(
+        provider="aws", job_name=name, instance_type=itype, instance_count=count, state="succeeded", duration_seconds=seconds, **kw
+    )
+
+
+def test_cheapest_within_target():
+    history = [
+        _run("a", "ml.m5.xlarge", 5 * 3600, metrics={"cpu_util": 390.0}),
+        _run("b", "ml.g5.xlarge", 3000, metrics={"gpu_util": 40.0, "images_per_sec": 800.0}),
+        _run("c", "ml.g5.xlarge", 3600, metrics={"gpu_util": 50.0, "images_per_sec": 700.0}),
+        _run("d", "ml.p3.2xlarge", 1800),
+        _run("e", "ml.weird.xlarge", 60),
+    ]
+    opts = recommender.options(history, recommender.Pricing())
+    assert [o.instance_type for o in opts] == ["ml.m5.xlarge", "ml.g5.xlarge", "ml.p3.2xlarge", "ml.weird.xlarge"]
+    g5 = opts[1]
+    assert (g5.runs, g5.seconds, g5.metrics["gpu_util"]) == (2, 3300, 45.0)
+
+    assert recommender.recommend(opts).instance_type == "ml.m5.xlarge"
+    assert recommender.recommend(opts, target_seconds=2 * 3600).instance_type == "ml.g5.xlarge"
+    assert recommender.recommend(opts, target_seconds=1900).instance_type == "ml.p3.2xlarge"
+    assert recommender.recommend(opts, target_seconds=30).instance_type == "ml.weird.xlarge"
+
+    text = recommender.format_recommendation(opts, recommender.recommend(opts, 7200), 7200, current=("ml.p3.2xlarge", 1, None, None))
+    assert "-> ml.g5.xlarge: cheapest within 2h00m" in text
+    assert "* ml.p3.2xlarge" in text
+
+
+def test_pricing_accelerators_and_overrides(tmp_path):
+    pricing = recommender.Pricing()
+    assert pricing.hourly("n1-standard-8", 2, "NVIDIA_TESLA_T4", 2) == (0.437 + 2 * 0.403) * 2
+    assert pricing.hourly("n1-standard-8", 1, "NVIDIA_UNKNOWN", 1) is None
+
+    path = tmp_path / "prices.yml"
+    path.write_text("instances:\n  ml.g5.xlarge: 1.0\n  ml.trn1.2xlarge: 1.5\n")
+    loaded = recommender.load_pricing(str(path))
+    assert loaded.instances["ml.g5.xlarge"] == 1.0 and loaded.instances["ml.trn1.2xlarge"] == 1.5
+    assert loaded.instances["ml.m5.xlarge"] == recommender.INSTANCE_PRICES["ml.m5.xlarge"]
+
+
+def test_workload_options_fetches_metrics_once(monkeypatch):
+    conn = job_registry.connect()
+    job_registry.record(_run("a", "ml.g5.xlarge", None, workload="w"), conn=conn)
+    job_registry.record(job_registry.JobRecord(provider="aws", job_name="b", workload="w", instance_type="ml.g5.2xlarge"), conn=conn)
+    calls = []
+
+    def fake_collect(job):
+        calls.append(job.job_name)
+        return 1200.0, {"gpu_util": 90.0}
+
+    monkeypatch.setitem(recommender.job_metrics.COLLECTORS, "aws", fake_collect)
+    monkeypatch.setattr(job_registry, "_sagemaker_statuses", lambda jobs: {"b": "Completed"})
+
+    opts = recommender.workload_options("w", recommender.Pricing(), conn=conn)
+    assert sorted(o.instance_type for o in opts) == ["ml.g5.2xlarge", "ml.g5.xlarge"]
+    recommender.workload_options("w", recommender.Pricing(), conn=conn)
+    assert sorted(calls) == ["a", "b"]
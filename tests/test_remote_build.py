@@ -0,0 +1,123 @@
+import tarfile
+import types
+import zipfile
+
+import pytest
+from botocore.exceptions import ClientError
+
+from jobber import remote_build
+
+
+def test_split_uri():
+    assert remote_build.split_uri("s3://b/some/prefix/") == ("s3", "b", "some/prefix")
+    assert remote_build.split_uri("gs://b") == ("gs", "b", "")
+    with pytest.raises(ValueError):
+        remote_build.split_uri("https://b/p")
+
+
+class FakeS3:
+    def __init__(self, existing=()):
+        self.existing = set(existing)
+        self.uploaded = []
+        self.zipped = []
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.existing:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+    def upload_file(self, path, bucket, key):
+        self.uploaded.append((bucket, key))
+        self.zipped.append(zipfile.is_zipfile(path) and zipfile.ZipFile(path).namelist())
+        self.existing.add(key)
+
+
+class FakeCodeBuild:
+    def __init__(self):
+        self.started = None
+        self.statuses = ["IN_PROGRESS", "SUCCEEDED"]
+
+    def start_build(self, **kwargs):
+        self.started = kwargs
+        return {"build": {"id": "proj:1"}}
+
+    def batch_get_builds(self, ids):
+        return {"builds": [{"buildStatus": self.statuses.pop(0), "currentPhase": "BUILD"}]}
+
+
+def test_codebuild_remote_build_skips_unchanged_context(tmp_path, monkeypatch):
+    (tmp_path / "train.py").write_text("print(1)\n")
+    (tmp_path / "Dockerfile").write_text("FROM scratch\n")
+    s3 = FakeS3()
+    cb = FakeCodeBuild()
+    repos = []
+    session = types.SimpleNamespace(client=lambda name: {"s3": s3, "codebuild": cb, "ecr": object()}[name])
+    monkeypatch.setitem(__import__("sys").modules, "boto3", types.SimpleNamespace(Session=lambda region_name=None: session))
+    monkeypatch.setattr("jobber.ecr_utils.ensure_repo", lambda client, repo, account_id=None: repos.append((repo, account_id)))
+    monkeypatch.setattr(remote_build.time, "sleep", lambda s: None)
+
+    uri = "123.dkr.ecr.us-east-1.amazonaws.com/team/train:v1"
+    remote_build.remote_build(str(tmp_path), str(tmp_path / "Dockerfile"), uri, "s3://bkt/builds", codebuild_project="proj")
+    assert len(s3.uploaded) == 1
+    bucket, key = s3.uploaded[0]
+    assert bucket == "bkt" and key.startswith("builds/context/") and key.endswith(".zip")
+    assert s3.zipped == [["Dockerfile", "train.py"]]
+    assert repos == [("team/train", "123")]
+    assert cb.started["sourceLocationOverride"] == f"bkt/{key}"
+    env = {e["name"]: e["value"] for e in cb.started["environmentVariablesOverride"]}
+    assert env["IMAGE_URI"] == uri
+    assert env["DOCKERFILE"] == "Dockerfile"
+
+    cb.statuses = ["SUCCEEDED"]
+    staged = remote_build.stage_context(str(tmp_path), str(tmp_path / "Dockerfile"), "s3://bkt/builds", boto_session=session)
+    assert staged.uploaded is False
+    assert len(s3.uploaded) == 1
+
+
+def test_codebuild_failure_raises(monkeypatch):
+    cb = FakeCodeBuild()
+    cb.statuses = ["FAILED"]
+    monkeypatch.setattr(remote_build.time, "sleep", lambda s: None)
+    with pytest.raises(RuntimeError):
+        remote_build._wait_for_codebuild(cb, "proj:1")
+
+
+def test_cloud_build_submits_staged_archive(monkeypatch):
+    calls = []
+    monkeypatch.setattr(remote_build.subprocess, "run", lambda cmd, check: calls.append(cmd))
+    monkeypatch.setattr("jobber.gcp_artifact.ensure_repo", lambda project, region, repo: calls.append(("ensure", project, region, repo)))
+    staged = remote_build.StagedContext(uri="gs://b/context/abc.tar.gz", sha256="abc", size=1, uploaded=True)
+    remote_build.cloud_build("proj", "us-central1", staged, "us-central1-docker.pkg.dev/proj/repo/img:t")
+    assert calls[0] == ("ensure", "proj", "us-central1", "repo")
+    assert calls[1][:4] == ["gcloud", "builds", "submit", "gs://b/context/abc.tar.gz"]
+    assert "--project=proj" in calls[1]
+
+
+def test_cloud_build_stages_tar_gz(tmp_path, monkeypatch):
+    (tmp_path / "train.py").write_text("print(1)\n")
+    (tmp_path / "Dockerfile").write_text("FROM scratch\n")
+    staged_files = []
+
+    def fake_upload(bucket, key, path):
+        with tarfile.open(path, "r:gz") as tar:
+            staged_files.append((bucket, key, tar.getnames()))
+        return True
+
+    monkeypatch.setattr(remote_build, "_upload_gcs", fake_upload)
+    staged = remote_build.stage_context(str(tmp_path), None, "gs://gb/builds")
+    [(bucket, key, names)] = staged_files
+    assert bucket == "gb" and key == f"builds/context/{staged.sha256}.tar.gz"
+    assert names == ["Dockerfile", "train.py"]
+    assert staged.uri == f"gs://gb/{key}"
+
+
+def test_external_dockerfile_is_passed_under_reserved_path(tmp_path, monkeypatch):
+    context = tmp_path / "ctx"
+    context.mkdir()
+    (context / "Dockerfile").write_text("FROM context\n")
+    external = tmp_path / "gpu.Dockerfile"
+    external.write_text("FROM gpu\n")
+    built = {}
+    monkeypatch.setattr(remote_build, "_upload_gcs", lambda bucket, key, path: True)
+    monkeypatch.setattr(remote_build, "cloud_build", lambda project, region, staged, uri, dockerfile: built.update(dockerfile=dockerfile))
+    remote_build.remote_build(str(context), str(external), "us-docker.pkg.dev/p/r/i:t", "gs://gb/builds", region="us-central1", project="p")
+    assert built["dockerfile"] == ".jobber/Dockerfile"
@@ -0,0 +1,163 @@
+import threading
+import types
+
+import pytest
+from botocore.awsrequest import AWSResponse
+from botocore.exceptions import ClientError
+
+from jobber import retry
+
+
+@pytest.fixture(autouse=True)
+def fresh_buckets(monkeypatch):
+    retry.reset()
+    monkeypatch.setattr(retry, "backoff", lambda attempt, policy: 0)
+    monkeypatch.setattr(retry.time, "sleep", lambda s: None)
+    yield
+    retry.reset()
+
+
+def throttled(code="ThrottlingException"):
+    return ClientError({"Error": {"Code": code, "Message": "Rate exceeded"}}, "DescribeLogStreams")
+
+
+def test_token_bucket_is_shared_across_threads():
+    now = [0.0]
+
+    def sleep(s):
+        now[0] += s
+
+    bucket = retry.TokenBucket(rate=10, burst=5, clock=lambda: now[0], sleep=sleep)
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 5 from the burst, 3 more at 10/s.
+    assert now[0] == pytest.approx(0.3, abs=0.05)
+
+
+def test_throttle_halves_rate_and_success_recovers():
+    bucket = retry.TokenBucket(rate=8, burst=8)
+    bucket.on_throttle()
+    bucket.on_throttle()
+    assert bucket.rate == 2
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == 8
+
+
+def test_call_retries_throttling_then_succeeds():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise throttled()
+        return "ok"
+
+    assert retry.call("cloudwatch-logs", flaky) == "ok"
+    assert len(attempts) == 3
+    assert retry.bucket("cloudwatch-logs").rate < retry.DEFAULT_POLICIES["cloudwatch-logs"].rate
+
+
+def test_call_reraises_other_errors_and_gives_up(monkeypatch):
+    def denied():
+        raise ClientError({"Error": {"Code": "AccessDeniedException", "Message": "no"}}, "CreateTrainingJob")
+
+    with pytest.raises(ClientError):
+        retry.call("sagemaker", denied)
+
+    monkeypatch.setenv("JOBBER_API_MAX_ATTEMPTS", "2")
+    attempts = []
+
+    def always():
+        attempts.append(1)
+        raise throttled()
+
+    with pytest.raises(ClientError):
+        retry.call("sagemaker", always)
+    assert len(attempts) == 2
+
+
+def test_google_quota_errors_are_throttles():
+    ResourceExhausted = type("ResourceExhausted", (Exception,), {"code": 429})
+    NotFound = type("NotFound", (Exception,), {"code": 404})
+    assert retry.is_throttle(ResourceExhausted("Quota exceeded for aiplatform.googleapis.com/custom_model_training_cpus"))
+    assert not retry.is_throttle(NotFound("missing"))
+
+
+def test_wrapped_client_retries_method_calls():
+    calls = []
+
+    class Client:
+        region = "us-central1"
+
+        def create_custom_job(self, parent, custom_job):
+            calls.append(parent)
+            if len(calls) == 1:
+                raise type("ResourceExhausted", (Exception,), {})("quota")
+            return types.SimpleNamespace(name="projects/p/locations/us-central1/customJobs/1")
+
+    client = retry.wrap(Client(), "aiplatform")
+    assert client.create_custom_job(parent="p", custom_job={}).name.endswith("/1")
+    assert client.region == "us-central1"
+    assert len(calls) == 2
+
+
+def test_wrapped_create_is_not_retried_after_service_unavailable():
+    calls = []
+
+    class Client:
+        def create_custom_job(self, parent, custom_job):
+            calls.append("create")
+            raise type("ServiceUnavailable", (Exception,), {"code": 503})("unavailable")
+
+        def get_custom_job(self, name):
+            calls.append("get")
+            if calls.count("get") == 1:
+                raise type("ServiceUnavailable", (Exception,), {"code": 503})("unavailable")
+            return "job"
+
+    client = retry.wrap(Client(), "aiplatform")
+    # The job may exist despite the 503; a second create could start a duplicate.
+    with pytest.raises(Exception, match="unavailable"):
+        client.create_custom_job(parent="p", custom_job={})
+    assert calls == ["create"]
+    assert client.get_custom_job(name="j") == "job"
+    assert calls == ["create", "get", "get"]
+
+
+def test_env_limits_override_policy(monkeypatch):
+    monkeypatch.setenv("JOBBER_API_LIMITS", "cloudwatch-logs=2/4,aiplatform=1")
+    assert retry.policy_for("cloudwatch-logs").rate == 2
+    assert retry.policy_for("cloudwatch-logs").burst == 4
+    assert retry.policy_for("aiplatform").burst == 2
+    assert retry.policy_for("s3") == retry.DEFAULT_POLICY
+
+
+def test_env_limits_ignore_unusable_rates(monkeypatch):
+    monkeypatch.setenv("JOBBER_API_LIMITS", "logging=0,aiplatform=-1,s3=2/0,cloudwatch-logs=x,sagemaker=1/2")
+    assert retry.policy_for("logging") == retry.DEFAULT_POLICIES["logging"]
+    assert retry.policy_for("aiplatform") == retry.DEFAULT_POLICIES["aiplatform"]
+    assert retry.policy_for("s3") == retry.DEFAULT_POLICY
+    assert retry.policy_for("cloudwatch-logs") == retry.DEFAULT_POLICIES["cloudwatch-logs"]
+    assert retry.policy_for("sagemaker").burst == 2
+
+
+def test_boto_session_retries_throttled_requests(monkeypatch):
+    monkeypatch.setenv("AWS_MAX_ATTEMPTS", "1")  # leave all retries to the jobber hook
+    monkeypatch.setenv("JOBBER_API_LIMITS", "cloudwatch-logs=1000/1000")
+    sent = []
+
+    def respond(request, **kwargs):
+        sent.append(request)
+        status, body = (400, b'{"__type":"ThrottlingException","message":"Rate exceeded"}') if len(sent) < 4 else (200, b'{"logStreams":[]}')
+        return AWSResponse(request.url, status, {}, types.SimpleNamespace(stream=lambda **kw: iter([body])))
+
+    session = retry.session("us-east-1")
+    session.events.register("before-send", respond)
+    logs = session.client("logs", aws_access_key_id="x", aws_secret_access_key="y")
+    assert logs.describe_log_streams(logGroupName="/aws/sagemaker/TrainingJobs")["logStreams"] == []
+    assert len(sent) == 4
+    assert retry.bucket("cloudwatch-logs").rate < 1000
@@ -0,0 +1,64 @@
+import types
+
+from botocore.exceptions import ClientError
+
+from jobber import config as cfg
+from jobber import s3_utils
+
+
+class FakeS3:
+    def __init__(self, region="us-west-2", buckets=(), keys=()):
+        self.meta = types.SimpleNamespace(region_name=region)
+        self.buckets = set(buckets)
+        self.keys = list(keys)
+        self.calls = []
+
+    def head_bucket(self, Bucket):
+        self.calls.append("head")
+        if Bucket not in self.buckets:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadBucket")
+
+    def create_bucket(self, **params):
+        self.calls.append(("create", params))
+        self.buckets.add(params["Bucket"])
+
+    def list_objects_v2(self, Bucket, Prefix, MaxKeys):
+        self.calls.append("list")
+        return {"KeyCount": sum(1 for k in self.keys if k.startswith(Prefix))}
+
+    def put_object(self, Bucket, Key, Body):
+        self.calls.append(("put", Key))
+        self.keys.append(Key)
+
+
+def _session(s3):
+    return types.SimpleNamespace(
+        region_name=s3.meta.region_name,
+        client=lambda name: s3,
+        get_credentials=lambda: types.SimpleNamespace(access_key="AKIA"),
+    )
+
+
+def test_ensure_bucket_creates_in_region_then_caches():
+    s3 = FakeS3()
+    session = _session(s3)
+    s3_utils.ensure_bucket("b", boto_session=session)
+    s3_utils.ensure_bucket("b", boto_session=session)
+    assert s3.calls == ["head", ("create", {"Bucket": "b", "CreateBucketConfiguration": {"LocationConstraint": "us-west-2"}})]
+
+
+def test_ensure_data_uploads_placeholder_only_when_empty():
+    s3 = FakeS3(keys=["full/data/x.csv"])
+    session = _session(s3)
+    s3_utils.ensure_data("b", "full", boto_session=session)
+    s3_utils.ensure_data("b", "empty/", boto_session=session)
+    assert s3.calls == ["list", "list", ("put", "empty/data/placeholder.txt")]
+
+
+def test_guess_region_and_account_use_boto3(monkeypatch):
+    import boto3
+
+    sts = types.SimpleNamespace(get_caller_identity=lambda: {"Account": "123456789012"})
+    monkeypatch.setattr(boto3, "Session", lambda: types.SimpleNamespace(region_name="eu-west-1", client=lambda name: sts))
+    assert cfg.guess_aws_region() == "eu-west-1"
+    assert cfg.guess_aws_account() == "123456789012"
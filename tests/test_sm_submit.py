@@ -36,7 +36,7 @@ def test_placeholder_upload(monkeypatch):
             assert name == "s3"
             return FakeS3()
 
-    monkeypatch.setattr(sm_submit.boto3, "Session", lambda region_name=None: FakeSession())
+    monkeypatch.setattr(sm_submit.retry, "session", lambda region=None: FakeSession())
 
     class DummyTrainer:
         def __init__(self, **kwargs):
@@ -73,3 +73,73 @@ def test_placeholder_upload(monkeypatch):
     assert calls["trainer_kwargs"]["stopping_condition"].max_wait_time_in_seconds == 123
     assert calls["trainer_kwargs"]["stopping_condition"].max_runtime_in_seconds == 123
     assert job == "job"
+
+
+def test_build_training_request_matches_submit_inputs():
+    req = sm_submit.build_training_request(
+        image_uri="uri",
+        role_arn="arn",
+        bucket="b",
+        prefix="p",
+        entry_point="train.py",
+        source_dir="src",
+        hyperparameters={"epochs": 3},
+        instance_type="ml.g5.xlarge",
+        instance_count=2,
+        use_spot=True,
+        max_wait_seconds=600,
+        tags={"jobber-fingerprint": "abc"},
+    )
+    assert req["AlgorithmSpecification"]["TrainingImage"] == "uri"
+    assert req["Tags"] == [{"Key": "jobber-fingerprint", "Value": "abc"}]
+    assert req["HyperParameters"] == {"epochs": "3"}
+    assert [c["ChannelName"] for c in req["InputDataConfig"]] == ["train", "code", "sm_drivers"]
+    assert req["InputDataConfig"][0]["DataSource"]["S3DataSource"]["S3Uri"] == "s3://b/p/data"
+    assert req["OutputDataConfig"]["S3OutputPath"] == "s3://b/p/outputs"
+    assert req["ResourceConfig"]["InstanceCount"] == 2
+    assert req["StoppingCondition"] == {"MaxRuntimeInSeconds": 600, "MaxWaitTimeInSeconds": 600}
+    assert req["EnableManagedSpotTraining"] is True
+
+
+def test_stream_training_logs_resumes_from_archived_tokens(capsys):
+    from jobber.log_archive import LogArchive, LogEvent
+
+    LogArchive.open("aws", "job").append([LogEvent(1, "job/algo-1", "old line")], {"job/algo-1": "f1"})
+    requested = []
+
+    def get_log_events(logGroupName, logStreamName, startFromHead, nextToken=None):
+        requested.append(nextToken)
+        return {"events": [{"timestamp": 2, "message": "new line"}], "nextForwardToken": "f2"}
+
+    logs = types.SimpleNamespace(
+        describe_log_streams=lambda **kw: {"logStreams": [{"logStreamName": "job/algo-1"}]}, get_log_events=get_log_events
+    )
+    sm = types.SimpleNamespace(describe_training_job=lambda TrainingJobName: {"TrainingJobStatus": "Completed"})
+    session = types.SimpleNamespace(client=lambda name: {"logs": logs, "sagemaker": sm}[name])
+
+    sm_submit._stream_training_logs("job", session, poll=0)
+    out = capsys.readouterr().out
+    assert requested == ["f1"]
+    assert "new line" in out and "old line" not in out
+    assert LogArchive.open("aws", "job").cursors == {"job/algo-1": "f2"}
+
+
+def test_build_training_request_spills_large_hyperparameters():
+    arch = {"layers": [{"width": 512, "dropout": 0.1}] * 200}
+    req = sm_submit.build_training_request(
+        image_uri="uri",
+        role_arn="arn",
+        bucket="b",
+        prefix="p",
+        entry_point="train.py",
+        source_dir=None,
+        hyperparameters={"epochs": 3, "model": arch},
+        instance_type="ml.g5.xlarge",
+    )
+    hps = req["HyperParameters"]
+    assert hps["epochs"] == "3"
+    assert "model" not in hps
+    assert hps["jobber-config"] == "/opt/ml/input/data/jobber-config/hyperparameters.json"
+    channel = req["InputDataConfig"][-1]
+    assert channel["ChannelName"] == "jobber-config"
+    assert channel["DataSource"]["S3DataSource"]["S3Uri"].startswith("s3://b/p/config/")
@@ -25,3 +25,52 @@ def test_add_and_delete_template(tmp_path):
         pass
     else:
         raise AssertionError("Template not deleted")
+
+
+def test_render_defaults_and_overrides():
+    gpu = tpl.get_template("gpu-cu121")
+    assert "{{" not in gpu.content
+    assert "# jobber:" not in gpu.content
+    assert gpu.content.startswith("# syntax=docker/dockerfile")
+    assert "FROM nvidia/cuda:12.1.0" in gpu.content
+    rendered = gpu.render({"python_version": "3.11"}, {"pip_packages": ["einops"], "apt_packages": ["git"]})
+    assert "python3.11 -m venv" in rendered
+    assert "'numpy<2' 'sagemaker-training>=5' einops" in rendered
+    assert "zlib1g-dev git" in rendered
+
+
+def test_render_nested_default():
+    cpu = tpl.get_template("cpu")
+    assert "FROM python:3.12-slim" in cpu.render({"python_version": "3.12"})
+    assert "FROM my/base:1" in cpu.render({"base_image": "my/base:1"})
+
+
+def test_builtin_templates_share_cache_mounts_and_layer_order():
+    for name in ("cpu", "gpu-cu121", "gpu-cu128"):
+        content = tpl.get_template(name).content
+        assert "--mount=type=cache,id=jobber-pip,target=/root/.cache/pip" in content
+        assert content.index("pip install -r requirements.txt") < content.index("COPY . .")
+
+
+def test_cu128_template_builds_without_requirements_file():
+    content = tpl.get_template("gpu-cu128").content
+    assert "COPY requirements.tx[t] ./" in content
+    assert "if [ -f requirements.txt ]; then pip install -r requirements.txt; fi" in content
+
+
+def test_render_missing_param(tmp_path):
+    custom_src = tmp_path / "custom.Dockerfile"
+    custom_src.write_text("FROM {{ base_image }}\n")
+    tpl.add_template("custom-param", custom_src)
+    try:
+        t = tpl.get_template("custom-param")
+        assert t.params == ["base_image"]
+        assert t.render({"base_image": "scratch"}) == "FROM scratch\n"
+        try:
+            t.render()
+        except ValueError as e:
+            assert "base_image" in str(e)
+        else:
+            raise AssertionError("missing param not reported")
+    finally:
+        tpl.delete_template("custom-param")
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from jobber import utilization
+
+
+class FakeSession:
+    def __init__(self, **clients):
+        self.clients = clients
+
+    def client(self, name, region_name=None):
+        return self.clients[name]
+
+
+def _fake_cloudwatch(values_by_metric):
+    def paginate(MetricDataQueries, **kw):
+        results = []
+        for q in MetricDataQueries:
+            metric = q["MetricStat"]["Metric"]["MetricName"]
+            values = values_by_metric.get(metric, [])
+            results.append({"Id": q["Id"], "Timestamps": list(range(len(values))), "Values": values})
+        return [{"MetricDataResults": results}]
+
+    return SimpleNamespace(get_paginator=lambda name: SimpleNamespace(paginate=paginate))
+
+
+def test_sagemaker_report_phases_and_data_loader_hint():
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    at = lambda minutes: t0 + timedelta(minutes=minutes)
+
+    class FakeSM:
+        def describe_training_job(self, TrainingJobName):
+            return {
+                "TrainingJobStatus": "Completed",
+                "ResourceConfig": {"InstanceType": "ml.g5.2xlarge", "InstanceCount": 1},
+                "TrainingStartTime": at(0),
+                "TrainingEndTime": at(60),
+                "SecondaryStatusTransitions": [
+                    {"Status": "Starting", "StartTime": at(0), "EndTime": at(5)},
+                    {"Status": "Downloading", "StartTime": at(5), "EndTime": at(25)},
+                    {"Status": "Training", "StartTime": at(25), "EndTime": at(55)},
+                    {"Status": "Uploading", "StartTime": at(55), "EndTime": at(60)},
+                ],
+            }
+
+    cloudwatch = _fake_cloudwatch({"GPUUtilization": [20.0, 30.0, 40.0], "CPUUtilization": [700.0, 760.0, 780.0]})
+    report = utilization.sagemaker_report("job", boto_session=FakeSession(sagemaker=FakeSM(), cloudwatch=cloudwatch))
+
+    assert [(p.name, p.seconds) for p in report.phases] == [("Starting", 300), ("Downloading", 1200), ("Training", 1800), ("Uploading", 300)]
+    assert report.summary("gpu_util") == (30.0, 40.0, 40.0)
+    assert report.means() == {"gpu_util": 30.0, "cpu_util": 746.7}
+    assert any("input download took 33%" in n for n in report.notes)
+    assert any("data-loader bound" in n for n in report.notes)
+
+    text = utilization.format_report(report)
+    assert "Downloading" in text and "0:20:00" in text
+    assert "gpu_util" in text and "disk_util" not in text
+
+
+def test_series_averages_hosts_by_timestamp():
+    cloudwatch = _fake_cloudwatch({"GPUUtilization": [10.0, 50.0]})
+    series = utilization.sagemaker_series(FakeSession(cloudwatch=cloudwatch), "job", None, None, hosts=2)
+    assert series == {"gpu_util": [10.0, 50.0]}
+
+
+def test_sparkline_downsamples():
+    line = utilization.sparkline([0.0] * 50 + [100.0] * 50, width=10)
+    assert len(line) == 10 and line[0] == "▁" and line[-1] == "█"
@@ -88,3 +88,32 @@ def test_builds_custom_job(monkeypatch):
     assert calls["placeholder"] == ("b", "p")
     assert job_name.endswith("customJobs/123")
     assert calls["gcloud"][0][:4] == ["gcloud", "ai", "custom-jobs", "stream-logs"]
+
+
+def test_build_custom_job_without_accelerator():
+    job = vertex_submit.build_custom_job(
+        image_uri="img",
+        bucket="b",
+        prefix="p",
+        entry_point=None,
+        args={"lr": 0.1},
+        machine_type="n1-standard-8",
+        accelerator_type="NVIDIA_TESLA_T4",
+        labels={"jobber-fingerprint": "abc"},
+    )
+    assert job["labels"] == {"jobber-fingerprint": "abc"}
+    spec = job["job_spec"]["worker_pool_specs"][0]
+    assert spec["machine_spec"] == {"machine_type": "n1-standard-8"}
+    assert spec["container_spec"] == {"image_uri": "img", "args": ["--lr", "0.1"]}
+    assert job["job_spec"]["base_output_directory"]["output_uri_prefix"] == "gs://b/p/outputs"
+
+
+def test_build_custom_job_spills_large_args():
+    augment = [f"transform-{i}" for i in range(1000)]
+    job = vertex_submit.build_custom_job(
+        image_uri="img", bucket="b", prefix="p", entry_point=None, args={"lr": 0.1, "augment": augment}, machine_type="n1-standard-8"
+    )
+    args = job["job_spec"]["worker_pool_specs"][0]["container_spec"]["args"]
+    assert args[:2] == ["--lr", "0.1"]
+    assert args[2] == "--jobber-config"
+    assert args[3].startswith("/gcs/b/p/config/") and args[3].endswith("/hyperparameters.json")